@@ -10,45 +10,46 @@ management functionality
 
 from __future__ import print_function
 
+import importlib
 import sys
 import optparse
 import os
 import tempfile
 from io import StringIO
 from logging import StreamHandler
-from sqlobject import sqlhub, connectionForURI, SQLObjectNotFound
-from sutekh.base.core.BaseTables import Ruling, PHYSICAL_LIST, AbstractCard
-from sutekh.base.core.BaseAdapters import IPhysicalCardSet, IAbstractCard
-from sutekh.core.SutekhTables import TABLE_LIST
-# pylint: disable=unused-import
-# We need this import to ensure we have all the filters imported
-# correctly, even though we don't use it directly
-import sutekh.core.Filters
-# pylint: enable=unused-import
-from sutekh.SutekhUtility import (read_white_wolf_list, read_rulings,
-                                  gen_temp_dir, is_crypt_card,
-                                  format_text, read_exp_info_file,
-                                  read_lookup_data, do_card_checks,
-                                  keyword_sort_key)
-from sutekh.base.core.DBUtility import refresh_tables, make_adapter_caches
 from sutekh.base.Utility import (ensure_dir_exists, prefs_dir, sqlite_uri,
                                  setup_logging)
-from sutekh.core.DatabaseUpgrade import DBUpgradeManager
-from sutekh.base.core.CardSetHolder import CardSetWrapper
-from sutekh.base.CliUtils import (run_filter, print_card_filter_list,
-                                  print_card_list, do_print_card)
-from sutekh.io.XmlFileHandling import (PhysicalCardXmlFile,
-                                       PhysicalCardSetXmlFile,
-                                       AbstractCardSetXmlFile,
-                                       write_all_pcs)
-from sutekh.io.WriteArdbText import WriteArdbText
-from sutekh.io.ZipFileWrapper import ZipFileWrapper
-from sutekh.base.io.EncodedFile import EncodedFile
-from sutekh.io.WwUrls import (WW_CARDLIST_URL, WW_RULINGS_URL,
-                              EXTRA_CARD_URL, EXP_DATA_URL,
-                              LOOKUP_DATA_URL)
+from sutekh.base.ImportTimer import ImportTimer
 from sutekh.SutekhInfo import SutekhInfo
 
+# pylint: disable=import-outside-toplevel
+# The commands import what they need when they run, so the one-shot
+# commands don't pay for loading the whole IO, filter and table stack
+
+# Formats for --export-format - name: (file extension, writer module,
+# writer class)
+EXPORT_FORMATS = {
+    'ardb': ('txt', 'sutekh.io.WriteArdbText', 'WriteArdbText'),
+    'html': ('html', 'sutekh.io.WriteArdbHTML', 'WriteArdbHTML'),
+    'csv': ('csv', 'sutekh.base.io.WriteCSV', 'WriteCSV'),
+    'jol': ('jol.txt', 'sutekh.io.WriteJOL', 'WriteJOL'),
+    'lackey': ('lackey.txt', 'sutekh.io.WriteLackeyCCG', 'WriteLackeyCCG'),
+    'xml': ('xml', 'sutekh.io.PhysicalCardSetWriter',
+            'PhysicalCardSetWriter'),
+}
+
+# Orders for --twda-stats-order (the CO_* constants in TWDAIndex)
+TWDA_ORDERS = ['decks', 'lift']
+
+# The modules defining the tables, adapters and abbreviations. These must
+# be imported before the adapter caches are made, since
+# make_adapter_caches only knows about the classes already loaded
+CACHE_MODULES = [
+    'sutekh.core.SutekhTables',
+    'sutekh.core.SutekhAdapters',
+    'sutekh.core.Abbreviations',
+]
+
 
 def parse_options(aArgs):
     """Handle the command line options"""
@@ -133,6 +134,28 @@ def parse_options(aArgs):
     oOptParser.add_option("--print-cs", type="string", dest="print_cs",
                           default=None, help="Print the given card set "
                                              "(ARDB Text format)")
+    oOptParser.add_option("--export-children", type="string",
+                          dest="export_children", default=None,
+                          help="Export all the card sets below the given "
+                               "card set")
+    oOptParser.add_option("--export-filter", type="string",
+                          dest="export_filter", default=None,
+                          help="Export all the card sets matching the given "
+                               "card set filter (may be combined with "
+                               "--export-children)")
+    oOptParser.add_option("--export-format", type="choice", action="append",
+                          dest="export_formats", default=None,
+                          choices=sorted(EXPORT_FORMATS),
+                          help="Format to export the card sets in. May be "
+                               "given several times. [ardb]")
+    oOptParser.add_option("--export-dir", type="string", dest="export_dir",
+                          default=".",
+                          help="Directory to write the exported card sets to "
+                               "[.]")
+    oOptParser.add_option("--export-jobs", type="int", dest="export_jobs",
+                          default=None,
+                          help="Number of processes to use for the export "
+                               "[one per core]")
     oOptParser.add_option("--list-cs", action="store_true", dest="list_cs",
                           default=False, help="Print a formatted list of all "
                                               "the card sets in the database")
@@ -149,12 +172,61 @@ def parse_options(aArgs):
                           dest="filter_detailed", default=False,
                           help="Print card details for filter results, "
                                "rather than just card names")
+    oOptParser.add_option("--explain-filter", action="store_true",
+                          dest="explain_filter", default=False,
+                          help="Print the database's query plan for --filter, "
+                               "with the time taken and number of rows, "
+                               "instead of the results")
     oOptParser.add_option("--print-card", type="string", dest="print_card",
                           default=None,
                           help="Print the details of the given card")
+    oOptParser.add_option("--twda-stats", type="string", dest="twda_stats",
+                          default=None,
+                          help="Print the cards most often played with the "
+                               "given card in the TWDA decks")
+    oOptParser.add_option("--twda-stats-top", type="int",
+                          dest="twda_stats_top", default=20,
+                          help="Number of cards to list with --twda-stats "
+                               "[20]")
+    oOptParser.add_option("--twda-stats-order", type="choice",
+                          dest="twda_stats_order", default=TWDA_ORDERS[0],
+                          choices=TWDA_ORDERS,
+                          help="Order the --twda-stats results by number of "
+                               "decks in common or by lift [%s]" %
+                          TWDA_ORDERS[0])
     oOptParser.add_option("--print-encoding", type="string",
                           dest="print_encoding", default='ascii',
                           help="Encoding to use when printing output")
+    oOptParser.add_option("--daemon", action="store_true", dest="daemon",
+                          default=False,
+                          help="Run a query daemon, which answers --filter, "
+                               "--print-card and --print-cs requests from "
+                               "--use-daemon, until stopped")
+    oOptParser.add_option("--use-daemon", action="store_true",
+                          dest="use_daemon", default=False,
+                          help="Send the --filter, --print-card and "
+                               "--print-cs requests to the query daemon")
+    oOptParser.add_option("--reload-daemon", action="store_true",
+                          dest="reload_daemon", default=False,
+                          help="Ask the query daemon to reload its caches "
+                               "(changes to SQLite databases are picked "
+                               "up automatically)")
+    oOptParser.add_option("--daemon-stats", action="store_true",
+                          dest="daemon_stats", default=False,
+                          help="Print the query daemon's filter cache "
+                               "statistics")
+    oOptParser.add_option("--stop-daemon", action="store_true",
+                          dest="stop_daemon", default=False,
+                          help="Stop the query daemon")
+    oOptParser.add_option("--daemon-socket", type="string",
+                          dest="daemon_socket", default=None,
+                          help="Socket for the query daemon "
+                               "[$PREFSDIR$/sutekh-cli.sock]")
+    oOptParser.add_option("--startup-timing", action="store_true",
+                          dest="startup_timing", default=False,
+                          help="Print how long each start-up phase and "
+                               "module import took, and the filter cache "
+                               "statistics, to stderr")
     oOptParser.add_option("--verbose", action="store_true", dest="verbose",
                           default=False, help="Display warning messages")
     oOptParser.add_option("--fetch-files", action="store_true", dest="fetch",
@@ -167,10 +239,29 @@ def parse_options(aArgs):
     return oOptParser, oOptParser.parse_args(aArgs)
 
 
+def load_filters():
+    """Import the Sutekh filters, so the filter parser knows about them"""
+    # pylint: disable=unused-import
+    # We need this import to ensure we have all the filters imported
+    # correctly, even though we don't use it directly
+    import sutekh.core.Filters
+
+
+def make_caches():
+    """Initialise the caches, so adapters, etc work for reading / writing
+       card sets"""
+    from sutekh.base.core.DBUtility import make_adapter_caches
+    for sModule in CACHE_MODULES:
+        importlib.import_module(sModule)
+    make_adapter_caches()
+
+
 def print_card_details(oCard):
     """Print the details of a given card"""
     # pylint: disable=too-many-branches
     # Several cases to consider, so many branches
+    from sutekh.SutekhUtility import (is_crypt_card, format_text,
+                                      keyword_sort_key)
     if not oCard.cardtype:
         print(u'CardType: Unknown')
     else:
@@ -232,15 +323,248 @@ def print_card_details(oCard):
     print(format_text(oCard.text))
 
 
+def print_twda_stats(sCardName, iTopN, sOrder):
+    """Print the cards most commonly played with the given card in the
+       TWDA decks"""
+    from sqlobject import SQLObjectNotFound
+    from sutekh.base.core.BaseAdapters import IAbstractCard
+    from sutekh.core.TWDAIndex import TWDA_INDEX
+    try:
+        oAbsCard = IAbstractCard(sCardName)
+    except SQLObjectNotFound:
+        print('Unable to find card %s' % sCardName)
+        return False
+    if not TWDA_INDEX.has_holders():
+        print('No TWDA decks found in the database')
+        return False
+    iCardDecks = len(TWDA_INDEX.get_card_decks(oAbsCard))
+    print('%s: in %d of %d TWDA decks' % (oAbsCard.name, iCardDecks,
+                                          TWDA_INDEX.get_deck_count()))
+    for oCard, iDecks, fConfidence, fLift in \
+            TWDA_INDEX.get_co_occurrences(oAbsCard, iTopN, sOrder):
+        print('%4d decks (%5.1f%%) lift %5.2f : %s' % (
+            iDecks, 100 * fConfidence, fLift, oCard.name))
+    return True
+
+
+def print_card_set(sName):
+    """Print the card set in ARDB text format"""
+    from sqlobject import SQLObjectNotFound
+    from sutekh.base.core.BaseAdapters import IPhysicalCardSet
+    from sutekh.base.core.CardSetHolder import CardSetWrapper
+    from sutekh.io.WriteArdbText import WriteArdbText
+    try:
+        oCS = IPhysicalCardSet(sName)
+    except SQLObjectNotFound:
+        print('Unable to load card set', sName)
+        return False
+    fPrint = StringIO()
+    oPrinter = WriteArdbText()
+    oPrinter.write(fPrint, CardSetWrapper(oCS))
+    print(fPrint.getvalue())
+    return True
+
+
+def daemon_filter(dRequest):
+    """Handle a filter request for the query daemon"""
+    from sqlobject import SQLObjectNotFound
+    from sutekh.base.CliUtils import (run_filter, print_card_filter_list,
+                                      explain_filter)
+    load_filters()
+    try:
+        if dRequest.get('explain', False):
+            print(explain_filter(dRequest['filter'], dRequest.get('cs')))
+            return True
+        dResults = run_filter(dRequest['filter'], dRequest.get('cs'), False)
+    except SQLObjectNotFound:
+        print('Unable to load card set', dRequest.get('cs'))
+        return False
+    print_card_filter_list(dResults, print_card_details,
+                           dRequest.get('detailed', False))
+    return True
+
+
+def daemon_reload(_dRequest):
+    """Reload the daemon's caches, to pick up changes to the database"""
+    from sqlobject import sqlhub
+    from sutekh.base.core.DBUtility import flush_cache
+    sqlhub.processConnection.expireAll()
+    flush_cache()
+    return True
+
+
+def print_filter_cache_stats(fOut):
+    """Print the number of hits and misses for the parsed filter cache"""
+    from sutekh.base.core.FilterParser import FilterParser
+    fOut.write('Filter cache: %(hits)d hits, %(misses)d misses, '
+               '%(size)d filters cached\n' % FilterParser.get_cache_stats())
+
+
+def daemon_stats(_dRequest):
+    """Report the daemon's cache statistics"""
+    print_filter_cache_stats(sys.stdout)
+    return True
+
+
+def daemon_print_card(dRequest):
+    """Handle a print-card request for the query daemon"""
+    from sutekh.base.CliUtils import do_print_card
+    return do_print_card(dRequest['card'], print_card_details, False)
+
+
+DAEMON_COMMANDS = {
+    'filter': daemon_filter,
+    'print-card': daemon_print_card,
+    'print-cs': lambda dRequest: print_card_set(dRequest['cs']),
+    'reload': daemon_reload,
+    'stats': daemon_stats,
+}
+
+
+def make_daemon_refresh():
+    """Return a function which reloads the daemon's caches if the
+       database has changed since the last request.
+
+       We can only check SQLite files, so we reload before every
+       request for the other databases."""
+    from sqlobject import sqlhub
+    from sutekh.base.core.DBUtility import get_database_stamp
+    dLast = {'stamp': get_database_stamp(sqlhub.processConnection)}
+
+    def refresh():
+        """Reload the caches if needed"""
+        oStamp = get_database_stamp(sqlhub.processConnection)
+        if oStamp is None or oStamp != dLast['stamp']:
+            daemon_reload(None)
+            dLast['stamp'] = oStamp
+
+    return refresh
+
+
+def run_daemon(sSocket, sDbUri):
+    """Answer requests from --use-daemon until asked to stop"""
+    from sutekh.base.CliServer import CliQueryServer
+    from sutekh.core.SutekhObjectCache import SutekhObjectCache
+    # Warm up the caches
+    load_filters()
+    make_caches()
+    _oCache = SutekhObjectCache()
+    oServer = CliQueryServer(sSocket, DAEMON_COMMANDS, sDbUri,
+                             make_daemon_refresh())
+    oServer.serve()
+
+
+def do_daemon_queries(oOpts):
+    """Send the requests given on the command line to the query daemon.
+
+       The requests are run in the same order as main_with_args runs
+       them."""
+    from sutekh.base.CliServer import send_query, SHUTDOWN
+    aRequests = []
+    if oOpts.reload_daemon:
+        aRequests.append({'command': 'reload'})
+    if oOpts.use_daemon:
+        if oOpts.print_cs is not None:
+            aRequests.append({'command': 'print-cs', 'cs': oOpts.print_cs})
+        if oOpts.filter_string is not None:
+            aRequests.append({'command': 'filter',
+                              'filter': oOpts.filter_string,
+                              'cs': oOpts.filter_cs,
+                              'detailed': oOpts.filter_detailed,
+                              'explain': oOpts.explain_filter})
+        if oOpts.print_card is not None:
+            aRequests.append({'command': 'print-card',
+                              'card': oOpts.print_card})
+    if oOpts.daemon_stats:
+        aRequests.append({'command': 'stats'})
+    if oOpts.stop_daemon:
+        aRequests.append({'command': SHUTDOWN})
+    if not aRequests:
+        print("--use-daemon needs one of --filter, --print-card or "
+              "--print-cs")
+        return False
+    for dRequest in aRequests:
+        # The daemon refuses requests for a different database
+        dRequest['db'] = oOpts.db
+        try:
+            dResponse = send_query(oOpts.daemon_socket, dRequest)
+        except (IOError, ValueError) as oErr:
+            print('Unable to contact the query daemon: %s' % oErr)
+            return False
+        # The output already has the trailing newlines
+        sys.stdout.write(dResponse['output'])
+        if not dResponse['ok']:
+            return False
+    return True
+
+
+def do_batch_export(oOpts):
+    """Export the card sets selected by the --export-* options"""
+    from sqlobject import SQLObjectNotFound
+    from sutekh.base.CliUtils import find_export_card_sets, export_card_sets
+    if oOpts.export_filter is not None:
+        load_filters()
+    try:
+        aNames = find_export_card_sets(oOpts.export_children,
+                                       oOpts.export_filter)
+    except SQLObjectNotFound:
+        print('Unable to load card set', oOpts.export_children)
+        return False
+    aFormats = []
+    for sFormat in oOpts.export_formats or ['ardb']:
+        sExt, sModule, sClass = EXPORT_FORMATS[sFormat]
+        aFormats.append((sExt, getattr(importlib.import_module(sModule),
+                                       sClass)))
+    ensure_dir_exists(oOpts.export_dir)
+    bOK = True
+    for sName, aFiles, sError in export_card_sets(
+            aNames, aFormats, oOpts.export_dir, oOpts.db, oOpts.export_jobs,
+            CACHE_MODULES):
+        if sError:
+            print('Unable to export card set %s: %s' % (sName, sError))
+            bOK = False
+        elif oOpts.verbose:
+            print('Exported %s to %s' % (sName, ', '.join(aFiles)))
+    return bOK
+
+
 def main_with_args(aTheArgs):
     """
     Main function: Loop through the options and process the database
     accordingly.
     """
+    oOptParser, (oOpts, aArgs) = parse_options(aTheArgs)
+    oTimer = ImportTimer()
+    if oOpts.startup_timing:
+        oTimer.install()
+    oTimer.mark('parse options')
+    try:
+        return run_commands(oOptParser, oOpts, aArgs, oTimer)
+    finally:
+        if oOpts.startup_timing:
+            oTimer.uninstall()
+            oTimer.mark('run commands')
+            oTimer.report(sys.stderr)
+            # Don't import the parser just to report that it wasn't used
+            if 'sutekh.base.core.FilterParser' in sys.modules:
+                print_filter_cache_stats(sys.stderr)
+
+
+def needs_caches(oOpts):
+    """Check if any of the commands need the full set of adapter caches"""
+    return any([oOpts.read_physical_cards_from, oOpts.save_all_css,
+                oOpts.dump_zip_name, oOpts.restore_zip_name, oOpts.save_cs,
+                oOpts.print_cs, oOpts.export_children, oOpts.export_filter,
+                oOpts.filter_string, oOpts.twda_stats, oOpts.read_cs,
+                oOpts.read_acs, oOpts.reload, oOpts.daemon])
+
+
+def run_commands(oOptParser, oOpts, aArgs, oTimer):
+    """Run the commands given by the options, recording the start-up
+       phases in oTimer"""
     # Turn off some pylint refactoring warnings
     # pylint: disable=too-many-statements, too-many-branches
     # pylint: disable=too-many-return-statements, too-many-locals
-    oOptParser, (oOpts, aArgs) = parse_options(aTheArgs)
     sPrefsDir = prefs_dir(SutekhInfo.NAME)
 
     oLogHandler = StreamHandler(sys.stdout)
@@ -249,12 +573,27 @@ def main_with_args(aTheArgs):
         oOptParser.print_help()
         return 1
 
+    if oOpts.daemon_socket is None:
+        oOpts.daemon_socket = os.path.join(sPrefsDir, "sutekh-cli.sock")
+
+    if oOpts.use_daemon or oOpts.stop_daemon or oOpts.reload_daemon or \
+            oOpts.daemon_stats:
+        # The daemon does all the database work
+        if not do_daemon_queries(oOpts):
+            return 1
+        return 0
+
     if oOpts.db is None:
         ensure_dir_exists(sPrefsDir)
         oOpts.db = sqlite_uri(os.path.join(sPrefsDir, "sutekh.db"))
 
     bDoCardListChecks = False
 
+    from sqlobject import sqlhub, connectionForURI, SQLObjectNotFound
+    from sutekh.base.core.BaseAdapters import IAbstractCard
+    from sutekh.base.core.BaseTables import Ruling, PHYSICAL_LIST, AbstractCard
+    from sutekh.core.SutekhTables import TABLE_LIST
+
     oConn = connectionForURI(oOpts.db)
     sqlhub.processConnection = oConn
 
@@ -275,12 +614,15 @@ def main_with_args(aTheArgs):
 
     # Only log critical messages by default
     setup_logging(oOpts.verbose)
+    oTimer.mark('open database')
 
     if oOpts.reload:
         if not oOpts.refresh_tables:
             print("reload should be called with --refresh-tables")
             return 1
         else:
+            from sutekh.SutekhUtility import gen_temp_dir
+            from sutekh.io.ZipFileWrapper import ZipFileWrapper
             sTempdir = gen_temp_dir()
             (fTemp, sReloadZipName) = \
                 tempfile.mkstemp('.zip', 'sutekh', sTempdir)
@@ -290,6 +632,10 @@ def main_with_args(aTheArgs):
             # We dump the databases here
             # We will reload them later
 
+    if oOpts.refresh_ruling_tables or oOpts.refresh_tables or \
+            oOpts.refresh_physical_card_tables:
+        from sutekh.base.core.DBUtility import refresh_tables
+
     if oOpts.refresh_ruling_tables:
         if not refresh_tables([Ruling], sqlhub.processConnection):
             print("refresh failed")
@@ -305,6 +651,14 @@ def main_with_args(aTheArgs):
             print("refresh failed")
             return 1
 
+    if oOpts.lookup_file is not None or oOpts.ww_file is not None or \
+            oOpts.extra_file is not None or oOpts.exp_data_file is not None or \
+            oOpts.ruling_file is not None or oOpts.fetch:
+        from sutekh.base.io.EncodedFile import EncodedFile
+        from sutekh.SutekhUtility import (read_white_wolf_list, read_rulings,
+                                          read_exp_info_file,
+                                          read_lookup_data)
+
     if oOpts.lookup_file is not None:
         read_lookup_data(EncodedFile(oOpts.lookup_file), oLogHandler)
 
@@ -323,6 +677,9 @@ def main_with_args(aTheArgs):
         read_rulings(EncodedFile(oOpts.ruling_file), oLogHandler)
 
     if oOpts.fetch:
+        from sutekh.io.WwUrls import (WW_CARDLIST_URL, WW_RULINGS_URL,
+                                      EXTRA_CARD_URL, EXP_DATA_URL,
+                                      LOOKUP_DATA_URL)
         read_lookup_data(EncodedFile(LOOKUP_DATA_URL, True), oLogHandler)
         read_white_wolf_list(EncodedFile(WW_CARDLIST_URL, True), oLogHandler)
         read_rulings(EncodedFile(WW_RULINGS_URL, True), oLogHandler)
@@ -332,12 +689,14 @@ def main_with_args(aTheArgs):
 
     if bDoCardListChecks:
         # Run the consistency checks on the database
+        from sutekh.SutekhUtility import do_card_checks
         for oAbsCard in AbstractCard.select():
             aMessages = do_card_checks(oAbsCard)
             if aMessages:
                 print('\n'.join(aMessages))
 
     if oOpts.upgrade_db:
+        from sutekh.core.DatabaseUpgrade import DBUpgradeManager
         oDBUpgrade = DBUpgradeManager()
         oDBUpgrade.attempt_database_upgrade(oLogHandler)
 
@@ -345,9 +704,20 @@ def main_with_args(aTheArgs):
         print("Can't use --save-cs and --save-all-cs Simulatenously")
         return 1
 
-    # initialise the caches, so adapters, etc work for reading / writing
-    # card sets
-    make_adapter_caches()
+    oTimer.mark('update database')
+
+    if needs_caches(oOpts):
+        make_caches()
+        oTimer.mark('make caches')
+
+    if oOpts.read_physical_cards_from or oOpts.save_all_css or \
+            oOpts.save_cs or oOpts.read_cs or oOpts.read_acs:
+        from sutekh.io.XmlFileHandling import (PhysicalCardXmlFile,
+                                               PhysicalCardSetXmlFile,
+                                               AbstractCardSetXmlFile,
+                                               write_all_pcs)
+    if oOpts.dump_zip_name or oOpts.restore_zip_name or oOpts.reload:
+        from sutekh.io.ZipFileWrapper import ZipFileWrapper
 
     if oOpts.read_physical_cards_from is not None:
         oFile = PhysicalCardXmlFile(oOpts.read_physical_cards_from)
@@ -369,17 +739,15 @@ def main_with_args(aTheArgs):
         oFile.write(oOpts.save_cs)
 
     if oOpts.print_cs is not None:
-        try:
-            oCS = IPhysicalCardSet(oOpts.print_cs)
-            fPrint = StringIO()
-            oPrinter = WriteArdbText()
-            oPrinter.write(fPrint, CardSetWrapper(oCS))
-            print(fPrint.getvalue())
-        except SQLObjectNotFound:
-            print('Unable to load card set', oOpts.print_cs)
+        if not print_card_set(oOpts.print_cs):
+            return 1
+
+    if oOpts.export_children is not None or oOpts.export_filter is not None:
+        if not do_batch_export(oOpts):
             return 1
 
     if oOpts.list_cs:
+        from sutekh.base.CliUtils import print_card_list
         if not print_card_list(oOpts.limit_list):
             return 1
     elif oOpts.limit_list is not None:
@@ -387,14 +755,29 @@ def main_with_args(aTheArgs):
         return 1
 
     if oOpts.filter_string is not None:
-        dResults = run_filter(oOpts.filter_string, oOpts.filter_cs)
-        print_card_filter_list(dResults, print_card_details,
-                               oOpts.filter_detailed)
+        from sutekh.base.CliUtils import (run_filter, print_card_filter_list,
+                                          explain_filter)
+        load_filters()
+        if oOpts.explain_filter:
+            print(explain_filter(oOpts.filter_string, oOpts.filter_cs))
+        else:
+            dResults = run_filter(oOpts.filter_string, oOpts.filter_cs, False)
+            print_card_filter_list(dResults, print_card_details,
+                                   oOpts.filter_detailed)
+    elif oOpts.explain_filter:
+        print("Can't use explain-filter without filter")
+        return 1
 
     if oOpts.print_card is not None:
+        from sutekh.base.CliUtils import do_print_card
         if not do_print_card(oOpts.print_card, print_card_details):
             return 1
 
+    if oOpts.twda_stats is not None:
+        if not print_twda_stats(oOpts.twda_stats, oOpts.twda_stats_top,
+                                oOpts.twda_stats_order):
+            return 1
+
     if oOpts.read_cs is not None:
         oFile = PhysicalCardSetXmlFile(oOpts.read_cs)
         oFile.read()
@@ -413,6 +796,10 @@ def main_with_args(aTheArgs):
         print("Can't use --upgrade-db and --refresh-tables simulatenously")
         return 1
 
+    if oOpts.daemon:
+        ensure_dir_exists(os.path.dirname(oOpts.daemon_socket) or '.')
+        run_daemon(oOpts.daemon_socket, oOpts.db)
+
     return 0
 
 
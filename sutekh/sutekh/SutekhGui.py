@@ -29,6 +29,9 @@ from sutekh.base.gui.GuiUtils import prepare_gui, load_config, save_config
 from sutekh.base.gui.SutekhDialog import exception_handler
 
 from sutekh.SutekhInfo import SutekhInfo
+# We need this import to ensure we have all the filters imported
+# correctly, even though we don't use it directly
+import sutekh.core.Filters  # pylint: disable=unused-import
 
 from sutekh.gui.SutekhMainWindow import SutekhMainWindow
 from sutekh.gui.ConfigFile import ConfigFile
@@ -5,10 +5,6 @@
 
 """Requirements and such for setuptools"""
 
-# pylint doesn't see resource_string for some reason
-# pylint: disable=no-name-in-module
-from pkg_resources import resource_string
-
 # license constants to simplify things a bit
 
 GPL = 'License :: OSI Approved :: GNU General Public License (GPL)'
@@ -62,8 +58,17 @@ class SutekhInfo:
     PYPI_URL = 'https://pypi.python.org/pypi/Sutekh/'
 
     LICENSE = 'GPL'
-    # resource_string returns bytes, because reasons
-    LICENSE_TEXT = resource_string(__name__, 'COPYING').decode('utf8')
+
+    @staticmethod
+    def get_license_text():
+        """Return the text of the license"""
+        # Importing pkg_resources is slow, so we only do it when the
+        # license text is actually needed
+        # pylint: disable=import-outside-toplevel, no-name-in-module
+        # pylint doesn't see resource_string for some reason
+        from pkg_resources import resource_string
+        # resource_string returns bytes, because reasons
+        return resource_string(__name__, 'COPYING').decode('utf8')
 
     CLASSIFIERS = [
         'Development Status :: 4 - Beta',
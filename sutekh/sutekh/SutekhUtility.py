@@ -15,14 +15,13 @@ from sqlobject import SQLObjectNotFound
 
 from sutekh.base.Utility import move_articles_to_back, gen_app_temp_dir
 from sutekh.base.io.IOBase import safe_parser
-from sutekh.base.io.LookupCSVParser import LookupCSVParser
 
 from sutekh.core.SutekhTables import CRYPT_TYPES
 from sutekh.base.core.BaseAdapters import IAbstractCard
 
-from sutekh.io.WhiteWolfTextParser import WhiteWolfTextParser
-from sutekh.io.RulingParser import RulingParser
-from sutekh.io.ExpInfoParser import ExpInfoParser
+# pylint: disable=import-outside-toplevel
+# The parsers are only imported when they're used, since they are slow to
+# import and most users of this module only want the helper functions
 
 
 def read_white_wolf_list(oFile, oLogHandler=None):
@@ -31,6 +30,7 @@ def read_white_wolf_list(oFile, oLogHandler=None):
        oFile is an object with a .open() method (e.g.
        sutekh.base.io.EncodedFile.EncodedFile)
        """
+    from sutekh.io.WhiteWolfTextParser import WhiteWolfTextParser
     oParser = WhiteWolfTextParser(oLogHandler)
     safe_parser(oFile, oParser)
 
@@ -41,6 +41,7 @@ def read_rulings(oFile, oLogHandler=None):
        oFile is an object with a .open() method (e.g. a
        sutekh.base.io.EncodedFile.EncodedFile)
        """
+    from sutekh.io.RulingParser import RulingParser
     oParser = RulingParser(oLogHandler)
     safe_parser(oFile, oParser)
 
@@ -51,6 +52,7 @@ def read_exp_info_file(oFile, oLogHandler=None):
        oFile is an object with a .open() method (e.g. a
        sutekh.base.io.EncodedFile.EncodedFile)
        """
+    from sutekh.io.ExpInfoParser import ExpInfoParser
     oParser = ExpInfoParser(oLogHandler)
     safe_parser(oFile, oParser)
 
@@ -61,6 +63,7 @@ def read_lookup_data(oFile, oLogHandler=None):
        oFile is an object with a .open() method (e.g. a
        sutekh.base.io.EncodedFile.EncodedFile)
        """
+    from sutekh.base.io.LookupCSVParser import LookupCSVParser
     oParser = LookupCSVParser(oLogHandler)
     safe_parser(oFile, oParser)
 
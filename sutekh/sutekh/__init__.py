@@ -6,43 +6,48 @@
 """This is the sutekh package.
    """
 
-# Do importing
+import importlib
 
-from sutekh.base.core.BaseTables import (AbstractCard, PhysicalCard,
-                                         PhysicalCardSet, RarityPair,
-                                         Expansion, Rarity, CardType,
-                                         Ruling)
+# The names are imported when first used, so importing a submodule (such as
+# sutekh.SutekhCli) doesn't pull in the whole database and filter stack
 
-from sutekh.core.SutekhTables import DisciplinePair, Discipline, Clan
-
-from sutekh.base.core.BaseFilters import (FilterAndBox, FilterOrBox,
-                                          CardTypeFilter,
-                                          MultiCardTypeFilter,
-                                          PhysicalCardSetFilter,
-                                          PhysicalCardFilter,
-                                          ExpansionFilter,
-                                          MultiExpansionFilter,
-                                          PhysicalExpansionFilter,
-                                          CardNameFilter,
-                                          MultiPhysicalExpansionFilter,
-                                          CardSetNameFilter,
-                                          CardSetDescriptionFilter,
-                                          CardSetAuthorFilter,
-                                          CardSetAnnotationsFilter)
-from sutekh.base.core.DBUtility import make_adapter_caches
-
-from sutekh.core.Filters import (ClanFilter, DisciplineFilter, CardTextFilter,
-                                 MultiDisciplineFilter, MultiClanFilter,
-                                 GroupFilter, MultiGroupFilter)
+_NAME_MODULES = {
+    # Sutekh Objects
+    'sutekh.base.core.BaseTables': [
+        'AbstractCard', 'PhysicalCard', 'PhysicalCardSet', 'RarityPair',
+        'Expansion', 'Rarity', 'CardType', 'Ruling'],
+    'sutekh.core.SutekhTables': ['DisciplinePair', 'Discipline', 'Clan'],
+    # Filters
+    'sutekh.base.core.BaseFilters': [
+        'FilterAndBox', 'FilterOrBox', 'CardTypeFilter',
+        'MultiCardTypeFilter', 'PhysicalCardSetFilter', 'PhysicalCardFilter',
+        'ExpansionFilter', 'MultiExpansionFilter', 'PhysicalExpansionFilter',
+        'CardNameFilter', 'MultiPhysicalExpansionFilter', 'CardSetNameFilter',
+        'CardSetDescriptionFilter', 'CardSetAuthorFilter',
+        'CardSetAnnotationsFilter'],
+    'sutekh.core.Filters': [
+        'ClanFilter', 'DisciplineFilter', 'CardTextFilter',
+        'MultiDisciplineFilter', 'MultiClanFilter', 'GroupFilter',
+        'MultiGroupFilter'],
+    # Groupings
+    'sutekh.base.core.BaseGroupings': [
+        'CardTypeGrouping', 'ExpansionGrouping', 'RarityGrouping'],
+    'sutekh.core.Groupings': ['ClanGrouping', 'DisciplineGrouping'],
+    # Misc
+    'sutekh.core.CardListTabulator': ['CardListTabulator'],
+}
 
-from sutekh.base.core.BaseGroupings import (CardTypeGrouping,
-                                            ExpansionGrouping,
-                                            RarityGrouping)
-from sutekh.core.Groupings import ClanGrouping, DisciplineGrouping
+_LAZY_NAMES = dict((sName, sModule) for sModule, aNames in
+                   _NAME_MODULES.items() for sName in aNames)
 
-from sutekh.core.CardListTabulator import CardListTabulator
 
-from sutekh.SutekhCli import main_with_args
+def __getattr__(sName):
+    """Import the exposed names on first use"""
+    if sName not in _LAZY_NAMES:
+        raise AttributeError("module 'sutekh' has no attribute '%s'" % sName)
+    oValue = getattr(importlib.import_module(_LAZY_NAMES[sName]), sName)
+    globals()[sName] = oValue
+    return oValue
 
 
 # start() method for use when working in the Python interpreter
@@ -50,31 +55,14 @@ from sutekh.SutekhCli import main_with_args
 def start(aArgs=['sutekh']):
     """Initialise SQLObject connection and so forth, for working in the
        python interpreter"""
+    # pylint: disable=import-outside-toplevel
+    # Imported here to keep importing sutekh cheap
+    from sutekh.SutekhCli import main_with_args, load_filters, make_caches
     main_with_args(aArgs)
-    # Also initialise the caches, so adapters, etc work
-    make_adapter_caches()
+    # Also initialise the filters and caches, so adapters, etc work
+    load_filters()
+    make_caches()
 
 # What we expose to import *
 
-ALL = [
-    # Sutekh Objects
-    AbstractCard, PhysicalCard, PhysicalCardSet,
-    RarityPair, Expansion, Rarity, DisciplinePair, Discipline,
-    Clan, CardType, Ruling,
-    # Filters
-    FilterAndBox, FilterOrBox, ClanFilter, DisciplineFilter,
-    CardTypeFilter, CardTextFilter, MultiCardTypeFilter,
-    MultiDisciplineFilter, MultiClanFilter, PhysicalCardSetFilter,
-    PhysicalCardFilter, GroupFilter, MultiGroupFilter,
-    ExpansionFilter, MultiExpansionFilter, CardNameFilter,
-    CardSetNameFilter, CardSetAuthorFilter, CardSetDescriptionFilter,
-    CardSetAnnotationsFilter, PhysicalExpansionFilter,
-    MultiPhysicalExpansionFilter,
-    # Groupings
-    CardTypeGrouping, ClanGrouping, DisciplineGrouping,
-    ExpansionGrouping, RarityGrouping,
-    # Misc
-    start, CardListTabulator,
-]
-
-__all__ = [x.__name__ for x in ALL]
+__all__ = sorted(_LAZY_NAMES) + ['start']
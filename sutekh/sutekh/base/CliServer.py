@@ -0,0 +1,178 @@
+# -*- coding: utf-8 -*-
+# vim:fileencoding=utf-8 ai ts=4 sts=4 et sw=4
+# Copyright 2026 Neil Muller <drnlmuller+sutekh@gmail.com>
+# GPL - see COPYING for details
+
+"""Query daemon for the CLI programs.
+
+   The daemon keeps the database connection and caches warm, and answers
+   requests over a local socket. Each request and response is a single
+   line of JSON. Requests are dictionaries with a 'command' key and the
+   command's arguments. Responses have the 'ok' flag and the 'output'
+   the command printed.
+
+   We use a unix socket where we can. Otherwise we listen on a port on
+   localhost, and write the port number to the socket path so the
+   clients can find it."""
+
+import contextlib
+import json
+import logging
+import os
+import socket
+import socketserver
+from io import StringIO
+
+SHUTDOWN = 'shutdown'
+
+
+def _use_unix_sockets():
+    """Check if we can use unix sockets"""
+    return hasattr(socket, 'AF_UNIX')
+
+
+def run_captured(fCommand, *aArgs):
+    """Run fCommand, returning the result and anything it printed"""
+    fOutput = StringIO()
+    with contextlib.redirect_stdout(fOutput):
+        bResult = fCommand(*aArgs)
+    return bResult, fOutput.getvalue()
+
+
+class CliQueryHandler(socketserver.StreamRequestHandler):
+    """Answer the requests on a connection, one per line"""
+
+    # Don't let a stuck client block the daemon forever
+    timeout = 60
+
+    def handle(self):
+        """Read the requests and write the responses"""
+        for bLine in self.rfile:
+            try:
+                dRequest = json.loads(bLine.decode('utf8'))
+                sCommand = dRequest['command']
+            except (ValueError, KeyError, TypeError):
+                sCommand = None
+                dResponse = {'ok': False, 'output': 'Invalid request\n'}
+            else:
+                dResponse = self.server.run_command(sCommand, dRequest)
+            self.wfile.write(json.dumps(dResponse).encode('utf8') + b'\n')
+            self.wfile.flush()
+            if sCommand == SHUTDOWN and dResponse['ok']:
+                self.server.bStop = True
+                return
+
+
+class CliQueryServer(socketserver.UnixStreamServer if _use_unix_sockets()
+                     else socketserver.TCPServer):
+    """Serve the query requests one at a time.
+
+       dCommands maps command names to functions taking the request
+       dictionary and returning True on success. Anything the functions
+       print is returned to the client. Requests are handled in turn,
+       so the commands don't need to worry about sharing the database
+       connection.
+
+       If sDbUri is given, requests for a different database are
+       refused. fRefresh is called before each command, so the daemon
+       can pick up changes other programs have made to the database."""
+
+    allow_reuse_address = True
+
+    def __init__(self, sAddress, dCommands, sDbUri=None, fRefresh=None):
+        self.sAddress = sAddress
+        self.dCommands = dCommands
+        self.sDbUri = sDbUri
+        self.fRefresh = fRefresh
+        self.bStop = False
+        if _use_unix_sockets():
+            if os.path.exists(sAddress):
+                # Remove stale sockets, but don't steal a running daemon's
+                if is_daemon_running(sAddress):
+                    raise IOError('A daemon is already listening on %s'
+                                  % sAddress)
+                os.remove(sAddress)
+            super(CliQueryServer, self).__init__(sAddress, CliQueryHandler)
+        else:
+            super(CliQueryServer, self).__init__(('127.0.0.1', 0),
+                                                 CliQueryHandler)
+            with open(sAddress, 'w') as fPort:
+                fPort.write('%d\n' % self.server_address[1])
+
+    def run_command(self, sCommand, dRequest):
+        """Run the command, and return the response dictionary"""
+        sDbUri = dRequest.get('db')
+        if sDbUri is not None and self.sDbUri is not None and \
+                sDbUri != self.sDbUri:
+            return {'ok': False,
+                    'output': 'The daemon is using the database %s, '
+                              'not %s\n' % (self.sDbUri, sDbUri)}
+        if sCommand == SHUTDOWN:
+            return {'ok': True, 'output': ''}
+        if sCommand not in self.dCommands:
+            return {'ok': False,
+                    'output': 'Unknown command %s\n' % sCommand}
+        try:
+            if self.fRefresh:
+                self.fRefresh()
+            bOK, sOutput = run_captured(self.dCommands[sCommand], dRequest)
+        # pylint: disable=broad-except
+        # We want to keep serving whatever goes wrong with a request
+        except Exception as oErr:
+            logging.exception('Error running %s', sCommand)
+            return {'ok': False, 'output': 'Error running %s: %s\n' % (
+                sCommand, oErr)}
+        return {'ok': bool(bOK), 'output': sOutput}
+
+    def serve(self):
+        """Handle requests until we're asked to shut down"""
+        try:
+            while not self.bStop:
+                self.handle_request()
+        finally:
+            self.server_close()
+            if os.path.exists(self.sAddress):
+                os.remove(self.sAddress)
+
+
+def _connect(sAddress):
+    """Return a socket connected to the daemon"""
+    if _use_unix_sockets():
+        oSock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        oAddress = sAddress
+    else:
+        with open(sAddress, 'r') as fPort:
+            oAddress = ('127.0.0.1', int(fPort.read().strip()))
+        oSock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    try:
+        oSock.connect(oAddress)
+    except socket.error:
+        oSock.close()
+        raise
+    return oSock
+
+
+def send_query(sAddress, dRequest):
+    """Send the request to the daemon listening on sAddress, and return
+       the response dictionary.
+
+       Raises socket.error (or IOError) if the daemon isn't running."""
+    oSock = _connect(sAddress)
+    try:
+        oSock.sendall(json.dumps(dRequest).encode('utf8') + b'\n')
+        with oSock.makefile('rb') as fIn:
+            bLine = fIn.readline()
+    finally:
+        oSock.close()
+    if not bLine:
+        raise IOError('No response from the daemon')
+    return json.loads(bLine.decode('utf8'))
+
+
+def is_daemon_running(sAddress):
+    """Check if something is answering on the daemon's socket"""
+    try:
+        _connect(sAddress).close()
+    except (socket.error, IOError, ValueError):
+        return False
+    return True
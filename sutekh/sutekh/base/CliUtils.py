@@ -10,50 +10,73 @@ functions to help the CLI programs
 
 from __future__ import print_function
 
-from sqlobject import SQLObjectNotFound
-from .core.BaseTables import (PhysicalCard,
+import importlib
+import multiprocessing
+import os
+
+from sqlobject import SQLObjectNotFound, sqlhub, connectionForURI
+from .core.BaseTables import (PhysicalCard, PhysicalCardSet,
                               MapPhysicalCardToPhysicalCardSet)
-from .core.BaseAdapters import IPhysicalCardSet, IAbstractCard
+from .core.BaseAdapters import (IPhysicalCardSet, IAbstractCard,
+                                CardNameLookupAdapter)
 from .core.BaseFilters import (PhysicalCardSetFilter, FilterAndBox,
                                PhysicalCardFilter)
-from .core.FilterParser import FilterParser
-from .core.CardSetUtilities import format_cs_list
+from .core.CardSetHolder import CardSetWrapper
+from .core.CardSetUtilities import format_cs_list, find_children
 from .core.DBUtility import make_adapter_caches
+from .Utility import safe_filename
 
+# pylint: disable=import-outside-toplevel
+# The filter parser only knows about the filters that have been imported
+# when it is loaded, so we leave importing it until the caller has loaded
+# the filters it wants
 
-def run_filter(sFilter, sCardSet):
-    """Run the given filter, returing a dictionary of cards and counts"""
-    make_adapter_caches()  # We need to have the adapters initialised
-                           # for filtering to work
-    oCardSet = None
-    if sCardSet:
-        oCardSet = IPhysicalCardSet(sCardSet)
+
+def make_filter_query(sFilter, sCardSet):
+    """Return the SelectResults for the given filter, over the card set
+       sCardSet if given, or the card list otherwise."""
+    from .core.FilterParser import FilterParser
     oParser = FilterParser()
     oFilter = oParser.apply(sFilter).get_filter()
-
-    dResults = {}
-    if oCardSet:
+    if sCardSet:
         # Filter the given card set
+        oCardSet = IPhysicalCardSet(sCardSet)
         oBaseFilter = PhysicalCardSetFilter(oCardSet.name)
         oJointFilter = FilterAndBox([oBaseFilter, oFilter])
-        aResults = oJointFilter.select(MapPhysicalCardToPhysicalCardSet)
-        for oCard in aResults:
-            oAbsCard = IAbstractCard(oCard)
-            dResults.setdefault(oAbsCard, 0)
+        return oJointFilter.select(MapPhysicalCardToPhysicalCardSet)
+    # Filter cardlist
+    oBaseFilter = PhysicalCardFilter()
+    oJointFilter = FilterAndBox([oBaseFilter, oFilter])
+    return oJointFilter.select(PhysicalCard)
+
+
+def run_filter(sFilter, sCardSet, bMakeCaches=True):
+    """Run the given filter, returing a dictionary of cards and counts.
+
+       bMakeCaches can be False if the adapter caches are known to be
+       up to date (as in the query daemon)."""
+    if bMakeCaches:
+        make_adapter_caches()  # We need to have the adapters initialised
+                               # for filtering to work
+    dResults = {}
+    for oCard in make_filter_query(sFilter, sCardSet):
+        oAbsCard = IAbstractCard(oCard)
+        # The card list case is flagged with a count of 0 for
+        # print_card_filter_list
+        dResults.setdefault(oAbsCard, 0)
+        if sCardSet:
             dResults[oAbsCard] += 1
-    else:
-        # Filter cardlist
-        oBaseFilter = PhysicalCardFilter()
-        oJointFilter = FilterAndBox([oBaseFilter, oFilter])
-        aResults = oJointFilter.select(PhysicalCard)
-        for oCard in aResults:
-            oAbsCard = IAbstractCard(oCard)
-            # flag non-cardset case for print_card_filter_list
-            dResults.setdefault(oAbsCard, 0)
 
     return dResults
 
 
+def explain_filter(sFilter, sCardSet):
+    """Return the database's query plan for the given filter, with the
+       time taken and number of rows, as text."""
+    from .core.QueryPlan import QueryPlan
+    return QueryPlan(make_filter_query(sFilter, sCardSet)).format()
+
+
 def print_card_filter_list(dResults, fPrintCard, bDetailed):
     """Print a dictionary of cards returned by runfilter"""
 
@@ -83,9 +106,12 @@ def print_card_list(sTreeRoot):
     return True
 
 
-def do_print_card(sCardName, fPrintCard):
+def do_print_card(sCardName, fPrintCard, bMakeCaches=True):
     """Print a card, handling possible encoding issues."""
-    make_adapter_caches()  # Needed for lookups to work
+    if bMakeCaches:
+        # Only the card name lookups are needed here, and they're much
+        # cheaper to set up than the full set of caches
+        CardNameLookupAdapter.make_object_cache()
     try:
         try:
             oCard = IAbstractCard(sCardName)
@@ -99,3 +125,128 @@ def do_print_card(sCardName, fPrintCard):
         print('Unable to find card %s' % sCardName)
         return False
     return True
+
+
+class CardSetSnapshot(CardSetWrapper):
+    """Read-only card set wrapper which reads the cards once, so several
+       writers can share them."""
+
+    def __init__(self, oCS):
+        super(CardSetSnapshot, self).__init__(oCS)
+        self._aCards = list(oCS.cards)
+
+    # pylint: disable=protected-access, invalid-name
+    # we delibrately allow access via these properties
+    # we use the column naming conventions
+    num_entries = property(fget=lambda self: len(self._aCards))
+    cards = property(fget=lambda self: self._aCards)
+
+
+def find_export_card_sets(sParent=None, sFilter=None):
+    """Return the names of the card sets to export, sorted by name.
+
+       If sParent is given, this is all the card sets below it, otherwise
+       all the card sets. If sFilter is given, only the card sets matching
+       the card set filter are included."""
+    make_adapter_caches()
+    if sParent is not None:
+        aSets = []
+        aToDo = [IPhysicalCardSet(sParent)]
+        while aToDo:
+            for oChild in find_children(aToDo.pop()):
+                # Guard against loops in the hierarchy
+                if oChild not in aSets:
+                    aSets.append(oChild)
+                    aToDo.append(oChild)
+    else:
+        aSets = list(PhysicalCardSet.select())
+    if sFilter is not None:
+        from .core.FilterParser import FilterParser
+        oFilter = FilterParser().apply(sFilter).get_filter()
+        aMatches = set(oCS.id for oCS in oFilter.select(PhysicalCardSet))
+        aSets = [oCS for oCS in aSets if oCS.id in aMatches]
+    return sorted(oCS.name for oCS in aSets)
+
+
+def _export_card_set(tTask):
+    """Write a card set in each of the formats.
+
+       Returns the card set name, the files written and an error message
+       if the export failed."""
+    # pylint: disable=broad-except
+    # we want to report all errors, and carry on with the other card sets
+    sName, sBaseName, aFormats, sDir = tTask
+    aFiles = []
+    try:
+        oHolder = CardSetSnapshot(IPhysicalCardSet(sName))
+        for sExt, cWriter in aFormats:
+            sFileName = os.path.join(sDir, '%s.%s' % (sBaseName, sExt))
+            with open(sFileName, 'w') as fOut:
+                cWriter().write(fOut, oHolder)
+            aFiles.append(sFileName)
+    except Exception as oErr:
+        return sName, aFiles, str(oErr)
+    return sName, aFiles, None
+
+
+def _get_export_file_names(aNames):
+    """Return the file name (without the extension) for each card set.
+
+       Card set names that differ only in characters safe_filename
+       replaces, or in case, would be written to the same file, so we
+       add the card set id to those."""
+    aBaseNames = [safe_filename(sName) for sName in aNames]
+    dCount = {}
+    for sBaseName in aBaseNames:
+        dCount[sBaseName.lower()] = dCount.get(sBaseName.lower(), 0) + 1
+    for iPos, sName in enumerate(aNames):
+        if dCount[aBaseNames[iPos].lower()] < 2:
+            continue
+        try:
+            oCS = IPhysicalCardSet(sName)
+        except SQLObjectNotFound:
+            # The export will report the missing card set
+            continue
+        aBaseNames[iPos] = '%s_%d' % (aBaseNames[iPos], oCS.id)
+    return aBaseNames
+
+
+def _init_export_worker(sDbUri, aModules):
+    """Setup the database and caches in an export worker process"""
+    for sModule in aModules:
+        importlib.import_module(sModule)
+    sqlhub.processConnection = connectionForURI(sDbUri)
+    make_adapter_caches()
+
+
+def export_card_sets(aNames, aFormats, sDir, sDbUri=None, iJobs=None,
+                     aModules=()):
+    """Write each of the named card sets into sDir in each of the formats.
+
+       aFormats is a list of (file extension, writer class) pairs. Each
+       card set is only read once for all the formats. Card sets whose
+       names give the same file name have their id added to the file
+       name.
+
+       If sDbUri is a database other processes can open, the card sets
+       are split between iJobs worker processes (by default, one per
+       core). The workers import aModules first, so they know about the
+       same tables and adapters as we do.
+
+       Returns a list of (card set name, files written, error message)
+       tuples, in the order of aNames. The error message is None if the
+       card set was written successfully."""
+    aTasks = [(sName, sBaseName, aFormats, sDir) for sName, sBaseName
+              in zip(aNames, _get_export_file_names(aNames))]
+    if iJobs is None:
+        iJobs = multiprocessing.cpu_count()
+    iJobs = min(iJobs, len(aTasks))
+    if iJobs < 2 or not sDbUri or ':memory:' in sDbUri:
+        return [_export_card_set(tTask) for tTask in aTasks]
+    # We use spawn so each worker opens its own database connection,
+    # rather than sharing the sqlite connections across a fork
+    oContext = multiprocessing.get_context('spawn')
+    with oContext.Pool(iJobs, _init_export_worker,
+                       (sDbUri, list(aModules))) as oPool:
+        return oPool.map(_export_card_set, aTasks,
+                         chunksize=max(1, len(aTasks) // (4 * iJobs)))
@@ -0,0 +1,105 @@
+# -*- coding: utf-8 -*-
+# vim:fileencoding=utf-8 ai ts=4 sts=4 et sw=4
+# Copyright 2026 Neil Muller <drnlmuller+sutekh@gmail.com>
+# GPL - see COPYING for details
+
+"""Measure where the start-up time of the command line tools goes.
+
+   The timer records how long each module takes to import, both on its
+   own and including the modules it imports, and how long each phase
+   of the start-up takes."""
+
+import importlib.abc
+import sys
+import time
+
+
+class ImportTimer(importlib.abc.MetaPathFinder):
+    """Time the imports and the start-up phases.
+
+       While installed, this sits at the front of sys.meta_path and wraps
+       the exec_module method of the loaders the other finders return.
+       Built-in and frozen modules are skipped, since they are cheap and
+       share a single loader."""
+
+    def __init__(self):
+        self._fStart = self._fLastMark = time.perf_counter()
+        # (name, self time, total time) for each module imported
+        self.aModules = []
+        # (phase, time) for each phase
+        self.aPhases = []
+        # stack of [name, time in the nested imports]
+        self._aStack = []
+
+    def install(self):
+        """Start timing imports"""
+        if self not in sys.meta_path:
+            sys.meta_path.insert(0, self)
+
+    def uninstall(self):
+        """Stop timing imports"""
+        if self in sys.meta_path:
+            sys.meta_path.remove(self)
+
+    def mark(self, sPhase):
+        """Record the end of the given start-up phase"""
+        fNow = time.perf_counter()
+        self.aPhases.append((sPhase, fNow - self._fLastMark))
+        self._fLastMark = fNow
+
+    def find_spec(self, sFullName, oPath, oTarget=None):
+        """Find the spec using the other finders, and wrap the loader"""
+        for oFinder in sys.meta_path:
+            if oFinder is self or not hasattr(oFinder, 'find_spec'):
+                continue
+            oSpec = oFinder.find_spec(sFullName, oPath, oTarget)
+            if oSpec is None:
+                continue
+            oLoader = oSpec.loader
+            if oLoader is not None and not isinstance(oLoader, type) and \
+                    hasattr(oLoader, 'exec_module') and \
+                    not hasattr(oLoader.exec_module, 'oTimer'):
+                # We override exec_module on the loader instance. Most
+                # modules get their own loader, but some loaders (such
+                # as zipimporter) are shared, so we only wrap once
+                oLoader.exec_module = self._wrap(oLoader.exec_module)
+            return oSpec
+        return None
+
+    def _wrap(self, fExecModule):
+        """Return a version of fExecModule that records the time taken"""
+        def exec_module(oModule):
+            """Time the import of the module"""
+            self._aStack.append([oModule.__name__, 0.0])
+            fStart = time.perf_counter()
+            try:
+                fExecModule(oModule)
+            finally:
+                fTotal = time.perf_counter() - fStart
+                sName, fNested = self._aStack.pop()
+                self.aModules.append((sName, fTotal - fNested, fTotal))
+                if self._aStack:
+                    self._aStack[-1][1] += fTotal
+        exec_module.oTimer = self
+        return exec_module
+
+    def report(self, fOut, iTop=30):
+        """Write the timings to fOut.
+
+           The modules are listed by the time spent in the module itself,
+           and only the first iTop are shown."""
+        fOut.write('Start-up phases (ms):\n')
+        for sPhase, fTime in self.aPhases:
+            fOut.write('%8.1f  %s\n' % (1000 * fTime, sPhase))
+        fOut.write('%8.1f  total\n' % (
+            1000 * (self._fLastMark - self._fStart)))
+        # The self times add up to the total time spent importing
+        fImports = sum(fSelf for _sName, fSelf, _fTotal in self.aModules)
+        fOut.write('Imports - %d modules, %.1f ms:\n' % (
+            len(self.aModules), 1000 * fImports))
+        fOut.write('%8s  %8s  %s\n' % ('self', 'total', 'module'))
+        aModules = sorted(self.aModules, key=lambda x: (-x[1], x[0]))
+        for sName, fSelf, fTotal in aModules[:iTop]:
+            fOut.write('%8.1f  %8.1f  %s\n' % (1000 * fSelf, 1000 * fTotal,
+                                               sName))
+
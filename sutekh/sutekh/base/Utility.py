@@ -18,8 +18,6 @@ import unicodedata
 
 from urllib.parse import urlsplit, urlunsplit
 
-from sqlobject import sqlhub
-
 
 def gen_temp_file(sBaseName, sDir):
     """Simple wrapper around tempfile creation - generates the name and closes
@@ -123,6 +121,10 @@ def norm_xml_quotes(sData):
 def get_database_url():
     """Return the database url, with the password stripped out if
        needed"""
+    # pylint: disable=import-outside-toplevel
+    # Importing sqlobject is slow, and not all the users of this module
+    # need it
+    from sqlobject import sqlhub
     sDBuri = sqlhub.processConnection.uri()
     tParsed = urlsplit(sDBuri)
     if tParsed.password:
@@ -254,5 +256,8 @@ def is_memory_db():
     """Helper function to test if we are using a memory db.
 
        returns True if this is a memory db"""
+    # pylint: disable=import-outside-toplevel
+    # See get_database_url
+    from sqlobject import sqlhub
     return sqlhub.processConnection.uri() in ["sqlite:///:memory:",
                                               "sqlite:/:memory:"]
@@ -17,6 +17,7 @@ from .BaseTables import (LookupHints, AbstractCard, PhysicalCard,
                          Keyword, Ruling, RarityPair, Expansion, Printing,
                          PrintingProperty, Rarity, CardType, Artist)
 from .BaseAbbreviations import CardTypes, Expansions, Rarities
+from .CardNameIndex import CARD_NAME_INDEX
 from ..Utility import move_articles_to_front
 
 
@@ -238,6 +239,7 @@ class CardNameLookupAdapter(Adapter):
     @classmethod
     def make_object_cache(cls):
         cls.__dCache = {}
+        CARD_NAME_INDEX.invalidate()
         # Fill in values from LookupHints
         for oLookup in LookupHints.select():
             if oLookup.domain == 'CardNames':
@@ -275,9 +277,15 @@ class CardNameLookupAdapter(Adapter):
                     # We will handle the failure case after the loop
                     oExp = oError
                     continue
-            # pylint: disable=raising-bad-type
-            # We're only raising if this is not None, so we're OK
             if oExp:
+                # Fall back to names that only differ in case, accents,
+                # punctuation and so on
+                oCard = CARD_NAME_INDEX.get_exact(sName)
+                if oCard is not None:
+                    cls.__dCache[sName] = oCard
+                    return oCard
+                # pylint: disable=raising-bad-type
+                # We're only raising if this is not None, so we're OK
                 raise oExp
         return oCard
 
@@ -27,7 +27,10 @@ from .BaseTables import (PhysicalCard, AbstractCard,
                          PhysicalCardSet, Expansion,
                          Rarity, RarityPair, CardType,
                          Ruling, Keyword, Artist, Metadata,
-                         LookupHints, Printing, PrintingProperty)
+                         LookupHints, Printing, PrintingProperty,
+                         MapAbstractCardToRarityPair, MapAbstractCardToRuling,
+                         MapAbstractCardToCardType, MapAbstractCardToArtist,
+                         MapAbstractCardToKeyword)
 from .DBUtility import flush_cache, refresh_tables
 from .BaseDBManagement import UnknownVersion
 from .DatabaseVersion import DatabaseVersion
@@ -66,6 +69,24 @@ class BaseDBUpgradeManager:
         'PrintingProperty': (PrintingProperty,
                              (-1, PrintingProperty.tableversion,)),
         'Metadata': (Metadata, (-1, 1, Metadata.tableversion,)),
+        # Version 1 of the mapping tables only lacks the covering indexes,
+        # which are created when the tables are recreated, so the rows
+        # are copied along with the abstract cards as usual
+        'MapAbstractCardToRarityPair': (
+            MapAbstractCardToRarityPair,
+            (1, MapAbstractCardToRarityPair.tableversion)),
+        'MapAbstractCardToRuling': (
+            MapAbstractCardToRuling,
+            (1, MapAbstractCardToRuling.tableversion)),
+        'MapAbstractCardToCardType': (
+            MapAbstractCardToCardType,
+            (1, MapAbstractCardToCardType.tableversion)),
+        'MapAbstractCardToArtist': (
+            MapAbstractCardToArtist,
+            (1, MapAbstractCardToArtist.tableversion)),
+        'MapAbstractCardToKeyword': (
+            MapAbstractCardToKeyword,
+            (1, MapAbstractCardToKeyword.tableversion)),
     }
 
     # List of functions for upgrading databases
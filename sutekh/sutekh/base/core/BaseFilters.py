@@ -30,6 +30,7 @@ from .BaseTables import (AbstractCard, CardType, Expansion, RarityPair,
 from .BaseAdapters import (IAbstractCard, IPhysicalCardSet, IRarityPair,
                            IExpansion, ICardType, IRarity, IArtist,
                            IPrinting, IPrintingName, IKeyword)
+from .CardNameIndex import CARD_NAME_INDEX
 
 
 # Compability Patches
@@ -81,6 +82,12 @@ class Filter:
         """joins needed by the filter"""
         raise NotImplementedError
 
+    def _get_map_ids(self):
+        """If the filter matches the cards with one of a list of ids in a
+           mapping table, return (map table, id column, ids), so the filter
+           boxes can plan the lookups. Otherwise return None."""
+        return None
+
     def is_physical_card_only(self):
         """Return true if this filter only operates on physical cards.
 
@@ -91,20 +98,74 @@ class Filter:
 
 # Collections of Filters
 class FilterBox(Filter, list):
-    """Base class for filter collections."""
+    """Base class for filter collections.
+
+       Joining a mapping table gives a row for each matching entry, so
+       every subfilter that joins a mapping table multiplies the number
+       of rows the database has to handle. The box instead looks up the
+       cards in the mapping tables with sub-selects, and uses the joins
+       for the other subfilters. Lookups on the same mapping table are
+       combined where the box allows it (see _bMergeLookups), and
+       repeated lookups are only done once.
+       """
+
+    # Combine the ids of lookups on the same mapping table column
+    _bMergeLookups = False
 
     # pylint: disable=protected-access
     # we delibrately access protected members
+    def _plan(self):
+        """Split the subfilters into the mapping table lookups and the
+           other subfilters.
+
+           Returns a list of the other subfilters and the
+           (map table, id column) keys, in the order of the subfilters,
+           and a dictionary of key: list of sets of ids to look up."""
+        aPlan = []
+        dLookups = {}
+        for oSubFilter in self:
+            tMapIds = oSubFilter._get_map_ids()
+            if tMapIds is None:
+                aPlan.append(oSubFilter)
+                continue
+            sTable, sColumn, aIds = tMapIds
+            tKey = (sTable, sColumn)
+            if tKey not in dLookups:
+                aPlan.append(tKey)
+                dLookups[tKey] = [set(aIds)]
+            elif self._bMergeLookups:
+                dLookups[tKey][0].update(aIds)
+            elif set(aIds) not in dLookups[tKey]:
+                dLookups[tKey].append(set(aIds))
+        return aPlan, dLookups
+
     def _get_joins(self):
         """The joins required for the composite filter
 
-           This is the union of the joins of the subfilters
+           This is the union of the joins of the subfilters that aren't
+           mapping table lookups
            """
+        aPlan, _dLookups = self._plan()
         aJoins = []
-        for oSubFilter in self:
-            aJoins.extend(oSubFilter._get_joins())
+        for oSubFilter in aPlan:
+            if isinstance(oSubFilter, Filter):
+                aJoins.extend(oSubFilter._get_joins())
         return aJoins
 
+    def _get_sub_expressions(self):
+        """The expressions to combine for the composite filter"""
+        aPlan, dLookups = self._plan()
+        aExpressions = []
+        for oSubFilter in aPlan:
+            if isinstance(oSubFilter, Filter):
+                aExpressions.append(oSubFilter._get_expression())
+            else:
+                sTable, sColumn = oSubFilter
+                for oIds in dLookups[oSubFilter]:
+                    aExpressions.append(map_lookup(sTable, sColumn,
+                                                   sorted(oIds)))
+        return aExpressions
+
     def _get_types(self):
         """Get types for a composite filter.
 
@@ -133,21 +194,19 @@ class FilterBox(Filter, list):
 class FilterAndBox(FilterBox):
     """AND a list of filters."""
 
-    # pylint: disable=protected-access
-    # we intentinally access protected members
     def _get_expression(self):
         """Combine filters with AND"""
-        return AND(*[x._get_expression() for x in self])
+        return AND(*self._get_sub_expressions())
 
 
 class FilterOrBox(FilterBox):
     """OR a list of filters."""
 
-    # pylint: disable=protected-access
-    # we intentinally access protected members
+    _bMergeLookups = True
+
     def _get_expression(self):
         """Combine filters with OR"""
-        return OR(*[x._get_expression() for x in self])
+        return OR(*self._get_sub_expressions())
 
 
 # NOT Filter
@@ -266,6 +325,10 @@ class SingleFilter(Filter):
         # SQLObject methods not detected by pylint
         return self._oIdField == self._oId
 
+    def _get_map_ids(self):
+        return (str(self._oIdField.tableName), self._oIdField.fieldName,
+                [self._oId])
+
 
 class MultiFilter(Filter):
     """Base class for filters on multiple items which connect to AbstractCard
@@ -288,6 +351,10 @@ class MultiFilter(Filter):
         # SQLObject methods not detected by pylint
         return IN(self._oIdField, self._aIds)
 
+    def _get_map_ids(self):
+        return (str(self._oIdField.tableName), self._oIdField.fieldName,
+                self._aIds)
+
 
 class DirectFilter(Filter):
     """Base class for filters which query AbstractTable directly."""
@@ -311,6 +378,19 @@ def split_list(aList):
     return aResults
 
 
+def map_lookup(sTable, sColumn, aIds):
+    """Match the cards with one of aIds in sColumn of the mapping table
+       sTable.
+
+       This uses a sub-select, rather than joining the mapping table, so
+       the cards are only matched once, however many entries match."""
+    if not aIds:
+        return False
+    oTable = Table(sTable)
+    return IN(AbstractCard.q.id, Select(oTable.abstract_card_id,
+                                        IN(getattr(oTable, sColumn), aIds)))
+
+
 def make_table_alias(sTable):
     """In order to allow multiple filters to be AND together, filters need
        to create aliases of mapping tables so that, for example:
@@ -1259,6 +1339,10 @@ class ParentCardSetFilter(MultiFilter):
     def _get_joins(self):
         return []
 
+    # We don't use a mapping table either
+    def _get_map_ids(self):
+        return None
+
 
 class CSPhysicalCardSetInUseFilter(DirectFilter):
     """Filter Physical Card Set on inuse status"""
@@ -1310,6 +1394,35 @@ def best_guess_filter(sName):
     return CardNameFilter(sFilterString)
 
 
+def best_guess_card(sName):
+    """Return the card sName most likely refers to, or None if there
+       isn't a clear choice.
+
+       A card that is the only match for best_guess_filter is used,
+       otherwise we fall back to the card name index."""
+    aCards = list(best_guess_filter(sName).select(AbstractCard).limit(2))
+    if len(aCards) == 1:
+        return aCards[0]
+    return CARD_NAME_INDEX.get_best_guess(sName)
+
+
+def best_guess_card_filter(sName):
+    """Create a filter for the possible matches for a card name.
+
+       If best_guess_filter matches a single card, that's used, otherwise
+       the candidates from the card name index are added to its matches."""
+    oFilter = best_guess_filter(sName)
+    aIds = [oCard.id for oCard in oFilter.select(AbstractCard)]
+    if len(aIds) == 1:
+        return oFilter
+    aCandidates = CARD_NAME_INDEX.get_candidates(sName)
+    if not aCandidates:
+        return oFilter
+    aIds.extend(oCard.id for _fScore, oCard in aCandidates
+                if oCard.id not in aIds)
+    return MultiSpecificCardIdFilter(aIds)
+
+
 def make_illegal_filter():
     """Creates a filter that excludes not legal for tournament play cards.
 
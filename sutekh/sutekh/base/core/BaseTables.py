@@ -201,6 +201,10 @@ class Keyword(SQLObject):
                         createRelatedTable=False)
 
 # Mapping Tables
+# The filters search the card property maps by property, so the property
+# indexes include the card as well, and the filters can find the cards
+# without reading the table. Looking up a card's properties keeps using the
+# plain card index, so the properties stay in the order they were added.
 
 
 class MapPhysicalCardToPhysicalCardSet(SQLObject):
@@ -223,13 +227,13 @@ class MapAbstractCardToRarityPair(SQLObject):
     class sqlmeta:
         table = 'abs_rarity_pair_map'
 
-    tableversion = 1
+    tableversion = 2
 
     abstractCard = ForeignKey('AbstractCard', notNull=True)
     rarityPair = ForeignKey('RarityPair', notNull=True)
 
     abstractCardIndex = DatabaseIndex(abstractCard, unique=False)
-    rarityPairIndex = DatabaseIndex(rarityPair, unique=False)
+    rarityPairIndex = DatabaseIndex(rarityPair, abstractCard, unique=False)
 
 
 class MapAbstractCardToRuling(SQLObject):
@@ -237,13 +241,13 @@ class MapAbstractCardToRuling(SQLObject):
     class sqlmeta:
         table = 'abs_ruling_map'
 
-    tableversion = 1
+    tableversion = 2
 
     abstractCard = ForeignKey('AbstractCard', notNull=True)
     ruling = ForeignKey('Ruling', notNull=True)
 
     abstractCardIndex = DatabaseIndex(abstractCard, unique=False)
-    rulingIndex = DatabaseIndex(ruling, unique=False)
+    rulingIndex = DatabaseIndex(ruling, abstractCard, unique=False)
 
 
 class MapAbstractCardToCardType(SQLObject):
@@ -251,13 +255,13 @@ class MapAbstractCardToCardType(SQLObject):
     class sqlmeta:
         table = 'abs_type_map'
 
-    tableversion = 1
+    tableversion = 2
 
     abstractCard = ForeignKey('AbstractCard', notNull=True)
     cardType = ForeignKey('CardType', notNull=True)
 
     abstractCardIndex = DatabaseIndex(abstractCard, unique=False)
-    cardTypeIndex = DatabaseIndex(cardType, unique=False)
+    cardTypeIndex = DatabaseIndex(cardType, abstractCard, unique=False)
 
 
 class MapAbstractCardToArtist(SQLObject):
@@ -265,13 +269,13 @@ class MapAbstractCardToArtist(SQLObject):
     class sqlmeta:
         table = 'abs_artist_map'
 
-    tableversion = 1
+    tableversion = 2
 
     abstractCard = ForeignKey('AbstractCard', notNull=True)
     artist = ForeignKey('Artist', notNull=True)
 
     abstractCardIndex = DatabaseIndex(abstractCard, unique=False)
-    artistIndex = DatabaseIndex(artist, unique=False)
+    artistIndex = DatabaseIndex(artist, abstractCard, unique=False)
 
 
 class MapAbstractCardToKeyword(SQLObject):
@@ -279,13 +283,13 @@ class MapAbstractCardToKeyword(SQLObject):
     class sqlmeta:
         table = 'abs_keyword_map'
 
-    tableversion = 1
+    tableversion = 2
 
     abstractCard = ForeignKey('AbstractCard', notNull=True)
     keyword = ForeignKey('Keyword', notNull=True)
 
     abstractCardIndex = DatabaseIndex(abstractCard, unique=False)
-    keywordIndex = DatabaseIndex(keyword, unique=False)
+    keywordIndex = DatabaseIndex(keyword, abstractCard, unique=False)
 
 
 class LookupHints(SQLObject):
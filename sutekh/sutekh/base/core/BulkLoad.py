@@ -0,0 +1,82 @@
+# -*- coding: utf-8 -*-
+# vim:fileencoding=utf-8 ai ts=4 sts=4 et sw=4
+# Copyright 2026 Neil Muller <drnlmuller+sutekh@gmail.com>
+# GPL - see COPYING for details
+
+"""Helpers for the parsers that load lots of rows into the database."""
+
+from sqlobject import sqlhub
+from sqlobject.sqlbuilder import Select, Insert
+
+from .BaseTables import AbstractCard, LookupHints
+from .CachedRelatedJoin import SOCachedRelatedJoin
+from .CardSetUtilities import BATCH_SIZE
+from ..Utility import move_articles_to_front
+
+
+def insert_rows(cTable, aRows):
+    """Insert the rows into the table for cTable, using as few queries
+       as possible.
+
+       aRows is a list of dictionaries, keyed by the attribute names
+       (so 'abstractCardID' and not 'abstract_card_id'). The inserted rows
+       bypass the SQLObject caches, so callers need to flush any cached
+       joins affected."""
+    if not aRows:
+        return
+    oConn = sqlhub.processConnection
+    dColumns = cTable.sqlmeta.columns
+    aValues = [dict((dColumns[x].dbName, y) for x, y in dRow.items())
+               for dRow in aRows]
+    for iStart in range(0, len(aValues), BATCH_SIZE):
+        oConn.query(oConn.sqlrepr(Insert(
+            cTable.sqlmeta.table,
+            valueList=aValues[iStart:iStart + BATCH_SIZE])))
+
+
+def select_columns(cTable, *aNames):
+    """Return a list of tuples of the given attributes of every row in the
+       table for cTable, without creating the SQLObject instances."""
+    oConn = sqlhub.processConnection
+    aColumns = [getattr(cTable.q, x) for x in aNames]
+    return oConn.queryAll(oConn.sqlrepr(Select(aColumns)))
+
+
+def flush_join_caches(cTable, sIntermediateTable):
+    """Flush the cached joins on cTable, and any subclasses, that use
+       the given intermediate table"""
+    aClasses = [cTable]
+    while aClasses:
+        cClass = aClasses.pop()
+        aClasses.extend(cClass.__subclasses__())
+        for oJoin in cClass.sqlmeta.joins:
+            if isinstance(oJoin, SOCachedRelatedJoin) and \
+                    oJoin.intermediateTable == sIntermediateTable:
+                oJoin.flush_cache()
+
+
+class CardNameMap:
+    """Map card names to (id, name) pairs, loaded in a single pass.
+
+       This handles the same names as the IAbstractCard adapter, other
+       than the fuzzy matches, without a query for each lookup."""
+
+    def __init__(self):
+        self._dNames = {}
+        for iId, sCanonical, sName in select_columns(
+                AbstractCard, 'id', 'canonicalName', 'name'):
+            self._dNames[sCanonical] = (iId, sName)
+        # As with the adapter, the lookup hints take precedence
+        for oLookup in LookupHints.selectBy(domain='CardNames'):
+            tCard = self._dNames.get(oLookup.value.lower())
+            if tCard is not None:
+                self._dNames[oLookup.lookup.lower()] = tCard
+
+    def get(self, sName):
+        """Return the (id, name) pair for sName, or None if we don't
+           know it"""
+        for sCand in (sName, move_articles_to_front(sName)):
+            tCard = self._dNames.get(sCand.lower())
+            if tCard is not None:
+                return tCard
+        return None
@@ -6,9 +6,17 @@
 """Lookup AbstractCards for a list of card names.
    """
 
+import json
+
 from sqlobject import SQLObjectNotFound
+from .BaseTables import LookupHints
 from .BaseAdapters import IPhysicalCard, IExpansion, IAbstractCard, IPrinting
 
+# LookupHints domains used to remember how the names in imported files
+# were resolved, for each file format
+CARD_MEMORY_DOMAIN = 'Resolved Card Names: %s'
+PRINTING_MEMORY_DOMAIN = 'Resolved Printings: %s'
+
 
 class LookupFailed(Exception):
     """Raised when an AbstractCard lookup fails completed.
@@ -74,7 +82,6 @@ class PrintingLookup:
         raise NotImplementedError
 
 
-
 class SimpleLookup(AbstractCardLookup, PhysicalCardLookup, PrintingLookup):
     """A really straightforward lookup of AbstractCards and PhysicalCards.
 
@@ -139,3 +146,56 @@ class SimpleLookup(AbstractCardLookup, PhysicalCardLookup, PrintingLookup):
 
 
 DEFAULT_LOOKUP = SimpleLookup()
+
+
+def get_lookup_memory(sFormat):
+    """Return a lookup cache for CachedCardSetHolder.create_pcs, filled
+       in with the card names and printings remembered for files in the
+       given format."""
+    dLookupCache = {'cards': {}, 'printings': {}}
+    for oHint in LookupHints.selectBy(domain=CARD_MEMORY_DOMAIN % sFormat):
+        dLookupCache['cards'][oHint.lookup] = oHint.value
+    for oHint in LookupHints.selectBy(
+            domain=PRINTING_MEMORY_DOMAIN % sFormat):
+        tExpPrint = tuple(json.loads(oHint.lookup))
+        dLookupCache['printings'][tExpPrint] = tuple(json.loads(oHint.value))
+    return dLookupCache
+
+
+def _remember(sDomain, sLookup, sValue):
+    """Add or update the lookup hint"""
+    aHints = list(LookupHints.selectBy(domain=sDomain, lookup=sLookup))
+    if aHints:
+        for oHint in aHints:
+            oHint.value = sValue
+            oHint.syncUpdate()
+    else:
+        LookupHints(domain=sDomain, lookup=sLookup, value=sValue)
+
+
+def remember_lookups(sFormat, dLookupCache):
+    """Remember the card names and printings in dLookupCache that
+       DEFAULT_LOOKUP can't resolve, so later imports of files in the
+       given format don't need to ask about them again.
+
+       These are stored as lookup hints, so they are dropped along with
+       the rest of the card list data when the card list changes."""
+    dKnown = get_lookup_memory(sFormat)
+    for sName, sCanonical in dLookupCache.get('cards', {}).items():
+        if not sCanonical or dKnown['cards'].get(sName) == sCanonical:
+            continue
+        oAbs = DEFAULT_LOOKUP.lookup([sName], None)[0]
+        if oAbs is not None and oAbs.canonicalName == sCanonical:
+            continue
+        _remember(CARD_MEMORY_DOMAIN % sFormat, sName, sCanonical)
+    for tExpPrint, tValue in dLookupCache.get('printings', {}).items():
+        if tValue == (None, None) or dKnown['printings'].get(
+                tExpPrint) == tValue:
+            continue
+        oPrinting = DEFAULT_LOOKUP.printing_lookup([tExpPrint], None,
+                                                   None)[tExpPrint]
+        if oPrinting is not None and \
+                (oPrinting.expansion.name, oPrinting.name) == tValue:
+            continue
+        _remember(PRINTING_MEMORY_DOMAIN % sFormat, json.dumps(tExpPrint),
+                  json.dumps(tValue))
@@ -0,0 +1,163 @@
+# -*- coding: utf-8 -*-
+# vim:fileencoding=utf-8 ai ts=4 sts=4 et sw=4
+# Copyright 2026 Neil Muller <drnlmuller+sutekh@gmail.com>
+# GPL - see COPYING for details
+
+"""In-memory index for matching misspelt card names"""
+
+import logging
+import string
+from difflib import SequenceMatcher
+
+from sqlobject import SQLObjectNotFound
+
+from .BaseTables import AbstractCard, LookupHints
+from ..Utility import move_articles_to_front, move_articles_to_back, to_ascii
+
+# Number of trigram matches we check more carefully
+REFINE_LIMIT = 20
+
+# A best guess must score at least this, and beat the next candidate
+# by the margin, before we pick it for the user
+BEST_GUESS_SCORE = 0.8
+BEST_GUESS_MARGIN = 0.1
+
+_PUNCTUATION = str.maketrans(string.punctuation,
+                             ' ' * len(string.punctuation))
+
+
+def normalise_name(sName):
+    """Reduce a card name to the form used for the index keys.
+
+       This ignores case, accents, punctuation and where the article is,
+       and treats '(Adv)' as '(Advanced)'."""
+    sName = to_ascii(move_articles_to_front(sName.strip())).lower()
+    sName = sName.replace('(adv)', '(advanced)')
+    return ' '.join(sName.translate(_PUNCTUATION).split())
+
+
+def _get_trigrams(sKey):
+    """Return the set of trigrams for the key"""
+    sPadded = '  %s ' % sKey
+    return set(sPadded[iPos:iPos + 3] for iPos in range(len(sPadded) - 2))
+
+
+class CardNameIndex:
+    """Index of the card names, the CardNames lookup hints and the
+       usual alternative forms of the names (articles at the end,
+       ELDB style quoting, '(Adv)').
+
+       This is built on first use, and invalidated by the
+       CardNameLookupAdapter cache whenever the adapter caches are
+       remade."""
+
+    def __init__(self):
+        # normalised key -> set of cards
+        self._dKeys = None
+        # trigram -> list of keys
+        self._dTrigrams = None
+
+    def invalidate(self):
+        """Drop the index"""
+        self._dKeys = None
+        self._dTrigrams = None
+
+    def _add_name(self, sName, oCard):
+        """Add a name for the card to the index"""
+        sKey = normalise_name(sName)
+        if not sKey:
+            return
+        if sKey not in self._dKeys:
+            self._dKeys[sKey] = set()
+            for sTrigram in _get_trigrams(sKey):
+                self._dTrigrams.setdefault(sTrigram, []).append(sKey)
+        self._dKeys[sKey].add(oCard)
+
+    def _build(self):
+        """Fill in the index from the database"""
+        self._dKeys = {}
+        self._dTrigrams = {}
+        for oCard in AbstractCard.select():
+            self._add_name(oCard.name, oCard)
+            # The quoting normalises away, but the article may have been
+            # moved to the end by an export
+            self._add_name(move_articles_to_back(oCard.name), oCard)
+        for oLookup in LookupHints.selectBy(domain='CardNames'):
+            try:
+                # pylint: disable=no-member
+                # SQLObject confuses pylint
+                oCard = AbstractCard.byCanonicalName(oLookup.value.lower())
+            except SQLObjectNotFound:
+                logging.warning("Unable to index %s mapping (%s -> %s)",
+                                oLookup.domain, oLookup.lookup,
+                                oLookup.value)
+                continue
+            self._add_name(oLookup.lookup, oCard)
+
+    def get_exact(self, sName):
+        """Return the card whose normalised name matches sName's, or None
+           if there isn't exactly one."""
+        if self._dKeys is None:
+            self._build()
+        aCards = self._dKeys.get(normalise_name(sName), ())
+        if len(aCards) == 1:
+            return next(iter(aCards))
+        return None
+
+    def get_candidates(self, sName, iMax=10):
+        """Return up to iMax (score, card) pairs for the cards closest to
+           sName, best first.
+
+           The score is between 0 and 1, with 1 for names that match
+           after normalisation."""
+        if self._dKeys is None:
+            self._build()
+        sKey = normalise_name(sName)
+        if not sKey:
+            return []
+        if sKey in self._dKeys:
+            aExact = sorted(self._dKeys[sKey], key=lambda x: x.name)
+            return [(1.0, oCard) for oCard in aExact][:iMax]
+        # Count the shared trigrams to find the likely keys
+        aTrigrams = _get_trigrams(sKey)
+        dShared = {}
+        for sTrigram in aTrigrams:
+            for sCandKey in self._dTrigrams.get(sTrigram, ()):
+                dShared[sCandKey] = dShared.get(sCandKey, 0) + 1
+        # Rank by the Dice coefficient - a key has len(key) + 1 trigrams
+        iLen = len(aTrigrams)
+        aLikely = sorted(dShared, key=lambda x: (
+            -2.0 * dShared[x] / (iLen + len(x) + 1), x))[:REFINE_LIMIT]
+        # Score the likely keys properly, keeping the best score for
+        # each card
+        # SequenceMatcher caches its information about the second sequence
+        oMatcher = SequenceMatcher(None, '', sKey)
+        dScores = {}
+        for sCandKey in aLikely:
+            oMatcher.set_seq1(sCandKey)
+            fScore = oMatcher.ratio()
+            for oCard in self._dKeys[sCandKey]:
+                if fScore > dScores.get(oCard, -1):
+                    dScores[oCard] = fScore
+        aResults = sorted(((fScore, oCard) for oCard, fScore in
+                           dScores.items()),
+                          key=lambda x: (-x[0], x[1].name))
+        return aResults[:iMax]
+
+    def get_best_guess(self, sName):
+        """Return the card sName most likely refers to, or None if
+           there isn't a clear choice."""
+        aCandidates = self.get_candidates(sName, 2)
+        if not aCandidates:
+            return None
+        fBest, oCard = aCandidates[0]
+        if fBest < BEST_GUESS_SCORE:
+            return None
+        if len(aCandidates) > 1 and \
+                aCandidates[1][0] > fBest - BEST_GUESS_MARGIN:
+            return None
+        return oCard
+
+
+# The card name index
+CARD_NAME_INDEX = CardNameIndex()
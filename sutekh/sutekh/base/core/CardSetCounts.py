@@ -0,0 +1,125 @@
+# -*- coding: utf-8 -*-
+# vim:fileencoding=utf-8 ai ts=4 sts=4 et sw=4
+# Copyright 2026 Neil Muller <drnlmuller+sutekh@gmail.com>
+# GPL - see COPYING for details
+
+"""Maintained card counts for the card sets"""
+
+from sqlobject import sqlhub
+from sqlobject.sqlbuilder import Select, func
+
+from .BaseTables import PhysicalCardSet, MapPhysicalCardToPhysicalCardSet
+from .CardSetHierarchy import get_base_conn
+from .DBSignals import (listen_changed, listen_batch_changed,
+                        listen_row_destroy, listen_row_created)
+
+
+class CardSetCounts:
+    """Total and per physical card counts for the card sets.
+
+       The totals for all the card sets are read with a single query on
+       first use, and the per card counts are read for each card set when
+       first needed. Both are then kept current from the changed signals.
+
+       Code that adds cards to a card set without sending the changed
+       signal (such as the card set importers) must call invalidate_set
+       afterwards. flush_cache invalidates everything."""
+
+    def __init__(self):
+        self._oConn = None
+        # card set id -> total number of cards
+        self._dTotals = {}
+        # card set id -> {physical card id: count}
+        self._dCards = {}
+        listen_changed(self.card_changed, PhysicalCardSet)
+        listen_batch_changed(self.cards_changed, PhysicalCardSet)
+        listen_row_destroy(self.card_set_added_deleted, PhysicalCardSet)
+        listen_row_created(self.card_set_added_deleted, PhysicalCardSet)
+
+    def invalidate(self):
+        """Force all the counts to be reread on next use"""
+        self._oConn = None
+
+    def invalidate_set(self, oCardSet):
+        """Force the counts for the card set to be reread on next use"""
+        self._dCards.pop(oCardSet.id, None)
+        if self._oConn is not None:
+            # Totals are only loaded in bulk, so reread just this one
+            self._dTotals[oCardSet.id] = \
+                MapPhysicalCardToPhysicalCardSet.selectBy(
+                    physicalCardSetID=oCardSet.id).count()
+
+    def _check(self):
+        """Reload the totals if required"""
+        # pylint: disable=no-member
+        # SQLObject confuses pylint
+        oConn = get_base_conn(sqlhub.processConnection)
+        if self._oConn is oConn:
+            return
+        self._dCards = {}
+        self._dTotals = {}
+        oQuery = Select(
+            (MapPhysicalCardToPhysicalCardSet.q.physicalCardSetID,
+             func.COUNT(MapPhysicalCardToPhysicalCardSet.q.id)),
+            groupBy=MapPhysicalCardToPhysicalCardSet.q.physicalCardSetID)
+        for iCSId, iCount in oConn.queryAll(oConn.sqlrepr(oQuery)):
+            self._dTotals[iCSId] = iCount
+        self._oConn = oConn
+
+    def get_total(self, oCardSet):
+        """Return the number of cards in the card set"""
+        self._check()
+        return self._dTotals.get(oCardSet.id, 0)
+
+    def get_card_counts(self, oCardSet):
+        """Return a dictionary of physical card id -> count for the
+           card set"""
+        # pylint: disable=no-member
+        # SQLObject confuses pylint
+        self._check()
+        if oCardSet.id not in self._dCards:
+            dCounts = {}
+            oQuery = Select(
+                (MapPhysicalCardToPhysicalCardSet.q.physicalCardID,
+                 func.COUNT(MapPhysicalCardToPhysicalCardSet.q.id)),
+                where=MapPhysicalCardToPhysicalCardSet.q.physicalCardSetID ==
+                oCardSet.id,
+                groupBy=MapPhysicalCardToPhysicalCardSet.q.physicalCardID)
+            for iCardId, iCount in self._oConn.queryAll(
+                    self._oConn.sqlrepr(oQuery)):
+                dCounts[iCardId] = iCount
+            self._dCards[oCardSet.id] = dCounts
+        return dict(self._dCards[oCardSet.id])
+
+    # Signal handlers
+
+    def card_changed(self, oCardSet, oPhysCard, iChg):
+        """Update the counts when cards are added or removed"""
+        # pylint: disable=protected-access
+        # SQLObject doesn't expose the connection publically
+        if self._oConn is None or \
+                get_base_conn(oCardSet._connection) is not self._oConn:
+            return
+        self._dTotals[oCardSet.id] = self._dTotals.get(oCardSet.id, 0) + iChg
+        if oCardSet.id in self._dCards:
+            dCounts = self._dCards[oCardSet.id]
+            dCounts[oPhysCard.id] = dCounts.get(oPhysCard.id, 0) + iChg
+            if dCounts[oPhysCard.id] <= 0:
+                del dCounts[oPhysCard.id]
+
+    def cards_changed(self, dChanges):
+        """Update the counts for a batch of changes"""
+        for oCardSet, dCards in dChanges.items():
+            for oPhysCard, iChg in dCards.items():
+                self.card_changed(oCardSet, oPhysCard, iChg)
+
+    def card_set_added_deleted(self, oCardSet, _dKW=None, _fPostFuncs=None):
+        """Drop any counts for new or deleted card sets.
+
+           The ids of deleted card sets may be reused."""
+        self._dCards.pop(oCardSet.id, None)
+        self._dTotals.pop(oCardSet.id, None)
+
+
+# Shared card counts
+CARD_SET_COUNTS = CardSetCounts()
@@ -0,0 +1,184 @@
+# -*- coding: utf-8 -*-
+# vim:fileencoding=utf-8 ai ts=4 sts=4 et sw=4
+# Copyright 2026 Neil Muller <drnlmuller+sutekh@gmail.com>
+# GPL - see COPYING for details
+
+"""In-memory index of the card set hierarchy"""
+
+from sqlobject import sqlhub
+from sqlobject.sqlbuilder import Select
+
+from .BaseTables import PhysicalCardSet
+from .DBSignals import (listen_row_destroy, listen_row_update,
+                        listen_row_created)
+
+
+def _get_id(oValue):
+    """Turn a parent value from a signal into an id"""
+    if oValue is None or isinstance(oValue, int):
+        return oValue
+    return oValue.id
+
+
+def get_base_conn(oConn):
+    """Return the underlying connection for a transaction, so changes
+       made inside a transaction update the index for the database."""
+    # pylint: disable=protected-access
+    # SQLObject doesn't expose this publically
+    return getattr(oConn, '_dbConnection', oConn)
+
+
+class CardSetHierarchy:
+    """Index of the parents, children and in-use flags of all the card
+       sets.
+
+       The index is built from a single query on first use and then kept
+       current by listening to the card set row signals, so lookups don't
+       need to touch the database. It is rebuilt if the database connection
+       changes, or after invalidate is called (flush_cache does this, to
+       cover bulk changes that bypass the signals)."""
+
+    def __init__(self):
+        self._oConn = None
+        # card set id -> parent id (None for top level card sets)
+        self._dParents = {}
+        # parent id (None for top level) -> set of child ids
+        self._dChildren = {}
+        # card set id -> inuse flag
+        self._dInUse = {}
+        listen_row_update(self.card_set_changed, PhysicalCardSet)
+        listen_row_destroy(self.card_set_deleted, PhysicalCardSet)
+        listen_row_created(self.card_set_added, PhysicalCardSet)
+
+    def invalidate(self):
+        """Force the index to be rebuilt on next use"""
+        self._oConn = None
+
+    def _check(self):
+        """Rebuild the index if it's out of date"""
+        if self._oConn is not get_base_conn(sqlhub.processConnection):
+            self.rebuild()
+
+    def rebuild(self):
+        """Rebuild the index from the database"""
+        # pylint: disable=no-member
+        # SQLObject confuses pylint
+        self._dParents = {}
+        self._dChildren = {None: set()}
+        self._dInUse = {}
+        oConn = get_base_conn(sqlhub.processConnection)
+        oQuery = Select((PhysicalCardSet.q.id, PhysicalCardSet.q.parentID,
+                         PhysicalCardSet.q.inuse))
+        for iId, iParentId, bInUse in oConn.queryAll(oConn.sqlrepr(oQuery)):
+            self._add(iId, iParentId, bool(bInUse))
+        self._oConn = oConn
+
+    def _add(self, iId, iParentId, bInUse):
+        """Add a card set to the index"""
+        self._dParents[iId] = iParentId
+        self._dInUse[iId] = bInUse
+        self._dChildren.setdefault(iParentId, set()).add(iId)
+        self._dChildren.setdefault(iId, set())
+
+    def _remove(self, iId):
+        """Remove a card set from the index"""
+        if iId not in self._dParents:
+            return
+        iParentId = self._dParents.pop(iId)
+        del self._dInUse[iId]
+        self._dChildren.get(iParentId, set()).discard(iId)
+        if not self._dChildren[iId]:
+            del self._dChildren[iId]
+
+    # Signal handlers
+
+    def _ignore(self, oCardSet):
+        """Return True if the card set isn't part of the indexed database.
+
+           This skips signals when the index hasn't been built, and card
+           sets created in other databases (during upgrades, etc.)."""
+        # pylint: disable=protected-access
+        # SQLObject doesn't expose this publically
+        return self._oConn is None or \
+            get_base_conn(oCardSet._connection) is not self._oConn
+
+    def card_set_changed(self, oCardSet, dChanges):
+        """Update the index when a card set's parent or in-use flag
+           changes."""
+        if self._ignore(oCardSet) or oCardSet.id not in self._dParents:
+            return
+        if 'parentID' in dChanges or 'parent' in dChanges:
+            iParentId = _get_id(dChanges.get('parentID',
+                                             dChanges.get('parent')))
+            self._dChildren.get(self._dParents[oCardSet.id],
+                                set()).discard(oCardSet.id)
+            self._dParents[oCardSet.id] = iParentId
+            self._dChildren.setdefault(iParentId, set()).add(oCardSet.id)
+        if 'inuse' in dChanges:
+            self._dInUse[oCardSet.id] = bool(dChanges['inuse'])
+
+    def card_set_added(self, oCardSet, _dKW=None, _fPostFuncs=None):
+        """Add new card sets to the index"""
+        if self._ignore(oCardSet):
+            return
+        self._add(oCardSet.id, oCardSet.parentID, bool(oCardSet.inuse))
+
+    def card_set_deleted(self, oCardSet, _fPostFuncs=None):
+        """Remove deleted card sets from the index"""
+        if self._ignore(oCardSet):
+            return
+        self._remove(oCardSet.id)
+
+    # Queries
+
+    def get_parent_id(self, oCardSet):
+        """Return the id of the card set's parent, or None"""
+        self._check()
+        return self._dParents.get(oCardSet.id)
+
+    def get_child_ids(self, oCardSet):
+        """Return the ids of the children of oCardSet.
+
+           If oCardSet is None, return the ids of the top level card sets.
+           """
+        self._check()
+        iId = oCardSet.id if oCardSet else None
+        return set(self._dChildren.get(iId, ()))
+
+    def get_children(self, oCardSet):
+        """Return the children of oCardSet (the top level card sets if
+           oCardSet is None)."""
+        return [PhysicalCardSet.get(x) for x in
+                sorted(self.get_child_ids(oCardSet))]
+
+    def has_children(self, oCardSet):
+        """Return True if the card set has children"""
+        self._check()
+        return bool(self._dChildren.get(oCardSet.id))
+
+    def count_children(self, oCardSet, bInUseOnly=False):
+        """Return the number of children of the card set, optionally only
+           counting the in-use children."""
+        self._check()
+        aChildren = self._dChildren.get(oCardSet.id, ())
+        if bInUseOnly:
+            return len([x for x in aChildren if self._dInUse[x]])
+        return len(aChildren)
+
+    def get_loop_ids(self, oCardSet):
+        """Return the ids of the card sets in the loop oCardSet leads to,
+           starting from the card set at which the loop is entered, or an
+           empty list if there is no loop."""
+        self._check()
+        aSeen = []
+        iId = oCardSet.id
+        while iId is not None and iId not in aSeen:
+            aSeen.append(iId)
+            iId = self._dParents.get(iId)
+        if iId is None:
+            return []
+        return aSeen[aSeen.index(iId):]
+
+
+# Shared hierarchy index
+CARD_SET_HIERARCHY = CardSetHierarchy()
@@ -10,6 +10,8 @@ from sqlobject import SQLObjectNotFound, sqlhub
 
 from .CardLookup import DEFAULT_LOOKUP
 from .BaseTables import PhysicalCardSet
+from .CardSetCounts import CARD_SET_COUNTS
+from .SharedCardLists import SHARED_CARD_LISTS
 
 
 class CardSetHolder:
@@ -185,6 +187,8 @@ class CardSetHolder:
                 continue
             oPCS.addPhysicalCard(oPhysCard.id)
         oPCS.syncUpdate()
+        CARD_SET_COUNTS.invalidate_set(oPCS)
+        SHARED_CARD_LISTS.invalidate_set(oPCS)
 
 
 class CardSetWrapper(CardSetHolder):
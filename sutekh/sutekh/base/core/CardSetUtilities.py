@@ -6,8 +6,15 @@
 """Utility functions for dealing with managing the CardSet Objects"""
 
 from sqlobject import SQLObjectNotFound, sqlhub
-from .BaseTables import PhysicalCardSet
+from sqlobject.sqlbuilder import Select, Insert, AND, IN
+from .BaseTables import (PhysicalCardSet, PhysicalCard,
+                         MapPhysicalCardToPhysicalCardSet)
 from .BaseAdapters import IPhysicalCardSet
+from .CardSetHierarchy import CARD_SET_HIERARCHY
+from .DBSignals import send_batch_changed_signal
+
+# Maximum number of rows to insert or delete in a single statement
+BATCH_SIZE = 500
 
 
 def check_cs_exists(sName):
@@ -17,19 +24,9 @@ def check_cs_exists(sName):
 
 
 def get_loop(oCardSet):
-    """Return a list names of the card sets in the loop."""
-    aLoop = [oCardSet]
-    oParent = oCardSet.parent
-    while oParent not in aLoop and oParent:
-        aLoop.append(oParent)
-        oParent = oParent.parent
-    if not oParent:
-        # No parent case
-        return []
-    if oParent != oCardSet:
-        # oCardSet is not actually part of the loop
-        return get_loop(oParent)
-    return aLoop
+    """Return a list of the card sets in the loop."""
+    return [PhysicalCardSet.get(x) for x in
+            CARD_SET_HIERARCHY.get_loop_ids(oCardSet)]
 
 
 def get_loop_names(oCardSet):
@@ -44,14 +41,7 @@ def get_loop_names(oCardSet):
 
 def detect_loop(oCardSet):
     """Checks whether the given card set lead to a loop"""
-    aSeen = [oCardSet]
-    oParent = oCardSet.parent
-    while oParent:
-        if oParent in aSeen:
-            return True  # we have a loop
-        aSeen.append(oParent)
-        oParent = oParent.parent
-    return False  # we've hit none, so no loop
+    return bool(CARD_SET_HIERARCHY.get_loop_ids(oCardSet))
 
 
 def break_loop(oCardSet):
@@ -96,19 +86,139 @@ def delete_physical_card_set(sSetName):
         return False
 
 
-def find_children(oCardSet):
-    """Find all the children of the given card set"""
+def _find_removals(oCardSet, dRemove):
+    """Find the mapping table entries to delete to remove the given
+       cards from the card set.
+
+       Follows the rules used when removing a single card - if a card without
+       a printing isn't in the card set, we remove a copy of the card
+       with a printing instead.
+       Returns the list of mapping table ids and a dictionary of
+       physical card id -> number removed."""
     # pylint: disable=no-member
     # SQLObject confuses pylint
-    if oCardSet:
-        return list(PhysicalCardSet.selectBy(parentID=oCardSet.id))
-    return list(PhysicalCardSet.selectBy(parentID=None))
+    oConn = sqlhub.processConnection
+    oQuery = Select(
+        (MapPhysicalCardToPhysicalCardSet.q.id,
+         MapPhysicalCardToPhysicalCardSet.q.physicalCardID,
+         PhysicalCard.q.abstractCardID),
+        where=AND(
+            MapPhysicalCardToPhysicalCardSet.q.physicalCardSetID ==
+            oCardSet.id,
+            MapPhysicalCardToPhysicalCardSet.q.physicalCardID ==
+            PhysicalCard.q.id,
+            IN(PhysicalCard.q.abstractCardID,
+               list(set(x.abstractCardID for x in dRemove)))),
+        orderBy=(MapPhysicalCardToPhysicalCardSet.q.physicalCardID,
+                 MapPhysicalCardToPhysicalCardSet.q.id))
+    # physical card id -> mapping table ids
+    dEntries = {}
+    # abstract card id -> physical card ids
+    dPrintings = {}
+    for iMapId, iCardId, iAbsId in oConn.queryAll(oConn.sqlrepr(oQuery)):
+        dEntries.setdefault(iCardId, []).append(iMapId)
+        aCardIds = dPrintings.setdefault(iAbsId, [])
+        if iCardId not in aCardIds:
+            aCardIds.append(iCardId)
+    aToDelete = []
+    dRemoved = {}
+    for oPhysCard, iCount in dRemove.items():
+        for _iNum in range(iCount):
+            if dEntries.get(oPhysCard.id):
+                aCardIds = [oPhysCard.id]
+            elif not oPhysCard.printing:
+                aCardIds = [x for x in
+                            dPrintings.get(oPhysCard.abstractCardID, [])
+                            if dEntries[x]]
+            else:
+                aCardIds = []
+            if not aCardIds:
+                # Nothing left to remove
+                break
+            # Remove the last entry, as dec_card does
+            aToDelete.append(dEntries[aCardIds[0]].pop())
+            dRemoved[aCardIds[0]] = dRemoved.get(aCardIds[0], 0) + 1
+    return aToDelete, dRemoved
+
+
+def change_card_counts(dChanges):
+    """Apply a group of card count changes to one or more card sets.
+
+       dChanges is a dictionary of card set -> list of (physical card,
+       change) pairs. All the changes are applied in a single transaction,
+       and a single batch changed signal is sent afterwards, rather than a
+       changed signal for each card.
+
+       Returns a dictionary of card set -> {physical card: change} for the
+       changes actually made. This may differ from the requested changes
+       if cards to be removed aren't in the card set."""
+    # pylint: disable=no-member
+    # SQLObject confuses pylint
+    def _apply_changes(dChanges, dApplied):
+        """Update the mapping table.
+
+           Intended to be wrapped in a transaction for speed."""
+        oConn = sqlhub.processConnection
+        sCardCol = MapPhysicalCardToPhysicalCardSet.sqlmeta.columns[
+            'physicalCardID'].dbName
+        sSetCol = MapPhysicalCardToPhysicalCardSet.sqlmeta.columns[
+            'physicalCardSetID'].dbName
+        for oCardSet, aCards in dChanges.items():
+            dNet = {}
+            for oPhysCard, iChg in aCards:
+                dNet[oPhysCard] = dNet.get(oPhysCard, 0) + iChg
+            dDone = {}
+            dRemove = dict((x, -y) for x, y in dNet.items() if y < 0)
+            if dRemove:
+                aToDelete, dRemoved = _find_removals(oCardSet, dRemove)
+                for iStart in range(0, len(aToDelete), BATCH_SIZE):
+                    MapPhysicalCardToPhysicalCardSet.deleteMany(IN(
+                        MapPhysicalCardToPhysicalCardSet.q.id,
+                        aToDelete[iStart:iStart + BATCH_SIZE]))
+                for iCardId, iCount in dRemoved.items():
+                    dDone[iCardId] = -iCount
+            aToAdd = []
+            for oPhysCard, iCount in dNet.items():
+                if iCount > 0:
+                    aToAdd.extend([{sCardCol: oPhysCard.id,
+                                    sSetCol: oCardSet.id}] * iCount)
+                    dDone[oPhysCard.id] = dDone.get(oPhysCard.id, 0) + iCount
+            for iStart in range(0, len(aToAdd), BATCH_SIZE):
+                oConn.query(oConn.sqlrepr(Insert(
+                    MapPhysicalCardToPhysicalCardSet.sqlmeta.table,
+                    valueList=aToAdd[iStart:iStart + BATCH_SIZE])))
+            dDone = dict((x, y) for x, y in dDone.items() if y)
+            if dDone:
+                dApplied[oCardSet] = dDone
+
+    dApplied = {}
+    if hasattr(sqlhub.processConnection, 'commit'):
+        # We're already in a transaction
+        _apply_changes(dChanges, dApplied)
+    else:
+        sqlhub.doInTransaction(_apply_changes, dChanges, dApplied)
+    # We look up any cards we don't already have outside the transaction,
+    # so they're tied to the right connection
+    dCards = dict((oPhysCard.id, oPhysCard) for aCards in dChanges.values()
+                  for oPhysCard, _iChg in aCards)
+    for oCardSet, dDone in dApplied.items():
+        dApplied[oCardSet] = dict(
+            (dCards[x] if x in dCards else PhysicalCard.get(x), y)
+            for x, y in dDone.items())
+    if dApplied:
+        send_batch_changed_signal(dApplied)
+    return dApplied
+
+
+def find_children(oCardSet):
+    """Find all the children of the given card set"""
+    return CARD_SET_HIERARCHY.get_children(oCardSet)
 
 
 def has_children(oCardSet):
     """Return true if the card set has children"""
     if oCardSet:
-        return PhysicalCardSet.selectBy(parentID=oCardSet.id).count() > 0
+        return CARD_SET_HIERARCHY.has_children(oCardSet)
     return False
 
 
@@ -31,18 +31,37 @@ class ChangedSignal(Signal):
        """
 
 
+class BatchChangedSignal(Signal):
+    """Syncronisation signal for a group of changes to card sets.
+
+       Sent once after a batch of changes has been commited to the
+       database, instead of a ChangedSignal for each card.
+       The argument is a dictionary of card set -> {physical card: change}.
+       """
+
+
 # Senders
 def send_changed_signal(oCardSet, oPhysCard, iChange, cClass=PhysicalCardSet):
     """Sent when card counts change, as card sets may need to update."""
     cClass.sqlmeta.send(ChangedSignal, oCardSet, oPhysCard, iChange)
 
 
+def send_batch_changed_signal(dChanges, cClass=PhysicalCardSet):
+    """Sent when the card counts of several cards have changed at once."""
+    cClass.sqlmeta.send(BatchChangedSignal, dChanges)
+
+
 # Listeners
 def listen_changed(fListener, cClass):
     """Listens for the changed_signal."""
     listen(fListener, cClass, ChangedSignal)
 
 
+def listen_batch_changed(fListener, cClass):
+    """Listens for the batch changed signal."""
+    listen(fListener, cClass, BatchChangedSignal)
+
+
 def listen_row_destroy(fListener, cClass):
     """listen for the row destroyed signal sent when a card set is deleted."""
     listen(fListener, cClass, RowDestroySignal)
@@ -63,6 +82,11 @@ def disconnect_changed(fListener, cClass):
     dispatcher.disconnect(fListener, signal=ChangedSignal, sender=cClass)
 
 
+def disconnect_batch_changed(fListener, cClass):
+    """Disconnects from the batch changed signal."""
+    dispatcher.disconnect(fListener, signal=BatchChangedSignal, sender=cClass)
+
+
 def disconnect_row_destroy(fListener, cClass):
     """Disconnect from the row destroyed signal."""
     dispatcher.disconnect(fListener, signal=RowDestroySignal, sender=cClass)
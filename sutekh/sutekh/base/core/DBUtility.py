@@ -10,6 +10,7 @@
 
 import datetime
 import logging
+import os
 
 from sqlobject import SQLObjectNotFound
 
@@ -18,6 +19,9 @@ from .BaseAdapters import Adapter
 from .BaseAbbreviations import DatabaseAbbreviation
 from .DatabaseVersion import DatabaseVersion
 from .CachedRelatedJoin import SOCachedRelatedJoin
+from .CardSetHierarchy import CARD_SET_HIERARCHY
+from .CardSetCounts import CARD_SET_COUNTS
+from .SharedCardLists import SHARED_CARD_LISTS
 from ..Utility import find_subclasses
 
 CARDLIST_UPDATE_DATE = "last cardlist update"
@@ -52,10 +56,34 @@ def flush_cache(bMakeCache=True):
         for oJoin in oChild.sqlmeta.joins:
             if isinstance(oJoin, SOCachedRelatedJoin):
                 oJoin.flush_cache()
+    # Bulk changes may not have sent the card set signals
+    CARD_SET_HIERARCHY.invalidate()
+    CARD_SET_COUNTS.invalidate()
+    SHARED_CARD_LISTS.invalidate()
     if bMakeCache:
         make_adapter_caches()
 
 
+def get_database_stamp(oConn):
+    """Return a value which changes when the database file is changed.
+
+       Returns None if the database isn't a SQLite file, since we can't
+       cheaply tell if it's been changed."""
+    sFile = getattr(oConn, 'filename', None)
+    if not sFile or sFile == ':memory:':
+        return None
+    aStamp = []
+    # Changes may only be in the write-ahead log until it's checkpointed
+    for sPath in (sFile, sFile + '-wal'):
+        try:
+            oStat = os.stat(sPath)
+        except OSError:
+            aStamp.append(None)
+        else:
+            aStamp.append((oStat.st_mtime_ns, oStat.st_size))
+    return tuple(aStamp)
+
+
 def init_cache():
     """Initiliase the cached join tables."""
     for oJoin in AbstractCard.sqlmeta.joins:
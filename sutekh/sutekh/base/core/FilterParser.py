@@ -12,6 +12,9 @@
    uses intospection to find the filters to add to the grammar.
    """
 
+import re
+from collections import OrderedDict
+
 # pylint: disable=no-name-in-module
 # pylint 0.18 misses ply parts
 import ply.lex as lex
@@ -241,35 +244,117 @@ class FilterYaccParser:
 
 # Wrapper objects around the parser
 class FilterParser:
-    """Entry point for filter parsing. Wraps Lexer and Parser Objects"""
-    # pylint: disable=too-few-public-methods
-    # This really does only need the 1 public method
+    """Entry point for filter parsing. Wraps Lexer and Parser Objects.
+
+       The lexer and parser are shared by all FilterParser instances.
+       Parsed filters are kept in a bounded cache, keyed on the filter
+       text with the whitespace outside of quoted strings normalised, so
+       saved filters and repeated queries don't need to be parsed again.
+       """
     _oGlobalLexer = None
     _oGlobalParser = None
     _oGlobalFilterParser = None
 
+    # Maximum number of parsed filters we keep
+    CACHE_SIZE = 256
+    _dCache = OrderedDict()
+    _dCacheStats = {'hits': 0, 'misses': 0}
+
     def __init__(self):
         """Create the global Parser and Lexer objects if needed"""
-        if not self._oGlobalLexer:
-            self._oGlobalLexer = ParseFilterDefinitions()
-            self._oGlobalLexer.build()
+        cls = self.__class__
+        if not cls._oGlobalLexer:
+            cls._oGlobalLexer = ParseFilterDefinitions()
+            cls._oGlobalLexer.build()
 
-        if not self._oGlobalParser:
+        if not cls._oGlobalParser:
             # yacc needs an initialised lexer
-            self._oGlobalFilterParser = FilterYaccParser()
-            self._oGlobalParser = yacc.yacc(module=self._oGlobalFilterParser,
-                                            debug=0,
-                                            write_tables=0)
+            cls._oGlobalFilterParser = FilterYaccParser()
+            cls._oGlobalParser = yacc.yacc(module=cls._oGlobalFilterParser,
+                                           debug=0,
+                                           write_tables=0)
 
     def apply(self, sFilter):
-        """Apply the parser to the string sFilter"""
+        """Apply the parser to the string sFilter.
+
+           Each call returns a new AST, so the caller is free to set the
+           values of any variables."""
+        sKey = normalise_filter(sFilter)
+        dCache = FilterParser._dCache
+        if sKey in dCache:
+            FilterParser._dCacheStats['hits'] += 1
+            dCache.move_to_end(sKey)
+            return copy_ast(dCache[sKey])
+        FilterParser._dCacheStats['misses'] += 1
+        oAST = self._parse(sKey)
+        dCache[sKey] = oAST
+        while len(dCache) > self.CACHE_SIZE:
+            dCache.popitem(last=False)
+        return copy_ast(oAST)
+
+    def _parse(self, sFilter):
+        """Run the lexer and parser on sFilter"""
         self._oGlobalFilterParser.reset()
-        if sFilter != '':
-            oAST = self._oGlobalParser.parse(sFilter)
-        else:
+        if sFilter == '':
             # '' can cause the lexer to bomb out, so we avoid it
-            oAST = self._oGlobalParser.parse(' ')
-        return oAST
+            sFilter = ' '
+        return self._oGlobalParser.parse(sFilter,
+                                         lexer=self._oGlobalLexer.oLexer)
+
+    @classmethod
+    def get_cache_stats(cls):
+        """Return the number of hits and misses, and the size of the
+           parsed filter cache"""
+        dStats = dict(cls._dCacheStats)
+        dStats['size'] = len(cls._dCache)
+        return dStats
+
+    @classmethod
+    def clear_cache(cls):
+        """Empty the parsed filter cache, and reset the counts"""
+        cls._dCache.clear()
+        cls._dCacheStats['hits'] = cls._dCacheStats['misses'] = 0
+
+
+# Matches the quoted strings in a filter, as for t_STRING
+STRING_RE = re.compile(
+    r'("(?:\\\\|\\\'|\\"|[^"\\])*?"|\'(?:\\\\|\\\'|\\"|[^\'\\])*?\')')
+
+
+# The operators, which don't need to be separated by whitespace
+OPERATOR_RE = re.compile(r'(&&|\|\||[,=()])')
+
+
+def normalise_filter(sFilter):
+    """Normalise the whitespace outside the quoted strings in the filter.
+
+       Filters that only differ in the spacing parse to the same AST, so
+       they share a cache entry."""
+    aParts = STRING_RE.split(sFilter)
+    # split returns the quoted strings at the odd indices
+    for iIndex in range(0, len(aParts), 2):
+        aParts[iIndex] = ' '.join(
+            OPERATOR_RE.sub(r' \1 ', aParts[iIndex]).split())
+    return ' '.join(x for x in aParts if x)
+
+
+def copy_ast(oNode):
+    """Copy the filter structure of the AST.
+
+       The value nodes are shared, as they are never changed, so the copy
+       is cheap, but the FilterPartNodes are new, so setting the values of
+       the variables doesn't change the original AST."""
+    if isinstance(oNode, FilterNode):
+        return FilterNode(copy_ast(oNode.oExpression))
+    if isinstance(oNode, BinOpNode):
+        return BinOpNode(copy_ast(oNode.oLeft), oNode.oOp,
+                         copy_ast(oNode.oRight))
+    if isinstance(oNode, NotOpNode):
+        return NotOpNode(copy_ast(oNode.oSubExpression))
+    if isinstance(oNode, FilterPartNode):
+        return FilterPartNode(oNode.sFilterName, oNode.aFilterValues,
+                              oNode.sVariableName)
+    return oNode
 
 
 # Helper functions for dealing with strings
@@ -0,0 +1,85 @@
+# -*- coding: utf-8 -*-
+# vim:fileencoding=utf-8 ai ts=4 sts=4 et sw=4
+# Copyright 2026 Neil Muller <drnlmuller+sutekh@gmail.com>
+# GPL - see COPYING for details
+
+"""Show how the database runs the query for a filter, to help find out
+   why a filter is slow."""
+
+import re
+import time
+
+from sqlobject import SQLObject, sqlhub
+
+from ..Utility import find_subclasses
+
+# Filters alias the mapping tables as <table>_alias<n>
+ALIAS_RE = re.compile(r'_alias\d+$')
+# The first word after SCAN is the table (or alias) being scanned.
+# Older versions of SQLite include 'TABLE'
+SQLITE_SCAN_RE = re.compile(r'^SCAN (?:TABLE )?(\w+)')
+POSTGRES_SCAN_RE = re.compile(r'Seq Scan on (\w+)')
+
+
+def get_map_tables():
+    """Return the names of the tables that map cards to their
+       properties and card sets"""
+    return set(cTable.sqlmeta.table for cTable in find_subclasses(SQLObject)
+               if cTable.__name__.startswith('Map'))
+
+
+class QueryPlan:
+    """The database's query plan for the query behind a SelectResults,
+       with the time the query took and the number of rows it returned.
+
+       SQLite and PostgreSQL plans are checked for full scans of the
+       mapping tables, which should always be searched using an index."""
+
+    def __init__(self, oResults):
+        oConn = sqlhub.processConnection
+        self.sSQL = oConn.sqlrepr(oResults.queryForSelect())
+        # (depth, step) for each step of the plan
+        self.aPlan = []
+        # mapping tables that are scanned in full
+        self.aFullScans = []
+        self._make_plan(oConn)
+        fStart = time.perf_counter()
+        self.iRows = len(oConn.queryAll(self.sSQL))
+        self.fTime = time.perf_counter() - fStart
+
+    def _make_plan(self, oConn):
+        """Ask the database for the plan, and look for full scans"""
+        aMapTables = get_map_tables()
+        if oConn.dbName == 'sqlite':
+            dDepth = {0: -1}
+            for iId, iParent, _iUnused, sStep in oConn.queryAll(
+                    'EXPLAIN QUERY PLAN ' + self.sSQL):
+                dDepth[iId] = dDepth.get(iParent, -1) + 1
+                self.aPlan.append((dDepth[iId], sStep))
+                oMatch = SQLITE_SCAN_RE.match(sStep)
+                if oMatch:
+                    self._check_scan(oMatch.group(1), aMapTables)
+        else:
+            for tRow in oConn.queryAll('EXPLAIN ' + self.sSQL):
+                sStep = ' '.join(str(x) for x in tRow)
+                self.aPlan.append((0, sStep))
+                for sTable in POSTGRES_SCAN_RE.findall(sStep):
+                    self._check_scan(sTable, aMapTables)
+
+    def _check_scan(self, sTable, aMapTables):
+        """Record the scan if sTable is a mapping table"""
+        sTable = ALIAS_RE.sub('', sTable)
+        if sTable in aMapTables and sTable not in self.aFullScans:
+            self.aFullScans.append(sTable)
+
+    def format(self):
+        """Return a description of the plan for displaying"""
+        aLines = ['Query:', self.sSQL, '', 'Plan:']
+        for iDepth, sStep in self.aPlan:
+            aLines.append('%s%s' % ('  ' * (iDepth + 1), sStep))
+        aLines.append('')
+        aLines.append('%d rows in %.1f ms' % (self.iRows, 1000 * self.fTime))
+        for sTable in self.aFullScans:
+            aLines.append('WARNING: full scan of the %s mapping table'
+                          % sTable)
+        return '\n'.join(aLines)
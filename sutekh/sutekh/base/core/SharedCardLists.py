@@ -0,0 +1,129 @@
+# -*- coding: utf-8 -*-
+# vim:fileencoding=utf-8 ai ts=4 sts=4 et sw=4
+# Copyright 2026 Neil Muller <drnlmuller+sutekh@gmail.com>
+# GPL - see COPYING for details
+
+"""Card lists for groups of card sets, shared between users"""
+
+import threading
+from collections import OrderedDict
+
+from sqlobject import sqlhub
+
+from .BaseTables import PhysicalCardSet, MapPhysicalCardToPhysicalCardSet
+from .BaseFilters import FilterAndBox
+from .CardSetHierarchy import get_base_conn
+from .DBSignals import (listen_changed, listen_batch_changed,
+                        listen_row_destroy)
+
+# The number of lists to keep. Each open card set pane uses a few, so this
+# covers many panes, while lists for closed panes are dropped eventually
+LIST_CACHE_SIZE = 64
+
+
+def _get_filter_key(oFilter):
+    """Return a key identifying the query a filter will run"""
+    # pylint: disable=protected-access
+    # We need the filter's expression and joins here
+    oConn = sqlhub.processConnection
+    return (oConn.sqlrepr(oFilter._get_expression()),
+            tuple(oConn.sqlrepr(x) for x in oFilter._get_joins()))
+
+
+class SharedCardLists:
+    """The card set map table entries for groups of card sets, restricted
+       by a filter.
+
+       The card set panes use these for the cards in parent, child and
+       sibling card sets, so panes on related card sets share the queries.
+       Entries are dropped when any of their card sets change, or when a
+       card set involved in their filter changes.
+
+       Code that adds cards to a card set without sending the changed
+       signal must call invalidate_set afterwards. flush_cache invalidates
+       everything.
+
+       Only the LIST_CACHE_SIZE most recently used lists are kept.
+       get_entries is called from the background load threads, so the
+       lists are protected by a lock."""
+
+    def __init__(self):
+        self._oConn = None
+        # key -> (card set ids, filter, entries), least recently used first
+        self._dLists = OrderedDict()
+        self._oLock = threading.Lock()
+        # Increased on every invalidation, so queries that ran while the
+        # card sets were changing aren't stored
+        self._iChanges = 0
+        listen_changed(self.card_changed, PhysicalCardSet)
+        listen_batch_changed(self.cards_changed, PhysicalCardSet)
+        listen_row_destroy(self.card_set_deleted, PhysicalCardSet)
+
+    def invalidate(self):
+        """Drop all the cached lists"""
+        with self._oLock:
+            self._dLists.clear()
+            self._iChanges += 1
+
+    def invalidate_set(self, oCardSet):
+        """Drop the lists affected by changes to the card set"""
+        with self._oLock:
+            self._iChanges += 1
+            for oKey, (aIds, oFilter, _aEntries) in list(
+                    self._dLists.items()):
+                if oCardSet.id in aIds or oFilter.involves(oCardSet):
+                    del self._dLists[oKey]
+
+    def get_entries(self, aCardSetIds, oSetFilter, oFilter):
+        """Return the map table entries for the card sets aCardSetIds
+           which match oFilter.
+
+           oSetFilter selects the card sets. The returned list is a copy,
+           so callers can change it."""
+        oConn = get_base_conn(sqlhub.processConnection)
+        oFullFilter = FilterAndBox([oSetFilter, oFilter])
+        oKey = _get_filter_key(oFullFilter)
+        with self._oLock:
+            if oConn is not self._oConn:
+                self._dLists.clear()
+                self._oConn = oConn
+            if oKey in self._dLists:
+                self._dLists.move_to_end(oKey)
+                return list(self._dLists[oKey][2])
+            iChanges = self._iChanges
+        # We don't hold the lock during the query, so the signal handlers
+        # aren't held up by a load in the background
+        aEntries = list(oFullFilter.select(
+            MapPhysicalCardToPhysicalCardSet).distinct())
+        with self._oLock:
+            if iChanges != self._iChanges or oConn is not self._oConn:
+                # Card sets changed during the query, so this may be out
+                # of date already
+                return aEntries
+            self._dLists[oKey] = (frozenset(aCardSetIds), oFilter, aEntries)
+            if len(self._dLists) > LIST_CACHE_SIZE:
+                # Drop the least recently used list
+                self._dLists.popitem(last=False)
+        return list(aEntries)
+
+    # Signal handlers
+
+    def card_changed(self, oCardSet, _oPhysCard, _iChg):
+        """Drop the lists affected by a card change"""
+        self.invalidate_set(oCardSet)
+
+    def cards_changed(self, dChanges):
+        """Drop the lists affected by a batch of changes"""
+        for oCardSet in dChanges:
+            self.invalidate_set(oCardSet)
+
+    def card_set_deleted(self, oCardSet, _fPostFuncs=None):
+        """Drop any lists for deleted card sets, as the ids may be
+           reused."""
+        self.invalidate_set(oCardSet)
+
+
+# Shared card lists. This is created on import, so it listens for the
+# changed signals ahead of the card set panes, and they never see an
+# out of date list
+SHARED_CARD_LISTS = SharedCardLists()
@@ -152,18 +152,23 @@ class AppMainWindow(MultiPaneWindow):
         # Check database is correctly populated
         self._verify_database()
 
-        # Load plugins
+        # Load plugins. Plugins which only add menu items are loaded
+        # when they're first used
         self._oPluginManager = oPluginManager
-        self._oPluginManager.load_plugins()
+        self._oPluginManager.load_plugins(True)
         for cPlugin in self._oPluginManager.get_all_plugins():
             # Fixup config to accomodate the plugins
-            cPlugin.update_config()
-            cPlugin.register_with_config(oConfig)
+            with self._oPluginManager.timed(
+                    self._oPluginManager.get_plugin_name(cPlugin), 'config'):
+                cPlugin.update_config()
+                cPlugin.register_with_config(oConfig)
 
         # Initiliase plugins that will work on the Main Window
         for cPlugin in self._oPluginManager.get_plugins_for('MainWindow'):
-            self._aPlugins.append(cPlugin(self, None,
-                                          "MainWindow"))
+            with self._oPluginManager.timed(
+                    self._oPluginManager.get_plugin_name(cPlugin), 'init'):
+                self._aPlugins.append(cPlugin(self, None,
+                                              "MainWindow"))
 
         # Re-validate config after adding plugin specs
         oValidationResults = oConfig.validate()
@@ -192,7 +197,9 @@ class AppMainWindow(MultiPaneWindow):
         self._oIconManager.setup()
         # plugins as well
         for oPlugin in self._aPlugins:
-            oPlugin.setup()
+            with self._oPluginManager.timed(
+                    self._oPluginManager.get_plugin_name(oPlugin), 'setup'):
+                oPlugin.setup()
 
         # Break any loops in the database
         break_existing_loops()
@@ -201,6 +208,7 @@ class AppMainWindow(MultiPaneWindow):
 
         # Now we can check for any plugins that have updated data
         self.check_for_plugin_updates()
+        self._oPluginManager.log_startup_costs()
 
     def run_plugin_checks(self):
         """Call the run_checks hook for all imported plugins."""
@@ -347,7 +355,9 @@ class AppMainWindow(MultiPaneWindow):
         aMessages = []
         aUpdatePlugins = []
         for oPlugin in self._aPlugins:
-            sMsg = oPlugin.check_for_updates()
+            with self._oPluginManager.timed(
+                    self._oPluginManager.get_plugin_name(oPlugin), 'updates'):
+                sMsg = oPlugin.check_for_updates()
             if sMsg:
                 aMessages.append(sMsg)
                 aUpdatePlugins.append(oPlugin)
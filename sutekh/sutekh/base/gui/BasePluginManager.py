@@ -10,8 +10,10 @@ import os
 import glob
 import logging
 import re
+import time
 import zipfile
 import zipimport
+from contextlib import contextmanager
 
 # Needed so we can import this into the documentation generator
 import gi
@@ -23,9 +25,11 @@ from sqlobject import sqlhub
 from ..core.DatabaseVersion import DatabaseVersion
 from ..core.BaseTables import PhysicalCardSet, PhysicalCard
 from ..core.BaseAdapters import IAbstractCard
+from ..core.CardSetCounts import CARD_SET_COUNTS
+from ..core.SharedCardLists import SHARED_CARD_LISTS
 from .BaseConfigFile import CARDSET, FULL_CARDLIST, CARDSET_LIST, FRAME
 from .MessageBus import MessageBus, CONFIG_MSG, DATABASE_MSG
-from .SutekhDialog import do_complaint_warning
+from .SutekhDialog import do_complaint_warning, do_complaint_error
 
 
 def submodules(oPackage):
@@ -57,12 +61,187 @@ def submodules(oPackage):
     return list(aModules)
 
 
+def check_table_versions(sName, dTableVersions):
+    """Check that the database tables are in the versions the plugin
+       supports."""
+    oDBVer = DatabaseVersion()
+    for oTable, aVersions in dTableVersions.items():
+        if not oDBVer.check_table_in_versions(oTable, aVersions):
+            logging.warning("Skipping plugin %s due to version error (%s)",
+                            sName, oTable)
+            return False
+    # If nothing is specified, currently we assume everything is A-OK
+    return True
+
+
+class DeferredPluginInfo:
+    """Stand-in for a plugin class whose module hasn't been imported yet.
+
+       This is built from the light metadata the plugins package provides,
+       and supports the class methods that are used before the plugin is
+       needed. Calling it creates a DeferredPlugin, as calling a plugin
+       class would create the plugin."""
+
+    def __init__(self, oManager, sName, aModelsSupported, dTableVersions,
+                 aMenus):
+        self._oManager = oManager
+        self.sName = sName
+        self.aModelsSupported = tuple(aModelsSupported)
+        self.dTableVersions = dict(dTableVersions)
+        self.aMenus = list(aMenus)
+        self._cPlugin = None
+        self._bFailed = False
+
+    def __call__(self, oView, oModel, cModelType=None):
+        return DeferredPlugin(self, oView, oModel, cModelType)
+
+    # Deferred plugins have no config, so these are no-ops
+    def update_config(self):
+        """Nothing to do until the plugin is loaded"""
+        pass
+
+    def register_with_config(self, _oConfig):
+        """Nothing to do until the plugin is loaded"""
+        pass
+
+    def check_versions(self):
+        """Check the table versions given in the metadata, so we don't
+           need to import the plugin to skip it."""
+        return check_table_versions(self.sName, self.dTableVersions)
+
+    def check_model_type(self, cModelType):
+        """Check whether the plugin should register on this frame."""
+        return cModelType in self.aModelsSupported
+
+    def timed(self, sPhase):
+        """Add the time taken by the block to the plugin's start-up costs"""
+        return self._oManager.timed(self.sName, sPhase)
+
+    def load(self):
+        """Import the plugin module and return the plugin class, or None if
+           the plugin can't be used."""
+        if self._cPlugin is None and not self._bFailed:
+            self._cPlugin = self._oManager.load_plugin_class(self.sName)
+            self._bFailed = self._cPlugin is None
+            if self._cPlugin:
+                logging.info('Loaded the %s plugin on first use', self.sName)
+        return self._cPlugin
+
+
+class DeferredPlugin:
+    """Stand-in for a plugin that hasn't been used yet.
+
+       The menu items are created from the plugin metadata. The first time
+       one of them is activated, we load the plugin, create it and activate
+       the plugin's matching menu item. The plugin's menu items must match
+       the metadata in number and order."""
+
+    def __init__(self, oInfo, oView, oModel, cModelType):
+        self._oInfo = oInfo
+        self._tArgs = (oView, oModel, cModelType)
+        self._oPlugin = None
+        self._aMenuItems = None
+
+    # pylint: disable=protected-access
+    # we allow access to the members via these properties
+    name = property(fget=lambda self: self._oInfo.sName,
+                    doc="The name of the plugin module.")
+    plugin = property(fget=lambda self: self._oPlugin,
+                      doc="The real plugin, if it has been loaded.")
+    # pylint: enable=protected-access
+
+    def add_to_menu(self, dAllMenus, oCatchAllMenu):
+        """Add the placeholder menu items to the frame"""
+        for iIndex, (sMenu, sLabel) in enumerate(self._oInfo.aMenus):
+            oMenuItem = Gtk.MenuItem(label=sLabel)
+            oMenuItem.connect('activate', self._activate, iIndex)
+            if sMenu in dAllMenus:
+                dAllMenus[sMenu].add(oMenuItem)
+            else:
+                oCatchAllMenu.add(oMenuItem)
+
+    def _load(self):
+        """Create the real plugin and its menu items"""
+        cPlugin = self._oInfo.load()
+        if cPlugin is None:
+            return False
+        with self._oInfo.timed('init'):
+            self._oPlugin = cPlugin(*self._tArgs)
+        with self._oInfo.timed('menu'):
+            aMenuItems = self._oPlugin.get_menu_item()
+        if aMenuItems is None:
+            aMenuItems = []
+        elif not isinstance(aMenuItems, list):
+            aMenuItems = [aMenuItems]
+        self._aMenuItems = [x[1] if isinstance(x, tuple) else x
+                            for x in aMenuItems]
+        if len(self._aMenuItems) != len(self._oInfo.aMenus):
+            logging.warning("Plugin %s has %d menu items, but the metadata"
+                            " lists %d", self._oInfo.sName,
+                            len(self._aMenuItems), len(self._oInfo.aMenus))
+        return True
+
+    def _activate(self, _oWidget, iIndex):
+        """Load the plugin if needed, and pass the activation on"""
+        if self._oPlugin is None and not self._load():
+            do_complaint_error("Unable to load the %s plugin.\n"
+                               "See the log for details." % self._oInfo.sName)
+            return
+        if iIndex < len(self._aMenuItems):
+            self._aMenuItems[iIndex].activate()
+
+    # The hooks the frames and main window call on their plugins. Deferred
+    # plugins don't use these until they're loaded
+    # pylint: disable=no-self-use
+    # These need to match the plugin API
+    def setup(self):
+        """Deferred plugins have no setup"""
+        return None
+
+    def get_toolbar_widget(self):
+        """Deferred plugins have no toolbar widgets"""
+        return None
+
+    def get_frame_from_config(self, _sType):
+        """Deferred plugins supply no frames"""
+        return None
+
+    def check_for_updates(self):
+        """Deferred plugins have no data to download"""
+        return None
+
+    def run_checks(self):
+        """Pass on to the plugin if loaded"""
+        if self._oPlugin:
+            self._oPlugin.run_checks()
+
+    def do_update(self):
+        """Pass on to the plugin if loaded"""
+        if self._oPlugin:
+            self._oPlugin.do_update()
+
+    # pylint: enable=no-self-use
+
+    def cleanup(self):
+        """Clean up the plugin if it was loaded"""
+        if self._oPlugin:
+            self._oPlugin.cleanup()
+        self._oPlugin = None
+        self._aMenuItems = None
+
+
 class BasePluginManager:
     """Base class for managing plugins.
 
        Plugin modules should be placed in the plugins package directory and
        contain an attribute named 'plugin' which points to the plugin class the
        module contains.
+
+       The plugins package can list plugins in DEFERRED_PLUGINS, as
+       module name: (models supported, table versions,
+                     [(menu, menu item label), ...]).
+       When loading with bDefer, these modules are only imported when one
+       of the menu items is first used.
        """
 
     # Base classes will specify these
@@ -71,42 +250,110 @@ class BasePluginManager:
 
     def __init__(self):
         self._aPlugins = []
-
-    def _do_load_plugins(self, aPlugins):
-        """Load list of Plugin Classes from plugin dir."""
-        for sPluginName in sorted(submodules(aPlugins)):
-            # load module
-            # pylint: disable=invalid-name
-            # mPlugin is legal name here
-            try:
+        # plugin name -> {phase : time taken}
+        self._dCosts = {}
+
+    @contextmanager
+    def timed(self, sName, sPhase):
+        """Add the time taken by the block to the plugin's start-up costs"""
+        fStart = time.perf_counter()
+        try:
+            yield
+        finally:
+            dCosts = self._dCosts.setdefault(sName, {})
+            dCosts[sPhase] = dCosts.get(sPhase, 0.0) + \
+                time.perf_counter() - fStart
+
+    def get_startup_costs(self):
+        """Return a dictionary of plugin name: {phase: time in seconds}"""
+        return dict((sName, dict(dCosts)) for sName, dCosts in
+                    self._dCosts.items())
+
+    def log_startup_costs(self):
+        """Log the start-up cost of each plugin, most expensive first"""
+        aCosts = sorted(self._dCosts.items(),
+                        key=lambda x: (-sum(x[1].values()), x[0]))
+        fTotal = sum(sum(dCosts.values()) for _sName, dCosts in aCosts)
+        aLines = ['Plugin start-up costs - %.1f ms in total:' %
+                  (1000 * fTotal)]
+        for sName, dCosts in aCosts:
+            aLines.append('%8.1f ms  %s (%s)' % (
+                1000 * sum(dCosts.values()), sName,
+                ', '.join('%s %.1f' % (sPhase, 1000 * fTime) for
+                          sPhase, fTime in sorted(dCosts.items()))))
+        logging.info('\n'.join(aLines))
+
+    @staticmethod
+    def get_plugin_name(oPlugin):
+        """Return the name used to report on the plugin or plugin class"""
+        if isinstance(oPlugin, DeferredPlugin):
+            return oPlugin.name
+        if isinstance(oPlugin, DeferredPluginInfo):
+            return oPlugin.sName
+        return oPlugin.__module__.rsplit('.', 1)[-1]
+
+    def load_plugin_class(self, sPluginName):
+        """Import the plugin module, and return the plugin class if it's
+           usable."""
+        # load module
+        # pylint: disable=invalid-name
+        # mPlugin is legal name here
+        try:
+            with self.timed(sPluginName, 'import'):
                 mPlugin = __import__("%s.%s" % (self.sPluginDir, sPluginName),
-                                     None, None, [aPlugins])
-            except ImportError as oExp:
-                logging.warning("Failed to load plugin %s (%s).",
-                                sPluginName, oExp, exc_info=1)
-                continue
+                                     None, None, ['plugin'])
+        except ImportError as oExp:
+            logging.warning("Failed to load plugin %s (%s).",
+                            sPluginName, oExp, exc_info=1)
+            return None
 
-            # find plugin class
-            try:
-                cPlugin = mPlugin.plugin
-            except AttributeError as oExp:
-                logging.warning("Plugin module %s appears not to contain a"
-                                " plugin (%s).", sPluginName, oExp, exc_info=1)
-                continue
+        # find plugin class
+        try:
+            cPlugin = mPlugin.plugin
+        except AttributeError as oExp:
+            logging.warning("Plugin module %s appears not to contain a"
+                            " plugin (%s).", sPluginName, oExp, exc_info=1)
+            return None
 
-            # add to appropriate plugin lists
-            if issubclass(cPlugin, self.cAppPlugin):
+        if not issubclass(cPlugin, self.cAppPlugin):
+            return None
+        if not self._check_versions(sPluginName, cPlugin):
+            return None
+        return cPlugin
+
+    def _check_versions(self, sPluginName, cPlugin):
+        """Check that the plugin supports the current database schema"""
+        # We skip the check if we're not currently connected to
+        # a database, so we can import plugins to generate
+        # the docs and so forth.
+        if not hasattr(sqlhub, 'processConnection'):
+            return True
+        with self.timed(sPluginName, 'version check'):
+            return cPlugin.check_versions()
+
+    def _do_load_plugins(self, aPlugins, bDefer=False):
+        """Load list of Plugin Classes from plugin dir.
+
+           If bDefer is set, the plugins listed in the package's
+           DEFERRED_PLUGINS aren't imported yet."""
+        dDeferred = getattr(aPlugins, 'DEFERRED_PLUGINS', {}) if bDefer \
+            else {}
+        for sPluginName in sorted(submodules(aPlugins)):
+            if sPluginName in dDeferred:
+                aModels, dTableVersions, aMenus = dDeferred[sPluginName]
+                oInfo = DeferredPluginInfo(self, sPluginName, aModels,
+                                           dTableVersions, aMenus)
                 # Skip plugins that don't support the current database
-                # schema
-                # We skip the check if we're not currently connected to
-                # a database, so we can import plugins to generate
-                # the docs and so forth.
-                if hasattr(sqlhub, 'processConnection') and \
-                        not cPlugin.check_versions():
-                    continue
+                # schema, as we would if we imported them
+                if self._check_versions(sPluginName, oInfo):
+                    self._aPlugins.append(oInfo)
+                continue
+            cPlugin = self.load_plugin_class(sPluginName)
+            # add to appropriate plugin lists
+            if cPlugin is not None:
                 self._aPlugins.append(cPlugin)
 
-    def load_plugins(self):
+    def load_plugins(self, bDefer=False):
         """Entry point to load the plugins"""
         # Subclasses should override this to call _do_load_plugins
         # with the correct arguments
@@ -239,14 +486,7 @@ class BasePlugin:
     def check_versions(cls):
         """Check whether the plugin supports the current version of
            the Sutekh database tables."""
-        oDBVer = DatabaseVersion()
-        for oTable, aVersions in cls.dTableVersions.items():
-            if not oDBVer.check_table_in_versions(oTable, aVersions):
-                logging.warning("Skipping plugin %s due to version error (%s)",
-                                cls, oTable)
-                return False
-        # If nothing is specified, currently we assume everything is A-OK
-        return True
+        return check_table_versions(cls, cls.dTableVersions)
 
     @classmethod
     def check_model_type(cls, cModelType):
@@ -478,3 +718,5 @@ class BasePlugin:
                 oCS.addPhysicalCard(oCard)
 
         sqlhub.doInTransaction(_in_transaction, oCS, aCards)
+        CARD_SET_COUNTS.invalidate_set(oCS)
+        SHARED_CARD_LISTS.invalidate_set(oCS)
@@ -119,9 +119,12 @@ class BasicFrame(Gtk.Frame):
         """Loop through the plugins, and enable those appropriate for us."""
         oPluginMgr = self._oMainWindow.plugin_manager
         for cPlugin in oPluginMgr.get_plugins_for(self._cModelType):
-            self._aPlugins.append(cPlugin(self._oController.view,
-                                          self._oController.view.get_model(),
-                                          self._cModelType))
+            with oPluginMgr.timed(oPluginMgr.get_plugin_name(cPlugin),
+                                  'init'):
+                self._aPlugins.append(cPlugin(
+                    self._oController.view,
+                    self._oController.view.get_model(),
+                    self._cModelType))
 
     def set_title(self, sTitle):
         """Set the title of the pane to sTitle"""
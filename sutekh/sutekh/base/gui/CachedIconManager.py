@@ -10,6 +10,7 @@ import os
 from gi.repository import GdkPixbuf, GLib, Gtk
 
 from ..io.BaseIconManager import BaseIconManager
+from .MessageBus import MessageBus, ICON_MSG
 from .ProgressDialog import ProgressDialog, SutekhCountLogHandler
 
 
@@ -108,3 +109,4 @@ class CachedIconManager(BaseIconManager):
         oLogHandler.set_total(self.get_icon_total())
         self.download_icons(oLogHandler)
         oProgressDialog.destroy()
+        MessageBus.publish(ICON_MSG, 'icons_changed')
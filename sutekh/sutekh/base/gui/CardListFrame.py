@@ -43,7 +43,7 @@ class CardListFrame(BasicFrame):
     def reload(self):
         """Reload frame contents"""
         # Needs to be exposed to the main window for major database changes
-        self._oController.view.reload_keep_expanded()
+        self._oController.view.reload_in_background()
 
     def get_toolbar_plugins(self):
         """Register plugins on the frame toolbar."""
@@ -88,7 +88,7 @@ class CardListFrame(BasicFrame):
         if oToolbar is not None:
             pack_resizable(oMbox, oToolbar)
 
-        self._oController.view.load()
+        self._oController.view.load_in_background()
 
         self.set_drag_handler(self._oMenu)
         self.set_drop_handler(self._oMenu)
@@ -7,8 +7,10 @@
 """The Gtk.TreeModel for the card lists."""
 
 import logging
+import threading
 
-from gi.repository import Gdk, GObject, Gtk
+from gi.repository import Gdk, GLib, GObject, Gtk
+from sqlobject import sqlhub
 
 from ..core.BaseFilters import (FilterAndBox, NullFilter,
                                 PhysicalCardFilter, CachedFilter,
@@ -32,6 +34,37 @@ EXTRA_LEVEL_LOOKUP = {
 USE_ICONS = "show icons for grouping"
 HIDE_ILLEGAL = "hide cards not legal for tournament play"
 
+# Number of cards added to the model in each step of a background load
+LOAD_CHUNK_SIZE = 200
+
+
+def can_load_in_background():
+    """Check if the database connection can be used from another thread.
+
+       In-memory SQLite databases can only be used from the thread that
+       created them, and we don't want to read around a transaction
+       that is in progress."""
+    oConn = sqlhub.processConnection
+    if hasattr(oConn, 'commit'):
+        return False
+    # pylint: disable=protected-access
+    # SQLObject doesn't expose this publically
+    return not getattr(oConn, '_memory', False)
+
+
+def load_state_property(sName):
+    """Make a property for model state that is rebuilt by each load.
+
+       While _get_load_data runs, the property refers to the load's own
+       copy of the state (see CardListModel.set_load_state), so a load in
+       a background thread doesn't change the state the main loop is using.
+       _fill_model then installs the new state from the main loop."""
+    # pylint: disable=protected-access
+    # the property needs access to the model's state
+    return property(
+        fget=lambda self: self._get_load_state()[sName],
+        fset=lambda self, x: self._get_load_state().__setitem__(sName, x))
+
 
 class CardListModel(Gtk.TreeStore):
     # pylint: disable=too-many-instance-attributes, too-many-public-methods
@@ -78,6 +111,27 @@ class CardListModel(Gtk.TreeStore):
         self._bHideIllegal = True
         self._oController = None
         self._oFilterParser = FilterParser()
+        # Background load state. The generation is increased by each
+        # load, so outdated background loads can tell they're cancelled
+        self._iLoadGeneration = 0
+        # Only one background thread gathers data at a time, so a burst of
+        # reloads only gathers the data for the latest one. Loads on the
+        # main thread don't wait for this, since each load gathers its
+        # state separately (see load_state_property).
+        self._oLoadLock = threading.Lock()
+        self._oActiveFill = None
+        self._tLoadCallbacks = (None, None)
+        # State rebuilt by loads (see load_state_property), and the copy
+        # of it used by the load being gathered on the current thread
+        self._dModelState = {}
+        self._oLoadState = threading.local()
+        # The rows added by the last load, so the next load can update
+        # the store in place. _tLoadKey is None if the store needs to be
+        # rebuilt instead.
+        self._tLoadKey = None
+        self._dGroupIters = {}
+        # group -> {abstract card id: (card iter, {physical card id: iter})}
+        self._dCardIters = {}
         MessageBus.subscribe(CONFIG_MSG, 'replace_filter', self.replace_filter)
         MessageBus.subscribe(CONFIG_MSG, 'profile_option_changed',
                              self.profile_option_changed)
@@ -123,6 +177,7 @@ class CardListModel(Gtk.TreeStore):
 
     def cleanup(self):
         """Remove the config file listener if needed"""
+        self._cancel_background_load()
         self._oController = None
         MessageBus.unsubscribe(CONFIG_MSG, 'replace_filter',
                                self.replace_filter)
@@ -237,80 +292,335 @@ class CardListModel(Gtk.TreeStore):
             self.set_sort_column_id(iSortColumn, iSortOrder)
 
     def load(self):
-        # pylint: disable=too-many-locals
-        # we use many local variables for clarity
-        """Clear and reload the underlying store. For use after initialisation
-           or when the filter or grouping changes."""
-        self.clear()
+        """Reload the underlying store. For use after initialisation
+           or when the filter or grouping changes.
+
+           If possible, the store is updated in place (see
+           can_update_in_place), otherwise it is cleared and refilled."""
+        self._cancel_background_load()
+        tData = self._get_load_data()
+        for _oStep in self._fill_model(tData):
+            pass
+
+    def is_loading(self):
+        """Return True if a background load is in progress"""
+        return self._tLoadCallbacks != (None, None)
+
+    def load_in_background(self, fBeforeFill=None, fAfterFill=None):
+        """Reload the store without blocking the main loop.
+
+           The data is gathered in a separate thread, and the store is
+           then filled in steps of LOAD_CHUNK_SIZE cards from the main loop.
+           fBeforeFill is called before the store is cleared, and
+           fAfterFill once it has been filled. A later load cancels any
+           background load still in progress, in which case neither
+           callback is called for the cancelled load.
+
+           If the database can't be used from another thread, this loads
+           the store directly."""
+        self._cancel_background_load()
+        if not can_load_in_background():
+            if fBeforeFill:
+                fBeforeFill()
+            self.load()
+            if fAfterFill:
+                fAfterFill()
+            return
+        self._tLoadCallbacks = (fBeforeFill, fAfterFill)
+        oThread = threading.Thread(target=self._gather_load_data,
+                                   args=(self._iLoadGeneration,))
+        oThread.daemon = True
+        oThread.start()
+
+    def restart_background_load(self):
+        """Restart the background load in progress, so it picks up
+           changes to the database since it was started."""
+        self.load_in_background(*self._tLoadCallbacks)
+
+    def _cancel_background_load(self):
+        """Cancel any background load in progress"""
+        self._iLoadGeneration += 1
+        self._tLoadCallbacks = (None, None)
+        if self._oActiveFill:
+            # Ensure the sort order is restored
+            self._oActiveFill.close()
+            self._oActiveFill = None
+
+    def _gather_load_data(self, iGeneration):
+        """Gather the data for the store in a background thread, and hand
+           it to the main loop."""
+        tData = None
+        with self._oLoadLock:
+            if iGeneration != self._iLoadGeneration:
+                # Already cancelled, so skip the work
+                return
+            try:
+                tData = self._get_load_data()
+            except Exception:  # pylint: disable=broad-except
+                # Database changes from the main thread can upset the
+                # queries, so we log this and load in the main loop instead
+                logging.warning('Background load failed', exc_info=True)
+        GLib.idle_add(self._start_fill, iGeneration, tData)
+
+    def _start_fill(self, iGeneration, tData):
+        """Start filling the store from the gathered data"""
+        if iGeneration != self._iLoadGeneration:
+            return False
+        fBeforeFill, fAfterFill = self._tLoadCallbacks
+        if fBeforeFill:
+            fBeforeFill()
+        if tData is None:
+            self.load()
+            if fAfterFill:
+                fAfterFill()
+            return False
+        self._oActiveFill = self._fill_model(tData)
+        GLib.idle_add(self._fill_step, iGeneration)
+        return False
+
+    def _fill_step(self, iGeneration):
+        """Add the next chunk of cards to the store"""
+        if iGeneration != self._iLoadGeneration:
+            return False
+        bReload = False
+        try:
+            next(self._oActiveFill)
+            return True
+        except StopIteration:
+            self._oActiveFill = None
+        except Exception:  # pylint: disable=broad-except
+            # We can't leave the load unfinished, since the view is
+            # detached until fAfterFill is called, so we log this and
+            # reload the store directly instead
+            logging.warning('Filling the store failed', exc_info=True)
+            self._oActiveFill = None
+            bReload = True
+        _fBeforeFill, fAfterFill = self._tLoadCallbacks
+        self._tLoadCallbacks = (None, None)
+        try:
+            if bReload:
+                self.load()
+        finally:
+            if fAfterFill:
+                fAfterFill()
+        return False
 
+    def _get_load_state(self):
+        """The state used by load_state_property attributes"""
+        dState = getattr(self._oLoadState, 'dState', None)
+        if dState is None:
+            return self._dModelState
+        return dState
+
+    def set_load_state(self, dState):
+        """Use dState for the load_state_property attributes on this thread
+           until this is called again with None."""
+        self._oLoadState.dState = dState
+
+    def _get_load_data(self):
+        """Gather the information needed to fill the store.
+
+           This may run in a background thread, so it only reads from the
+           database and doesn't change the model. Any model state it
+           builds must be returned in the data and set by _fill_model.
+           Returns a list of (group, cards) pairs, and the list of cards
+           for the load listeners."""
         oCardIter = self.get_card_iterator(self.get_current_filter())
         fGetCard, _fGetCount, fGetExpanInfo, oGroupedIter, aCards = \
             self.grouped_card_iter(oCardIter)
+        aGroups = []
+        for sGroup, oGroupIter in oGroupedIter:
+            aRows = []
+            for oItem in oGroupIter:
+                oCard = fGetCard(oItem)
+                aRows.append((oCard, IPhysicalCard((oCard, None)),
+                              self.get_expansion_info(oCard,
+                                                      fGetExpanInfo(oItem))))
+            aGroups.append((self._fix_group_name(sGroup), aRows))
+        return aGroups, aCards
+
+    def _get_load_key(self):
+        """The settings the rows in the store depend on, other than the
+           cards shown."""
+        return (self.groupby, self.bUseIcons, self.oIconManager)
+
+    def can_update_in_place(self):
+        """Return True if the next load will update the rows in the store
+           in place, rather than clearing and refilling it.
+
+           Rows that don't change keep their expanded and selected state in
+           the view, so it doesn't need to save and restore this."""
+        return self._tLoadKey is not None and \
+            self._tLoadKey == self._get_load_key()
+
+    def reset_load_state(self):
+        """Ensure the next load rebuilds the store.
+
+           Needed when the cards in the store are no longer valid, such as
+           after the database is replaced."""
+        self._tLoadKey = None
+
+    def _add_group_row(self, sGroup):
+        """Add a group entry to the store"""
+        oSectionIter = self.append(None)
+        aTexts, aIcons = self.lookup_icons(sGroup)
+        if aTexts:
+            self.set(oSectionIter, 0, sGroup,
+                     5, aTexts, 6, aIcons,
+                    )
+        else:
+            self.set(oSectionIter, 0, sGroup)
+        self._dGroupIters[sGroup] = oSectionIter
+        self._dCardIters[sGroup] = {}
+        return oSectionIter
+
+    def _add_expansion_row(self, oChildIter, oPhysCard, sExpansion):
+        """Add an expansion entry below the card entry"""
+        oExpansionIter = self.append(oChildIter)
+        self.set(oExpansionIter,
+                 0, sExpansion,
+                 9, oPhysCard,
+                )
+        return oExpansionIter
+
+    def _add_card_row(self, sGroup, tRow, bPostfix):
+        """Add a card entry, and its expansions, to the group"""
+        oCard, oNoPrintCard, aExpansionInfo = tRow
+        oChildIter = self.prepend(self._dGroupIters[sGroup])
+        # We need to lookup the card directly, since
+        # aExpansionInfo may not have the info we need
+        # Names will be set by _set_display_name
+        sName = oCard.name
+        if bPostfix:
+            sName = move_articles_to_back(sName)
+        self.set(oChildIter,
+                 0, sName,
+                 8, oCard,
+                 9, oNoPrintCard,
+                )
+        dExpIters = {}
+        for oPhysCard, sExpansion in aExpansionInfo:
+            dExpIters[oPhysCard.id] = self._add_expansion_row(
+                oChildIter, oPhysCard, sExpansion)
+        self._dCardIters[sGroup][oCard.id] = (oChildIter, dExpIters)
+
+    def _update_card_row(self, sGroup, tRow):
+        """Update the expansions for a card entry already in the store"""
+        oCard, _oNoPrintCard, aExpansionInfo = tRow
+        oChildIter, dExpIters = self._dCardIters[sGroup][oCard.id]
+        dNew = dict((x.id, (x, y)) for x, y in aExpansionInfo)
+        for iId in [x for x in dExpIters if x not in dNew]:
+            self.remove(dExpIters.pop(iId))
+        for iId, (oPhysCard, sExpansion) in dNew.items():
+            if iId not in dExpIters:
+                dExpIters[iId] = self._add_expansion_row(
+                    oChildIter, oPhysCard, sExpansion)
+
+    def _set_empty_row(self):
+        """Add the entry shown when there are no cards"""
+        if not self.oEmptyIter:
+            self.oEmptyIter = self.append(None)
+        self.set(self.oEmptyIter, 0, self._get_empty_text())
 
-        self.oEmptyIter = None
+    def _update_model(self, tData):
+        """Update the store to match the data from _get_load_data,
+           only touching the rows that have changed.
 
-        # Disable sorting while we do the insertions - speeds things up
+           This is a generator, like _fill_model."""
+        aGroups, aCards = tData
+        bPostfix = self._oConfig.get_postfix_the_display()
+        # Disable sorting while we change the rows, as for _fill_model
         iSortColumn, iSortOrder = self.get_sort_column_id()
         if iSortColumn is not None:
             self.set_sort_column_id(-2, 0)
 
-        # Iterate over groups
-        bEmpty = True
-        bPostfix = self._oConfig.get_postfix_the_display()
-        for sGroup, oGroupIter in oGroupedIter:
-            # Check for null group
-            sGroup = self._fix_group_name(sGroup)
-
-            # Create Group Section
-            oSectionIter = self.append(None)
-
-            # Fill in Cards
-            for oItem in oGroupIter:
-                oCard = fGetCard(oItem)
-                oChildIter = self.prepend(oSectionIter)
-                # We need to lookup the card directly, since aExpansionInfo
-                # may not have the info we need
-                # Names will be set by _set_display_name
-                sName = oCard.name
-                if bPostfix:
-                    sName = move_articles_to_back(sName)
-                self.set(oChildIter,
-                         0, sName,
-                         8, oCard,
-                         9, IPhysicalCard((oCard, None)),
-                        )
-                aExpansionInfo = self.get_expansion_info(oCard,
-                                                         fGetExpanInfo(oItem))
-                for oPhysCard, sExpansion in aExpansionInfo:
-                    oExpansionIter = self.append(oChildIter)
-                    self.set(oExpansionIter,
-                             0, sExpansion,
-                             9, oPhysCard,
-                            )
-                bEmpty = False
-
-            # Update Group Section
-            aTexts, aIcons = self.lookup_icons(sGroup)
-            if aTexts:
-                self.set(oSectionIter, 0, sGroup,
-                         5, aTexts, 6, aIcons,
-                        )
-            else:
-                self.set(oSectionIter, 0, sGroup)
-
-        if bEmpty:
-            # Showing nothing
-            self.oEmptyIter = self.append(None)
-            sText = self._get_empty_text()
-            self.set(self.oEmptyIter, 0, sText)
+        try:
+            aNewGroups = set(sGroup for sGroup, _aRows in aGroups)
+            for sGroup in [x for x in self._dGroupIters
+                           if x not in aNewGroups]:
+                self.remove(self._dGroupIters.pop(sGroup))
+                del self._dCardIters[sGroup]
+            if aGroups and self.oEmptyIter:
+                self.remove(self.oEmptyIter)
+                self.oEmptyIter = None
+            iCards = 0
+            for sGroup, aRows in aGroups:
+                if sGroup not in self._dGroupIters:
+                    self._add_group_row(sGroup)
+                dCards = self._dCardIters[sGroup]
+                aNewCards = set(tRow[0].id for tRow in aRows)
+                for iId in [x for x in dCards if x not in aNewCards]:
+                    self.remove(dCards.pop(iId)[0])
+                for tRow in aRows:
+                    if tRow[0].id in dCards:
+                        self._update_card_row(sGroup, tRow)
+                    else:
+                        self._add_card_row(sGroup, tRow, bPostfix)
+                    iCards += 1
+                    if iCards % LOAD_CHUNK_SIZE == 0:
+                        yield
+            if not aGroups:
+                self._set_empty_row()
+            # Notify Listeners
+            MessageBus.publish(self, 'load', aCards)
+        finally:
+            if iSortColumn is not None:
+                self.set_sort_column_id(iSortColumn, iSortOrder)
+
+    def _fill_model(self, tData):
+        """Fill the store with the data from _get_load_data.
+
+           The store is updated in place if possible, otherwise it's
+           cleared and refilled. This is a generator, which pauses after
+           every LOAD_CHUNK_SIZE cards."""
+        if self.can_update_in_place():
+            for _oStep in self._update_model(tData):
+                yield
+            return
+        aGroups, aCards = tData
+        self.clear()
+        self._tLoadKey = None
+        self._dGroupIters = {}
+        self._dCardIters = {}
 
-        # Notify Listeners
-        MessageBus.publish(self, 'load', aCards)
+        self.oEmptyIter = None
 
-        # We only re-enable sorting after filling listeners, so sorting on
-        # listeners which cache information works properly
+        # Disable sorting while we do the insertions - speeds things up
+        iSortColumn, iSortOrder = self.get_sort_column_id()
         if iSortColumn is not None:
-            self.set_sort_column_id(iSortColumn, iSortOrder)
+            self.set_sort_column_id(-2, 0)
+
+        try:
+            # Iterate over groups
+            bEmpty = True
+            iCards = 0
+            bPostfix = self._oConfig.get_postfix_the_display()
+            for sGroup, aRows in aGroups:
+                # Create Group Section
+                self._add_group_row(sGroup)
+
+                # Fill in Cards
+                for tRow in aRows:
+                    self._add_card_row(sGroup, tRow, bPostfix)
+                    bEmpty = False
+                    iCards += 1
+                    if iCards % LOAD_CHUNK_SIZE == 0:
+                        yield
+
+            if bEmpty:
+                # Showing nothing
+                self._set_empty_row()
+
+            # The next load can update these rows
+            self._tLoadKey = self._get_load_key()
+
+            # Notify Listeners
+            MessageBus.publish(self, 'load', aCards)
+        finally:
+            # We only re-enable sorting after filling listeners, so sorting
+            # on listeners which cache information works properly
+            if iSortColumn is not None:
+                self.set_sort_column_id(iSortColumn, iSortOrder)
 
     def get_card_iterator(self, oFilter):
         """Return an interator over the card model.
@@ -278,7 +278,8 @@ class CardListView(FilteredView):
         """Create the filter dialog for this view."""
         self._oFilterDialog = FilterDialog(self._oMainWin, self._oConfig,
                                            self._oController.filtertype,
-                                           sDefaultFilter)
+                                           sDefaultFilter,
+                                           self._oModel.get_card_iterator)
         return True
 
     def make_drag_icon(self, _oWidget, oDragContext):
@@ -15,7 +15,8 @@ from ..core.DBSignals import send_changed_signal
 from ..core.BaseTables import (PhysicalCardSet, PhysicalCard,
                                MapPhysicalCardToPhysicalCardSet)
 from ..core.BaseAdapters import IPhysicalCardSet
-from ..core.CardSetUtilities import delete_physical_card_set
+from ..core.CardSetUtilities import (delete_physical_card_set,
+                                     change_card_counts)
 
 
 class CardSetController:
@@ -135,6 +136,42 @@ class CardSetController:
             self._add_undo_operation(dOperation)
         return oPhysCard
 
+    def change_cards(self, dChanges, bAddUndo=True):
+        """Apply a group of card changes in a single transaction.
+
+           dChanges is a dictionary of card set name -> list of
+           (physical card, change) pairs, with None as the name for this
+           card set. A single batch changed signal is sent for all the
+           changes.
+           Returns the changes actually made, in the same format."""
+        dSets = {}
+        try:
+            for sCardSetName, aCards in dChanges.items():
+                if sCardSetName:
+                    oCS = IPhysicalCardSet(sCardSetName)
+                else:
+                    oCS = self.__oPhysCardSet
+                    sCardSetName = self.view.sSetName
+                # None and our name refer to the same card set, so
+                # combine the changes rather than losing some of them
+                _sName, aSetCards = dSets.setdefault(oCS,
+                                                     (sCardSetName, []))
+                aSetCards.extend(aCards)
+        except SQLObjectNotFound:
+            # Bail on error
+            return {}
+        dApplied = change_card_counts(dict((x, y[1]) for x, y in
+                                           dSets.items()))
+        dResult = {}
+        for oCS, dCards in dApplied.items():
+            dResult[dSets[oCS][0]] = list(dCards.items())
+        if bAddUndo and dResult:
+            dOperation = {}
+            for sCardSetName, aCards in dResult.items():
+                dOperation[sCardSetName] = [(x, -y) for x, y in aCards]
+            self._add_undo_operation(dOperation)
+        return dResult
+
     def edit_properties(self, _oMenuWidget):
         """Run the dialog to update the card set properties"""
         update_card_set(self.__oPhysCardSet, self._oMainWindow)
@@ -203,47 +240,33 @@ class CardSetController:
            Only works when we're editable.
            """
         aSources = sSource.split(':')
-        aUndoCards = []
         if not self.model.bEditable:
             return False
         if aSources[0] in ("Phys", PhysicalCardSet.sqlmeta.table):
             # Add the cards, Count Matters
+            aChanges = []
             for iCount, oPhysCard in aCards:
                 if aSources[0] == "Phys":
                     # Only ever add 1 when dragging from physical card list
-                    self.add_card(oPhysCard, None, False)
-                    aUndoCards.append((oPhysCard, -1))
+                    aChanges.append((oPhysCard, 1))
                 else:
-                    for _iLoop in range(iCount):
-                        self.add_card(oPhysCard, None, False)
-                        aUndoCards.append((oPhysCard, -1))
-            dOperation = {self.view.sSetName: aUndoCards}
-            self._add_undo_operation(dOperation)
+                    aChanges.append((oPhysCard, iCount))
+            self.change_cards({None: aChanges})
             return True
         return False
 
     def change_selected_card_count(self, dSelectedData):
         """Helper function to set the selected cards to the specified number"""
-        dOperation = {}
+        dChanges = {}
         for oPhysCard in dSelectedData:
             for sCardSetName, (iCardCount, iNewCnt) in \
                     dSelectedData[oPhysCard].items():
-                aCards = []
-                if iNewCnt < iCardCount:
-                    # remove cards
-                    for _iAttempt in range(iCardCount - iNewCnt):
-                        # None as card set indicates this card set
-                        oCard = self.dec_card(oPhysCard, sCardSetName, False)
-                        if oCard:
-                            aCards.append((oCard, 1))
-                elif iNewCnt > iCardCount:
-                    # add cards
-                    for _iAttempt in range(iNewCnt - iCardCount):
-                        oCard = self.inc_card(oPhysCard, sCardSetName, False)
-                        aCards.append((oCard, -1))
-                dOperation.setdefault(sCardSetName, [])
-                dOperation[sCardSetName].extend(aCards)
-        self._add_undo_operation(dOperation)
+                if iNewCnt != iCardCount:
+                    # None as card set indicates this card set
+                    dChanges.setdefault(sCardSetName, [])
+                    dChanges[sCardSetName].append((oPhysCard,
+                                                   iNewCnt - iCardCount))
+        self.change_cards(dChanges)
 
     def _add_undo_operation(self, dOperation):
         """Handle adding an item to the undo list."""
@@ -259,12 +282,7 @@ class CardSetController:
         if not self._aUndoList:
             return
         dOperation = self._aUndoList.pop()
-        for sCardSetName, aCards in dOperation.items():
-            for oPhysCard, iCnt in aCards:
-                if iCnt < 0:
-                    self.dec_card(oPhysCard, sCardSetName, False)
-                else:
-                    self.add_card(oPhysCard, sCardSetName, False)
+        self.change_cards(dOperation, False)
         self._aRedoList.append(dOperation)
         self._fix_undo_status()
 
@@ -273,12 +291,9 @@ class CardSetController:
         if not self._aRedoList:
             return
         dOperation = self._aRedoList.pop()
-        for sCardSetName, aCards in dOperation.items():
-            for oPhysCard, iCnt in aCards:
-                # Logic is reversed from Undo list
-                if iCnt > 0:
-                    self.dec_card(oPhysCard, sCardSetName, False)
-                else:
-                    self.add_card(oPhysCard, sCardSetName, False)
+        # Logic is reversed from Undo list
+        self.change_cards(dict((sCardSetName, [(x, -y) for x, y in aCards])
+                               for sCardSetName, aCards in dOperation.items()),
+                          False)
         self._aUndoList.append(dOperation)
         self._fix_undo_status()
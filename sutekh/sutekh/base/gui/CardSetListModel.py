@@ -11,6 +11,8 @@
 
 from gi.repository import Gdk, Gtk
 
+from sqlobject.sqlbuilder import IN
+
 from ..core.BaseFilters import (FilterAndBox, NullFilter,
                                 PhysicalCardFilter,
                                 PhysicalCardSetFilter,
@@ -26,13 +28,16 @@ from ..core.BaseTables import (PhysicalCard, PhysicalCardSet,
                                MapPhysicalCardToPhysicalCardSet)
 from ..core.BaseAdapters import (IPhysicalCard, IPhysicalCardSet,
                                  IAbstractCard, IPrintingName)
+from ..core.SharedCardLists import SHARED_CARD_LISTS
 from ..core.DBSignals import (listen_changed, disconnect_changed,
+                              listen_batch_changed, disconnect_batch_changed,
                               listen_row_destroy, listen_row_update,
                               listen_row_created,
                               disconnect_row_destroy, disconnect_row_created,
                               disconnect_row_update)
 from ..Utility import move_articles_to_back
-from .CardListModel import CardListModel, USE_ICONS, HIDE_ILLEGAL
+from .CardListModel import (CardListModel, USE_ICONS, HIDE_ILLEGAL,
+                            LOAD_CHUNK_SIZE, load_state_property)
 from .BaseConfigFile import CARDSET, FRAME
 from .MessageBus import MessageBus
 
@@ -85,6 +90,10 @@ CARD_SETS_LEVEL = set([SHOW_CARD_SETS, CARD_SETS_AND_EXP, EXP_AND_CARD_SETS])
 BOTH_EXP_CARD_SETS = set([CARD_SETS_AND_EXP, EXP_AND_CARD_SETS])
 PARENT_OR_MINUS = set([PARENT_COUNT, MINUS_THIS_SET])
 
+# Batches of card changes that affect more cards than this are handled by
+# queueing a full reload, rather than updating the model card by card
+BATCH_RELOAD_LIMIT = 200
+
 
 class CardSetModelRow:
     """Object which holds the data needed for a card set row."""
@@ -170,6 +179,12 @@ class CardSetCardListModel(CardListModel):
        entries. Updates the model to correspond to database changes in
        response to calls from CardSetController.
        """
+
+    # State built by the loads, which may run in a background thread
+    _dCache = load_state_property('_dCache')
+    _bPhysicalFilter = load_state_property('_bPhysicalFilter')
+    _dAbs2Phys = load_state_property('_dAbs2Phys')
+
     def __init__(self, sSetName, oConfig):
         super(CardSetCardListModel, self).__init__(oConfig)
         self._cCardClass = MapPhysicalCardToPhysicalCardSet
@@ -179,11 +194,20 @@ class CardSetCardListModel(CardListModel):
         self.bChildren = False
         self.bEditable = False
         self._bPhysicalFilter = False
+        # Cards to add once the current batch of changes has been applied
+        # (abstract card id -> physical card), or None outside a batch.
+        # The database already has the whole batch, so adding cards part
+        # way through would count the later changes twice.
+        self._dBatchNewCards = None
         self._dAbs2Iter = {}
         self._dAbs2Phys = {}
         self._dAbsSecondLevel2Iter = {}
         self._dAbs2nd3rdLevel2Iter = {}
         self._dGroupName2Iter = {}
+        # Rows whose children haven't been added yet (abstract card id ->
+        # CardSetModelRow), when lazy children are enabled
+        self._bLazyChildren = False
+        self._dPendingChildren = {}
         self.oEditColour = None
         self._oCountColour = BLACK
 
@@ -193,6 +217,7 @@ class CardSetCardListModel(CardListModel):
 
         # Add database listeners
         listen_changed(self.card_changed, PhysicalCardSet)
+        listen_batch_changed(self.cards_changed, PhysicalCardSet)
         listen_row_update(self.card_set_changed, PhysicalCardSet)
         listen_row_destroy(self.card_set_deleted_created, PhysicalCardSet)
         listen_row_created(self.card_set_deleted_created, PhysicalCardSet)
@@ -231,6 +256,7 @@ class CardSetCardListModel(CardListModel):
         """Remove the signal handler - avoids issues when card sets are
            deleted, but the objects are still around."""
         disconnect_changed(self.card_changed, PhysicalCardSet)
+        disconnect_batch_changed(self.cards_changed, PhysicalCardSet)
         disconnect_row_update(self.card_set_changed, PhysicalCardSet)
         disconnect_row_destroy(self.card_set_deleted_created, PhysicalCardSet)
         disconnect_row_created(self.card_set_deleted_created, PhysicalCardSet)
@@ -265,35 +291,64 @@ class CardSetCardListModel(CardListModel):
             self.oEmptyIter = self.append(None, (sText, 0, 0, False, False, [],
                                                  [], BLACK, None, None))
 
-    def load(self):
+    def _get_load_data(self):
+        """Gather the information needed to fill the store.
+
+           Returns a list of (group, rows) pairs, the list of cards
+           for the load listeners and the new cache, physical filter flag
+           and _dAbs2Phys mapping for _fill_model to set."""
+        # The load works on its own copy of this state, since this may be
+        # in a background thread. The cache entries that are kept between
+        # loads are carried over.
+        dState = {
+            '_dCache': dict(self._dCache),
+            '_bPhysicalFilter': False,
+            '_dAbs2Phys': {},
+        }
+        self.set_load_state(dState)
+        try:
+            # Clear cache (we can't do this in grouped_card_iter, since that
+            # is also called by add_new_card)
+            self._init_cache(True)
+
+            if self.applyfilter and self.selectfilter:
+                self._bPhysicalFilter = \
+                    self.selectfilter.is_physical_card_only()
+            elif self.configfilter is not None:
+                self._bPhysicalFilter = \
+                    self.configfilter.is_physical_card_only()
+
+            oCardIter = self.get_card_iterator(self.get_current_filter())
+            # pylint: disable=unbalanced-tuple-unpacking
+            # pylint misinterprets the number of iterms grouped_card_iter
+            # returns
+            oGroupedIter, aCards = self.grouped_card_iter(oCardIter)
+            # pylint: enable=unbalanced-tuple-unpacking
+            aGroups = [(self._fix_group_name(sGroup),
+                        [oRow for _oId, oRow in oGroupIter])
+                       for sGroup, oGroupIter in oGroupedIter]
+        finally:
+            self.set_load_state(None)
+        return aGroups, aCards, dState
+
+    def _fill_model(self, tData):
         # pylint: disable=too-many-locals
         # we use many local variables for clarity
-        """Clear and reload the underlying store. For use after initialisation,
-           when the filter or grouping changes or when card set relationships
-           change.
-           """
+        """Clear the store and fill it with the data from _get_load_data.
+
+           This is a generator, which pauses after every LOAD_CHUNK_SIZE
+           cards."""
+        aGroups, aCards, dState = tData
         self.set_count_colour()
         self.clear()
-        self._dAbs2Phys = {}
+        self._dCache = dState['_dCache']
+        self._bPhysicalFilter = dState['_bPhysicalFilter']
+        self._dAbs2Phys = dState['_dAbs2Phys']
         self._dAbs2Iter = {}
         self._dAbsSecondLevel2Iter = {}
         self._dAbs2nd3rdLevel2Iter = {}
         self._dGroupName2Iter = {}
-        # Clear cache (we can't do this in grouped_card_iter, since that
-        # is also called by add_new_card)
-        self._init_cache(True)
-
-        self._bPhysicalFilter = False
-        if self.applyfilter and self.selectfilter:
-            self._bPhysicalFilter = self.selectfilter.is_physical_card_only()
-        elif self.configfilter is not None:
-            self._bPhysicalFilter = self.configfilter.is_physical_card_only()
-
-        oCardIter = self.get_card_iterator(self.get_current_filter())
-        # pylint: disable=unbalanced-tuple-unpacking
-        # pylint misinterprets the number of iterms grouped_card_iter returns
-        oGroupedIter, aCards = self.grouped_card_iter(oCardIter)
-        # pylint: enable=unbalanced-tuple-unpacking
+        self._dPendingChildren = {}
         self.oEmptyIter = None
 
         # Disable sorting while we do the insertions
@@ -305,59 +360,61 @@ class CardSetCardListModel(CardListModel):
             # Gtk+ docs says this disables sorting
             self.set_sort_column_id(-2, 0)
 
-        # Iterate over groups
-
-        bPostfix = self._oConfig.get_postfix_the_display()
-
-        for sGroup, oGroupIter in oGroupedIter:
-            # Check for null group
-            sGroup = self._fix_group_name(sGroup)
-
-            # Create Group Section
-            oSectionIter = self.insert_with_values(None, 0, [0], [sGroup])
-            self._dGroupName2Iter[sGroup] = oSectionIter
+        try:
+            # Iterate over groups
+            bPostfix = self._oConfig.get_postfix_the_display()
+            iCards = 0
 
-            # Fill in Cards
-            iGrpCnt = 0
-            iParGrpCnt = 0
-            for _oId, oRow in oGroupIter:
-                oCard = oRow.oAbsCard
-                iCnt = oRow.iCount
-                iParCnt = oRow.iParentCount
-                iGrpCnt += iCnt
-                iParGrpCnt += iParCnt
-                bIncCard, bDecCard = self.check_inc_dec(iCnt)
-                # Direct lookup, for same reason as in CardListModel
-                # We skip name here, as that gets reset in _set_display_name
-                sName = oCard.name
-                if bPostfix:
-                    sName = move_articles_to_back(sName)
-                oChildIter = self.insert_with_values(oSectionIter, 0, [0, 1, 2, 3, 4, 8, 9],
-                                                     [sName, iCnt, iParCnt, bIncCard, bDecCard,
-                                                      oCard, oRow.oPhysCard])
-                self.set_par_count_colour(oChildIter, iParCnt, iCnt)
-                self._dAbs2Iter.setdefault(oCard.id, []).append(oChildIter)
-                self._add_children(oChildIter, oRow)
-            # Update Group Section
-            aTexts, aIcons = self.lookup_icons(sGroup)
-            if aTexts:
-                self.set(oSectionIter, 1, iGrpCnt, 2, iParGrpCnt,
-                         5, aTexts, 6, aIcons,
-                        )
-            else:
-                self.set(oSectionIter, 1, iGrpCnt, 2, iParGrpCnt)
+            for sGroup, aRows in aGroups:
+                # Create Group Section
+                oSectionIter = self.insert_with_values(None, 0, [0], [sGroup])
+                self._dGroupName2Iter[sGroup] = oSectionIter
 
-            self.set_par_count_colour(oSectionIter, iParGrpCnt, iGrpCnt)
+                # Fill in Cards
+                iGrpCnt = 0
+                iParGrpCnt = 0
+                for oRow in aRows:
+                    oCard = oRow.oAbsCard
+                    iCnt = oRow.iCount
+                    iParCnt = oRow.iParentCount
+                    iGrpCnt += iCnt
+                    iParGrpCnt += iParCnt
+                    bIncCard, bDecCard = self.check_inc_dec(iCnt)
+                    # Direct lookup, for same reason as in CardListModel
+                    # We skip name here, as that gets reset in
+                    # _set_display_name
+                    sName = oCard.name
+                    if bPostfix:
+                        sName = move_articles_to_back(sName)
+                    oChildIter = self.insert_with_values(oSectionIter, 0, [0, 1, 2, 3, 4, 8, 9],
+                                                         [sName, iCnt, iParCnt, bIncCard, bDecCard,
+                                                          oCard, oRow.oPhysCard])
+                    self.set_par_count_colour(oChildIter, iParCnt, iCnt)
+                    self._dAbs2Iter.setdefault(oCard.id, []).append(oChildIter)
+                    self._add_card_children(oChildIter, oRow)
+                    iCards += 1
+                    if iCards % LOAD_CHUNK_SIZE == 0:
+                        yield
+                # Update Group Section
+                aTexts, aIcons = self.lookup_icons(sGroup)
+                if aTexts:
+                    self.set(oSectionIter, 1, iGrpCnt, 2, iParGrpCnt,
+                             5, aTexts, 6, aIcons,
+                            )
+                else:
+                    self.set(oSectionIter, 1, iGrpCnt, 2, iParGrpCnt)
 
-        self._check_if_empty()
+                self.set_par_count_colour(oSectionIter, iParGrpCnt, iGrpCnt)
 
-        # Notify Listeners
-        MessageBus.publish(self, 'load', aCards)
+            self._check_if_empty()
 
-        # Restore sorting
-        # See comments in CardListModel
-        if iSortColumn is not None:
-            self.set_sort_column_id(iSortColumn, iSortOrder)
+            # Notify Listeners
+            MessageBus.publish(self, 'load', aCards)
+        finally:
+            # Restore sorting
+            # See comments in CardListModel
+            if iSortColumn is not None:
+                self.set_sort_column_id(iSortColumn, iSortOrder)
 
     def _try_queue_reload(self):
         """Attempt to setup a call to queue_reload, otherwise just reload"""
@@ -366,6 +423,69 @@ class CardSetCardListModel(CardListModel):
         else:
             self.load()
 
+    def enable_lazy_children(self):
+        """Only add the expansion and child card set rows for a card when
+           the card is first expanded.
+
+           The view enables this. The counts shown for the card rows are
+           the same either way."""
+        self._bLazyChildren = True
+
+    def _row_has_children(self, oRow):
+        """Return True if the card row will have any children"""
+        if self._iExtraLevelsMode in EXPANSIONS_2ND_LEVEL:
+            return bool(oRow.dExpansions)
+        if self._iExtraLevelsMode in CARD_SETS_2ND_LEVEL:
+            return bool(oRow.dChildCardSets)
+        return False
+
+    def _add_card_children(self, oChildIter, oRow):
+        """Add the children for a card, or defer adding them until the
+           card is expanded if lazy children are enabled."""
+        if not self._bLazyChildren:
+            self._add_children(oChildIter, oRow)
+        elif self._row_has_children(oRow):
+            # Add an empty row, so the view shows the card as expandable
+            self.insert_with_values(oChildIter, 0, [0], [''])
+            self._dPendingChildren[oRow.oAbsCard.id] = oRow
+
+    def _populate_card(self, oAbsId):
+        """Add any deferred children for the card.
+
+           This must be done before the card's children are examined or
+           changed."""
+        oRow = self._dPendingChildren.pop(oAbsId, None)
+        if oRow is None:
+            return
+        for oIter in self._dAbs2Iter.get(oAbsId, []):
+            oPlaceholder = self.iter_children(oIter)
+            if oPlaceholder:
+                self.remove(oPlaceholder)
+            self._add_children(oIter, oRow)
+
+    def populate_children(self, oIter):
+        """Ensure the children of the card at oIter have been added.
+
+           Called by the view before a row is expanded."""
+        if self._dPendingChildren and self.iter_depth(oIter) == 1:
+            self._populate_card(self.get_abstract_card_from_iter(oIter).id)
+
+    def get_all_iter_children(self, oIter):
+        """Get a list of all the subiters of this iter, skipping the
+           placeholder for children that haven't been added."""
+        if self._dPendingChildren and self.iter_depth(oIter) == 1 and \
+                self.get_abstract_card_from_iter(oIter).id in \
+                self._dPendingChildren:
+            return []
+        return super(CardSetCardListModel, self).get_all_iter_children(oIter)
+
+    def get_child_entries_from_iter(self, oIter):
+        """Return a list of (sExpansion, iCount) pairs for the children of
+           this path, adding the children if needed."""
+        self.populate_children(oIter)
+        return super(CardSetCardListModel,
+                     self).get_child_entries_from_iter(oIter)
+
     def _add_children(self, oChildIter, oRow):
         """Add the needed children for a card in the model."""
         dExpansionInfo = oRow.get_expansion_info()
@@ -533,6 +653,7 @@ class CardSetCardListModel(CardListModel):
            """
         oIter = self.get_iter(oPath)
         iDepth = self.iter_depth(oIter)
+        self.populate_children(oIter)
         if iDepth == 0 or iDepth == 3 or (iDepth == 2 and
                                           self._iExtraLevelsMode in
                                           EXPANSIONS_2ND_LEVEL):
@@ -677,9 +798,9 @@ class CardSetCardListModel(CardListModel):
                 self._dCache['full child card list']:
             aChildCards = self._dCache['full child card list']
         elif self._dCache['all children filter']:
-            oFullFilter = FilterAndBox([self._dCache['all children filter'],
-                                        oCurFilter])
-            aChildCards = list(oFullFilter.select(self.cardclass).distinct())
+            aChildCards = SHARED_CARD_LISTS.get_entries(
+                self._dCache['set map'], self._dCache['all children filter'],
+                oCurFilter)
             if not self.is_filtered():
                 self._dCache['full child card list'] = aChildCards
         if self._iExtraLevelsMode in CARD_SETS_LEVEL and \
@@ -729,10 +850,13 @@ class CardSetCardListModel(CardListModel):
                     self._dCache['cardset cards filter'] = CachedFilter(
                         MultiSpecificCardIdFilter(aAbsCardIds))
                     aFilters.append(self._dCache['cardset cards filter'])
-                oParentFilter = FilterAndBox(aFilters)
-                aParentCards = [
-                    IPhysicalCard(x) for x in
-                    oParentFilter.select(self.cardclass).distinct()]
+                    oParentFilter = FilterAndBox(aFilters)
+                    aEntries = oParentFilter.select(self.cardclass).distinct()
+                else:
+                    # Other panes may need the same list
+                    aEntries = SHARED_CARD_LISTS.get_entries(
+                        [self._oCardSet.parentID], *aFilters)
+                aParentCards = [IPhysicalCard(x) for x in aEntries]
                 if not self.is_filtered():
                     self._dCache['full parent card list'] = aParentCards
             for oPhysCard in aParentCards:
@@ -784,7 +908,11 @@ class CardSetCardListModel(CardListModel):
         self._dCache.setdefault('all children filter', None)
         self._dCache.setdefault('set map', None)
         self._dCache.setdefault('sibling filter', None)
+        self._dCache.setdefault('sibling ids', None)
         self._dCache.setdefault('parent filter', None)
+        # Visibility of the cards in the batch being applied. This covers
+        # the calls to add_new_card during the batch, so it isn't reset here
+        self._dCache.setdefault('batch visible', {})
 
         if bClearFilters:
             # These are only reset on full loads. On calls to add new card,
@@ -936,11 +1064,13 @@ class CardSetCardListModel(CardListModel):
         """Get the list of cards in sibling card sets"""
         dSiblingCards = {}
         if self._dCache['sibling filter'] is None:
-            aChildren = [x.name for x in PhysicalCardSet.selectBy(
-                parentID=self._oCardSet.parentID, inuse=True)]
+            aChildren = list(PhysicalCardSet.selectBy(
+                parentID=self._oCardSet.parentID, inuse=True))
             if aChildren:
                 self._dCache['sibling filter'] = \
-                    CachedFilter(MultiPhysicalCardSetMapFilter(aChildren))
+                    CachedFilter(MultiPhysicalCardSetMapFilter(
+                        [x.name for x in aChildren]))
+                self._dCache['sibling ids'] = [x.id for x in aChildren]
             else:
                 # We flag this so we don't repeat the check on
                 # calls to add_new_card
@@ -955,15 +1085,14 @@ class CardSetCardListModel(CardListModel):
                         oCurFilter,
                         self._dCache['cardset cards filter'],
                         ])
+                    aEntries = oSibFilter.select(self.cardclass).distinct()
                 else:
-                    oSibFilter = FilterAndBox([
-                        self._dCache['sibling filter'],
-                        oCurFilter,
-                        ])
+                    # Other panes may need the same list
+                    aEntries = SHARED_CARD_LISTS.get_entries(
+                        self._dCache['sibling ids'],
+                        self._dCache['sibling filter'], oCurFilter)
 
-                aInUseCards = [IPhysicalCard(x)
-                               for x in
-                               oSibFilter.select(self.cardclass).distinct()]
+                aInUseCards = [IPhysicalCard(x) for x in aEntries]
                 if not self.is_filtered():
                     self._dCache['full sibling card list'] = aInUseCards
             for oPhysCard in aInUseCards:
@@ -1106,19 +1235,22 @@ class CardSetCardListModel(CardListModel):
                                                [], BLACK, None, None))
         return oSectionIter
 
-    def add_new_card(self, oPhysCard):
+    def add_new_card(self, oPhysCard, bAllPrintings=False):
         # pylint: disable=too-many-locals
         # we use many local variables for clarity
         """If the card oPhysCard is not in the current list (i.e. is not in
            the card set or is filtered out) see if it should be visible. If it
            should be visible, add it to the appropriate groups.
+
+           If bAllPrintings is True, all the printings of the card in the
+           card set are added, not just oPhysCard.
            """
         self._init_cache(False)
         oFilter = self.get_current_filter()
         if not oFilter:
             oFilter = NullFilter()
         oAbsId = oPhysCard.abstractCardID
-        if self._bPhysicalFilter:
+        if self._bPhysicalFilter or bAllPrintings:
             # Because we rely on this fixing any entries we removed
             # in card_changed, we need to select more cards than in
             # the non-physical case.
@@ -1176,7 +1308,7 @@ class CardSetCardListModel(CardListModel):
                 self.set_par_count_colour(oChildIter, iParCnt, iCnt)
                 self._dAbs2Iter.setdefault(oCard.id, []).append(oChildIter)
                 # Handle as for loading
-                self._add_children(oChildIter, oRow)
+                self._add_card_children(oChildIter, oRow)
 
             # Update Group Section
             self.set(oSectionIter, 1, iGrpCnt, 2, iParGrpCnt)
@@ -1245,10 +1377,12 @@ class CardSetCardListModel(CardListModel):
                 self._dCache[sFullCache] = None
             elif self._dCache[sFullCache]:
                 if iChg > 0:
-                    self._dCache[sFullCache].append(oPhysCard)
-                elif iChg < 0 and oPhysCard in self._dCache[sFullCache]:
+                    self._dCache[sFullCache].extend([oPhysCard] * iChg)
+                for _iNum in range(-iChg):
                     # may be cases (THIS_SET_ONLY), were card is not in cache,
                     # so we do need to check fot that.
+                    if oPhysCard not in self._dCache[sFullCache]:
+                        break
                     self._dCache[sFullCache].remove(oPhysCard)
 
     def _update_child_set_cache(self, oPhysCard, iChg, sName):
@@ -1396,6 +1530,88 @@ class CardSetCardListModel(CardListModel):
         # here, since the fiddling on parents should generate changed
         # signals for us.
 
+    def _batch_affects_model(self, oCardSet):
+        """Check if changes to the given card set can affect the model"""
+        if oCardSet.id == self._oCardSet.id:
+            return True
+        if self._bPhysicalFilter and \
+                self.get_current_filter().involves(oCardSet):
+            return True
+        return (self.changes_with_children() and self.is_child(oCardSet)) \
+            or (self.changes_with_parent() and self.is_parent(oCardSet)) \
+            or (self.changes_with_siblings() and self.is_sibling(oCardSet))
+
+    def _check_batch_visible(self, aPhysCards):
+        """Check the visibility of all the cards in a batch, and all
+           the other printings of those cards, with a single query."""
+        # pylint: disable=no-member
+        # SQLObject confuses pylint
+        dVisible = {}
+        if self._bPhysicalFilter:
+            aAbsIds = list(set(x.abstractCardID for x in aPhysCards))
+            oFullFilter = FilterAndBox([
+                PhysicalCardFilter(), self.get_current_filter(),
+                MultiSpecificCardIdFilter(aAbsIds)])
+            aVisible = set(oFullFilter.select(PhysicalCard))
+            for oPhysCard in PhysicalCard.select(
+                    IN(PhysicalCard.q.abstractCardID, aAbsIds)):
+                dVisible[oPhysCard] = oPhysCard in aVisible
+        self._dCache['batch visible'] = dVisible
+
+    def cards_changed(self, dChanges):
+        """Listen for batches of card changes.
+
+           The changes to all the cards are applied in a single pass with
+           sorting disabled, checking the visibility of all the cards
+           together, rather than handling each change separately.
+           Batches that change many cards queue a full reload instead.
+           """
+        aChanges = []
+        for oCardSet, dCards in dChanges.items():
+            if self._batch_affects_model(oCardSet):
+                aChanges.extend((oCardSet, oPhysCard, iChg) for
+                                oPhysCard, iChg in dCards.items())
+        if not aChanges:
+            return
+        if self.is_loading():
+            # The load may have missed these changes, so start again
+            self.restart_background_load()
+            return
+        if len(set(x[1].abstractCardID for x in aChanges)) > \
+                BATCH_RELOAD_LIMIT:
+            # The card lists we update on each change are now out of date
+            self._dCache['this card list'] = None
+            self._dCache['full parent card list'] = None
+            self._dCache['full child card list'] = None
+            self._dCache['full sibling card list'] = None
+            self._try_queue_reload()
+            return
+        self._check_batch_visible(set(x[1] for x in aChanges))
+        # Disable sorting while we update the model, as in load
+        iSortColumn, iSortOrder = self.get_sort_column_id()
+        if iSortColumn is not None:
+            self.set_sort_column_id(-2, 0)
+        self._dBatchNewCards = {}
+        try:
+            for oCardSet, oPhysCard, iChg in aChanges:
+                self._apply_card_change(oCardSet, oPhysCard, iChg)
+            # The caches are now up to date, so we can add the new cards
+            for oAbsId, oPhysCard in self._dBatchNewCards.items():
+                if oAbsId in self._dAbs2Iter:
+                    continue
+                self.add_new_card(oPhysCard, True)
+                if self._iShowCardMode == THIS_SET_ONLY:
+                    # Will have added invalid info to these caches
+                    self._dCache['full parent card list'] = None
+                    self._dCache['full sibling card list'] = None
+        finally:
+            self._dBatchNewCards = None
+        if iSortColumn is not None:
+            self.set_sort_column_id(iSortColumn, iSortOrder)
+        # expire short-lived caches
+        self._dCache['batch visible'] = {}
+        self._dCache['visible'] = {}
+
     def card_changed(self, oCardSet, oPhysCard, iChg):
         """Listen on card changes.
 
@@ -1404,9 +1620,24 @@ class CardSetCardListModel(CardListModel):
            as we can query the database and obtain accurate results.
            Does rely on everyone calling send_changed_signal.
            """
+        if self.is_loading():
+            if self._batch_affects_model(oCardSet):
+                # The load may have missed this change, so start again
+                self.restart_background_load()
+            return
+        self._apply_card_change(oCardSet, oPhysCard, iChg)
+        # expire short-lived cache
+        self._dCache['visible'] = {}
+
+    def _apply_card_change(self, oCardSet, oPhysCard, iChg):
+        """Update the model for a change of iChg copies of oPhysCard in
+           oCardSet."""
         # pylint: disable=too-many-branches, too-many-statements
         # need to consider several cases, so lots of branches and statements
         oAbsId = oPhysCard.abstractCardID
+        if oAbsId in self._dPendingChildren:
+            # The updates below assume the children are present
+            self._populate_card(oAbsId)
         if self._bPhysicalFilter:
             oCurFilter = self.get_current_filter()
             # Physical filters checks are quite expensive, due to the
@@ -1424,7 +1655,6 @@ class CardSetCardListModel(CardListModel):
             # If we have a card count filter, any change can affect us,
             # so we always consider these cases.
             if not self._needs_update(oAbsId, oPhysCard):
-                self._dCache['visible'] = {}
                 return
             dStates = {}
             if self._oController and oAbsId in self._dAbs2Iter:
@@ -1447,17 +1677,18 @@ class CardSetCardListModel(CardListModel):
             if (iChg > 0 and self._dCache['this card list'] is not None
                     and self.configfilter is None):
                 # this card list can be empty
-                self._dCache['this card list'].append(oPhysCard)
+                self._dCache['this card list'].extend([oPhysCard] * iChg)
             elif (self._dCache['this card list']
                   and self.configfilter is None):
-                self._dCache['this card list'].remove(oPhysCard)
+                for _iNum in range(-iChg):
+                    self._dCache['this card list'].remove(oPhysCard)
             if self._iShowCardMode == THIS_SET_ONLY and iChg > 0:
                 # This cache may no longer be valid in this case
                 self._dCache['full parent card list'] = None
             if oAbsId in self._dAbs2Iter:
                 self.alter_card_count(oPhysCard, iChg)
             elif iChg > 0:
-                self.add_new_card(oPhysCard)  # new card
+                self._add_changed_card(oPhysCard)  # new card
                 if self._iShowCardMode == THIS_SET_ONLY:
                     # Will have added invalid info to these caches
                     self._dCache['full parent card list'] = None
@@ -1465,15 +1696,19 @@ class CardSetCardListModel(CardListModel):
             if self._oCardSet.inuse:
                 self._clean_cache(oPhysCard, 'sibling')
         elif self.changes_with_children() and self.is_child(oCardSet):
-            # Changing a child card set
-            self._update_cache(oPhysCard, iChg, 'child')
-            self._update_child_set_cache(oPhysCard, iChg, oCardSet.name)
-            if oAbsId in self._dAbs2Iter:
-                self.alter_child_count(oPhysCard, oCardSet.name, iChg)
-            elif iChg > 0 and oPhysCard not in self._dCache['child cards']:
-                self.add_new_card(oPhysCard)
-            self._clean_cache(oPhysCard, 'child')
-            self._clean_child_set_cache(oPhysCard, oCardSet.name)
+            # Changing a child card set. The child entries are updated
+            # one card at a time
+            iStep = 1 if iChg > 0 else -1
+            for _iNum in range(abs(iChg)):
+                self._update_cache(oPhysCard, iStep, 'child')
+                self._update_child_set_cache(oPhysCard, iStep, oCardSet.name)
+                if oAbsId in self._dAbs2Iter:
+                    self.alter_child_count(oPhysCard, oCardSet.name, iStep)
+                elif iStep > 0 and \
+                        oPhysCard not in self._dCache['child cards']:
+                    self._add_changed_card(oPhysCard)
+                self._clean_cache(oPhysCard, 'child')
+                self._clean_child_set_cache(oPhysCard, oCardSet.name)
         elif self.changes_with_parent() and self.is_parent(oCardSet):
             # Changing parent card set
             self._update_cache(oPhysCard, iChg, 'parent')
@@ -1482,7 +1717,7 @@ class CardSetCardListModel(CardListModel):
             elif iChg > 0 and oPhysCard not in self._dCache['parent cards']:
                 # New card that we haven't seen before, so see if we need
                 # to add it
-                self.add_new_card(oPhysCard)
+                self._add_changed_card(oPhysCard)
             self._clean_cache(oPhysCard, 'parent')
         elif self.changes_with_siblings() and self.is_sibling(oCardSet):
             # Changing sibling card set
@@ -1495,8 +1730,15 @@ class CardSetCardListModel(CardListModel):
                 self.alter_parent_count(oPhysCard, -iChg, False)
             self._clean_cache(oPhysCard, 'sibling')
         # Doesn't affect us, so ignore
-        # expire short-lived cache
-        self._dCache['visible'] = {}
+
+    def _add_changed_card(self, oPhysCard):
+        """Add a card that isn't in the model after a change, or queue
+           it if we're applying a batch of changes."""
+        if self._dBatchNewCards is None:
+            self.add_new_card(oPhysCard)
+        else:
+            self._dBatchNewCards.setdefault(oPhysCard.abstractCardID,
+                                            oPhysCard)
 
     def check_card_visible(self, oPhysCard):
         """Returns true if oPhysCard should be shown.
@@ -1509,6 +1751,8 @@ class CardSetCardListModel(CardListModel):
         # the plugins & filter for the same card during an operation
         if oPhysCard in self._dCache['visible']:
             return self._dCache['visible'][oPhysCard]
+        if oPhysCard in self._dCache['batch visible']:
+            return self._dCache['batch visible'][oPhysCard]
         bResult = True
         if self._bPhysicalFilter:
             if self._dCache['filtered cards']:
@@ -1634,6 +1878,7 @@ class CardSetCardListModel(CardListModel):
             if oAbsId in self._dCache['parent abstract cards']:
                 bResult = self._dCache['parent abstract cards'][oAbsId] > 0
         elif self._iShowCardMode == CHILD_CARDS:
+            self.populate_children(oIter)
             if self._iExtraLevelsMode in CARD_SETS_2ND_LEVEL:
                 # Check if any top level child iters have non-zero counts
                 oChildIter = self.iter_children(oIter)
@@ -1860,6 +2105,7 @@ class CardSetCardListModel(CardListModel):
                 self.set_par_count_colour(oGrpIter, iParGrpCnt, iGrpCnt)
 
         del self._dAbs2Iter[oAbsId]
+        self._dPendingChildren.pop(oAbsId, None)
 
         self._check_if_empty()
 
@@ -131,5 +131,6 @@ class CardSetManagementView(CardSetsListView):
         """Create the filter dialog for this view."""
         self._oFilterDialog = FilterDialog(self._oMainWin, self._oConfig,
                                            self._oController.filtertype,
-                                           sDefaultFilter)
+                                           sDefaultFilter,
+                                           self._oModel.get_card_set_iterator)
         return True
@@ -66,6 +66,7 @@ class CardSetView(CardListView):
     def __init__(self, oMainWindow, oController, sName, bStartEditable):
         oModel = CardSetCardListModel(sName, oMainWindow.config_file)
         oModel.enable_sorting()
+        oModel.enable_lazy_children()
         if bStartEditable:
             oModel.bEditable = True
         # The only path here is via the main window, so config_file exists
@@ -133,6 +134,7 @@ class CardSetView(CardListView):
 
         self.__iMapID = self.connect('map', self.mapped)
         self.connect('key-press-event', self.key_press)
+        self.connect('test-expand-row', self.row_expanding)
 
         self._oMenu = None
 
@@ -295,6 +297,13 @@ class CardSetView(CardListView):
                     self._oModel.get_all_names_from_path(oPath)
                 self._oController.dec_card(oPhysCard, sCardSetName)
 
+    def row_expanding(self, _oWidget, oIter, _oPath):
+        """Ensure the model has added the children before the row is
+           expanded."""
+        self._oModel.populate_children(oIter)
+        # Allow the row to expand
+        return False
+
     def key_press(self, _oWidget, oEvent):
         """Change the number if 1-9 is pressed and we're editable or if + or
            - is pressed. We use the lists defined above to handle the keypad
@@ -337,7 +346,7 @@ class CardSetView(CardListView):
         # panes moving, etc.
         self.disconnect(self.__iMapID)
         self.__iMapID = None
-        self.reload_keep_expanded()
+        self.reload_in_background()
         # Allow other map signals to run as well (needed for drag-n-drop in
         # some Gtk versions)
         return True
@@ -365,23 +374,26 @@ class CardSetView(CardListView):
                 # Prevent pasting into oneself
                 self._oController.add_paste_data(sSource, aCards)
 
+    def _finish_load(self):
+        """Reattach the model, and update the count colour"""
+        self.oNumCell.set_property('foreground-rgba',
+                                   self._oModel.get_count_colour())
+        super(CardSetView, self)._finish_load()
+
     def load(self):
         """Called when the model needs to be reloaded."""
         if self.__iMapID is not None:
             # skip loading until we're mapped, to save double loads in
             # some cases
             return
-        if hasattr(self._oMainWin, 'set_busy_cursor'):
-            self._oMainWin.set_busy_cursor()
-        self.freeze_child_notify()
-        self.set_model(None)
-        self._oModel.load()
-        self.set_model(self._oModel)
-        self.oNumCell.set_property('foreground-rgba',
-                                   self._oModel.get_count_colour())
-        self.thaw_child_notify()
-        if hasattr(self._oMainWin, 'restore_cursor'):
-            self._oMainWin.restore_cursor()
+        super(CardSetView, self).load()
+
+    def load_in_background(self, fCallback=None):
+        """Reload the model in the background once we're mapped"""
+        if self.__iMapID is not None:
+            # As for load
+            return
+        super(CardSetView, self).load_in_background(fCallback)
 
     def set_color_edit_cue(self):
         """Set a visual cue that the card set is editable."""
@@ -511,6 +523,10 @@ class CardSetView(CardListView):
             sKey = self.get_iter_identifier(oIter)
             if sParKey in dStates['expanded']:
                 self.expand_to_path(self._oModel.get_path(oParIter))
+            if sKey in dStates['expanded']:
+                # Expanding the row adds any children the model has
+                # deferred, which we need to restore their state
+                self.expand_to_path(self._oModel.get_path(oIter))
             aChildIters = self._oModel.get_all_iter_children(oIter)
             self.restore_iter_state(aChildIters, dStates)
             # selection needs to happen after all the expansions
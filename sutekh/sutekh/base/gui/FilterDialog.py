@@ -10,6 +10,8 @@
 from gi.repository import GObject, Gtk
 
 from ..core import FilterParser
+from ..core.QueryPlan import QueryPlan
+from .AutoScrolledWindow import AutoScrolledWindow
 from .SutekhDialog import (SutekhDialog, do_complaint_error,
                            do_complaint_buttons)
 from .BaseConfigFile import FULL_CARDLIST, CARDSET, DEF_PROFILE_FILTER
@@ -26,6 +28,9 @@ class FilterDialog(SutekhDialog):
 
        This also listens to Config File events, so the list of available
        filters remains syncronised across the different views.
+
+       If fGetQuery is given, it is used to turn the filter into the
+       view's query, and the user can ask to see the query plan for it.
        """
     # pylint: disable=too-many-instance-attributes, too-many-public-methods
     # we keep a lot of internal state, so many instance variables
@@ -38,10 +43,12 @@ class FilterDialog(SutekhDialog):
     RESPONSE_LOAD = 3
     RESPONSE_SAVE = 4
     RESPONSE_DELETE = 5
+    RESPONSE_PLAN = 6
 
     INITIAL_FILTER = "Default Filter Template"
 
-    def __init__(self, oParent, oConfig, sFilterType, sDefaultFilter=None):
+    def __init__(self, oParent, oConfig, sFilterType, sDefaultFilter=None,
+                 fGetQuery=None):
         super(FilterDialog, self).__init__("Specify Filter",
                                            oParent,
                                            Gtk.DialogFlags.DESTROY_WITH_PARENT)
@@ -52,6 +59,7 @@ class FilterDialog(SutekhDialog):
         self.__oParser = FilterParser.FilterParser()
         self.__oConfig = oConfig
         self.__sFilterType = sFilterType
+        self.__fGetQuery = fGetQuery
         self.__oFilter = None
         self.__oFilterEditor = FilterEditor(None, self.__sFilterType,
                                             self.__oParser, self)
@@ -71,6 +79,8 @@ class FilterDialog(SutekhDialog):
         self.add_button("Load", self.RESPONSE_LOAD)
         self.add_button("Save", self.RESPONSE_SAVE)
         self.add_button("Delete", self.RESPONSE_DELETE)
+        if fGetQuery:
+            self.add_button("Query Plan", self.RESPONSE_PLAN)
 
         self.action_area.pack_start(Gtk.VSeparator(), True, True, 0)
 
@@ -155,6 +165,10 @@ class FilterDialog(SutekhDialog):
             # and clear the filter editor
             self.__delete_filter()
             return True
+        elif iResponse == self.RESPONSE_PLAN:
+            # show how the database runs the filter
+            self.__show_query_plan()
+            return True
         else:
             self.__bWasCancelled = True
         self.hide()
@@ -212,6 +226,36 @@ class FilterDialog(SutekhDialog):
         finally:
             oLoadDialog.destroy()
 
+    def __show_query_plan(self):
+        """Display the database's query plan for the current filter,
+           with the time taken and the number of rows returned."""
+        # pylint: disable=broad-except
+        # we want to report any problem with the filter to the user
+        try:
+            oFilter = self.__oFilterEditor.get_filter()
+            oPlan = QueryPlan(self.__fGetQuery(oFilter))
+        except Exception as oExp:
+            do_complaint_error("Unable to get the query plan for the "
+                               "filter:\n%s" % oExp)
+            return
+        oPlanDialog = SutekhDialog("Query Plan", self.__oParent,
+                                   Gtk.DialogFlags.MODAL |
+                                   Gtk.DialogFlags.DESTROY_WITH_PARENT,
+                                   ("_Close", Gtk.ResponseType.CLOSE))
+        oPlanDialog.set_keep_above(True)
+        oPlanDialog.set_default_size(700, 400)
+        oTextView = Gtk.TextView()
+        oTextView.set_editable(False)
+        oTextView.set_monospace(True)
+        oTextView.get_buffer().set_text(oPlan.format())
+        oPlanDialog.vbox.pack_start(AutoScrolledWindow(oTextView), True, True,
+                                    0)
+        oPlanDialog.show_all()
+        try:
+            oPlanDialog.run()
+        finally:
+            oPlanDialog.destroy()
+
     def __fetch_filters(self, bDefault):
         """Load filters from config or default list.
 
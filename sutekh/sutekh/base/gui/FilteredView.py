@@ -34,6 +34,11 @@ class FilteredView(CustomDragIconView):
         # Filtering Dialog
         self._oFilterDialog = None
 
+        # State for background loads
+        self._bLoading = False
+        self._bUpdating = False
+        self._tPendingState = None
+
         # Text searching of card names
         self.set_search_equal_func(self.compare, None)
 
@@ -53,24 +58,99 @@ class FilteredView(CustomDragIconView):
                             doc="The filter dialog.")
     # pylint: enable=protected-access
 
-    def load(self):
-        """Called when the model needs to be reloaded."""
+    def _start_load(self):
+        """Detach the model from the view while it's reloaded."""
+        if self._bLoading:
+            # A cancelled background load has already done this
+            return
+        self._bLoading = True
         if hasattr(self._oMainWin, 'set_busy_cursor'):
             self._oMainWin.set_busy_cursor()
         self.freeze_child_notify()
         self.set_model(None)
-        self._oModel.load()
+
+    def _finish_load(self):
+        """Reattach the model after reloading."""
+        self._bLoading = False
         self.set_model(self._oModel)
         self.thaw_child_notify()
+        if self._bUpdating:
+            # The reload cancelled an update in place
+            self._bUpdating = False
+            self.thaw_child_notify()
+        if hasattr(self._oMainWin, 'restore_cursor'):
+            self._oMainWin.restore_cursor()
+
+    def _start_update(self):
+        """Show the busy cursor while the model is updated in place.
+
+           The model stays attached, so the expanded rows and selection
+           are kept."""
+        if self._bUpdating:
+            # A cancelled background update has already done this
+            return
+        self._bUpdating = True
+        if hasattr(self._oMainWin, 'set_busy_cursor'):
+            self._oMainWin.set_busy_cursor()
+        self.freeze_child_notify()
+
+    def _finish_update(self):
+        """Restore the cursor after updating the model in place."""
+        self._bUpdating = False
+        self.thaw_child_notify()
         if hasattr(self._oMainWin, 'restore_cursor'):
             self._oMainWin.restore_cursor()
 
+    def load(self):
+        """Called when the model needs to be reloaded."""
+        self._start_load()
+        self._oModel.load()
+        self._finish_load()
+
+    def load_in_background(self, fCallback=None):
+        """Reload the model without blocking the main loop, calling
+           fCallback once the model has been reloaded.
+
+           Falls back to load for models that don't support background
+           loading."""
+        if not hasattr(self._oModel, 'load_in_background'):
+            self.load()
+            if fCallback:
+                fCallback()
+            return
+
+        def _finish():
+            """Reattach the model and call the callback"""
+            self._finish_load()
+            if fCallback:
+                fCallback()
+
+        self._oModel.load_in_background(self._start_load, _finish)
+
+    def _can_update_in_place(self):
+        """Check if the model can be reloaded while attached to the view.
+
+           Models that update their rows in place leave the expanded rows,
+           selection and cursor of rows that don't change alone, so we
+           don't need to save and restore them."""
+        if self._bLoading or self._tPendingState is not None:
+            # Need to finish the load that's already in progress
+            return False
+        return hasattr(self._oModel, 'can_update_in_place') and \
+            self._oModel.can_update_in_place()
+
     def reload_keep_expanded(self, bRestoreSelection=False):
         """Reload with current expanded state.
 
            Attempt to reload the card list, keeping the existing structure
            of expanded rows.
            """
+        if self._can_update_in_place():
+            self._oModel.load()
+            if self._bUpdating:
+                # The load cancelled a background update in place
+                self._finish_update()
+            return
         # Internal helper functions
         # See what's expanded
         sCurId = None
@@ -90,6 +170,42 @@ class FilteredView(CustomDragIconView):
             # Restore cursor position if possible
             self._oModel.foreach(self._restore_cursor, sCurId)
 
+    def reload_in_background(self, bRestoreSelection=False):
+        """Reload in the background, keeping the expanded state.
+
+           As for reload_keep_expanded, but the model is reloaded without
+           blocking the main loop."""
+        if self._can_update_in_place():
+            self._oModel.load_in_background(self._start_update,
+                                            self._finish_update)
+            return
+        if self._tPendingState is None:
+            # If there's already a load in progress, we keep the state
+            # from before it started, since the model may be partly filled
+            sCurId = None
+            aSelectedRows = None
+            if bRestoreSelection:
+                aSelectedRows = self._get_selected_rows()
+            oCurPath, _oCol = self.get_cursor()
+            if oCurPath:
+                sCurId = self.get_iter_identifier(
+                    self._oModel.get_iter(oCurPath))
+            self._tPendingState = (self._get_expanded_list(), aSelectedRows,
+                                   sCurId)
+        self.load_in_background(self._restore_pending_state)
+
+    def _restore_pending_state(self):
+        """Restore the expanded state, selection and cursor saved by
+           reload_in_background."""
+        aExpandedSet, aSelectedRows, sCurId = self._tPendingState
+        self._tPendingState = None
+        self._expand_list(aExpandedSet)
+        if aSelectedRows:
+            self._reset_selected_rows(aSelectedRows)
+        if sCurId is not None:
+            # Restore cursor position if possible
+            self._oModel.foreach(self._restore_cursor, sCurId)
+
     # Filtering
 
     # pylint: disable=no-self-use
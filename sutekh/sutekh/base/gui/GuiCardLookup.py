@@ -11,12 +11,12 @@ import re
 from gi.repository import GObject, Gtk, Pango
 
 from sqlobject import SQLObjectNotFound
-from ..core.BaseTables import AbstractCard, PhysicalCard, Printing
+from ..core.BaseTables import PhysicalCard, Printing
 from ..core.BaseAdapters import (IAbstractCard, IPhysicalCard, IExpansion,
                                  IPrinting, IPrintingName)
 from ..core.CardLookup import (AbstractCardLookup, PhysicalCardLookup,
                                PrintingLookup, LookupFailed)
-from ..core.BaseFilters import best_guess_filter
+from ..core.BaseFilters import best_guess_card, best_guess_card_filter
 from .SutekhDialog import SutekhDialog, do_complaint_error
 from .CellRendererSutekhButton import CellRendererSutekhButton
 from .PhysicalCardView import PhysicalCardView
@@ -257,7 +257,7 @@ class ReplacementTreeView(Gtk.TreeView):
         sFullName = self.oModel.get_value(oIter, 1)
         sName, _sExp = self.parse_card_name(sFullName)
 
-        oFilter = best_guess_filter(sName)
+        oFilter = best_guess_card_filter(sName)
         self.oCardListView.get_model().selectfilter = oFilter
 
         if not self.oFilterToggleButton.get_active():
@@ -617,12 +617,10 @@ class GuiLookup(AbstractCardLookup, PhysicalCardLookup, PrintingLookup):
 
         # Populate the model with the card names and best guesses
         for sName in dUnknownCards:
-            oBestGuessFilter = best_guess_filter(sName)
-            aCards = list(oBestGuessFilter.select(AbstractCard))
-            if len(aCards) == 1:
-                sBestGuess = aCards[0].name
+            oCard = best_guess_card(sName)
+            if oCard is not None:
+                sBestGuess = oCard.name
                 iWeight = Pango.Weight.NORMAL
-                oCard = aCards[0]
             else:
                 sBestGuess = NO_CARD
                 iWeight = Pango.Weight.BOLD
@@ -11,10 +11,11 @@ import logging
 from gi.repository import Gtk
 from sqlobject import sqlhub
 
-from ..core.CardSetHolder import CardSetHolder, CardSetWrapper
+from ..core.CardSetHolder import CachedCardSetHolder, CardSetWrapper
 from ..core.BaseTables import PhysicalCardSet
 from ..core.BaseAdapters import IPhysicalCardSet
-from ..core.CardLookup import LookupFailed
+from ..core.CardLookup import (LookupFailed, get_lookup_memory,
+                               remember_lookups)
 from ..core.CardSetUtilities import (delete_physical_card_set, find_children,
                                      has_children, detect_loop,
                                      get_loop_names, break_loop,
@@ -244,7 +245,7 @@ def export_cs(oCardSet, cWriter, oParWin, sExt, aPatterns=None):
 # Common to MainMenu import code and plugins
 def import_cs(fIn, oParser, oMainWindow, sSetName=None):
     """Create a card set from the given file object."""
-    oHolder = CardSetHolder()
+    oHolder = CachedCardSetHolder()
 
     # pylint: disable=broad-except
     # we really do want all the exceptions
@@ -285,9 +286,16 @@ def import_cs(fIn, oParser, oMainWindow, sSetName=None):
     oHolder, aChildren = get_import_name(oHolder)
     if not oHolder.name:
         return  # User bailed
+    # Reuse the choices the user made when importing earlier files
+    # in the same format. Guessing parsers record the parser they used.
+    sFormat = type(getattr(oParser, 'oChosenParser', None) or
+                   oParser).__name__
+    dLookupCache = get_lookup_memory(sFormat)
     # Create CS
     try:
-        oHolder.create_pcs(oCardLookup=oMainWindow.cardLookup)
+        oHolder.create_pcs(oCardLookup=oMainWindow.cardLookup,
+                           dLookupCache=dLookupCache)
+        remember_lookups(sFormat, dLookupCache)
         reparent_all_children(oHolder.name, aChildren)
         aWarnings = oHolder.get_warnings()
         if aWarnings:
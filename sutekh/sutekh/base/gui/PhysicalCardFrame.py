@@ -39,6 +39,12 @@ class PhysicalCardFrame(CardListFrame):
         """Get the menu key"""
         return self._sName
 
+    def update_to_new_db(self):
+        """The cards in the model are from the old database, so we need
+           to rebuild the card list, rather than update it."""
+        self._oController.model.reset_load_state()
+        self.reload()
+
     def cleanup(self, bQuit=False):
         """Cleanup function called before pane is removed by the Main Window"""
         super(PhysicalCardFrame, self).cleanup(bQuit)
@@ -109,8 +109,11 @@ class SutekhMenu(Gtk.MenuBar):
         oMenuItem = self.create_menu_item_with_submenu(self, 'Other')
         oMenu = oMenuItem.get_submenu()
         # Add plugins
+        oPluginMgr = self._oMainWindow.plugin_manager
         for oPlugin in oPluginWindow.plugins:
-            oPlugin.add_to_menu(self._dMenus, oMenu)
+            with oPluginMgr.timed(oPluginMgr.get_plugin_name(oPlugin),
+                                  'menu'):
+                oPlugin.add_to_menu(self._dMenus, oMenu)
         if not oMenu.get_children():
             self.remove(oMenuItem)
             del self._dMenus['Other']
@@ -9,7 +9,7 @@ from gi.repository import Gtk
 from ...core.BaseTables import PhysicalCard, PhysicalCardSet
 from ...core.BaseAdapters import (IPhysicalCard, IAbstractCard,
                                   IPhysicalCardSet, IPrintingName)
-from ...core.BaseFilters import PhysicalCardSetFilter
+from ...core.CardSetCounts import CARD_SET_COUNTS
 from ..BasePluginManager import BasePlugin
 from ..SutekhDialog import SutekhDialog, NotebookDialog, do_complaint_error
 from ..CardSetsListView import CardSetsListView
@@ -24,9 +24,10 @@ def _get_card_set_list(aCardSetNames, bIgnoreExpansions):
     # Only compare abstract cards
     dFullCardList = {}
     for sCardSetName in aCardSetNames:
-        oFilter = PhysicalCardSetFilter(sCardSetName)
-        oCardSet = oFilter.select(PhysicalCard)
-        for oCard in oCardSet:
+        dCounts = CARD_SET_COUNTS.get_card_counts(
+            IPhysicalCardSet(sCardSetName))
+        for iCardId, iCount in dCounts.items():
+            oCard = PhysicalCard.get(iCardId)
             oAbsCard = IAbstractCard(oCard)
             if bIgnoreExpansions:
                 oKey = (oAbsCard, oAbsCard.name, UNKNOWN_EXP)
@@ -38,7 +39,7 @@ def _get_card_set_list(aCardSetNames, bIgnoreExpansions):
                     oKey = (oAbsCard, oAbsCard.name, UNKNOWN_EXP)
             dFullCardList.setdefault(oKey, {aCardSetNames[0]: 0,
                                             aCardSetNames[1]: 0})
-            dFullCardList[oKey][sCardSetName] += 1
+            dFullCardList[oKey][sCardSetName] += iCount
     dDifferences = {aCardSetNames[0]: {}, aCardSetNames[1]: {}}
     dCommon = {}
     for tCardInfo in dFullCardList:
@@ -10,12 +10,14 @@ from sqlobject import SQLObjectNotFound
 
 from gi.repository import Pango
 
-from ...core.BaseTables import (PhysicalCardSet,
-                                MapPhysicalCardToPhysicalCardSet)
+from ...core.BaseTables import PhysicalCardSet
 from ...core.BaseAdapters import IPhysicalCardSet
+from ...core.CardSetHierarchy import CARD_SET_HIERARCHY
+from ...core.CardSetCounts import CARD_SET_COUNTS
 from ...core.DBSignals import (listen_row_destroy, listen_row_update,
                                listen_row_created, listen_changed,
-                               disconnect_changed,
+                               listen_batch_changed, disconnect_changed,
+                               disconnect_batch_changed,
                                disconnect_row_destroy,
                                disconnect_row_update,
                                disconnect_row_created)
@@ -65,10 +67,12 @@ class BaseExtraCSListViewColumns(BaseExtraColumns):
         listen_row_destroy(self.card_set_added_deleted, PhysicalCardSet)
         listen_row_created(self.card_set_added_deleted, PhysicalCardSet)
         listen_changed(self.card_changed, PhysicalCardSet)
+        listen_batch_changed(self.cards_changed, PhysicalCardSet)
 
     def cleanup(self):
         """Disconnect the database listeners"""
         disconnect_changed(self.card_changed, PhysicalCardSet)
+        disconnect_batch_changed(self.cards_changed, PhysicalCardSet)
         disconnect_row_update(self.card_set_changed, PhysicalCardSet)
         disconnect_row_destroy(self.card_set_added_deleted,
                                PhysicalCardSet)
@@ -87,17 +91,20 @@ class BaseExtraCSListViewColumns(BaseExtraColumns):
         """Reconnect the database signal listeners and queue a refresh"""
         # clear cache
         self._dCache = {}
+        self._clear_sort_keys()
         # reconnect signals
         listen_row_update(self.card_set_changed, PhysicalCardSet)
         listen_row_destroy(self.card_set_added_deleted, PhysicalCardSet)
         listen_row_created(self.card_set_added_deleted, PhysicalCardSet)
         listen_changed(self.card_changed, PhysicalCardSet)
+        listen_batch_changed(self.cards_changed, PhysicalCardSet)
         # queue a redraw
         self.view.queue_draw()
 
     def prepare_for_db_update(self):
         """Disconnect the database signals during the upgrade"""
         disconnect_changed(self.card_changed, PhysicalCardSet)
+        disconnect_batch_changed(self.cards_changed, PhysicalCardSet)
         disconnect_row_update(self.card_set_changed, PhysicalCardSet)
         disconnect_row_destroy(self.card_set_added_deleted,
                                PhysicalCardSet)
@@ -134,9 +141,8 @@ class BaseExtraCSListViewColumns(BaseExtraColumns):
     def _get_data_total(self, sCardSet, bGetIcons=True):
         """Return the total number of cards in the card set"""
         def query(oCardSet):
-            """Query the database"""
-            return MapPhysicalCardToPhysicalCardSet.selectBy(
-                physicalCardSetID=oCardSet.id).count()
+            """Query the maintained card counts"""
+            return CARD_SET_COUNTS.get_total(oCardSet)
 
         if sCardSet:
             # lookup totals
@@ -158,8 +164,8 @@ class BaseExtraCSListViewColumns(BaseExtraColumns):
     def _get_data_all_children(self, sCardSet, bGetIcons=True):
         """Return the number of children card sets"""
         def query(oCardSet):
-            """Query the database"""
-            return PhysicalCardSet.selectBy(parentID=oCardSet.id).count()
+            """Query the hierarchy index"""
+            return CARD_SET_HIERARCHY.count_children(oCardSet)
 
         if sCardSet:
             # lookup totals
@@ -181,9 +187,8 @@ class BaseExtraCSListViewColumns(BaseExtraColumns):
     def _get_data_inuse_children(self, sCardSet, bGetIcons=True):
         """Return the number of In-Use children card sets"""
         def query(oCardSet):
-            """Query the database"""
-            return PhysicalCardSet.selectBy(parentID=oCardSet.id,
-                                            inuse=True).count()
+            """Query the hierarchy index"""
+            return CARD_SET_HIERARCHY.count_children(oCardSet, True)
         if sCardSet:
             # lookup totals
             dInfo = self._dCache[sCardSet]
@@ -257,11 +262,13 @@ class BaseExtraCSListViewColumns(BaseExtraColumns):
     def card_set_changed(self, _oCardSet, _dChanges):
         """We listen for card set events, and invalidate the cache"""
         self._dCache = {}
+        self._clear_sort_keys()
 
     def card_set_added_deleted(self, _oCardSet, _dKW=None, _fPostFuncs=None):
         """We listen for card set additions & deletions, and
            invalidate the cache when that occurs"""
         self._dCache = {}
+        self._clear_sort_keys()
 
     def card_changed(self, oCardSet, _oPhysCard, _iChg):
         """Listen for card changes.
@@ -269,6 +276,7 @@ class BaseExtraCSListViewColumns(BaseExtraColumns):
            We invalidate card counts for the card set if it's in the cache.
            """
         sName = oCardSet.name
+        self._clear_sort_keys(sName)
         if sName in self._dCache:
             dInfo = self._dCache[sName]
             for sKey in self.CS_KEYS:
@@ -276,3 +284,8 @@ class BaseExtraCSListViewColumns(BaseExtraColumns):
                     del dInfo[sKey]
             # queue a redraw
             self.view.queue_draw()
+
+    def cards_changed(self, dChanges):
+        """Listen for batches of card changes"""
+        for oCardSet in dChanges:
+            self.card_changed(oCardSet, None, None)
@@ -4,12 +4,18 @@
 # GPL - see COPYING for details
 """Display extra columns in the tree view"""
 
+from collections import OrderedDict
+
 from sqlobject import SQLObjectNotFound
 
 from ...core.BaseTables import PhysicalCard, PhysicalCardSet
 from ..CellRendererIcons import SHOW_TEXT_ONLY
+from ..MessageBus import MessageBus, ICON_MSG
 from .BaseExtraColumns import BaseExtraColumns
 
+# Number of cards we keep the rendered text and icons for in each column
+CELL_CACHE_SIZE = 1000
+
 
 class BaseExtraCardViewColumns(BaseExtraColumns):
     """Add extra columns to the card list view.
@@ -31,12 +37,54 @@ class BaseExtraCardViewColumns(BaseExtraColumns):
 
     dCardListConfig = dPerPaneConfig
 
+    def __init__(self, *args, **kwargs):
+        # The cell data functions get called on every redraw, so we keep
+        # the text and icons for the most recently drawn cards, keyed by
+        # the column's data function
+        self._dCellData = {}
+        super(BaseExtraCardViewColumns, self).__init__(*args, **kwargs)
+        MessageBus.subscribe(ICON_MSG, 'icons_changed', self.icons_changed)
+
+    def cleanup(self):
+        """Disconnect from the message bus"""
+        MessageBus.unsubscribe(ICON_MSG, 'icons_changed',
+                               self.icons_changed)
+        super(BaseExtraCardViewColumns, self).cleanup()
+
     @classmethod
     def update_config(cls):
         """Fix the config to use the right keys."""
         cls.fix_config(cls.dPerPaneConfig)
         cls.dCardListConfig = cls.dPerPaneConfig
 
+    def update_to_new_db(self):
+        """The card data may have changed, so drop the sort keys and
+           the cell data"""
+        self._clear_sort_keys()
+        self._dCellData = {}
+
+    def icons_changed(self):
+        """The icons have been downloaded again, so redraw with the
+           new icons"""
+        self._dCellData = {}
+        self.view.queue_draw()
+
+    def _get_cell_data(self, oCard, oGetData):
+        """Return oGetData's text and icons for oCard, using the cached
+           values if we have them."""
+        if oCard is None:
+            return oGetData(oCard, True)
+        dCells = self._dCellData.setdefault(oGetData, OrderedDict())
+        if oCard in dCells:
+            dCells.move_to_end(oCard)
+            return dCells[oCard]
+        tData = oGetData(oCard, True)
+        dCells[oCard] = tData
+        if len(dCells) > CELL_CACHE_SIZE:
+            # Drop the least recently drawn card
+            dCells.popitem(last=False)
+        return tData
+
     def _get_iter_data(self, oIter):
         """For the given iterator, get the associated abstract card"""
         if self.model.iter_depth(oIter) == 1:
@@ -72,7 +120,8 @@ class BaseExtraCardViewColumns(BaseExtraColumns):
     def _render_card_type(self, _oColumn, oCell, _oModel, oIter, _oDummy):
         """display the card type(s)"""
         oCard = self._get_iter_data(oIter)
-        aText, aIcons = self._get_data_card_type(oCard, True)
+        aText, aIcons = self._get_cell_data(oCard,
+                                            self._get_data_card_type)
         oCell.set_data(aText, aIcons, self._iShowMode)
 
     def _get_data_expansions(self, oCard, bGetIcons=True):
@@ -90,7 +139,8 @@ class BaseExtraCardViewColumns(BaseExtraColumns):
     def _render_expansions(self, _oColumn, oCell, _oModel, oIter, _oDummy):
         """Display expansion info"""
         oCard = self._get_iter_data(oIter)
-        aText, aIcons = self._get_data_expansions(oCard)
+        aText, aIcons = self._get_cell_data(oCard,
+                                            self._get_data_expansions)
         oCell.set_data(aText, aIcons, self._iShowMode)
 
     def _get_data_card_text(self, oCard, bGetIcons=True):
@@ -106,5 +156,6 @@ class BaseExtraCardViewColumns(BaseExtraColumns):
     def _render_card_text(self, _oColumn, oCell, _oModel, oIter, _oDummy):
         """Display card text in the column"""
         oCard = self._get_iter_data(oIter)
-        aTexts, aIcons = self._get_data_card_text(oCard)
+        aTexts, aIcons = self._get_cell_data(oCard,
+                                             self._get_data_card_text)
         oCell.set_data(aTexts, aIcons, SHOW_TEXT_ONLY)
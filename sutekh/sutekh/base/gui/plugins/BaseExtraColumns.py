@@ -75,6 +75,10 @@ class BaseExtraColumns(BasePlugin):
         # The database lookups can be moderately expensive, so we
         # provide a cache for the results
         self._dCache = {}
+        # Sort keys for each column's data function, keyed by the object
+        # returned by _get_iter_data. Sorting compares each row many
+        # times, so we only want to look up each row's value once
+        self._dSortKeys = {}
 
         self._iShowMode = self.MODES[self.DEFAULT_MODE]
 
@@ -99,6 +103,26 @@ class BaseExtraColumns(BasePlugin):
            data queries."""
         raise NotImplementedError('Implement _get_iter_data')
 
+    def _get_sort_key(self, oObj, oGetData):
+        """Return the sort key for oObj, looking it up if needed"""
+        dKeys = self._dSortKeys.setdefault(oGetData, {})
+        if oObj not in dKeys:
+            oVal = oGetData(oObj, False)[0]
+            # convert to string for sorting
+            if isinstance(oVal, list):
+                oVal = " ".join(oVal)
+            dKeys[oObj] = oVal
+        return dKeys[oObj]
+
+    def _clear_sort_keys(self, oObj=None):
+        """Drop the cached sort keys, either all of them or just those
+           for oObj."""
+        if oObj is None:
+            self._dSortKeys = {}
+            return
+        for dKeys in self._dSortKeys.values():
+            dKeys.pop(oObj, None)
+
     def sort_column(self, _oModel, oIter1, oIter2, oGetData):
         """Comparision of oIter1 and oIter2.
 
@@ -109,12 +133,8 @@ class BaseExtraColumns(BasePlugin):
         if oObj1 is None or oObj2 is None:
             # Not comparing like for like, so fall-back to default
             return self.model.sort_equal_iters(oIter1, oIter2)
-        oVal1 = oGetData(oObj1, False)[0]
-        oVal2 = oGetData(oObj2, False)[0]
-        # convert to string for sorting
-        if isinstance(oVal1, list):
-            oVal1 = " ".join(oVal1)
-            oVal2 = " ".join(oVal2)
+        oVal1 = self._get_sort_key(oObj1, oGetData)
+        oVal2 = self._get_sort_key(oObj2, oGetData)
         if oVal1 < oVal2:
             return -1
         elif oVal1 > oVal2:
@@ -7,10 +7,11 @@
 """Test whether card sets can be constructed independently"""
 
 from gi.repository import Gtk
-from ...core.BaseTables import PhysicalCardSet
+from ...core.BaseTables import PhysicalCardSet, PhysicalCard
 from ...core.BaseAdapters import (IPhysicalCardSet, IAbstractCard,
                                   IPhysicalCard, IPrintingName)
 from ...core.BaseFilters import ParentCardSetFilter
+from ...core.CardSetCounts import CARD_SET_COUNTS
 from ..BasePluginManager import BasePlugin
 from ..CardSetsListView import CardSetsListView
 from ..SutekhDialog import (SutekhDialog, NotebookDialog,
@@ -37,12 +38,12 @@ def _get_cards(oCardSet, dCards, bIgnoreExpansions):
         fCard = lambda oCard: oCard.abstractCard
     else:
         fCard = lambda oCard: oCard
-    for oCard in oCardSet.cards:
-        oCard = fCard(oCard)
+    for iCardId, iCount in CARD_SET_COUNTS.get_card_counts(oCardSet).items():
+        oCard = fCard(PhysicalCard.get(iCardId))
         dCards.setdefault(oCard, CardInfo())
-        dCards[oCard].iCount += 1
+        dCards[oCard].iCount += iCount
         dCards[oCard].dCardSets.setdefault(oCardSet.name, 0)
-        dCards[oCard].dCardSets[oCardSet.name] += 1
+        dCards[oCard].dCardSets[oCardSet.name] += iCount
 
 
 def _make_align_list(aList):
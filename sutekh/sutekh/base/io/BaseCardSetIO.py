@@ -6,10 +6,11 @@
 """Base classes for the app specific XML card set parsers and writers.
    """
 
-from xml.etree.ElementTree import Element, SubElement
+from xml.etree.ElementTree import Element, SubElement, tostring
 
 from .IOBase import BaseXMLParser, BaseXMLWriter
 from ..core.BaseTables import MAX_ID_LENGTH
+from ..Utility import norm_xml_quotes
 
 
 class BaseCardXMLParser(BaseXMLParser):
@@ -114,11 +115,9 @@ class BaseCardXMLWriter(BaseXMLWriter):
     sTypeTag = "none"
     sVersionTag = "none"
 
-    def _gen_tree(self, oHolder):
-        """Convert the card set wrapped in oHolder to an ElementTree."""
-        dPhys = {}
-        bInUse = oHolder.inuse
-
+    def _make_root(self, oHolder):
+        """Create the root element, with the comment and annotations,
+           for the card set wrapped in oHolder."""
         oRoot = Element(self.sTypeTag,
                         name=oHolder.name)
         oRoot.attrib[self.sVersionTag] = self.sMyVersion
@@ -133,13 +132,15 @@ class BaseCardXMLWriter(BaseXMLWriter):
         if oHolder.parent:
             oRoot.attrib['parent'] = oHolder.parent
 
-        if bInUse:
+        if oHolder.inuse:
             oRoot.attrib['inuse'] = 'Yes'
+        return oRoot
 
+    def _get_card_counts(self, oHolder):
+        """Return a sorted list of (name, expansion, printing, count)
+           tuples for the cards in oHolder."""
+        dPhys = {}
         for oCard in oHolder.cards:
-            # ElementTree 1.2 doesn't support searching for attributes,
-            # so this is easier than using the tree directly. For
-            # ElementTree 1.3, this should be reworked
             oAbs = oCard.abstractCard
             if oCard.printing:
                 sExpName = oCard.printing.expansion.name
@@ -154,9 +155,36 @@ class BaseCardXMLWriter(BaseXMLWriter):
             dPhys[tKey] += 1
 
         # we sort by card name & expansion, as makes results more predictable
-        for tKey in sorted(dPhys):
-            iNum = dPhys[tKey]
-            sName, sExpName, sPrinting = tKey
+        return [tKey + (dPhys[tKey],) for tKey in sorted(dPhys)]
+
+    def _gen_tree(self, oHolder):
+        """Convert the card set wrapped in oHolder to an ElementTree."""
+        oRoot = self._make_root(oHolder)
+        for sName, sExpName, sPrinting, iNum in self._get_card_counts(
+                oHolder):
             SubElement(oRoot, 'card', name=sName, count=str(iNum),
                        expansion=sExpName, printing=sPrinting)
         return oRoot
+
+    def write(self, fOut, oHolder):
+        """Write the holder contents as pretty XML to the given file-like
+           object fOut.
+
+           The card elements are written one at a time, rather than
+           building the whole tree, so large card sets don't need much
+           memory. The output matches BaseXMLWriter.write."""
+        oRoot = self._make_root(oHolder)
+        # We write the indentation pretty_xml would add ourselves
+        oRoot.text = "\n  "
+        oRoot[0].tail = "\n  "
+        sData = norm_xml_quotes(tostring(oRoot)).decode('ascii')
+        # Drop the closing tag, so we can add the cards
+        sClose = '</%s>' % self.sTypeTag
+        fOut.write(sData[:-len(sClose)])
+        for sName, sExpName, sPrinting, iNum in self._get_card_counts(
+                oHolder):
+            oCard = Element('card', name=sName, count=str(iNum),
+                            expansion=sExpName, printing=sPrinting)
+            fOut.write("\n  ")
+            fOut.write(norm_xml_quotes(tostring(oCard)).decode('ascii'))
+        fOut.write("\n" + sClose)
@@ -8,6 +8,7 @@
    """
 
 import logging
+import time
 
 from xml.etree.ElementTree import parse, tostring
 # pylint: disable=no-name-in-module, import-error
@@ -150,7 +151,9 @@ def safe_parser(oFile, oParser):
 
        oFile is an object with a .open() method (e.g. EncodedFile).
        oParser is an object with a parse() method that takes an
-       open file object."""
+       open file object.
+
+       The time taken is logged, to help track down slow imports."""
     # We don't care about issues we log in this flush_cache step,
     # as the database may not have all the required information.
     # So we forcibly silence all log messages for this step.
@@ -162,10 +165,16 @@ def safe_parser(oFile, oParser):
     fIn = None
     oOldConn = sqlhub.processConnection
     sqlhub.processConnection = oOldConn.transaction()
+    fStart = time.time()
     try:
         fIn = oFile.open()
         oParser.parse(fIn)
         sqlhub.processConnection.commit(close=True)
+        sSource = getattr(oFile, 'sfFile', None)
+        if not isinstance(sSource, str):
+            sSource = 'file'
+        logging.info('%s read %s in %.2f seconds', type(oParser).__name__,
+                     sSource, time.time() - fStart)
     finally:
         # We use the fIn check so we don't swallow any exceptions raised
         # by open failing
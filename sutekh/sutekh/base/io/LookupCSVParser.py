@@ -12,6 +12,7 @@ import csv
 from logging import Logger
 
 from ..core.BaseTables import LookupHints
+from ..core.BulkLoad import insert_rows
 
 
 class LookupCSVParser:
@@ -30,8 +31,9 @@ class LookupCSVParser:
         aRows = list(oCsvFile)
         if hasattr(self.oLogHandler, 'set_total'):
             self.oLogHandler.set_total(len(aRows))
+        aLookups = []
         for sDomain, sLookup, sValue in aRows:
-            oLookup = LookupHints(domain=sDomain, lookup=sLookup,
-                                  value=sValue)
-            oLookup.syncUpdate()
+            aLookups.append({'domain': sDomain, 'lookup': sLookup,
+                             'value': sValue})
             self.oLogger.info('Added Lookup : (%s, %s)', sDomain, sLookup)
+        insert_rows(LookupHints, aLookups)
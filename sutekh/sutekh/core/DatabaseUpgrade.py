@@ -30,7 +30,12 @@ from sutekh.base.core.BaseTables import (PhysicalCard, AbstractCard,
                                          MAX_ID_LENGTH)
 from sutekh.core.SutekhTables import (SutekhAbstractCard, Clan, Virtue,
                                       Discipline, Creed, DisciplinePair,
-                                      Sect, Title, TABLE_LIST)
+                                      Sect, Title, MapAbstractCardToClan,
+                                      MapAbstractCardToDisciplinePair,
+                                      MapAbstractCardToSect,
+                                      MapAbstractCardToTitle,
+                                      MapAbstractCardToCreed,
+                                      MapAbstractCardToVirtue, TABLE_LIST)
 from sutekh.io.WhiteWolfTextParser import strip_braces
 from sutekh.base.core.BaseDatabaseUpgrade import BaseDBUpgradeManager
 from sutekh.base.core.DatabaseVersion import DatabaseVersion
@@ -300,6 +305,21 @@ class DBUpgradeManager(BaseDBUpgradeManager):
         'Sect': (Sect, (Sect.tableversion,)),
         'DisciplinePair': (DisciplinePair, (DisciplinePair.tableversion,)),
         'Title': (Title, (Title.tableversion,)),
+        # As for the base mapping tables, version 1 only lacks the
+        # covering indexes
+        'MapAbstractCardToClan': (MapAbstractCardToClan,
+                                  (1, MapAbstractCardToClan.tableversion)),
+        'MapAbstractCardToDisciplinePair': (
+            MapAbstractCardToDisciplinePair,
+            (1, MapAbstractCardToDisciplinePair.tableversion)),
+        'MapAbstractCardToSect': (MapAbstractCardToSect,
+                                  (1, MapAbstractCardToSect.tableversion)),
+        'MapAbstractCardToTitle': (MapAbstractCardToTitle,
+                                   (1, MapAbstractCardToTitle.tableversion)),
+        'MapAbstractCardToCreed': (MapAbstractCardToCreed,
+                                   (1, MapAbstractCardToCreed.tableversion)),
+        'MapAbstractCardToVirtue': (MapAbstractCardToVirtue,
+                                    (1, MapAbstractCardToVirtue.tableversion)),
     })
     # We override the default values for these
     SUPPORTED_TABLES['Expansion'] = (Expansion, (Expansion.tableversion, 3, 4))
@@ -307,7 +327,7 @@ class DBUpgradeManager(BaseDBUpgradeManager):
                                         (AbstractCard.tableversion, 5, 6))
     SUPPORTED_TABLES['PhysicalCardSet'] = (PhysicalCardSet,
                                            (PhysicalCardSet.tableversion, 6))
-    SUPPORTED_TABLES['Metadata'] = (Metadata, (-1, 1, Expansion.tableversion))
+    SUPPORTED_TABLES['Metadata'] = (Metadata, (-1, 1, Metadata.tableversion))
 
     COPY_OLD_DB = [
         ('_copy_old_discipline', 'Discipline table', False),
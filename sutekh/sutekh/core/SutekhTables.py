@@ -142,6 +142,8 @@ class Title(SQLObject):
 
 
 # Mapping Tables
+# As in BaseTables, the property indexes include the card, so the
+# filters don't need to read the table
 
 
 class MapAbstractCardToClan(SQLObject):
@@ -149,13 +151,13 @@ class MapAbstractCardToClan(SQLObject):
     class sqlmeta:
         table = 'abs_clan_map'
 
-    tableversion = 1
+    tableversion = 2
 
     abstractCard = ForeignKey('SutekhAbstractCard', notNull=True)
     clan = ForeignKey('Clan', notNull=True)
 
     abstractCardIndex = DatabaseIndex(abstractCard, unique=False)
-    clanIndex = DatabaseIndex(clan, unique=False)
+    clanIndex = DatabaseIndex(clan, abstractCard, unique=False)
 
 
 class MapAbstractCardToDisciplinePair(SQLObject):
@@ -163,13 +165,14 @@ class MapAbstractCardToDisciplinePair(SQLObject):
     class sqlmeta:
         table = 'abs_discipline_pair_map'
 
-    tableversion = 1
+    tableversion = 2
 
     abstractCard = ForeignKey('SutekhAbstractCard', notNull=True)
     disciplinePair = ForeignKey('DisciplinePair', notNull=True)
 
     abstractCardIndex = DatabaseIndex(abstractCard, unique=False)
-    disciplinePairIndex = DatabaseIndex(disciplinePair, unique=False)
+    disciplinePairIndex = DatabaseIndex(disciplinePair, abstractCard,
+                                        unique=False)
 
 
 class MapAbstractCardToSect(SQLObject):
@@ -177,13 +180,13 @@ class MapAbstractCardToSect(SQLObject):
     class sqlmeta:
         table = 'abs_sect_map'
 
-    tableversion = 1
+    tableversion = 2
 
     abstractCard = ForeignKey('SutekhAbstractCard', notNull=True)
     sect = ForeignKey('Sect', notNull=True)
 
     abstractCardIndex = DatabaseIndex(abstractCard, unique=False)
-    sectIndex = DatabaseIndex(sect, unique=False)
+    sectIndex = DatabaseIndex(sect, abstractCard, unique=False)
 
 
 class MapAbstractCardToTitle(SQLObject):
@@ -191,13 +194,13 @@ class MapAbstractCardToTitle(SQLObject):
     class sqlmeta:
         table = 'abs_title_map'
 
-    tableversion = 1
+    tableversion = 2
 
     abstractCard = ForeignKey('SutekhAbstractCard', notNull=True)
     title = ForeignKey('Title', notNull=True)
 
     abstractCardIndex = DatabaseIndex(abstractCard, unique=False)
-    titleIndex = DatabaseIndex(title, unique=False)
+    titleIndex = DatabaseIndex(title, abstractCard, unique=False)
 
 
 class MapAbstractCardToCreed(SQLObject):
@@ -205,13 +208,13 @@ class MapAbstractCardToCreed(SQLObject):
     class sqlmeta:
         table = 'abs_creed_map'
 
-    tableversion = 1
+    tableversion = 2
 
     abstractCard = ForeignKey('SutekhAbstractCard', notNull=True)
     creed = ForeignKey('Creed', notNull=True)
 
     abstractCardIndex = DatabaseIndex(abstractCard, unique=False)
-    creedIndex = DatabaseIndex(creed, unique=False)
+    creedIndex = DatabaseIndex(creed, abstractCard, unique=False)
 
 
 class MapAbstractCardToVirtue(SQLObject):
@@ -219,13 +222,13 @@ class MapAbstractCardToVirtue(SQLObject):
     class sqlmeta:
         table = 'abs_virtue_map'
 
-    tableversion = 1
+    tableversion = 2
 
     abstractCard = ForeignKey('SutekhAbstractCard', notNull=True)
     virtue = ForeignKey('Virtue', notNull=True)
 
     abstractCardIndex = DatabaseIndex(abstractCard, unique=False)
-    virtueIndex = DatabaseIndex(virtue, unique=False)
+    virtueIndex = DatabaseIndex(virtue, abstractCard, unique=False)
 
 
 # pylint: enable=no-init, too-many-instance-attributes
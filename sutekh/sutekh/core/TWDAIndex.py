@@ -0,0 +1,257 @@
+# -*- coding: utf-8 -*-
+# vim:fileencoding=utf-8 ai ts=4 sts=4 et sw=4
+# Copyright 2026 Neil Muller <drnlmuller+sutekh@gmail.com>
+# GPL - see COPYING for details
+
+"""Index of the cards found in the Tournament Winning Deck Archive decks"""
+
+import re
+import heapq
+from collections import Counter
+
+from sqlobject import sqlhub, SQLObjectNotFound
+from sqlobject.sqlbuilder import Select, AND, IN, func
+
+from sutekh.base.core.BaseTables import (PhysicalCardSet, PhysicalCard,
+                                         AbstractCard,
+                                         MapPhysicalCardToPhysicalCardSet)
+
+# pattern for TWDA holders
+TWDA_HOLDER_REGEX = re.compile('^TWDA ([0-9]{4})$')
+
+# Orderings supported by get_co_occurrences
+CO_DECKS = 'decks'
+CO_LIFT = 'lift'
+
+
+def get_twda_holders():
+    """Return all the TWDA holders in the current database"""
+    return [oCS for oCS in PhysicalCardSet.select()
+            if TWDA_HOLDER_REGEX.match(oCS.name)]
+
+
+class TWDAIndex:
+    """Card to deck index for the TWDA decks in the database.
+
+       The index covers all the in-use children of the TWDA holders, and
+       maps each abstract card id to the decks it appears in and the number
+       of copies. The index is tracked per holder, so adding or replacing
+       a TWDA year only re-reads the decks for that year.
+       """
+
+    def __init__(self):
+        self._bFullRebuild = True
+        self._aDirtyHolders = set()
+        # abstract card id -> {deck id: count}
+        self._dCardDecks = {}
+        # deck id -> {abstract card id: count}
+        self._dDeckCards = {}
+        # deck id -> holder id
+        self._dDecks = {}
+        # deck id -> deck name
+        self._dDeckNames = {}
+        # holder id -> holder name
+        self._dHolders = {}
+        # abstract card id -> Counter of decks shared with the other cards
+        self._dCoOccurCache = {}
+
+    def invalidate(self):
+        """Mark the entire index as stale, so it's rebuilt on next use."""
+        self._bFullRebuild = True
+
+    def mark_changed(self, oCardSet):
+        """Mark the part of the index affected by changes to oCardSet as
+           stale.
+
+           This only re-reads the TWDA holder containing the card set
+           on next use, and does nothing for card sets unrelated to
+           the TWDA."""
+        if oCardSet.id in self._dHolders:
+            self._aDirtyHolders.add(oCardSet.id)
+        elif oCardSet.id in self._dDecks:
+            self._aDirtyHolders.add(self._dDecks[oCardSet.id])
+        elif TWDA_HOLDER_REGEX.match(oCardSet.name):
+            # New holder
+            self._aDirtyHolders.add(oCardSet.id)
+        if oCardSet.parentID in self._dHolders:
+            # Deck added to (or removed from) a holder
+            self._aDirtyHolders.add(oCardSet.parentID)
+
+    def is_valid(self):
+        """Return True if the index doesn't need to be updated."""
+        return not self._bFullRebuild and not self._aDirtyHolders
+
+    def rebuild(self):
+        """Rebuild the entire index from the database."""
+        self._bFullRebuild = False
+        self._aDirtyHolders = set()
+        self._dCardDecks = {}
+        self._dDeckCards = {}
+        self._dDecks = {}
+        self._dDeckNames = {}
+        self._dHolders = {}
+        self._dCoOccurCache = {}
+        self._load_holders(get_twda_holders())
+
+    def refresh(self):
+        """Bring the index up to date, only re-reading the holders which
+           have been marked as changed."""
+        if self._bFullRebuild:
+            self.rebuild()
+            return
+        if not self._aDirtyHolders:
+            return
+        aHolders = []
+        for iHolderId in self._aDirtyHolders:
+            self._drop_holder(iHolderId)
+            try:
+                oHolder = PhysicalCardSet.get(iHolderId)
+            except SQLObjectNotFound:
+                # Holder has been deleted
+                continue
+            if TWDA_HOLDER_REGEX.match(oHolder.name):
+                aHolders.append(oHolder)
+        self._aDirtyHolders = set()
+        self._dCoOccurCache = {}
+        self._load_holders(aHolders)
+
+    def _drop_holder(self, iHolderId):
+        """Remove all the index entries for the given holder"""
+        self._dHolders.pop(iHolderId, None)
+        for iDeckId in [x for x, y in self._dDecks.items()
+                        if y == iHolderId]:
+            del self._dDecks[iDeckId]
+            del self._dDeckNames[iDeckId]
+            for iAbsId in self._dDeckCards.pop(iDeckId):
+                dDecks = self._dCardDecks[iAbsId]
+                del dDecks[iDeckId]
+                if not dDecks:
+                    del self._dCardDecks[iAbsId]
+
+    def _load_holders(self, aHolders):
+        """Add the decks for the given holders to the index"""
+        # pylint: disable=no-member, singleton-comparison
+        # SQLObject confuses pylint, and == True is needed for the query
+        if not aHolders:
+            return
+        for oHolder in aHolders:
+            self._dHolders[oHolder.id] = oHolder.name
+        aHolderIds = [x.id for x in aHolders]
+        for oCS in PhysicalCardSet.select(AND(
+                IN(PhysicalCardSet.q.parentID, aHolderIds),
+                PhysicalCardSet.q.inuse == True)):
+            self._dDecks[oCS.id] = oCS.parentID
+            self._dDeckNames[oCS.id] = oCS.name
+            self._dDeckCards[oCS.id] = {}
+        oConn = sqlhub.processConnection
+        oQuery = Select(
+            (PhysicalCard.q.abstractCardID,
+             MapPhysicalCardToPhysicalCardSet.q.physicalCardSetID,
+             func.COUNT(MapPhysicalCardToPhysicalCardSet.q.id)),
+            where=AND(
+                PhysicalCard.q.id ==
+                MapPhysicalCardToPhysicalCardSet.q.physicalCardID,
+                MapPhysicalCardToPhysicalCardSet.q.physicalCardSetID ==
+                PhysicalCardSet.q.id,
+                IN(PhysicalCardSet.q.parentID, aHolderIds),
+                PhysicalCardSet.q.inuse == True),
+            groupBy=(PhysicalCard.q.abstractCardID,
+                     MapPhysicalCardToPhysicalCardSet.q.physicalCardSetID))
+        for iAbsId, iDeckId, iCount in oConn.queryAll(oConn.sqlrepr(oQuery)):
+            self._dCardDecks.setdefault(iAbsId, {})
+            self._dCardDecks[iAbsId][iDeckId] = iCount
+            self._dDeckCards[iDeckId][iAbsId] = iCount
+
+    def has_holders(self):
+        """Return True if there are TWDA holders in the database"""
+        self.refresh()
+        return bool(self._dHolders)
+
+    def get_deck_names(self):
+        """Return the names of all the TWDA decks in the index"""
+        self.refresh()
+        return list(self._dDeckNames.values())
+
+    def get_deck_count(self):
+        """Return the number of TWDA decks in the index"""
+        self.refresh()
+        return len(self._dDecks)
+
+    def involves(self, oCardSet):
+        """Return True if the card set is a deck or holder in the index."""
+        return oCardSet.id in self._dDecks or oCardSet.id in self._dHolders
+
+    def get_card_decks(self, oAbsCard):
+        """Return a dictionary of deck id -> count for the given card"""
+        self.refresh()
+        return self._dCardDecks.get(oAbsCard.id, {})
+
+    def find_decks(self, aAbsCards, iMinMatches=1):
+        """Find the decks containing at least iMinMatches of the given
+           abstract cards.
+
+           Returns a dictionary of PhysicalCardSet -> {card name: count}.
+           """
+        self.refresh()
+        dMatches = {}
+        for oAbsCard in set(aAbsCards):
+            for iDeckId, iCount in self._dCardDecks.get(oAbsCard.id,
+                                                        {}).items():
+                dMatches.setdefault(iDeckId, {})
+                dMatches[iDeckId][oAbsCard.name] = iCount
+        dCardSets = {}
+        for iDeckId, dCards in dMatches.items():
+            if len(dCards) >= iMinMatches:
+                dCardSets[PhysicalCardSet.get(iDeckId)] = dCards
+        return dCardSets
+
+    def _get_co_counts(self, iAbsId):
+        """Return the number of decks each card shares with the given card.
+
+           Results are cached until the index changes."""
+        if iAbsId not in self._dCoOccurCache:
+            oCounts = Counter()
+            for iDeckId in self._dCardDecks.get(iAbsId, {}):
+                oCounts.update(self._dDeckCards[iDeckId].keys())
+            oCounts.pop(iAbsId, None)
+            self._dCoOccurCache[iAbsId] = oCounts
+        return self._dCoOccurCache[iAbsId]
+
+    def get_co_occurrences(self, oAbsCard, iTopN=20, sOrder=CO_DECKS,
+                           iMinDecks=1):
+        """Return the cards most often played alongside oAbsCard.
+
+           Returns a list of (AbstractCard, decks in common, confidence,
+           lift) tuples, where confidence is the fraction of the decks
+           containing oAbsCard that also contain the other card, and lift
+           is how much more often the cards appear together than would be
+           expected if they were independent.
+
+           sOrder is either CO_DECKS, to order by the number of decks in
+           common, or CO_LIFT to order by lift. Only cards sharing at least
+           iMinDecks decks are considered."""
+        self.refresh()
+        iCardDecks = len(self._dCardDecks.get(oAbsCard.id, {}))
+        if not iCardDecks:
+            return []
+        iTotal = len(self._dDecks)
+        oCounts = self._get_co_counts(oAbsCard.id)
+
+        def _lift(iAbsId):
+            """Calculate the lift for the pair"""
+            return (float(oCounts[iAbsId] * iTotal) /
+                    (iCardDecks * len(self._dCardDecks[iAbsId])))
+
+        aCandidates = [x for x, y in oCounts.items() if y >= iMinDecks]
+        if sOrder == CO_LIFT:
+            aTop = heapq.nlargest(iTopN, aCandidates,
+                                  key=lambda x: (_lift(x), oCounts[x]))
+        else:
+            aTop = heapq.nlargest(iTopN, aCandidates,
+                                  key=lambda x: (oCounts[x], _lift(x)))
+        return [(AbstractCard.get(x), oCounts[x],
+                 float(oCounts[x]) / iCardDecks, _lift(x)) for x in aTop]
+
+
+# Shared index for the application, so we only rebuild this when needed
+TWDA_INDEX = TWDAIndex()
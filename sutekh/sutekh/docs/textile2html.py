@@ -20,11 +20,11 @@ sModPath = os.path.join(os.path.dirname(__file__), '..', '..')
 sys.path.append(sInfoPath)
 sys.path.append(sModPath)
 SutekhInfo = importlib.import_module("SutekhInfo").SutekhInfo
-sutekh_package = importlib.import_module("sutekh")
 
 # Import filter info
-Filters = sutekh_package.core.Filters
-FilterParser = sutekh_package.base.core.FilterParser
+# The filters need to be imported before the filter parser
+Filters = importlib.import_module('.core.Filters', 'sutekh')
+FilterParser = importlib.import_module('.base.core.FilterParser', 'sutekh')
 # Import docutils
 DocUtils = importlib.import_module('.base.docs.DocUtils', 'sutekh')
 
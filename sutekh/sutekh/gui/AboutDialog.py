@@ -25,7 +25,7 @@ class SutekhAboutDialog(Gtk.AboutDialog):
         self.set_version(SutekhInfo.VERSION_STR)
         self.set_copyright(SutekhInfo.LICENSE)
         self.set_comments(SutekhInfo.DESCRIPTION)
-        self.set_license(SutekhInfo.LICENSE_TEXT)
+        self.set_license(SutekhInfo.get_license_text())
         self.set_wrap_license(False)  # don't automatically wrap license text
         self.set_website(SutekhInfo.SOURCEFORGE_URL)
         self.set_website_label("Website")
@@ -20,6 +20,6 @@ class PluginManager(BasePluginManager):
     cAppPlugin = SutekhPlugin
     sPluginDir = "sutekh.gui.plugins"
 
-    def load_plugins(self):
+    def load_plugins(self, bDefer=False):
         """Load list of Plugin Classes from plugin dir."""
-        self._do_load_plugins(plugins)
+        self._do_load_plugins(plugins, bDefer)
@@ -111,7 +111,7 @@ class ExtraCardViewColumns(SutekhPlugin, BaseExtraCardViewColumns):
     def _render_clan(self, _oColumn, oCell, _oModel, oIter, _oDummy):
         """display the clan"""
         oCard = self._get_iter_data(oIter)
-        aText, aIcons = self._get_data_clan(oCard)
+        aText, aIcons = self._get_cell_data(oCard, self._get_data_clan)
         oCell.set_data(aText, aIcons, self._iShowMode)
 
     def _get_data_disciplines(self, oCard, bGetIcons=True):
@@ -148,7 +148,7 @@ class ExtraCardViewColumns(SutekhPlugin, BaseExtraCardViewColumns):
     def _render_disciplines(self, _oColumn, oCell, _oModel, oIter, _oDummy):
         """display the card disciplines"""
         oCard = self._get_iter_data(oIter)
-        aText, aIcons = self._get_data_disciplines(oCard)
+        aText, aIcons = self._get_cell_data(oCard, self._get_data_disciplines)
         oCell.set_data(aText, aIcons, self._iShowMode)
 
     def _get_data_group(self, oCard, _bGetIcons=True):
@@ -161,7 +161,7 @@ class ExtraCardViewColumns(SutekhPlugin, BaseExtraCardViewColumns):
     def _render_group(self, _oColumn, oCell, _oModel, oIter, _oDummy):
         """Display the group info"""
         oCard = self._get_iter_data(oIter)
-        iGrp, aIcons = self._get_data_group(oCard)
+        iGrp, aIcons = self._get_cell_data(oCard, self._get_data_group)
         if iGrp != -100:
             if iGrp == -1:
                 oCell.set_data(['Any'], aIcons, SHOW_TEXT_ONLY)
@@ -181,7 +181,7 @@ class ExtraCardViewColumns(SutekhPlugin, BaseExtraCardViewColumns):
     def _render_capacity(self, _oColumn, oCell, _oModel, oIter, _oDummy):
         """Display capacity in the column"""
         oCard = self._get_iter_data(oIter)
-        iCap, aIcons = self._get_data_capacity(oCard)
+        iCap, aIcons = self._get_cell_data(oCard, self._get_data_capacity)
         aText = format_number(iCap)
         oCell.set_data(aText, aIcons, SHOW_TEXT_ONLY)
 
@@ -211,7 +211,8 @@ class ExtraCardViewColumns(SutekhPlugin, BaseExtraCardViewColumns):
     def _render_cost(self, _oColumn, oCell, _oModel, oIter, _oDummy):
         """Display cost in the column"""
         oCard = self._get_iter_data(oIter)
-        iCost, sCostType, aIcons = self._get_data_cost(oCard)
+        iCost, sCostType, aIcons = self._get_cell_data(oCard,
+                                                       self._get_data_cost)
         if iCost > 0:
             oCell.set_data(["%d %s" % (iCost, sCostType)], aIcons,
                            SHOW_TEXT_ONLY)
@@ -235,7 +236,7 @@ class ExtraCardViewColumns(SutekhPlugin, BaseExtraCardViewColumns):
     def _render_title(self, _oColumn, oCell, _oModel, oIter, _oDummy):
         """Display title in the column"""
         oCard = self._get_iter_data(oIter)
-        aTitles, aIcons = self._get_data_title(oCard)
+        aTitles, aIcons = self._get_cell_data(oCard, self._get_data_title)
         oCell.set_data(aTitles, aIcons, SHOW_TEXT_ONLY)
 
     def _get_data_sect(self, oCard, bGetIcons=True):
@@ -252,7 +253,7 @@ class ExtraCardViewColumns(SutekhPlugin, BaseExtraCardViewColumns):
     def _render_sect(self, _oColumn, oCell, _oModel, oIter, _oDummy):
         """Display sect in the column"""
         oCard = self._get_iter_data(oIter)
-        aSects, aIcons = self._get_data_sect(oCard)
+        aSects, aIcons = self._get_cell_data(oCard, self._get_data_sect)
         oCell.set_data(aSects, aIcons, SHOW_TEXT_ONLY)
 
 
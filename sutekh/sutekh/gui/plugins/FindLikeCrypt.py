@@ -13,6 +13,8 @@ from sutekh.base.core.BaseAdapters import (IAbstractCard, IPhysicalCard,
                                            IPhysicalCardSet)
 from sutekh.core.SutekhTables import SutekhAbstractCard
 from sutekh.base.core.BaseFilters import CardTypeFilter, FilterAndBox
+from sutekh.base.core.CardSetCounts import CARD_SET_COUNTS
+from sutekh.base.core.SharedCardLists import SHARED_CARD_LISTS
 from sutekh.core.Filters import (MultiGroupFilter, MultiVirtueFilter,
                                  MultiDisciplineFilter,
                                  MultiDisciplineLevelFilter)
@@ -386,6 +388,8 @@ class FindLikeVampires(SutekhPlugin):
                 # pylint: disable=no-member
                 # SQLObject confuses pylint
                 oCardSet.addPhysicalCard(IPhysicalCard((oCard, None)))
+            CARD_SET_COUNTS.invalidate_set(oCardSet)
+            SHARED_CARD_LISTS.invalidate_set(oCardSet)
             self._open_cs(sCSName, True)
 
 
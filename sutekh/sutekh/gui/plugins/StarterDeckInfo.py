@@ -11,19 +11,21 @@ from io import BytesIO
 
 from gi.repository import Gtk
 
-from sqlobject import SQLObjectNotFound
+from sqlobject import SQLObjectNotFound, sqlhub
+from sqlobject.sqlbuilder import Select, AND, IN, func
 
-from sutekh.base.core.BaseTables import (PhysicalCardSet,
+from sutekh.base.core.BaseTables import (PhysicalCardSet, PhysicalCard,
                                          MapPhysicalCardToPhysicalCardSet)
 from sutekh.base.core.BaseAdapters import (IRarityPair, IPhysicalCardSet,
                                            IExpansion)
-from sutekh.base.core.BaseFilters import (PhysicalCardSetFilter,
-                                          FilterAndBox, SpecificCardIdFilter)
 from sutekh.base.core.DBSignals import (listen_row_destroy, listen_row_update,
-                                        listen_row_created,
+                                        listen_row_created, listen_changed,
+                                        listen_batch_changed,
                                         disconnect_row_destroy,
                                         disconnect_row_update,
-                                        disconnect_row_created)
+                                        disconnect_row_created,
+                                        disconnect_changed,
+                                        disconnect_batch_changed)
 from sutekh.base.io.UrlOps import urlopen_with_timeout
 from sutekh.base.gui.MessageBus import MessageBus, CARD_TEXT_MSG
 from sutekh.base.gui.SutekhDialog import (SutekhDialog,
@@ -206,7 +208,11 @@ class StarterInfoPlugin(SutekhPlugin):
         self.oToggle = None
         self.oLastCard = None
         self.bShowInfo = False
-        self._aStarters = []
+        # card set id -> (type, expansion, displayed expansion, deck name)
+        self._dStarters = {}
+        # abstract card id -> list of (card set id, count)
+        self._dCardIndex = {}
+        self._bIndexValid = False
         # Flag to avoid crashing if we call cleanup early
         # (which may happen in the test suite)
         self._bDoSignalCleanup = False
@@ -214,15 +220,27 @@ class StarterInfoPlugin(SutekhPlugin):
     def cleanup(self):
         """Remove the listener"""
         if self._bDoSignalCleanup:
-            disconnect_row_update(self.card_set_changed, PhysicalCardSet)
-            disconnect_row_destroy(self.card_set_added_deleted,
-                                   PhysicalCardSet)
-            disconnect_row_created(self.card_set_added_deleted,
-                                   PhysicalCardSet)
+            self._disconnect_signals()
             MessageBus.unsubscribe(CARD_TEXT_MSG, 'post_set_text',
                                    self.post_set_card_text)
         super(StarterInfoPlugin, self).cleanup()
 
+    def _connect_signals(self):
+        """Listen for card set changes to manage the cache"""
+        listen_row_update(self.card_set_changed, PhysicalCardSet)
+        listen_row_destroy(self.card_set_added_deleted, PhysicalCardSet)
+        listen_row_created(self.card_set_added_deleted, PhysicalCardSet)
+        listen_changed(self.card_changed, PhysicalCardSet)
+        listen_batch_changed(self.cards_changed, PhysicalCardSet)
+
+    def _disconnect_signals(self):
+        """Disconnect the database listeners"""
+        disconnect_row_update(self.card_set_changed, PhysicalCardSet)
+        disconnect_row_destroy(self.card_set_added_deleted, PhysicalCardSet)
+        disconnect_row_created(self.card_set_added_deleted, PhysicalCardSet)
+        disconnect_changed(self.card_changed, PhysicalCardSet)
+        disconnect_batch_changed(self.cards_changed, PhysicalCardSet)
+
     def get_menu_item(self):
         """Overrides method from base class.
 
@@ -230,10 +248,7 @@ class StarterInfoPlugin(SutekhPlugin):
            """
         MessageBus.subscribe(CARD_TEXT_MSG, 'post_set_text',
                              self.post_set_card_text)
-        # Listen for card set changes to manage the cache
-        listen_row_update(self.card_set_changed, PhysicalCardSet)
-        listen_row_destroy(self.card_set_added_deleted, PhysicalCardSet)
-        listen_row_created(self.card_set_added_deleted, PhysicalCardSet)
+        self._connect_signals()
         self._bDoSignalCleanup = True
 
         # Make sure we add the tag we need
@@ -427,70 +442,103 @@ class StarterInfoPlugin(SutekhPlugin):
 
     def card_set_changed(self, _oCardSet, _dChanges):
         """We listen for card set events, and invalidate the cache"""
-        self._aStarters = []
+        self._bIndexValid = False
 
     def card_set_added_deleted(self, _oCardSet, _dKW=None, _fPostFuncs=None):
         """We listen for card set additions & deletions, and
            invalidate the cache when that occurs"""
-        self._aStarters = []
+        self._bIndexValid = False
+
+    def card_changed(self, oCardSet, _oPhysCard, _iChg):
+        """Invalidate the cache if the cards in a starter deck change"""
+        if oCardSet.id in self._dStarters:
+            self._bIndexValid = False
+
+    def cards_changed(self, dChanges):
+        """Invalidate the cache if a batch of changes affects a starter"""
+        for oCardSet in dChanges:
+            self.card_changed(oCardSet, None, None)
+
+    def _match_starter(self, sName):
+        """Return the (type, match) for a starter deck name, or
+           (None, None) if the name isn't a starter deck."""
+        for sType, oRegex in (('Starters', self.oStarterRegex),
+                              ('Fixed', self.oFixedRegex),
+                              ('Demos', self.oDemoRegex)):
+            oMatch = oRegex.match(sName)
+            if oMatch:
+                return sType, oMatch
+        return None, None
 
     def _cache_starters(self):
-        """Lookup the starter decks and cache them to avoid repeated queries"""
+        """Build the card to starter deck index.
+
+           The starter deck names are parsed once, and the card counts for
+           all the starter decks are retrieved with a single query."""
+        # pylint: disable=no-member
+        # SQLObject confuses pylint
+        self._dStarters = {}
+        self._dCardIndex = {}
         for oCS in PhysicalCardSet.select():
-            for _sType, oRegex in (('Starters', self.oStarterRegex),
-                                   ('Fixed', self.oFixedRegex),
-                                   ('Demos', self.oDemoRegex)):
-                oMatch = oRegex.match(oCS.name)
-                if oMatch:
-                    self._aStarters.append(oCS)
+            sType, oMatch = self._match_starter(oCS.name)
+            if not oMatch:
+                continue
+            sCandExpName = oMatch.groups()[0]
+            # Canonicalise the expansion name, so we can handle cases
+            # Where we want to use the marketing name, even when
+            # it doesn't map to the canonical expansion name
+            try:
+                oExp = IExpansion(sCandExpName)
+                sExpName = oExp.name
+            except SQLObjectNotFound:
+                # Just fall through and fail on the check when
+                # looking up cards
+                sExpName = sCandExpName
+            sDeckName = oMatch.groups()[1]
+            for iPostfix in self.aPostfixes:
+                if len(oMatch.groups()) <= iPostfix:
+                    break
+                if oMatch.groups()[iPostfix]:
+                    sDeckName += ' ' + oMatch.groups()[iPostfix]
+            self._dStarters[oCS.id] = (sType, sExpName, sCandExpName,
+                                       sDeckName)
+        self._bIndexValid = True
+        if not self._dStarters:
+            return
+        oConn = sqlhub.processConnection
+        oQuery = Select(
+            (PhysicalCard.q.abstractCardID,
+             MapPhysicalCardToPhysicalCardSet.q.physicalCardSetID,
+             func.COUNT(MapPhysicalCardToPhysicalCardSet.q.id)),
+            where=AND(
+                PhysicalCard.q.id ==
+                MapPhysicalCardToPhysicalCardSet.q.physicalCardID,
+                IN(MapPhysicalCardToPhysicalCardSet.q.physicalCardSetID,
+                   list(self._dStarters))),
+            groupBy=(PhysicalCard.q.abstractCardID,
+                     MapPhysicalCardToPhysicalCardSet.q.physicalCardSetID))
+        for iAbsId, iCSId, iCount in oConn.queryAll(oConn.sqlrepr(oQuery)):
+            self._dCardIndex.setdefault(iAbsId, []).append((iCSId, iCount))
 
     def _get_card_set_info(self, oAbsCard):
         """Find preconstructed card sets that contain the card"""
-        if not self._aStarters:
+        if not self._bIndexValid:
             self._cache_starters()
         dMatches = {'Starters': [], 'Demos': [], 'Fixed': []}
-        for oCS in self._aStarters:
-            for sType, oRegex in (('Starters', self.oStarterRegex),
-                                  ('Fixed', self.oFixedRegex),
-                                  ('Demos', self.oDemoRegex)):
-                oMatch = oRegex.match(oCS.name)
-                if oMatch:
-                    sCandExpName = oMatch.groups()[0]
-                    # Canonicalise the expansion name, so we can handle cases
-                    # Where we want to use the marketing name, even when
-                    # it doesn't map to the canonical expansion name
-                    try:
-                        oExp = IExpansion(sCandExpName)
-                        sExpName = oExp.name
-                    except SQLObjectNotFound:
-                        # Just fall through and fail on the next check
-                        sExpName = sCandExpName
-                    if _check_exp_name(sExpName, oAbsCard):
-                        sDeckName = oMatch.groups()[1]
-                        for iPostfix in self.aPostfixes:
-                            if len(oMatch.groups()) <= iPostfix:
-                                break
-                            if oMatch.groups()[iPostfix]:
-                                sDeckName += ' ' + oMatch.groups()[iPostfix]
-                        dMatches[sType].append((oCS, oMatch.groups()[0],
-                                                sDeckName))
-
-        # Find the card in the starter decks
+        for iCSId, iCount in self._dCardIndex.get(oAbsCard.id, []):
+            sType, sExpName, sCandExpName, sDeckName = self._dStarters[iCSId]
+            if _check_exp_name(sExpName, oAbsCard):
+                dMatches[sType].append((sCandExpName, sDeckName, iCount))
+
         dInfo = {'Starters': [], 'Demos': [], 'Fixed': []}
         for sType, aResults in dMatches.items():
-            for oCS, sExpName, sDeckName in sorted(aResults,
-                                                   key=lambda x: (x[1], x[2])):
-                # Sort by exp, name
-                oFilter = FilterAndBox([SpecificCardIdFilter(oAbsCard.id),
-                                        PhysicalCardSetFilter(oCS.name)])
-                iCount = oFilter.select(
-                    MapPhysicalCardToPhysicalCardSet).count()
-                if iCount > 0:
-                    dInfo[sType].append("x %(count)d %(exp)s (%(cardset)s)" % {
-                        'count': iCount,
-                        'exp': sExpName,
-                        'cardset': sDeckName,
-                        })
+            # Sort by exp, name
+            for sExpName, sDeckName, iCount in sorted(aResults):
+                dInfo[sType].append("x %(count)d %(exp)s (%(cardset)s)" % {
+                    'count': iCount,
+                    'exp': sExpName,
+                    'cardset': sDeckName,
+                    })
         return dInfo
 
     def post_set_card_text(self, oPhysCard):
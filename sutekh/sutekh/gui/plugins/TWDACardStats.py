@@ -0,0 +1,255 @@
+# -*- coding: utf-8 -*-
+# vim:fileencoding=utf-8 ai ts=4 sts=4 et sw=4
+# Copyright 2026 Neil Muller <drnlmuller+sutekh@gmail.com>
+# GPL - see COPYING for details
+
+"""Pane showing which cards are played together in the TWDA decks"""
+
+from gi.repository import GLib, Gtk
+
+from sutekh.base.core.BaseTables import PhysicalCardSet
+from sutekh.base.core.DBSignals import (listen_row_destroy, listen_row_update,
+                                        listen_row_created, listen_changed,
+                                        listen_batch_changed,
+                                        disconnect_row_destroy,
+                                        disconnect_row_update,
+                                        disconnect_row_created,
+                                        disconnect_changed,
+                                        disconnect_batch_changed)
+from sutekh.base.gui.BasicFrame import BasicFrame
+from sutekh.base.gui.AutoScrolledWindow import AutoScrolledWindow
+from sutekh.base.gui.MessageBus import MessageBus, CARD_TEXT_MSG
+
+from sutekh.core.TWDAIndex import TWDA_INDEX, CO_DECKS, CO_LIFT
+from sutekh.gui.PluginManager import SutekhPlugin
+
+
+class TWDAStatsFrame(BasicFrame):
+    # pylint: disable=too-many-public-methods
+    # Gtk.Widget, so many public methods
+    # pylint: disable=property-on-old-class
+    # Gtk classes aren't old-style, but pylint thinks they are
+    """Frame listing the cards most often played with the selected card
+       in the TWDA decks."""
+
+    sMenuFlag = 'TWDA Card Statistics'
+
+    ORDERS = {
+        'Decks in common': CO_DECKS,
+        'Lift': CO_LIFT,
+    }
+
+    def __init__(self, oMainWindow):
+        super(TWDAStatsFrame, self).__init__(oMainWindow)
+        self._oAbsCard = None
+        self._iRedrawId = None
+        oVBox = Gtk.VBox(homogeneous=False, spacing=2)
+        self._oCardLabel = Gtk.Label()
+        oVBox.pack_start(self._oCardLabel, False, False, 2)
+
+        oHBox = Gtk.HBox(homogeneous=False, spacing=2)
+        oHBox.pack_start(Gtk.Label(label="Show top"), False, False, 2)
+        self._oTopN = Gtk.SpinButton()
+        self._oTopN.set_adjustment(Gtk.Adjustment(value=20, lower=1,
+                                                  upper=500, step_incr=1))
+        oHBox.pack_start(self._oTopN, False, False, 2)
+        oHBox.pack_start(Gtk.Label(label="ordered by"), False, False, 2)
+        self._oOrder = Gtk.ComboBoxText()
+        for sOrder in sorted(self.ORDERS):
+            self._oOrder.append_text(sOrder)
+        self._oOrder.set_active(0)
+        oHBox.pack_start(self._oOrder, False, False, 2)
+        oVBox.pack_start(oHBox, False, False, 2)
+
+        # Card name, decks in common, % of decks, lift
+        self._oStore = Gtk.ListStore(str, int, str, str)
+        oTree = Gtk.TreeView(model=self._oStore)
+        for iCol, sTitle in enumerate(('Card', 'Decks', '% of decks',
+                                       'Lift')):
+            oColumn = Gtk.TreeViewColumn(sTitle, Gtk.CellRendererText(),
+                                         text=iCol)
+            oTree.append_column(oColumn)
+        oVBox.pack_start(AutoScrolledWindow(oTree), True, True, 0)
+
+        self._oView = oVBox
+        self.set_drag_handler(oTree)
+        self.set_drop_handler(oTree)
+
+        self._oTopN.connect('value-changed', self._update_stats)
+        self._oOrder.connect('changed', self._update_stats)
+
+    type = property(fget=lambda self: self.sMenuFlag, doc="Frame Type")
+
+    def frame_setup(self):
+        """Subscribe to the set_card_text signal and the card set
+           changes which update the TWDA index"""
+        MessageBus.subscribe(CARD_TEXT_MSG, 'set_card_text',
+                             self.set_card_text)
+        listen_row_update(self.card_set_changed, PhysicalCardSet)
+        listen_row_destroy(self.card_set_added_deleted, PhysicalCardSet)
+        listen_row_created(self.card_set_added_deleted, PhysicalCardSet)
+        listen_changed(self.card_changed, PhysicalCardSet)
+        listen_batch_changed(self.cards_changed, PhysicalCardSet)
+        super(TWDAStatsFrame, self).frame_setup()
+
+    def cleanup(self, bQuit=False):
+        """Remove the listeners"""
+        MessageBus.unsubscribe(CARD_TEXT_MSG, 'set_card_text',
+                               self.set_card_text)
+        disconnect_row_update(self.card_set_changed, PhysicalCardSet)
+        disconnect_row_destroy(self.card_set_added_deleted, PhysicalCardSet)
+        disconnect_row_created(self.card_set_added_deleted, PhysicalCardSet)
+        disconnect_changed(self.card_changed, PhysicalCardSet)
+        disconnect_batch_changed(self.cards_changed, PhysicalCardSet)
+        if self._iRedrawId is not None:
+            GLib.source_remove(self._iRedrawId)
+            self._iRedrawId = None
+        super(TWDAStatsFrame, self).cleanup(bQuit)
+
+    def _queue_redraw(self):
+        """Redraw the statistics for the current card once the
+           TWDA index has been updated.
+
+           We wait until the main loop is idle, since the index is marked
+           as changed by the TWDA plugin's listeners, which may be called
+           after ours, and card sets are only removed after the destroy
+           signal."""
+        if self._oAbsCard is not None and self._iRedrawId is None:
+            self._iRedrawId = GLib.idle_add(self._redraw)
+
+    def _redraw(self):
+        """Redraw the statistics from the idle handler"""
+        self._iRedrawId = None
+        self._update_stats(None)
+        # Don't call us again
+        return False
+
+    def card_set_changed(self, _oCardSet, _dChanges):
+        """Redraw when card sets are renamed or moved, since this may
+           change the TWDA decks"""
+        self._queue_redraw()
+
+    def card_set_added_deleted(self, _oCardSet, _dKW=None,
+                               _fPostFuncs=None):
+        """Redraw when card sets are added or deleted"""
+        self._queue_redraw()
+
+    def card_changed(self, oCardSet, _oPhysCard, _iChg):
+        """Redraw if one of the TWDA decks is edited"""
+        if TWDA_INDEX.involves(oCardSet):
+            self._queue_redraw()
+
+    def cards_changed(self, dChanges):
+        """Redraw if a batch of changes edits one of the TWDA decks"""
+        for oCardSet in dChanges:
+            self.card_changed(oCardSet, None, None)
+
+    def update_to_new_db(self):
+        """Clear the display, since the card may no longer be valid"""
+        self._oAbsCard = None
+        if self._iRedrawId is not None:
+            GLib.source_remove(self._iRedrawId)
+            self._iRedrawId = None
+        self._update_stats(None)
+
+    def set_card_text(self, oPhysCard):
+        """Show the statistics for the newly selected card"""
+        if not oPhysCard:
+            return
+        self._oAbsCard = oPhysCard.abstractCard
+        self._update_stats(None)
+
+    def _update_stats(self, _oWidget):
+        """Fill the list with the co-occurrence stats for the card"""
+        self._oStore.clear()
+        if self._oAbsCard is None:
+            self._oCardLabel.set_text('No card selected')
+            return
+        iTopN = int(self._oTopN.get_value())
+        sOrder = self.ORDERS[self._oOrder.get_active_text()]
+        iCardDecks = len(TWDA_INDEX.get_card_decks(self._oAbsCard))
+        self._oCardLabel.set_text('%s: in %d of %d TWDA decks' % (
+            self._oAbsCard.name, iCardDecks, TWDA_INDEX.get_deck_count()))
+        for oCard, iDecks, fConfidence, fLift in \
+                TWDA_INDEX.get_co_occurrences(self._oAbsCard, iTopN, sOrder):
+            self._oStore.append((oCard.name, iDecks,
+                                 '%.1f' % (100 * fConfidence),
+                                 '%.2f' % fLift))
+
+    def get_menu_name(self):
+        """Return the menu key"""
+        return self.sMenuFlag
+
+
+class TWDACardStats(SutekhPlugin):
+    """Plugin providing the TWDA card statistics pane."""
+    dTableVersions = {PhysicalCardSet: (5, 6, 7)}
+    aModelsSupported = ("MainWindow",)
+
+    _sMenuFlag = TWDAStatsFrame.sMenuFlag
+
+    def __init__(self, *args, **kwargs):
+        super(TWDACardStats, self).__init__(*args, **kwargs)
+        self._oStatsFrame = None
+        self._oReplaceItem = None
+        self._oAddItem = None
+
+    def _get_frame(self):
+        """Create the frame if needed"""
+        if not self._oStatsFrame:
+            self._oStatsFrame = TWDAStatsFrame(self.parent)
+            self._oStatsFrame.set_title(self._sMenuFlag)
+            self._oStatsFrame.add_parts()
+        return self._oStatsFrame
+
+    def cleanup(self):
+        """Cleanup listeners if required"""
+        if self._oStatsFrame:
+            self._oStatsFrame.cleanup()
+        super(TWDACardStats, self).cleanup()
+
+    def get_menu_item(self):
+        """Overrides method from base class.
+
+           Adds the add & replace pane menu items."""
+        self._oReplaceItem = Gtk.MenuItem(
+            label="Replace with TWDA Card Statistics")
+        self._oReplaceItem.connect("activate", self.replace_pane)
+
+        self._oAddItem = Gtk.MenuItem(label="Add TWDA Card Statistics")
+        self._oAddItem.connect("activate", self.add_pane)
+        self.parent.add_to_menu_list(self._sMenuFlag,
+                                     self.add_stats_frame_active)
+        return [('Add Pane', self._oAddItem),
+                ('Replace Pane', self._oReplaceItem)]
+
+    def add_stats_frame_active(self, bValue):
+        """Toggle the sensitivity of the menu items."""
+        self._oReplaceItem.set_sensitive(bValue)
+        self._oAddItem.set_sensitive(bValue)
+
+    def get_frame_from_config(self, sType):
+        """Add the frame if it's been saved in the config file."""
+        if sType == self._sMenuFlag:
+            return self._get_frame()
+        return None
+
+    def replace_pane(self, _oWidget):
+        """Handle replacing a frame in the main window if required"""
+        if not self.parent.is_open_by_menu_name(self._sMenuFlag):
+            oNewPane = self.parent.focussed_pane
+            if oNewPane:
+                oFrame = self._get_frame()
+                oFrame.set_unique_id()
+                self.parent.replace_frame(oNewPane, oFrame)
+
+    def add_pane(self, _oWidget):
+        """Handle adding the frame to the main window if required"""
+        if not self.parent.is_open_by_menu_name(self._sMenuFlag):
+            oNewPane = self.parent.add_pane_end()
+            oFrame = self._get_frame()
+            oFrame.set_unique_id()
+            self.parent.replace_frame(oNewPane, oFrame)
+
+
+plugin = TWDACardStats
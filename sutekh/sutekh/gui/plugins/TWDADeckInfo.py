@@ -5,7 +5,6 @@
 
 """Adds info about the TWDA decks cards are found in"""
 
-import re
 import datetime
 from logging import Logger
 from io import BytesIO
@@ -14,12 +13,16 @@ from gi.repository import Gtk
 
 from sqlobject import SQLObjectNotFound
 
-from sutekh.base.core.BaseTables import (PhysicalCardSet, PhysicalCard,
-                                         MapPhysicalCardToPhysicalCardSet)
-from sutekh.base.core.BaseAdapters import IAbstractCard, IPhysicalCardSet
-from sutekh.base.core.BaseFilters import (FilterOrBox, FilterAndBox,
-                                          SpecificCardFilter,
-                                          MultiPhysicalCardSetMapFilter)
+from sutekh.base.core.BaseTables import PhysicalCardSet, PhysicalCard
+from sutekh.base.core.BaseAdapters import IPhysicalCardSet
+from sutekh.base.core.DBSignals import (listen_row_destroy, listen_row_update,
+                                        listen_row_created, listen_changed,
+                                        listen_batch_changed,
+                                        disconnect_row_destroy,
+                                        disconnect_row_update,
+                                        disconnect_row_created,
+                                        disconnect_changed,
+                                        disconnect_batch_changed)
 from sutekh.base.io.UrlOps import urlopen_with_timeout, fetch_data, HashError
 from sutekh.base.gui.SutekhDialog import (SutekhDialog, NotebookDialog,
                                           do_complaint_error)
@@ -31,6 +34,7 @@ from sutekh.base.gui.SutekhFileWidget import add_filter
 from sutekh.base.gui.AutoScrolledWindow import AutoScrolledWindow
 from sutekh.base.gui.GuiDataPack import gui_error_handler
 
+from sutekh.core.TWDAIndex import TWDA_INDEX, TWDA_HOLDER_REGEX
 from sutekh.io.DataPack import find_all_data_packs, DOC_URL
 from sutekh.io.ZipFileWrapper import ZipFileWrapper
 from sutekh.gui.PluginManager import SutekhPlugin
@@ -128,13 +132,44 @@ class TWDAConfigDialog(SutekhDialog):
         return find_all_data_packs('twd', fErrorHandler=gui_error_handler)
 
 
+class MinMatchesDialog(SutekhDialog):
+    # pylint: disable=too-many-public-methods
+    # Gtk Widget, so has many public methods
+    """Dialog for choosing the minimum number of selected cards to match."""
+
+    def __init__(self, oParent, iNumCards):
+        super(MinMatchesDialog, self).__init__(
+            'Find TWDA decks containing at least ...',
+            oParent,
+            Gtk.DialogFlags.MODAL | Gtk.DialogFlags.DESTROY_WITH_PARENT,
+            ("_OK", Gtk.ResponseType.OK,
+             "_Cancel", Gtk.ResponseType.CANCEL))
+        oAdj = Gtk.Adjustment(value=min(2, iNumCards), lower=1,
+                              upper=iNumCards, step_incr=1)
+        self._oMinSpin = Gtk.SpinButton()
+        self._oMinSpin.set_adjustment(oAdj)
+        oHbox = Gtk.HBox()
+        oHbox.pack_start(Gtk.Label(label="Match at least"), False, True, 5)
+        oHbox.pack_start(self._oMinSpin, False, True, 0)
+        oHbox.pack_start(Gtk.Label(label="of the %d selected cards" %
+                                   iNumCards), False, True, 5)
+        # pylint: disable=no-member
+        # vbox confuses pylint
+        self.vbox.pack_start(oHbox, False, True, 0)
+        self.show_all()
+
+    def get_min_matches(self):
+        """Return the chosen number of cards to match"""
+        return int(self._oMinSpin.get_value())
+
+
 class TWDAInfoPlugin(SutekhPlugin):
     """Plugin providing access to TWDA decks."""
     dTableVersions = {PhysicalCardSet: (5, 6, 7)}
     aModelsSupported = (PhysicalCardSet, PhysicalCard, 'MainWindow')
 
     # pattern for TWDA holders
-    oTWDARegex = re.compile('^TWDA ([0-9]{4})$')
+    oTWDARegex = TWDA_HOLDER_REGEX
 
     dGlobalConfig = {
         'twda configured': 'option("Yes", "No", "Unasked", default="Unasked")',
@@ -149,8 +184,10 @@ class TWDAInfoPlugin(SutekhPlugin):
                    deck archive for decks containing specific combinations of
                    cards.
 
-                   You can either search for all the selected cards or for
-                   those that contain at least 1 of the selected cards.
+                   You can either search for all the selected cards, for
+                   those that contain at least 1 of the selected cards, or
+                   for those that contain at least a chosen number of the
+                   selected cards.
 
                    The results are grouped by year, and list the number of
                    matching card found in each listed deck. The matching
@@ -165,6 +202,33 @@ class TWDAInfoPlugin(SutekhPlugin):
         super(TWDAInfoPlugin, self).__init__(*args, **kwargs)
         self.oAllTWDA = None
         self.oAnyTWDA = None
+        self.oMinTWDA = None
+        # Flag to avoid crashing if we call cleanup early
+        # (which may happen in the test suite)
+        self._bDoSignalCleanup = False
+
+    def cleanup(self):
+        """Remove the listeners"""
+        if self._bDoSignalCleanup:
+            self._disconnect_signals()
+            self._bDoSignalCleanup = False
+        super(TWDAInfoPlugin, self).cleanup()
+
+    def _connect_signals(self):
+        """Listen for card set changes to keep the index current"""
+        listen_row_update(self.card_set_changed, PhysicalCardSet)
+        listen_row_destroy(self.card_set_added_deleted, PhysicalCardSet)
+        listen_row_created(self.card_set_added_deleted, PhysicalCardSet)
+        listen_changed(self.card_changed, PhysicalCardSet)
+        listen_batch_changed(self.cards_changed, PhysicalCardSet)
+
+    def _disconnect_signals(self):
+        """Disconnect the database listeners"""
+        disconnect_changed(self.card_changed, PhysicalCardSet)
+        disconnect_batch_changed(self.cards_changed, PhysicalCardSet)
+        disconnect_row_update(self.card_set_changed, PhysicalCardSet)
+        disconnect_row_destroy(self.card_set_added_deleted, PhysicalCardSet)
+        disconnect_row_created(self.card_set_added_deleted, PhysicalCardSet)
 
     def get_menu_item(self):
         """Overrides method from base class.
@@ -172,6 +236,10 @@ class TWDAInfoPlugin(SutekhPlugin):
            Adds the menu item to the analyze menu.
            """
         if self.model is None:
+            # The shared TWDA index is kept current by the main window
+            # instance, so we only listen for changes once
+            self._connect_signals()
+            self._bDoSignalCleanup = True
             # Add entry to the data download menu
             oDownload = Gtk.MenuItem(label="Download TWDA decks")
             oDownload.connect('activate', self.do_download)
@@ -186,12 +254,12 @@ class TWDAInfoPlugin(SutekhPlugin):
         self.oAnyTWDA = Gtk.MenuItem(label="ANY selected cards")
         oSubMenu.add(self.oAnyTWDA)
         self.oAnyTWDA.connect("activate", self.find_twda, "any")
-        if self.check_enabled():
-            self.oAnyTWDA.set_sensitive(True)
-            self.oAllTWDA.set_sensitive(True)
-        else:
-            self.oAnyTWDA.set_sensitive(False)
-            self.oAllTWDA.set_sensitive(False)
+        self.oMinTWDA = Gtk.MenuItem(label="AT LEAST N selected cards")
+        oSubMenu.add(self.oMinTWDA)
+        self.oMinTWDA.connect("activate", self.find_twda, "min")
+        bEnabled = self.check_enabled()
+        for oItem in (self.oAnyTWDA, self.oAllTWDA, self.oMinTWDA):
+            oItem.set_sensitive(bEnabled)
         return ('Analyze', oTWDMenu)
 
     def find_twda(self, _oWidget, sMode):
@@ -201,45 +269,25 @@ class TWDAInfoPlugin(SutekhPlugin):
         if not aAbsCards:
             do_complaint_error('Need to select some cards for this plugin')
             return
-        if len(aAbsCards) > 20:
-            do_complaint_error('Too many cards selected (%d). Please select '
-                               'no more than 20 cards' % len(aAbsCards))
-            return
-        aCardFilters = []
         iTotCards = len(aAbsCards)
-        for oCard in aAbsCards:
-            aCardFilters.append(SpecificCardFilter(oCard))
-        # needs to be OR, since we're matching against the card to card set
-        # mapping table
-        oCardFilter = FilterOrBox(aCardFilters)
-        aNames = self._get_twda_names()
-        oMapFilter = MultiPhysicalCardSetMapFilter(aNames)
-        oFullFilter = FilterAndBox([oCardFilter, oMapFilter])
-
-        # pylint: disable=no-member
-        # SQLObject confuses pylint
-        dCardSets = {}
-        for oMapCard in oFullFilter.select(MapPhysicalCardToPhysicalCardSet):
-            oCS = oMapCard.physicalCardSet
-            sCardName = IAbstractCard(oMapCard).name
-            dCardSets.setdefault(oCS, {})
-            dCardSets[oCS].setdefault(sCardName, 0)
-            dCardSets[oCS][sCardName] += 1
-
-        if sMode == 'all' and iTotCards > 1:
-            # This is a little clunky, but, because of how we construct the
-            # filters, we currently have the any match set, so we need to
-            # filter this down to those that match all the cards
-            for oCS in list(dCardSets):
-                if len(dCardSets[oCS]) != iTotCards:
-                    # Not all, so drop this one
-                    del dCardSets[oCS]
-
         sCards = '",  "'.join(sorted([x.name for x in aAbsCards]))
         if sMode == 'any':
+            iMinMatches = 1
             sMatchText = 'Matching ANY of "%s"' % sCards
-        else:
+        elif sMode == 'all':
+            iMinMatches = iTotCards
             sMatchText = 'Matching ALL of "%s"' % sCards
+        else:
+            oMinDlg = MinMatchesDialog(self.parent, iTotCards)
+            iResponse = oMinDlg.run()
+            iMinMatches = oMinDlg.get_min_matches()
+            oMinDlg.destroy()
+            if iResponse != Gtk.ResponseType.OK:
+                return
+            sMatchText = 'Matching AT LEAST %d of "%s"' % (iMinMatches,
+                                                           sCards)
+
+        dCardSets = TWDA_INDEX.find_decks(aAbsCards, iMinMatches)
 
         # Create a dialog showing the results
         if dCardSets:
@@ -306,33 +354,44 @@ class TWDAInfoPlugin(SutekhPlugin):
 
     def check_enabled(self):
         """check for TWD decks in the database and disable menu if not"""
-        bEnabled = False
-        for oCS in PhysicalCardSet.select():
-            oMatch = self.oTWDARegex.match(oCS.name)
-            if oMatch:
-                bEnabled = True
-                break
-        return bEnabled
+        return TWDA_INDEX.has_holders()
 
     def _get_twda_names(self):
         """Get names of all the TWDA entries in the current database"""
-        aNames = []
-        for oCS in PhysicalCardSet.select():
-            if not oCS.parent or not oCS.inuse:
-                continue
-            oMatch = self.oTWDARegex.match(oCS.parent.name)
-            if oMatch:
-                aNames.append(oCS.name)
-        return aNames
-
-    def _get_twda_holders(self):
-        """Return all the TWDA holders in the current database"""
-        aHolders = []
-        for oCS in PhysicalCardSet.select():
-            oMatch = self.oTWDARegex.match(oCS.name)
-            if oMatch:
-                aHolders.append(oCS)
-        return aHolders
+        return TWDA_INDEX.get_deck_names()
+
+    # pylint: disable=no-self-use
+    # These are database signal handlers, so need to be methods
+
+    def card_set_changed(self, oCardSet, dChanges):
+        """Update the TWDA index if a relevant card set changes"""
+        if set(dChanges).intersection(('name', 'parentID')):
+            # May have created a new holder or moved decks between
+            # holders, so we start afresh
+            TWDA_INDEX.invalidate()
+        else:
+            TWDA_INDEX.mark_changed(oCardSet)
+
+    def card_set_added_deleted(self, oCardSet, _dKW=None, _fPostFuncs=None):
+        """We listen for card set additions & deletions, and
+           update the index when that occurs"""
+        TWDA_INDEX.mark_changed(oCardSet)
+
+    def card_changed(self, oCardSet, _oPhysCard, _iChg):
+        """Update the TWDA index if one of the decks is edited"""
+        if TWDA_INDEX.involves(oCardSet):
+            TWDA_INDEX.mark_changed(oCardSet)
+
+    def cards_changed(self, dChanges):
+        """Update the TWDA index for a batch of changes"""
+        for oCardSet in dChanges:
+            self.card_changed(oCardSet, None, None)
+
+    def update_to_new_db(self):
+        """The database has been replaced, so the index is stale"""
+        TWDA_INDEX.invalidate()
+
+    # pylint: enable=no-self-use
 
     def setup(self):
         """1st time setup tasks"""
@@ -497,8 +556,10 @@ class TWDAInfoPlugin(SutekhPlugin):
             if oCS.parent.name in aToReplace:
                 aToDelete.append(oCS.name)
 
-        return unzip_files_into_db(aZipHolders, "Adding TWDA Data",
-                                   self.parent, aToDelete)
+        bResult = unzip_files_into_db(aZipHolders, "Adding TWDA Data",
+                                      self.parent, aToDelete)
+        TWDA_INDEX.refresh()
+        return bResult
 
     def _unzip_twda_file(self, oFile):
         """Unzip a single zip file containing all the TWDA entries"""
@@ -516,8 +577,10 @@ class TWDAInfoPlugin(SutekhPlugin):
         # We do this to handle card sets being removed from the TWDA
         # correctly
         aToDelete = self._get_twda_names()
-        return unzip_files_into_db([oFile], "Adding TWDA Data", self.parent,
-                                   aToDelete)
+        bResult = unzip_files_into_db([oFile], "Adding TWDA Data",
+                                      self.parent, aToDelete)
+        TWDA_INDEX.refresh()
+        return bResult
 
 
 plugin = TWDAInfoPlugin
@@ -3,3 +3,92 @@
 # Copyright 2006 Simon Cross <hodgestar@gmail.com>
 # GPL - see COPYING for details
 """This is the sutekh.gui.plugins package."""
+
+from sutekh.base.core.BaseTables import (PhysicalCardSet, PhysicalCard,
+                                         Expansion)
+
+# Plugins that are only imported when one of their menu items is first
+# used, so they don't slow down start-up.
+# module name: (models supported, table versions,
+#               [(menu, menu item label), ...])
+# These must match the plugin's aModelsSupported, dTableVersions and
+# get_menu_item, which test_DeferredPlugins checks without needing Gtk.
+# The table versions are checked at start-up, so plugins that don't
+# support the database don't add menu items.
+# Plugins with config options, setup, toolbar widgets, frames or extra
+# dependencies must be loaded at start-up, so aren't listed.
+DEFERRED_PLUGINS = {
+    'AnalyzeCardList': (
+        (PhysicalCardSet,), {PhysicalCardSet: (6, 7)}, [
+            ('Analyze', 'Analyze Deck'),
+            ('Analyze', 'Analyze Deck (Rapids Thoughts)')]),
+    'CSVImporter': (
+        ('MainWindow',), {PhysicalCardSet: (4, 5, 6, 7)}, [
+            ('Import Card Set', 'Import CSV File')]),
+    'CardDrawProbabilities': (
+        (PhysicalCardSet,), {PhysicalCardSet: (4, 5, 6, 7)}, [
+            ('Analyze', 'Card Draw probabilities')]),
+    'CardSetCompare': (
+        (PhysicalCardSet,), {PhysicalCardSet: (5, 6, 7)}, [
+            ('Analyze', 'Compare with another Card Set')]),
+    'CardSetExport': (
+        (PhysicalCardSet,), {PhysicalCardSet: (4, 5, 6, 7)}, [
+            ('Export Card Set', 'Export to JOL format'),
+            ('Export Card Set', 'Export to Lackey CCG format'),
+            ('Export Card Set', 'Export to ARDB Text'),
+            ('Export Card Set', 'Export to text formated used in the TWDA'),
+            ('Export Card Set', 'BBcode output for the V:EKN Forums'),
+            ('Export Card Set', 'Export to ELDB CSV Inventory File'),
+            ('Export Card Set', 'Export to ELDB ELD Deck File'),
+            ('Export Card Set', 'Export to ARDB Inventory XML File'),
+            ('Export Card Set', 'Export to ARDB Deck XML File')]),
+    'CardSetExportCSV': (
+        (PhysicalCardSet,), {PhysicalCardSet: (4, 5, 6, 7)}, [
+            ('Export Card Set', 'Export to CSV')]),
+    'CardSetFromFilter': (
+        (PhysicalCardSet, PhysicalCard), {PhysicalCardSet: (4, 5, 6, 7)}, [
+            ('Filter', 'Card Set From Filter')]),
+    'CardSetImporter': (
+        ('MainWindow',), {PhysicalCardSet: (5, 6, 7)}, [
+            ('Import Card Set', 'Import Card Set in other formats')]),
+    'CardSetIndependence': (
+        (PhysicalCardSet,), {PhysicalCardSet: (5, 6, 7)}, [
+            ('Analyze', 'Test Card Set Independence')]),
+    'CardSetPrint': (
+        (PhysicalCardSet,), {PhysicalCardSet: (5, 6, 7)}, [
+            ('Actions', 'Print Card Set')]),
+    'ClanDisciplineStats': (
+        (PhysicalCard,), {}, [
+            ('Analyze', 'Clan Discipline Stats')]),
+    'ClusterCardList': (
+        (PhysicalCard, PhysicalCardSet), {}, [
+            ('Analyze', 'Cluster Cards')]),
+    'ExpansionStats': (
+        (PhysicalCard,), {Expansion: (4, 5)}, [
+            ('Analyze', 'Expansion Stats')]),
+    'FindLikeCrypt': (
+        (PhysicalCardSet, PhysicalCard), {PhysicalCardSet: (5, 6, 7)}, [
+            ('Analyze', 'Find similar crypt cards')]),
+    'FullBackup': (
+        ('MainWindow',), {}, [
+            ('Backup', 'Save a Full Backup'),
+            ('Backup', 'Restore a Full Backup')]),
+    'ImportFromZipFile': (
+        ('MainWindow',), {}, [
+            ('Import Card Set', 'Import Card Set(s) from zip file')]),
+    'OpeningDrawSimulator': (
+        (PhysicalCardSet,), {PhysicalCardSet: (4, 5, 6, 7)}, [
+            ('Analyze', 'Simulate opening hand')]),
+    'RandomPromoSelector': (
+        (PhysicalCardSet,), {PhysicalCardSet: (4, 5, 6, 7)}, [
+            ('Actions', 'Generate random groups of cards')]),
+    'SetCardExpansions': (
+        (PhysicalCardSet,), {PhysicalCardSet: (5, 6, 7)}, [
+            ('Actions', 'Set selected cards to a single expansion')]),
+    'ShowExportedCardSet': (
+        (PhysicalCardSet,), {}, [
+            ('Actions', 'Display card set in alternative format')]),
+    'SnapshotCardSet': (
+        (PhysicalCardSet,), {PhysicalCardSet: (6, 7)}, [
+            ('Actions', 'Take a snapshot of this card set')]),
+}
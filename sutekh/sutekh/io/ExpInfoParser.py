@@ -8,15 +8,24 @@
 import json
 from logging import Logger
 
-from sutekh.base.core.BaseAdapters import (IExpansion, IPrinting,
-                                           IAbstractCard)
+from sqlobject.sqlbuilder import IN
+
+from sutekh.base.core.BaseTables import (PhysicalCard, Printing,
+                                         PrintingProperty,
+                                         MapPrintingToPrintingProperty)
+from sutekh.base.core.BaseAdapters import IExpansion, IPrinting, IAbstractCard
+from sutekh.base.core.BulkLoad import (CardNameMap, insert_rows,
+                                       select_columns, flush_join_caches)
 
 from sutekh.core.SutekhObjectMaker import SutekhObjectMaker
 
 
 class ExpInfoParser:
     """Parse expansion and printing info from a JSON file and update the
-       database with the correct information."""
+       database with the correct information.
+
+       The printings are looked up as we go, but the properties and
+       physical cards are all added at the end."""
 
     # pylint: disable=too-many-arguments
     # we may need all these arguments for some files
@@ -26,37 +35,42 @@ class ExpInfoParser:
             self.oLogger.addHandler(oLogHandler)
         self.oLogHandler = oLogHandler
         self._oMaker = SutekhObjectMaker()
+        self._oNames = None
+        # printing id -> list of property values
+        self._dProperties = {}
+        # set of (abstract card id, printing id) pairs
+        self._aPhysCards = set()
+
+    def _get_card_id(self, sCardName):
+        """Return the id of the named card"""
+        if self._oNames is None:
+            self._oNames = CardNameMap()
+        tCard = self._oNames.get(sCardName)
+        if tCard is not None:
+            return tCard[0]
+        # Fall back to the adapter, which raises a suitable error if the
+        # card really is missing
+        return IAbstractCard(sCardName).id
 
     def _update_printing(self, oPrinting, dPrintInfo):
-        """Update the specific printing with the required info"""
-        # Clear any existing properties (to ensure we reflect
-        # updates correctly)
-        for oProp in oPrinting.properties:
-            oPrinting.removePrintingProperty(oProp)
+        """Queue the updates for the specific printing"""
+        # Any existing properties are replaced, to ensure we reflect
+        # updates correctly
+        aProps = self._dProperties.setdefault(oPrinting.id, [])
         # Add properties for the variant
         sDate = dPrintInfo.pop('date')
         sBack = dPrintInfo.pop('back')
-        oDateProp = self._oMaker.make_printing_property(
-            "Release Date: %s" % sDate)
-        oBackProp = self._oMaker.make_printing_property(
-            "Back Type: %s" % sBack)
-
-        # pylint: disable=no-member
-        # SQLObject confuses pylint
-        oPrinting.addPrintingProperty(oDateProp)
-        oPrinting.addPrintingProperty(oBackProp)
-        # pylint: enable=no-member
+        aProps.append("Release Date: %s" % sDate)
+        aProps.append("Back Type: %s" % sBack)
 
         aCards = dPrintInfo.pop('cards', [])
         # Create Physical cards for the variant cards if needed
         for sCardName in aCards:
-            oAbsCard = IAbstractCard(sCardName)
-            _oCard = self._oMaker.make_physical_card(oAbsCard, oPrinting)
+            self._aPhysCards.add((self._get_card_id(sCardName),
+                                  oPrinting.id))
         # Any other items in the dict get added 'as-is'
         for sKey, sValue in dPrintInfo.items():
-            oProp = self._oMaker.make_printing_property(
-                "%s: %s" % (sKey, sValue))
-            oPrinting.addProperty(oProp)
+            aProps.append("%s: %s" % (sKey, sValue))
 
     def _handle_expansion(self, sExp, dExpInfo):
         """Handle updating the specific expansion."""
@@ -67,7 +81,51 @@ class ExpInfoParser:
             else:
                 oPrinting = self._oMaker.make_printing(oExp, sVariant)
             self._update_printing(oPrinting, dExpInfo[sVariant])
-            oPrinting.syncUpdate()
+
+    def _save(self):
+        """Add the queued properties and physical cards to the database"""
+        # pylint: disable=no-member
+        # SQLObject confuses pylint
+        dPropIds = dict((sCanonical, iId) for iId, sCanonical in
+                        select_columns(PrintingProperty, 'id',
+                                       'canonicalValue'))
+        dNewProps = {}
+        for aProps in self._dProperties.values():
+            for sValue in aProps:
+                if sValue.lower() not in dPropIds:
+                    dNewProps.setdefault(sValue.lower(), sValue)
+        insert_rows(PrintingProperty, [
+            {'canonicalValue': x, 'value': y} for x, y in dNewProps.items()])
+        if dNewProps:
+            dPropIds = dict((sCanonical, iId) for iId, sCanonical in
+                            select_columns(PrintingProperty, 'id',
+                                           'canonicalValue'))
+
+        aPrintingIds = list(self._dProperties)
+        if aPrintingIds:
+            # An empty IN () isn't valid SQL for all databases
+            MapPrintingToPrintingProperty.deleteMany(IN(
+                MapPrintingToPrintingProperty.q.printingID, aPrintingIds))
+        aMaps = []
+        for iPrintingId, aProps in self._dProperties.items():
+            aPropIds = []
+            for sValue in aProps:
+                iPropId = dPropIds[sValue.lower()]
+                if iPropId not in aPropIds:
+                    aPropIds.append(iPropId)
+                    aMaps.append({'printingID': iPrintingId,
+                                  'printingPropertyID': iPropId})
+        insert_rows(MapPrintingToPrintingProperty, aMaps)
+        flush_join_caches(Printing,
+                          MapPrintingToPrintingProperty.sqlmeta.table)
+
+        aExisting = set(select_columns(PhysicalCard, 'abstractCardID',
+                                       'printingID'))
+        insert_rows(PhysicalCard, [
+            {'abstractCardID': iCardId, 'printingID': iPrintingId}
+            for iCardId, iPrintingId in sorted(self._aPhysCards - aExisting)])
+        self._dProperties = {}
+        self._aPhysCards = set()
 
     def parse(self, fIn):
         """Process the JSON file line into the database"""
@@ -77,3 +135,4 @@ class ExpInfoParser:
         for sExp in dExpInfo:
             self._handle_expansion(sExp, dExpInfo[sExp])
             self.oLogger.info('Added Expansion info: %s', sExp)
+        self._save()
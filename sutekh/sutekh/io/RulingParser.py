@@ -9,14 +9,65 @@
 import re
 from logging import Logger
 
-from sqlobject import SQLObjectNotFound
-
 from sutekh.base.io.SutekhBaseHTMLParser import (SutekhBaseHTMLParser,
                                                  HTMLStateError, LogState,
                                                  LogStateWithInfo)
-from sutekh.base.core.BaseAdapters import IAbstractCard
+from sutekh.base.core.BaseTables import (AbstractCard, Ruling,
+                                         MapAbstractCardToRuling)
+from sutekh.base.core.BulkLoad import (CardNameMap, insert_rows,
+                                       select_columns, flush_join_caches)
+
+
+# Ruling Loader
+class RulingLoader:
+    """Collects the rulings found by the parser, and adds them all to
+       the database at the end."""
+
+    def __init__(self):
+        self._oNames = None
+        self._aRulings = []
 
-from sutekh.core.SutekhObjectMaker import SutekhObjectMaker
+    def get_card(self, sName):
+        """Return the (id, name) pair for the card, or None"""
+        if self._oNames is None:
+            self._oNames = CardNameMap()
+        return self._oNames.get(sName)
+
+    def add_ruling(self, tCard, sText, sCode, sUrl):
+        """Queue a ruling for the card"""
+        self._aRulings.append((tCard[0], sText, sCode, sUrl))
+
+    def save(self):
+        """Add the queued rulings to the database"""
+        # pylint: disable=no-member
+        # SQLObject confuses pylint
+        dExisting = dict((sText, (iId, sUrl)) for iId, sText, sUrl in
+                         select_columns(Ruling, 'id', 'text', 'url'))
+        # Rulings are matched on the text, as with IRuling
+        dNew = {}
+        dUpdates = {}
+        for _iCardId, sText, sCode, sUrl in self._aRulings:
+            if sText in dExisting:
+                if sUrl and sUrl != dExisting[sText][1]:
+                    dUpdates[dExisting[sText][0]] = sUrl
+            elif sText in dNew:
+                if sUrl:
+                    dNew[sText]['url'] = sUrl
+            else:
+                dNew[sText] = {'text': sText, 'code': sCode, 'url': sUrl}
+        insert_rows(Ruling, list(dNew.values()))
+        for iId, sUrl in dUpdates.items():
+            oRuling = Ruling.get(iId)
+            oRuling.url = sUrl
+            oRuling.syncUpdate()
+        if dNew:
+            dExisting = dict((sText, (iId, None)) for iId, sText in
+                             select_columns(Ruling, 'id', 'text'))
+        insert_rows(MapAbstractCardToRuling, [
+            {'abstractCardID': iCardId, 'rulingID': dExisting[sText][0]}
+            for iCardId, sText, _sCode, _sUrl in self._aRulings])
+        flush_join_caches(AbstractCard, MapAbstractCardToRuling.sqlmeta.table)
+        self._aRulings = []
 
 
 # Ruling Saver
@@ -48,34 +99,22 @@ class RuleDict(dict):
         'Ur-Shulgi': 'Ur-Shulgi, The Shepherd',
     }
 
-    def __init__(self, oLogger):
+    def __init__(self, oLoader, oLogger):
         self._oLogger = oLogger
         super(RuleDict, self).__init__()
-        self._oMaker = SutekhObjectMaker()
+        self.oLoader = oLoader
 
     def _find_card(self, sTitle):
-        """Find the abstract card this rules applies to."""
+        """Find the (id, name) pair for the card this rules applies to."""
         sTitle = self._oMasterOut.sub('', sTitle)
         sTitle = self._oCommaThe.sub('', sTitle)
 
-        try:
-            return IAbstractCard(sTitle)
-        except SQLObjectNotFound:
-            pass
-
-        try:
-            return IAbstractCard(self._dOddTitles[sTitle])
-        except KeyError:
-            pass
-        except SQLObjectNotFound:
-            pass
-
-        try:
-            return IAbstractCard(('The ' + sTitle))
-        except SQLObjectNotFound:
-            pass
-
-        return None
+        tCard = self.oLoader.get_card(sTitle)
+        if tCard is None and sTitle in self._dOddTitles:
+            tCard = self.oLoader.get_card(self._dOddTitles[sTitle])
+        if tCard is None:
+            tCard = self.oLoader.get_card('The ' + sTitle)
+        return tCard
 
     def clear_rule(self):
         """Remove current contents of the rule."""
@@ -88,7 +127,7 @@ class RuleDict(dict):
             self[sKey] = sValue
 
     def save(self):
-        """Add the rulings to the database."""
+        """Queue the ruling to be added to the database."""
         if not ('title' in self and 'code' in self
                 and 'text' in self):
             return
@@ -99,25 +138,25 @@ class RuleDict(dict):
         if self['card'] is None:
             return
 
-        self._oLogger.info('Card: %s', self['card'].name)
+        self._oLogger.info('Card: %s', self['card'][1])
 
-        oRuling = self._oMaker.make_ruling(self['text'], self['code'])
-
-        if 'url' in self:
-            oRuling.url = self['url']
-            oRuling.syncUpdate()
-
-        self['card'].addRuling(oRuling)
+        self.oLoader.add_ruling(self['card'], self['text'], self['code'],
+                                self.get('url'))
 
 
 # State Classes
 class NoSection(LogState):
     """Not in any ruling section."""
 
+    def __init__(self, oLoader, oLogger):
+        super(NoSection, self).__init__(oLogger)
+        self._oLoader = oLoader
+
     def transition(self, sTag, _dAttr):
         """Transition to InSection if needed."""
         if sTag == 'p':
-            return InSection(RuleDict(self._oLogger), self._oLogger)
+            return InSection(RuleDict(self._oLoader, self._oLogger),
+                             self._oLogger)
         return self
 
 
@@ -130,8 +169,9 @@ class InSection(LogStateWithInfo):
             return SectionTitle(self._dInfo, self._oLogger)
         elif sTag == 'p':
             # skip to next section
-            return InSection(RuleDict(self._oLogger), self._oLogger)
-        return NoSection(self._oLogger)
+            return InSection(RuleDict(self._dInfo.oLoader, self._oLogger),
+                             self._oLogger)
+        return NoSection(self._dInfo.oLoader, self._oLogger)
 
 
 class SectionTitle(LogStateWithInfo):
@@ -157,9 +197,10 @@ class SectionWithTitle(LogStateWithInfo):
             return SectionRule(self._dInfo, self._oLogger)
         elif sTag == 'p':
             # skip to next section
-            return InSection(RuleDict(self._oLogger), self._oLogger)
+            return InSection(RuleDict(self._dInfo.oLoader, self._oLogger),
+                             self._oLogger)
         elif sTag == '/ul':
-            return NoSection(self._oLogger)
+            return NoSection(self._dInfo.oLoader, self._oLogger)
         return self
 
 
@@ -171,7 +212,7 @@ class SectionRule(LogStateWithInfo):
         if sTag == 'li':
             return InRuleText(self._dInfo, self._oLogger)
         elif sTag == '/ul':
-            return NoSection(self._oLogger)
+            return NoSection(self._dInfo.oLoader, self._oLogger)
         return self
 
 
@@ -236,4 +277,11 @@ class RulingParser(SutekhBaseHTMLParser):
     def reset(self):
         """Reset the parser"""
         super(RulingParser, self).reset()
-        self._oState = NoSection(self._oLogger)
+        self._oLoader = RulingLoader()
+        self._oState = NoSection(self._oLoader, self._oLogger)
+
+    def parse(self, fOpenFile):
+        """Parse the file, and then add the rulings found to the
+           database."""
+        super(RulingParser, self).parse(fOpenFile)
+        self._oLoader.save()
@@ -14,6 +14,9 @@ from sutekh.base.core.DBUtility import refresh_tables
 from sutekh.base.io.EncodedFile import EncodedFile
 from sutekh.base.tests.TestUtils import make_null_handler, create_pkg_tmp_file
 
+# We need this import to ensure we have all the filters imported
+# correctly, even though we don't use it directly
+import sutekh.core.Filters  # pylint: disable=unused-import
 from sutekh.SutekhUtility import (read_white_wolf_list, read_rulings,
                                   read_exp_info_file, read_lookup_data)
 from sutekh.core.SutekhTables import TABLE_LIST
@@ -0,0 +1,148 @@
+# -*- coding: utf-8 -*-
+# vim:fileencoding=utf-8 ai ts=4 sts=4 et sw=4
+# Copyright 2026 Neil Muller <drnlmuller+sutekh@gmail.com>
+# GPL - see COPYING for details
+
+"""Test the cli query daemon"""
+
+import os
+import threading
+import unittest
+from io import StringIO
+
+from mock import patch
+
+from sutekh.base.CliServer import (CliQueryServer, send_query,
+                                   is_daemon_running, SHUTDOWN)
+from sutekh.base.CliUtils import do_print_card
+from sutekh.base.core.FilterParser import FilterParser
+from sutekh.tests.core.test_PhysicalCardSet import make_set_1
+from sutekh.tests.TestCore import SutekhTest
+
+from sutekh.SutekhCli import (DAEMON_COMMANDS, print_card_details,
+                              print_card_set, main_with_args,
+                              make_daemon_refresh)
+
+
+class CliServerTests(SutekhTest):
+    """Run requests through the query daemon"""
+    # pylint: disable=too-many-public-methods
+    # unittest.TestCase, so many public methods
+
+    def _run_client(self, sSocket, aResults):
+        """Send the test requests to the daemon, and then stop it"""
+        try:
+            for dRequest in [
+                    {'command': 'print-card', 'card': 'Alexandra'},
+                    {'command': 'print-cs', 'cs': 'Test Set 1'},
+                    {'command': 'print-card', 'card': 'Swallowed'},
+                    {'command': 'unknown'},
+                    {'command': 'filter'}]:
+                aResults.append(send_query(sSocket, dRequest))
+            # The client passes on the usual options
+            for aArgs in [
+                    ['--filter', "Clan = 'Ahrimane'", '--filter-cs',
+                     'Test Set 1'],
+                    ['--filter', "CardType = 'Reaction'", '--reload-daemon'],
+                    ['--filter', "CardType='Reaction'", '--daemon-stats'],
+                    # Requests for another database are refused
+                    ['--db', 'sqlite:///other.db', '--print-card',
+                     'Alexandra'],
+                    ['--db', 'sqlite:///daemon.db', '--print-card',
+                     'Alexandra']]:
+                with patch('sys.stdout', new_callable=StringIO) as oMock:
+                    iRes = main_with_args(['sutekh-cli', '--use-daemon',
+                                           '--daemon-socket', sSocket] +
+                                          aArgs)
+                    aResults.append((iRes, oMock.getvalue()))
+        finally:
+            send_query(sSocket, {'command': SHUTDOWN})
+
+    def test_daemon(self):
+        """Test the daemon gives the same results as the direct calls"""
+        make_set_1()
+        FilterParser.clear_cache()
+        sSocket = os.path.join(self._sTempDir, 'test.sock')
+        self.assertFalse(is_daemon_running(sSocket))
+        aRefreshed = []
+        oServer = CliQueryServer(sSocket, DAEMON_COMMANDS,
+                                 'sqlite:///daemon.db',
+                                 lambda: aRefreshed.append(True))
+        # The daemon needs to use the database connection from this
+        # thread, so the client runs in the other one
+        aResults = []
+        oThread = threading.Thread(target=self._run_client,
+                                   args=(sSocket, aResults))
+        oThread.start()
+        oServer.serve()
+        oThread.join()
+        self.assertFalse(os.path.exists(sSocket))
+        self.assertEqual(len(aResults), 10)
+        # Known commands check for database changes first
+        self.assertEqual(len(aRefreshed), 10)
+
+        dResponse = aResults[0]
+        self.assertTrue(dResponse['ok'])
+        with patch('sys.stdout', new_callable=StringIO) as oMock:
+            do_print_card('Alexandra', print_card_details)
+            self.assertEqual(dResponse['output'], oMock.getvalue())
+
+        dResponse = aResults[1]
+        self.assertTrue(dResponse['ok'])
+        with patch('sys.stdout', new_callable=StringIO) as oMock:
+            print_card_set('Test Set 1')
+            self.assertEqual(dResponse['output'], oMock.getvalue())
+
+        # Errors are reported, and the daemon carries on
+        self.assertFalse(aResults[2]['ok'])
+        self.assertEqual(aResults[2]['output'],
+                         'Unable to find card Swallowed\n')
+        self.assertFalse(aResults[3]['ok'])
+        self.assertFalse(aResults[4]['ok'])
+
+        self.assertEqual(aResults[5], (0, '  2 x The Siamese\n'))
+        self.assertEqual(aResults[6], (0, 'Abandoning the Flesh\n'
+                                          'Hide the Heart\n'
+                                          "Predator's Communion\n"))
+        # The repeated filter is only parsed once
+        self.assertEqual(aResults[7], (0, 'Abandoning the Flesh\n'
+                                          'Hide the Heart\n'
+                                          "Predator's Communion\n"
+                                          'Filter cache: 1 hits, 2 misses, '
+                                          '2 filters cached\n'))
+        self.assertEqual(aResults[8], (1, 'The daemon is using the database '
+                                          'sqlite:///daemon.db, not '
+                                          'sqlite:///other.db\n'))
+        self.assertEqual(aResults[9][0], 0)
+        self.assertEqual(aResults[9][1], aResults[0]['output'])
+
+        # The client fails cleanly if the daemon isn't running
+        with patch('sys.stdout', new_callable=StringIO) as oMock:
+            iRes = main_with_args(['sutekh-cli', '--use-daemon',
+                                   '--daemon-socket', sSocket,
+                                   '--print-card', 'Alexandra'])
+            self.assertEqual(iRes, 1)
+            self.assertTrue(oMock.getvalue().startswith(
+                'Unable to contact the query daemon'))
+
+    def test_refresh(self):
+        """Test the daemon reloads the caches when the database changes"""
+        aStamps = [None, None, 'a', 'a', 'b']
+        with patch('sutekh.base.core.DBUtility.get_database_stamp',
+                   side_effect=aStamps), \
+                patch('sutekh.SutekhCli.daemon_reload') as oReload:
+            fRefresh = make_daemon_refresh()
+            # We can't tell if the database has changed, so always reload
+            fRefresh()
+            self.assertEqual(oReload.call_count, 1)
+            # The file changed
+            fRefresh()
+            self.assertEqual(oReload.call_count, 2)
+            fRefresh()
+            self.assertEqual(oReload.call_count, 2)
+            fRefresh()
+            self.assertEqual(oReload.call_count, 3)
+
+
+if __name__ == "__main__":
+    unittest.main()
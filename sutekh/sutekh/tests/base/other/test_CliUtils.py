@@ -5,17 +5,25 @@
 
 """Test some of the cli interface functionality"""
 
+import os
+import sqlite3
 from io import StringIO
 
 from mock import patch
+from sqlobject import sqlhub
 
 from sutekh.base.core.BaseTables import PhysicalCardSet
+from sutekh.base.core.CardSetHolder import CardSetWrapper
+from sutekh.base.io.WriteCSV import WriteCSV
+from sutekh.io.WriteArdbText import WriteArdbText
 from sutekh.tests.core.test_PhysicalCardSet import make_set_1
 from sutekh.tests.TestCore import SutekhTest
 
-from sutekh.SutekhCli import print_card_details
+from sutekh.SutekhCli import print_card_details, CACHE_MODULES
 from sutekh.base.CliUtils import (run_filter, print_card_filter_list,
-                                  print_card_list, do_print_card)
+                                  explain_filter, make_filter_query,
+                                  print_card_list, do_print_card,
+                                  find_export_card_sets, export_card_sets)
 
 
 TREE_1 = """ Root
@@ -166,3 +174,109 @@ class CliUtilsTests(SutekhTest):
         with patch('sys.stdout', new_callable=StringIO) as oMock:
             print_card_filter_list(dResults, None, False)
             self.assertEqual(oMock.getvalue(), FILTER_LIST)
+
+    def test_explain_filter(self):
+        """Test the query plan report for a filter"""
+        sText = explain_filter("CardType = 'Reaction'", None)
+        self.assertTrue(sText.startswith('Query:\n'))
+        self.assertTrue('\nPlan:\n' in sText)
+        iRows = make_filter_query("CardType = 'Reaction'", None).count()
+        self.assertTrue(iRows > 0)
+        self.assertTrue('\n%d rows in ' % iRows in sText)
+        self.assertFalse('WARNING' in sText)
+        make_set_1()
+        sText = explain_filter("Clan = 'Ahrimane'", 'Test Set 1')
+        self.assertTrue('\n2 rows in ' in sText)
+
+
+class BatchExportTests(SutekhTest):
+    """Test exporting many card sets at once"""
+
+    def _make_sets(self):
+        """Create the card sets to export"""
+        oRoot = make_set_1()
+        oChild1 = PhysicalCardSet(name='Child 1', parent=oRoot)
+        oChild2 = PhysicalCardSet(name='Child/2', parent=oRoot)
+        PhysicalCardSet(name='GC 1', parent=oChild1)
+        for oCard in oRoot.cards[:5]:
+            oChild1.addPhysicalCard(oCard.id)
+            oChild2.addPhysicalCard(oCard.id)
+        PhysicalCardSet(name='Other')
+
+    def _check_export(self, aResults, aNames):
+        """Check the exported files match the writer output"""
+        self.assertEqual([x[0] for x in aResults], aNames)
+        for sName, aFiles, sError in aResults:
+            self.assertEqual(sError, None)
+            self.assertEqual(len(aFiles), 2)
+            self._aTempFiles.extend(aFiles)
+            oHolder = CardSetWrapper(PhysicalCardSet.byName(sName))
+            for sFileName, cWriter in zip(aFiles, (WriteArdbText, WriteCSV)):
+                fExpected = StringIO()
+                cWriter().write(fExpected, oHolder)
+                with open(sFileName) as fIn:
+                    self.assertEqual(fIn.read(), fExpected.getvalue())
+
+    def test_find_card_sets(self):
+        """Test selecting the card sets to export"""
+        self._make_sets()
+        self.assertEqual(find_export_card_sets(),
+                         ['Child 1', 'Child/2', 'GC 1', 'Other',
+                          'Test Set 1'])
+        self.assertEqual(find_export_card_sets('Test Set 1'),
+                         ['Child 1', 'Child/2', 'GC 1'])
+        self.assertEqual(find_export_card_sets('Child 1'), ['GC 1'])
+        self.assertEqual(find_export_card_sets(None, "CardSetName = 'h'"),
+                         ['Child 1', 'Child/2', 'Other'])
+        self.assertEqual(find_export_card_sets('Test Set 1',
+                                               "CardSetName = 'h'"),
+                         ['Child 1', 'Child/2'])
+
+    def test_export(self):
+        """Test exporting the card sets"""
+        self._make_sets()
+        aNames = find_export_card_sets('Test Set 1')
+        aFormats = [('txt', WriteArdbText), ('csv', WriteCSV)]
+        aResults = export_card_sets(aNames, aFormats, self._sTempDir)
+        self.assertEqual(aResults[1][1],
+                         [os.path.join(self._sTempDir, 'Child_2.txt'),
+                          os.path.join(self._sTempDir, 'Child_2.csv')])
+        self._check_export(aResults, aNames)
+        # Failures are reported, and don't stop the other card sets
+        aResults = export_card_sets(['Missing', 'Child 1'], aFormats,
+                                    self._sTempDir)
+        self.assertEqual(aResults[0][:2], ('Missing', []))
+        self.assertTrue(aResults[0][2])
+        self._check_export(aResults[1:], ['Child 1'])
+
+    def test_export_name_clash(self):
+        """Test exporting card sets that would share a file name"""
+        self._make_sets()
+        oClash = PhysicalCardSet(name='Child_2')
+        oCaseClash = PhysicalCardSet(name='other')
+        aNames = ['Child/2', 'Child_2', 'Other', 'other', 'Child 1']
+        aFormats = [('txt', WriteArdbText), ('csv', WriteCSV)]
+        aResults = export_card_sets(aNames, aFormats, self._sTempDir)
+        iChild2 = PhysicalCardSet.byName('Child/2').id
+        iOther = PhysicalCardSet.byName('Other').id
+        self.assertEqual(
+            [os.path.basename(x[1][0]) for x in aResults],
+            ['Child_2_%d.txt' % iChild2, 'Child_2_%d.txt' % oClash.id,
+             'Other_%d.txt' % iOther, 'other_%d.txt' % oCaseClash.id,
+             'Child_1.txt'])
+        self._check_export(aResults, aNames)
+
+    def test_parallel_export(self):
+        """Test exporting the card sets with several processes"""
+        self._make_sets()
+        # The worker processes need a database file to open
+        sDbFile = self._create_tmp_file()
+        oDest = sqlite3.connect(sDbFile)
+        sqlhub.processConnection.getConnection().backup(oDest)
+        oDest.close()
+        aNames = find_export_card_sets()
+        aFormats = [('txt', WriteArdbText), ('csv', WriteCSV)]
+        aResults = export_card_sets(aNames, aFormats, self._sTempDir,
+                                    'sqlite://%s' % sDbFile, 2,
+                                    CACHE_MODULES)
+        self._check_export(aResults, aNames)
@@ -0,0 +1,160 @@
+# -*- coding: utf-8 -*-
+# vim:fileencoding=utf-8 ai ts=4 sts=4 et sw=4
+# Copyright 2026 Neil Muller <drnlmuller+sutekh@gmail.com>
+# GPL - see COPYING for details
+
+"""Check the deferred plugin metadata against the plugin source.
+
+   This reads the plugin modules with ast, rather than importing them,
+   so it doesn't need Gtk."""
+
+import ast
+import os
+import unittest
+from importlib.util import resolve_name
+
+import sutekh
+from sutekh.base.core import BaseTables
+from sutekh.gui.plugins import DEFERRED_PLUGINS
+
+# Only plugins that don't need to be loaded at start-up can be deferred
+START_UP_METHODS = ('setup', 'get_toolbar_widget', 'get_frame_from_config',
+                    'check_for_updates', 'update_config',
+                    'register_with_config')
+CONFIG_DICTS = ('dGlobalConfig', 'dPerPaneConfig', 'dCardListConfig',
+                'dCardSetListConfig')
+# The plugin base classes, which supply the defaults
+BASE_PLUGINS = ('BasePlugin', 'SutekhPlugin')
+
+
+def _parse_module(sModule):
+    """Parse the source of the given sutekh module"""
+    sPath = os.path.join(os.path.dirname(os.path.dirname(sutekh.__file__)),
+                         *sModule.split('.')) + '.py'
+    with open(sPath, 'r') as fIn:
+        return ast.parse(fIn.read(), sPath)
+
+
+def _get_imports(sModule, oTree):
+    """Map the names imported by the module to their modules"""
+    dImports = {}
+    sPackage = sModule.rsplit('.', 1)[0]
+    for oNode in oTree.body:
+        if isinstance(oNode, ast.ImportFrom):
+            sFrom = resolve_name('.' * oNode.level + (oNode.module or ''),
+                                 sPackage)
+            for oAlias in oNode.names:
+                dImports[oAlias.asname or oAlias.name] = sFrom
+    return dImports
+
+
+def get_class_chain(sModule, sClass=None):
+    """Return the class definitions for the class and the classes it
+       inherits from, in method resolution order, stopping at the plugin
+       base classes.
+
+       If sClass isn't given, we use the module's plugin class."""
+    oTree = _parse_module(sModule)
+    dImports = _get_imports(sModule, oTree)
+    if sClass is None:
+        sClass = [x.value.id for x in oTree.body
+                  if isinstance(x, ast.Assign) and
+                  [getattr(y, 'id', None) for y in x.targets] == ['plugin']][0]
+    oClass = [x for x in oTree.body if isinstance(x, ast.ClassDef) and
+              x.name == sClass][0]
+    aChain = [oClass]
+    for oBase in oClass.bases:
+        if oBase.id in BASE_PLUGINS or oBase.id not in dImports:
+            continue
+        aChain.extend(x for x in get_class_chain(dImports[oBase.id],
+                                                 oBase.id)
+                      if x not in aChain)
+    return aChain
+
+
+def _eval_node(oNode):
+    """Evaluate the simple class attribute values the metadata uses"""
+    if isinstance(oNode, ast.Name):
+        return getattr(BaseTables, oNode.id)
+    if isinstance(oNode, ast.Tuple):
+        return tuple(_eval_node(x) for x in oNode.elts)
+    if isinstance(oNode, ast.Dict):
+        return dict((_eval_node(oKey), _eval_node(oValue)) for oKey, oValue
+                    in zip(oNode.keys, oNode.values))
+    return ast.literal_eval(oNode)
+
+
+def _find_assign(aChain, sName):
+    """Return the first assignment to sName in the class chain"""
+    for oClass in aChain:
+        for oNode in oClass.body:
+            if isinstance(oNode, ast.Assign) and \
+                    [getattr(x, 'id', None) for x in oNode.targets] == [sName]:
+                return oNode
+    return None
+
+
+def get_class_attr(aChain, sName, oDefault):
+    """Return the first value assigned to sName in the class chain"""
+    oNode = _find_assign(aChain, sName)
+    if oNode is None:
+        return oDefault
+    return _eval_node(oNode.value)
+
+
+class DeferredPluginTests(unittest.TestCase):
+    """Check DEFERRED_PLUGINS matches the plugins"""
+    # pylint: disable=too-many-public-methods
+    # unittest.TestCase, so many public methods
+
+    def test_metadata(self):
+        """Test the metadata matches the plugin source"""
+        for sName, (aModels, dVersions, aMenus) in DEFERRED_PLUGINS.items():
+            aChain = get_class_chain('sutekh.gui.plugins.%s' % sName)
+            self.assertEqual(tuple(aModels),
+                             get_class_attr(aChain, 'aModelsSupported', ()),
+                             sName)
+            self.assertEqual(dVersions,
+                             get_class_attr(aChain, 'dTableVersions', {}),
+                             sName)
+            # The config is filled in when the plugin is loaded, so
+            # we check the plugin doesn't set up any
+            for sConfig in CONFIG_DICTS:
+                self.assertEqual(_find_assign(aChain, sConfig), None,
+                                 '%s has %s' % (sName, sConfig))
+            aStrings = set()
+            for oClass in aChain:
+                for oNode in ast.walk(oClass):
+                    if isinstance(oNode, ast.FunctionDef):
+                        self.assertFalse(oNode.name in START_UP_METHODS,
+                                         '%s defines %s' % (sName,
+                                                            oNode.name))
+                    elif isinstance(oNode, ast.Constant) and \
+                            isinstance(oNode.value, str):
+                        aStrings.add(oNode.value)
+            # The menu labels are built in several ways, so we just
+            # check the plugin uses the strings
+            for sMenu, sLabel in aMenus:
+                self.assertTrue(sMenu in aStrings, '%s: %s' % (sName, sMenu))
+                self.assertTrue(sLabel in aStrings,
+                                '%s: %s' % (sName, sLabel))
+
+    def test_check(self):
+        """Test the check notices out of date metadata"""
+        aChain = get_class_chain('sutekh.gui.plugins.CardSetExportCSV')
+        self.assertEqual([x.name for x in aChain],
+                         ['CardSetExportCSV', 'BaseExportCSV'])
+        self.assertEqual(get_class_attr(aChain, 'aModelsSupported', ()),
+                         (BaseTables.PhysicalCardSet,))
+        self.assertNotEqual(get_class_attr(aChain, 'dTableVersions', {}),
+                            {BaseTables.PhysicalCardSet: (1,)})
+        # The class name needn't match the module
+        aChain = get_class_chain('sutekh.gui.plugins.FindLikeCrypt')
+        self.assertEqual(aChain[0].name, 'FindLikeVampires')
+        # Plugins with config aren't deferred
+        aChain = get_class_chain('sutekh.gui.plugins.ExtraCardViewColumns')
+        self.assertNotEqual(_find_assign(aChain, 'dPerPaneConfig'), None)
+
+
+if __name__ == "__main__":
+    unittest.main()
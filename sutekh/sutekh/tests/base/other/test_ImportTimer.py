@@ -0,0 +1,93 @@
+# -*- coding: utf-8 -*-
+# vim:fileencoding=utf-8 ai ts=4 sts=4 et sw=4
+# Copyright 2026 Neil Muller <drnlmuller+sutekh@gmail.com>
+# GPL - see COPYING for details
+
+"""Test the start-up timing and the lazy imports in the cli"""
+
+import os
+import subprocess
+import sys
+import unittest
+from io import StringIO
+
+from sutekh.base.ImportTimer import ImportTimer
+from sutekh.core.TWDAIndex import CO_DECKS, CO_LIFT
+from sutekh.tests.TestCore import SutekhTest
+
+from sutekh.SutekhCli import TWDA_ORDERS
+
+
+class ImportTimerTests(SutekhTest):
+    """Tests for the import timer"""
+    # pylint: disable=too-many-public-methods
+    # unittest.TestCase, so many public methods
+
+    def _make_module(self, sName, sText):
+        """Create a module in the temporary directory"""
+        sFile = os.path.join(self._sTempDir, '%s.py' % sName)
+        with open(sFile, 'w') as fOut:
+            fOut.write(sText)
+        # Ensure the module is cleaned up with the other temporary files
+        self._aTempFiles.append(sFile)
+
+    def test_timer(self):
+        """Test timing the imports"""
+        self._make_module('timer_outer', 'import timer_inner\n')
+        self._make_module('timer_inner', 'import time\ntime.sleep(0.02)\n')
+        sys.path.insert(0, self._sTempDir)
+        # Don't leave a __pycache__ directory behind
+        bOldDontWrite = sys.dont_write_bytecode
+        sys.dont_write_bytecode = True
+        oTimer = ImportTimer()
+        oTimer.install()
+        try:
+            # pylint: disable=import-error, unused-import
+            # Created above, only imported for the timing
+            import timer_outer
+        finally:
+            oTimer.uninstall()
+            sys.dont_write_bytecode = bOldDontWrite
+            sys.path.remove(self._sTempDir)
+            sys.modules.pop('timer_outer', None)
+            sys.modules.pop('timer_inner', None)
+        self.assertFalse(oTimer in sys.meta_path)
+        oTimer.mark('imports')
+        dTimes = dict((x[0], x[1:]) for x in oTimer.aModules)
+        fInnerSelf, fInnerTotal = dTimes['timer_inner']
+        fOuterSelf, fOuterTotal = dTimes['timer_outer']
+        self.assertTrue(fInnerSelf >= 0.02)
+        self.assertTrue(fOuterTotal >= fInnerTotal)
+        # The outer module's own time excludes the nested import
+        self.assertTrue(fOuterSelf < fInnerSelf)
+        self.assertEqual(oTimer.aPhases[0][0], 'imports')
+
+        fOut = StringIO()
+        oTimer.report(fOut)
+        aLines = fOut.getvalue().splitlines()
+        self.assertEqual(aLines[0], 'Start-up phases (ms):')
+        self.assertTrue(aLines[1].endswith('imports'))
+        self.assertTrue(aLines[2].endswith('total'))
+        self.assertTrue(aLines[3].startswith('Imports - 2 modules'))
+        # Sorted by the time in the module itself
+        self.assertTrue(aLines[5].endswith('timer_inner'))
+        self.assertTrue(aLines[6].endswith('timer_outer'))
+
+    def test_cli_imports(self):
+        """Test that the cli doesn't load the database when it's not
+           needed"""
+        self.assertEqual(TWDA_ORDERS, [CO_DECKS, CO_LIFT])
+        sCheck = ('import sys\n'
+                  'import sutekh.SutekhCli\n'
+                  'print(sorted(x for x in ["sqlobject", "sutekh.core.Filters",'
+                  ' "sutekh.io.WriteArdbText", "pkg_resources"]'
+                  ' if x in sys.modules))\n')
+        sOutput = subprocess.check_output(
+            [sys.executable, '-c', sCheck],
+            cwd=os.path.join(os.path.dirname(__file__), '..', '..', '..',
+                             '..'))
+        self.assertEqual(sOutput.decode('utf8').strip(), '[]')
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,63 @@
+# -*- coding: utf-8 -*-
+# vim:fileencoding=utf-8 ai ts=4 sts=4 et sw=4
+# Copyright 2026 Neil Muller <drnlmuller+sutekh@gmail.com>
+# GPL - see COPYING for details
+
+"""Test the bulk loading helpers"""
+
+import unittest
+
+from sutekh.base.core.BaseTables import (AbstractCard, Ruling,
+                                         MapAbstractCardToRuling)
+from sutekh.base.core.BaseAdapters import IAbstractCard
+from sutekh.base.core.BulkLoad import (CardNameMap, insert_rows,
+                                       select_columns, flush_join_caches)
+
+from sutekh.tests.TestCore import SutekhTest
+
+
+class BulkLoadTests(SutekhTest):
+    """class for the bulk loading tests"""
+    # pylint: disable=too-many-public-methods
+    # unittest.TestCase, so many public methods
+
+    def test_card_name_map(self):
+        """Test that the name map agrees with the adapter"""
+        oMap = CardNameMap()
+        for sName in ["Pier 13", "Anastaszdi Zagreb", "Path of Blood, The",
+                      "THE PATH OF bLOOD", "Kemintiri (Adv)",
+                      ".44 Magnum", u"L\xe1z\xe1r Dobrescu"]:
+            oCard = IAbstractCard(sName)
+            self.assertEqual(oMap.get(sName), (oCard.id, oCard.name))
+        self.assertEqual(oMap.get("Not a card"), None)
+
+    def test_insert_rows(self):
+        """Test inserting rows and flushing the join caches"""
+        # pylint: disable=no-member
+        # SQLObject confuses pylint
+        oCard = IAbstractCard('Abbot')
+        aOldRulings = list(oCard.rulings)
+        insert_rows(Ruling, [{'text': 'Test ruling %d' % x, 'code': '[T]',
+                              'url': None} for x in range(3)])
+        dRulings = dict((sText, iId) for iId, sText in
+                        select_columns(Ruling, 'id', 'text'))
+        self.assertTrue('Test ruling 2' in dRulings)
+        insert_rows(MapAbstractCardToRuling, [
+            {'abstractCardID': oCard.id,
+             'rulingID': dRulings['Test ruling %d' % x]} for x in range(3)])
+        # The cached join doesn't see the new rows until it's flushed
+        self.assertEqual(list(oCard.rulings), aOldRulings)
+        flush_join_caches(AbstractCard,
+                          MapAbstractCardToRuling.sqlmeta.table)
+        self.assertEqual(sorted(x.text for x in oCard.rulings
+                                if x.code == '[T]'),
+                         ['Test ruling 0', 'Test ruling 1', 'Test ruling 2'])
+        for oRuling in list(oCard.rulings):
+            if oRuling.code == '[T]':
+                oCard.removeRuling(oRuling)
+                Ruling.delete(oRuling.id)
+        self.assertEqual(list(oCard.rulings), aOldRulings)
+
+
+if __name__ == "__main__":
+    unittest.main()
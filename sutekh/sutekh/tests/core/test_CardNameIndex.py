@@ -0,0 +1,106 @@
+# -*- coding: utf-8 -*-
+# vim:fileencoding=utf-8 ai ts=4 sts=4 et sw=4
+# Copyright 2026 Neil Muller <drnlmuller+sutekh@gmail.com>
+# GPL - see COPYING for details
+
+"""Test the card name index"""
+
+import unittest
+
+from sqlobject import SQLObjectNotFound
+
+from sutekh.base.core.BaseAdapters import IAbstractCard
+from sutekh.base.core.BaseFilters import (best_guess_card,
+                                          best_guess_card_filter,
+                                          best_guess_filter)
+from sutekh.base.core.BaseTables import AbstractCard
+from sutekh.base.core.CardNameIndex import CARD_NAME_INDEX, normalise_name
+
+from sutekh.tests.TestCore import SutekhTest
+
+
+class CardNameIndexTests(SutekhTest):
+    """class for the card name index tests"""
+    # pylint: disable=too-many-public-methods
+    # unittest.TestCase, so many public methods
+
+    def test_normalise(self):
+        """Test the key normalisation"""
+        self.assertEqual(normalise_name('Path of Blood, The'),
+                         'the path of blood')
+        self.assertEqual(normalise_name(u'L\xe1z\xe1r Dobrescu'),
+                         'lazar dobrescu')
+        self.assertEqual(normalise_name('Kemintiri (Adv)'),
+                         normalise_name('Kemintiri (Advanced)'))
+        self.assertEqual(normalise_name('Inez `Nurse216` Villagrande'),
+                         'inez nurse216 villagrande')
+        self.assertEqual(normalise_name(' ,. '), '')
+
+    def test_exact(self):
+        """Test lookups that match after normalisation"""
+        oCard = IAbstractCard('Inez "Nurse216" Villagrande')
+        self.assertEqual(CARD_NAME_INDEX.get_exact(
+            'Inez `Nurse216` Villagrande'), oCard)
+        self.assertEqual(CARD_NAME_INDEX.get_exact('44 magnum'),
+                         IAbstractCard('.44 Magnum'))
+        # Lookup hints are included
+        self.assertEqual(CARD_NAME_INDEX.get_exact('Pier 13'),
+                         IAbstractCard('Pier 13, Port of Baltimore'))
+        self.assertEqual(CARD_NAME_INDEX.get_exact('Abot'), None)
+        # The adapter falls back to the index
+        self.assertEqual(IAbstractCard('Inez `Nurse216` Villagrande'),
+                         oCard)
+        self.assertEqual(IAbstractCard('Yvette the Hopeless'),
+                         IAbstractCard('Yvette, The Hopeless'))
+        self.assertRaises(SQLObjectNotFound, IAbstractCard, 'Abot')
+
+    def test_candidates(self):
+        """Test the ranked candidates"""
+        oAbbot = IAbstractCard('Abbot')
+        aCandidates = CARD_NAME_INDEX.get_candidates('Abot', 3)
+        self.assertEqual(len(aCandidates), 3)
+        self.assertEqual(aCandidates[0][1], oAbbot)
+        self.assertTrue(aCandidates[0][0] > aCandidates[1][0])
+        self.assertEqual(CARD_NAME_INDEX.get_candidates('Abbot'),
+                         [(1.0, oAbbot)])
+        self.assertEqual(CARD_NAME_INDEX.get_candidates('zzzzz'), [])
+        self.assertEqual(CARD_NAME_INDEX.get_candidates(''), [])
+
+        self.assertEqual(CARD_NAME_INDEX.get_best_guess('Abot'), oAbbot)
+        self.assertEqual(CARD_NAME_INDEX.get_best_guess('Path of Bloud'),
+                         IAbstractCard('The Path of Blood'))
+        # No clear choice
+        self.assertEqual(CARD_NAME_INDEX.get_best_guess('Alan'), None)
+        self.assertEqual(CARD_NAME_INDEX.get_best_guess('zzzzz'), None)
+
+    def test_best_guess(self):
+        """Test combining the best guess filter with the index"""
+        # A single match for the best guess filter is kept, even if the
+        # index has no clear choice or prefers another card
+        for sName, sCard in [('.44', '.44 Magnum'),
+                             ('Alfred', 'Alfred Benezri'),
+                             ('Abandoning', 'Abandoning the Flesh'),
+                             ('Baron', 'Baron Dieudonne'),
+                             ('Aabbt', 'Aabbt Kindred')]:
+            oCard = IAbstractCard(sCard)
+            self.assertEqual(best_guess_card(sName), oCard, sName)
+            self.assertEqual(
+                list(best_guess_card_filter(sName).select(AbstractCard)),
+                [oCard], sName)
+        # Otherwise, we fall back to the index
+        oSkin = IAbstractCard('Ablative Skin')
+        self.assertEqual(best_guess_card('Ablative Skn'), oSkin)
+        self.assertTrue(oSkin in
+                        best_guess_card_filter('Ablative Skn').select(
+                            AbstractCard))
+        self.assertEqual(best_guess_card('zzzzz'), None)
+        # Several matches for the best guess filter are all kept
+        aMatches = set(best_guess_filter('Anna').select(AbstractCard))
+        self.assertTrue(len(aMatches) > 1)
+        self.assertEqual(best_guess_card('Anna'), None)
+        self.assertTrue(aMatches.issubset(set(
+            best_guess_card_filter('Anna').select(AbstractCard))))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,70 @@
+# -*- coding: utf-8 -*-
+# vim:fileencoding=utf-8 ai ts=4 sts=4 et sw=4
+# Copyright 2026 Neil Muller <drnlmuller+sutekh@gmail.com>
+# GPL - see COPYING for details
+
+"""Test the maintained card set counts"""
+
+import unittest
+
+from sutekh.base.core.BaseTables import (PhysicalCardSet,
+                                         MapPhysicalCardToPhysicalCardSet)
+from sutekh.base.core.CardSetCounts import CARD_SET_COUNTS
+from sutekh.base.core.DBSignals import send_changed_signal
+from sutekh.base.core.DBUtility import flush_cache
+from sutekh.base.tests.TestUtils import make_card
+
+from sutekh.tests.TestCore import SutekhTest
+
+
+class CardSetCountsTests(SutekhTest):
+    """class for the card set count tests"""
+    # pylint: disable=too-many-public-methods
+    # unittest.TestCase, so many public methods
+
+    def test_basic(self):
+        """Test that the counts follow changes to the card sets"""
+        # pylint: disable=no-member
+        # SQLObject confuses pylint
+        oMagnum = make_card('.44 magnum', 'Jyhad')
+        oAbbot = make_card('abbot', None)
+        oCS1 = PhysicalCardSet(name='Set 1')
+        oCS2 = PhysicalCardSet(name='Set 2')
+        for oCard in (oMagnum, oMagnum, oAbbot):
+            oCS1.addPhysicalCard(oCard.id)
+        # Pick up the changes made without signals
+        flush_cache()
+        self.assertEqual(CARD_SET_COUNTS.get_total(oCS1), 3)
+        self.assertEqual(CARD_SET_COUNTS.get_total(oCS2), 0)
+        self.assertEqual(CARD_SET_COUNTS.get_card_counts(oCS1),
+                         {oMagnum.id: 2, oAbbot.id: 1})
+        self.assertEqual(CARD_SET_COUNTS.get_card_counts(oCS2), {})
+
+        # Changes that send the changed signal are tracked
+        oCS2.addPhysicalCard(oAbbot.id)
+        send_changed_signal(oCS2, oAbbot, 1)
+        self.assertEqual(CARD_SET_COUNTS.get_total(oCS2), 1)
+        self.assertEqual(CARD_SET_COUNTS.get_card_counts(oCS2),
+                         {oAbbot.id: 1})
+        oMap = MapPhysicalCardToPhysicalCardSet.selectBy(
+            physicalCardID=oAbbot.id, physicalCardSetID=oCS1.id)[0]
+        MapPhysicalCardToPhysicalCardSet.delete(oMap.id)
+        send_changed_signal(oCS1, oAbbot, -1)
+        self.assertEqual(CARD_SET_COUNTS.get_total(oCS1), 2)
+        self.assertEqual(CARD_SET_COUNTS.get_card_counts(oCS1),
+                         {oMagnum.id: 2})
+
+        # Changes without the signal need invalidate_set
+        oCS2.addPhysicalCard(oMagnum.id)
+        CARD_SET_COUNTS.invalidate_set(oCS2)
+        self.assertEqual(CARD_SET_COUNTS.get_total(oCS2), 2)
+        self.assertEqual(CARD_SET_COUNTS.get_card_counts(oCS2),
+                         {oAbbot.id: 1, oMagnum.id: 1})
+
+        # New card sets start empty
+        oCS3 = PhysicalCardSet(name='Set 3')
+        self.assertEqual(CARD_SET_COUNTS.get_total(oCS3), 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,72 @@
+# -*- coding: utf-8 -*-
+# vim:fileencoding=utf-8 ai ts=4 sts=4 et sw=4
+# Copyright 2026 Neil Muller <drnlmuller+sutekh@gmail.com>
+# GPL - see COPYING for details
+
+"""Test the card set hierarchy index"""
+
+import unittest
+
+from sutekh.base.core.BaseTables import PhysicalCardSet
+from sutekh.base.core.CardSetHierarchy import CARD_SET_HIERARCHY
+from sutekh.base.core.CardSetUtilities import delete_physical_card_set
+
+from sutekh.tests.TestCore import SutekhTest
+
+
+class CardSetHierarchyTests(SutekhTest):
+    """class for the card set hierarchy index tests"""
+    # pylint: disable=too-many-public-methods
+    # unittest.TestCase, so many public methods
+
+    def test_basic(self):
+        """Test that the index tracks changes to the card sets"""
+        oRoot = PhysicalCardSet(name='Root')
+        oChild = PhysicalCardSet(name='Child', parent=oRoot, inuse=True)
+        oSet1 = PhysicalCardSet(name='Set 1', parent=oChild)
+        oSet2 = PhysicalCardSet(name='Set 2', parent=oChild, inuse=True)
+
+        self.assertEqual(CARD_SET_HIERARCHY.get_child_ids(None),
+                         set([oRoot.id]))
+        self.assertEqual(CARD_SET_HIERARCHY.get_children(oChild),
+                         [oSet1, oSet2])
+        self.assertEqual(CARD_SET_HIERARCHY.get_parent_id(oSet1), oChild.id)
+        self.assertEqual(CARD_SET_HIERARCHY.count_children(oChild), 2)
+        self.assertEqual(CARD_SET_HIERARCHY.count_children(oChild, True), 1)
+
+        # Changes made after the index is built are picked up
+        oSet1.inuse = True
+        oSet1.syncUpdate()
+        self.assertEqual(CARD_SET_HIERARCHY.count_children(oChild, True), 2)
+        oSet2.parent = oRoot
+        oSet2.syncUpdate()
+        self.assertEqual(CARD_SET_HIERARCHY.get_children(oRoot),
+                         [oChild, oSet2])
+        self.assertEqual(CARD_SET_HIERARCHY.count_children(oChild), 1)
+        oSet3 = PhysicalCardSet(name='Set 3', parent=oSet1)
+        self.assertTrue(CARD_SET_HIERARCHY.has_children(oSet1))
+        delete_physical_card_set('Child')
+        self.assertEqual(CARD_SET_HIERARCHY.get_children(oRoot),
+                         [oSet1, oSet2])
+
+        # Index matches a rebuild from the database
+        aChildren = CARD_SET_HIERARCHY.get_child_ids(oRoot)
+        CARD_SET_HIERARCHY.invalidate()
+        self.assertEqual(CARD_SET_HIERARCHY.get_child_ids(oRoot), aChildren)
+
+    def test_loops(self):
+        """Test loop detection in the index"""
+        oRoot = PhysicalCardSet(name='Root')
+        oChild = PhysicalCardSet(name='Child', parent=oRoot)
+        oLeaf = PhysicalCardSet(name='Leaf', parent=oChild)
+        self.assertEqual(CARD_SET_HIERARCHY.get_loop_ids(oLeaf), [])
+        oRoot.parent = oChild
+        oRoot.syncUpdate()
+        self.assertEqual(CARD_SET_HIERARCHY.get_loop_ids(oLeaf),
+                         [oChild.id, oRoot.id])
+        self.assertEqual(CARD_SET_HIERARCHY.get_loop_ids(oRoot),
+                         [oRoot.id, oChild.id])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -10,12 +10,40 @@ import unittest
 from sutekh.base.core.CardSetHolder import CardSetHolder, CachedCardSetHolder
 from sutekh.base.core.BaseAdapters import (IPhysicalCardSet, IExpansion,
                                            IAbstractCard, IPrinting)
-from sutekh.base.core.BaseTables import MapPhysicalCardToPhysicalCardSet
+from sutekh.base.core.BaseTables import (MapPhysicalCardToPhysicalCardSet,
+                                         LookupHints)
+from sutekh.base.core.CardLookup import (SimpleLookup, get_lookup_memory,
+                                         remember_lookups, CARD_MEMORY_DOMAIN,
+                                         PRINTING_MEMORY_DOMAIN)
 from sutekh.base.core import BaseFilters
 
 from sutekh.tests.TestCore import SutekhTest
 
 
+class FixingLookup(SimpleLookup):
+    """Lookup which corrects a known misspelling, as the user would"""
+
+    def __init__(self):
+        self.aAsked = []
+
+    def lookup(self, aNames, sInfo):
+        aCards = super(FixingLookup, self).lookup(aNames, sInfo)
+        for iPos, sName in enumerate(aNames):
+            if sName == 'Abede':
+                self.aAsked.append(sName)
+                aCards[iPos] = IAbstractCard('Abebe')
+        return aCards
+
+    def printing_lookup(self, aExpPrintNames, sInfo, dCardExpansions):
+        dPrintings = super(FixingLookup, self).printing_lookup(
+            aExpPrintNames, sInfo, dCardExpansions)
+        for tExpPrint in dPrintings:
+            if tExpPrint == ('Legacy of Bllod', None):
+                self.aAsked.append(tExpPrint)
+                dPrintings[tExpPrint] = IPrinting((IExpansion('LoB'), None))
+        return dPrintings
+
+
 class CardSetHolderTests(SutekhTest):
     """class for the Card Set Holder tests"""
     # pylint: disable=too-many-public-methods
@@ -315,6 +343,37 @@ class CardSetHolderTests(SutekhTest):
         self.assertEqual(dLookupCache['printings'][('Legacy of Bllod', None)],
                          (None, None))
 
+    def test_lookup_memory(self):
+        """Test remembering lookups between imports"""
+        self.assertEqual(get_lookup_memory('Test'),
+                         {'cards': {}, 'printings': {}})
+        oLookup = FixingLookup()
+        for sName in ('Set 1', 'Set 2'):
+            oCSH = CachedCardSetHolder()
+            oCSH.add(2, 'Abede', 'Legacy of Bllod', None)
+            oCSH.add(1, '.44 Magnum', 'Jyhad', None)
+            oCSH.name = sName
+            dLookupCache = get_lookup_memory('Test')
+            oCSH.create_pcs(oLookup, dLookupCache)
+            remember_lookups('Test', dLookupCache)
+            oCS = IPhysicalCardSet(sName)
+            self.assertEqual(sorted(x.abstractCard.name for x in oCS.cards),
+                             ['.44 Magnum', 'Abebe', 'Abebe'])
+        # We only had to ask the first time
+        self.assertEqual(oLookup.aAsked, ['Abede', ('Legacy of Bllod', None)])
+        # Only the names that needed fixing are remembered
+        self.assertEqual(get_lookup_memory('Test'), {
+            'cards': {'Abede': 'abebe'},
+            'printings': {('Legacy of Bllod', None): ('Legacy of Blood',
+                                                      None)}})
+        # Other formats are separate
+        self.assertEqual(get_lookup_memory('Other'),
+                         {'cards': {}, 'printings': {}})
+        # The lookup hints aren't reset between tests, so tidy up
+        for sDomain in (CARD_MEMORY_DOMAIN, PRINTING_MEMORY_DOMAIN):
+            for oHint in LookupHints.selectBy(domain=sDomain % 'Test'):
+                LookupHints.delete(oHint.id)
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -7,13 +7,19 @@
 
 import unittest
 
-from sutekh.base.core.BaseTables import PhysicalCardSet
+from sutekh.base.core.BaseTables import (PhysicalCardSet,
+                                         MapPhysicalCardToPhysicalCardSet)
 from sutekh.base.core.CardSetUtilities import (delete_physical_card_set,
                                                get_loop_names, detect_loop,
                                                find_children, break_loop,
                                                has_children, clean_empty,
                                                get_current_card_sets,
-                                               format_cs_list)
+                                               format_cs_list,
+                                               change_card_counts)
+from sutekh.base.core.CardSetCounts import CARD_SET_COUNTS
+from sutekh.base.core.DBSignals import (listen_batch_changed,
+                                        disconnect_batch_changed)
+from sutekh.base.tests.TestUtils import make_card
 
 from sutekh.tests.TestCore import SutekhTest
 
@@ -166,6 +172,53 @@ class CardSetUtilTests(SutekhTest):
         self.assertTrue(oChild.name in aSets)
         self.assertTrue(oRoot.name in aSets)
 
+    def test_change_card_counts(self):
+        """Test applying batched changes to card sets"""
+        # pylint: disable=no-member
+        # SQLObject confuses pylint
+        aSignals = []
+
+        def _record(dChanges):
+            """Record the batch signals"""
+            aSignals.append(dChanges)
+
+        oMagnum = make_card('.44 magnum', 'Jyhad')
+        oMagnumNone = make_card('.44 magnum', None)
+        oAbbot = make_card('abbot', None)
+        oCS1 = PhysicalCardSet(name='Set 1')
+        oCS2 = PhysicalCardSet(name='Set 2')
+        listen_batch_changed(_record, PhysicalCardSet)
+        try:
+            dApplied = change_card_counts({
+                oCS1: [(oMagnum, 3), (oAbbot, 1), (oAbbot, 1)],
+                oCS2: [(oAbbot, 1)]})
+            self.assertEqual(dApplied, {oCS1: {oMagnum: 3, oAbbot: 2},
+                                        oCS2: {oAbbot: 1}})
+            self.assertEqual(len(aSignals), 1)
+            self.assertEqual(aSignals[0], dApplied)
+            self.assertEqual(CARD_SET_COUNTS.get_card_counts(oCS1),
+                             {oMagnum.id: 3, oAbbot.id: 2})
+            # Removing a card without a printing removes a printed copy, and
+            # we can't remove more cards than the card set has
+            dApplied = change_card_counts({
+                oCS1: [(oMagnumNone, -1), (oAbbot, -5)],
+                oCS2: [(oMagnum, -1)]})
+            self.assertEqual(dApplied, {oCS1: {oMagnum: -1, oAbbot: -2}})
+            self.assertEqual(len(aSignals), 2)
+            self.assertEqual(CARD_SET_COUNTS.get_total(oCS1), 2)
+            self.assertEqual(
+                MapPhysicalCardToPhysicalCardSet.selectBy(
+                    physicalCardSetID=oCS1.id,
+                    physicalCardID=oMagnum.id).count(), 2)
+            self.assertEqual(
+                MapPhysicalCardToPhysicalCardSet.selectBy(
+                    physicalCardSetID=oCS2.id).count(), 1)
+            # Nothing to do sends no signal
+            self.assertEqual(change_card_counts({oCS2: [(oMagnum, -1)]}), {})
+            self.assertEqual(len(aSignals), 2)
+        finally:
+            disconnect_batch_changed(_record, PhysicalCardSet)
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -1535,6 +1535,14 @@ class DatabaseUpgradeTests(SutekhTest):
     # pylint: disable=too-many-public-methods
     # unittest.TestCase, so many public methods
 
+    # pylint: disable=no-self-use
+    # helper is clearer as a method
+    def _get_index_columns(self, oConn, sIndex):
+        """Get the columns of the given sqlite index"""
+        return [x[2] for x in oConn.queryAll("PRAGMA index_info(%s)"
+                                             % sIndex)]
+    # pylint: enable=no-self-use
+
     def test_copy_to_new_ac_db(self):
         """Test copying an existing database to a freshly created one using
            copy_to_new_abstract_card_db."""
@@ -1674,7 +1682,7 @@ class DatabaseUpgradeTests(SutekhTest):
                                                           aVersions)
 
         self.assertEqual(len(aHigherTables), 0)
-        self.assertEqual(len(aLowerTables), 10)
+        self.assertEqual(len(aLowerTables), 21)
 
         # Run the upgrade code
         oDBManager = DBUpgradeManager()
@@ -1706,6 +1714,13 @@ class DatabaseUpgradeTests(SutekhTest):
         assert oDefJyhad
         assert IPhysicalCard((oMagnum, oDefJyhad))
 
+        # The mapping tables are recreated with the covering indexes
+        oVer.expire_cache()
+        self.assertTrue(oVer.check_tables_and_versions(aTables, aVersions))
+        self.assertEqual(self._get_index_columns(
+            oOldDB, 'abs_type_map_cardTypeIndex'),
+                         ['card_type_id', 'abstract_card_id'])
+
         oOldDB.close()
 
         # Restore old state
@@ -1722,3 +1737,69 @@ class DatabaseUpgradeTests(SutekhTest):
         oCursor.close()
         oConn.cache.clear()
         flush_cache()
+
+    def test_upgrade_map_indexes(self):
+        """Test upgrading mapping tables without the covering indexes"""
+        sDBuri = sqlhub.processConnection.uri()
+        if not sDBuri.startswith('sqlite:'):
+            self.skipTest("Not running on sqlite database")
+
+        oConn = sqlhub.processConnection
+        aMapTables = [x for x in TABLE_LIST
+                      if x.__name__.startswith('MapAbstractCard')]
+        self.assertEqual(len(aMapTables), 11)
+        dRows = {}
+        for cCls in aMapTables:
+            dRows[cCls] = cCls.select().count()
+
+        # Copy the current database, and recreate the version 1 indexes
+        sDbFile = self._create_tmp_file()
+        if sys.platform.startswith("win"):
+            oOldDB = connectionForURI("sqlite:///%s" % sDbFile)
+        else:
+            oOldDB = connectionForURI("sqlite://%s" % sDbFile)
+        oCursor = oOldDB.getConnection().cursor()
+        for sSQL in oConn.getConnection().iterdump():
+            oCursor.execute(sSQL)
+        oCursor.close()
+        oOldDB.getConnection().commit()
+        sqlhub.processConnection = oOldDB
+        oVer = DatabaseVersion(oConn=oOldDB)
+        oVer.expire_cache()
+        for cCls in aMapTables:
+            sTable = cCls.sqlmeta.table
+            for oIndex in cCls.sqlmeta.indexes:
+                sIndex = '%s_%s' % (sTable, oIndex.name)
+                oOldDB.query('DROP INDEX %s' % sIndex)
+                oOldDB.query('CREATE INDEX %s ON %s (%s)' % (
+                    sIndex, sTable, oIndex.descriptions[0]['column'].dbName))
+            oVer.set_version(cCls, 1, oOldDB)
+        self.assertEqual(self._get_index_columns(
+            oOldDB, 'abs_clan_map_clanIndex'), ['clan_id'])
+
+        aTables = [VersionTable] + TABLE_LIST
+        aVersions = [x.tableversion for x in aTables]
+        oVer.expire_cache()
+        aLowerTables, aHigherTables = oVer.get_bad_tables(aTables, aVersions)
+        self.assertEqual(aHigherTables, [])
+        self.assertEqual(len(aLowerTables), 11)
+
+        oDBManager = DBUpgradeManager()
+        self.assertTrue(oDBManager.attempt_database_upgrade(
+            make_null_handler()))
+
+        oVer.expire_cache()
+        self.assertTrue(oVer.check_tables_and_versions(aTables, aVersions))
+        self.assertEqual(self._get_index_columns(
+            oOldDB, 'abs_clan_map_clanIndex'), ['clan_id', 'abstract_card_id'])
+        # The card index is unchanged, so the card's clans keep their order
+        self.assertEqual(self._get_index_columns(
+            oOldDB, 'abs_clan_map_abstractCardIndex'), ['abstract_card_id'])
+        for cCls in aMapTables:
+            self.assertEqual(cCls.select().count(), dRows[cCls])
+
+        oOldDB.close()
+        oVer.expire_cache()
+        sqlhub.processConnection = oConn
+        oConn.cache.clear()
+        flush_cache()
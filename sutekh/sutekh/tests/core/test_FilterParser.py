@@ -571,6 +571,52 @@ class FilterParserTests(SutekhTest):
                          "FilterBoxModel %s failed. %s != %s." % (
                              sFilter, aNames, aExpectedNames))
 
+    def test_parse_cache(self):
+        """Test the parsed filter cache"""
+        FilterParser.FilterParser.clear_cache()
+        self.assertEqual(FilterParser.FilterParser.get_cache_stats(),
+                         {'hits': 0, 'misses': 0, 'size': 0})
+        self.assertEqual(
+            FilterParser.normalise_filter(
+                ' CardType  in\tVampire,  "Action  Modifier" '),
+            'CardType in Vampire , "Action  Modifier"')
+        sFilter = 'Clan in Ravnos, Samedi and CardType = $a'
+        oAST = self.oFilterParser.apply(sFilter)
+        oAST2 = self.oFilterParser.apply('Clan   in Ravnos,Samedi  and '
+                                         'CardType = $a')
+        self.assertEqual(FilterParser.FilterParser.get_cache_stats(),
+                         {'hits': 1, 'misses': 1, 'size': 1})
+        self.assertEqual(str(oAST), str(oAST2))
+        # Setting the variable doesn't change the cached copy
+        oAST.oExpression.oRight.set_values(['Vampire'])
+        self.assertEqual(self._get_abs_names(oAST.get_filter()),
+                         self._get_abs_names(Filters.FilterAndBox([
+                             Filters.MultiClanFilter(['Ravnos', 'Samedi']),
+                             Filters.CardTypeFilter('Vampire')])))
+        self.assertTrue(oAST2.oExpression.oRight.aFilterValues is None)
+        oAST3 = self.oFilterParser.apply(sFilter)
+        self.assertTrue(oAST3.oExpression.oRight.aFilterValues is None)
+        self.assertEqual(self._get_abs_names(oAST3.get_filter()),
+                         self._get_abs_names(
+                             Filters.MultiClanFilter(['Ravnos', 'Samedi'])))
+        # Quoted strings are kept as they are
+        oAST = self.oFilterParser.apply('CardName in "Pier  13"')
+        self.assertEqual(oAST.get_filter().select(AbstractCard).count(), 0)
+        # Errors aren't cached
+        self.assertRaises(ValueError, self.oFilterParser.apply,
+                          'CardType in $a and Clan in $a')
+        # The cache is bounded
+        iOldSize = FilterParser.FilterParser.CACHE_SIZE
+        FilterParser.FilterParser.CACHE_SIZE = 2
+        try:
+            for sClan in ['Ravnos', 'Samedi', 'Assamite']:
+                self.oFilterParser.apply('Clan = %s' % sClan)
+            self.assertEqual(
+                FilterParser.FilterParser.get_cache_stats()['size'], 2)
+        finally:
+            FilterParser.FilterParser.CACHE_SIZE = iOldSize
+            FilterParser.FilterParser.clear_cache()
+
 
 if __name__ == "__main__":
     unittest.main()
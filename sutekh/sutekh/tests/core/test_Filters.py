@@ -6,7 +6,7 @@
 """Sutekh Filters tests"""
 
 import unittest
-from sqlobject import SQLObjectNotFound
+from sqlobject import SQLObjectNotFound, AND, OR
 from sutekh.tests.TestCore import SutekhTest
 from sutekh.base.tests.TestUtils import make_card
 from sutekh.tests.io import test_WhiteWolfParser
@@ -742,6 +742,86 @@ class FilterTests(SutekhTest):
                              "Filter Object %s failed. %s != %s." % (
                                  oFilter, aCards, aExpectedCards))
 
+    def test_join_planner(self):
+        """Test that the filter boxes give the same results as joining all
+           the mapping tables, with fewer rows"""
+        # pylint: disable=protected-access
+        # We need to build the unplanned queries from the subfilters
+        def _unplanned(oFilter):
+            """Return the expression and joins that join the mapping table
+               for each subfilter"""
+            if not isinstance(oFilter, BaseFilters.FilterBox):
+                return oFilter._get_expression(), oFilter._get_joins()
+            fCombine = AND
+            if isinstance(oFilter, BaseFilters.FilterOrBox):
+                fCombine = OR
+            aExpressions = []
+            aJoins = []
+            for oSubFilter in oFilter:
+                oExpression, aSubJoins = _unplanned(oSubFilter)
+                aExpressions.append(oExpression)
+                aJoins.extend(aSubJoins)
+            return fCombine(*aExpressions), aJoins
+
+        aTests = [
+            Filters.FilterAndBox([
+                Filters.MultiCardTypeFilter(['Vampire']),
+                Filters.MultiDisciplineFilter(['dom', 'obf', 'aus'])]),
+            Filters.FilterAndBox([
+                Filters.MultiCardTypeFilter(['Action', 'Action Modifier',
+                                             'Combat', 'Reaction']),
+                Filters.MultiDisciplineFilter(['dom', 'obf', 'pot', 'pre',
+                                               'aus', 'for', 'cel', 'tha'])]),
+            Filters.FilterOrBox([
+                Filters.DisciplineFilter('dom'),
+                Filters.DisciplineFilter('pre'),
+                Filters.DisciplineFilter('obf')]),
+            Filters.FilterAndBox([
+                Filters.MultiDisciplineFilter(['dom', 'obf']),
+                Filters.MultiDisciplineFilter(['obf', 'dom']),
+                Filters.CapacityFilter(10)]),
+        ]
+        for oFilter in aTests:
+            for cCardClass in (AbstractCard, PhysicalCard):
+                if cCardClass is PhysicalCard:
+                    oFilter = Filters.FilterAndBox(
+                        [Filters.PhysicalCardFilter(), oFilter])
+                oExpression, aJoins = _unplanned(oFilter)
+                oUnplanned = cCardClass.select(oExpression, join=aJoins)
+                oPlanned = oFilter.select(cCardClass)
+                aCards = sorted(oPlanned.distinct(), key=lambda x: x.id)
+                self.assertTrue(aCards)
+                self.assertEqual(aCards, sorted(oUnplanned.distinct(),
+                                                key=lambda x: x.id))
+                # The planned query doesn't repeat cards
+                self.assertEqual(oPlanned.count(), len(aCards))
+                self.assertTrue(oUnplanned.count() > len(aCards))
+
+        # The 3 disciplines are looked up together, and the repeated
+        # filter only once
+        oFilter = aTests[2]
+        self.assertEqual(oFilter._get_joins(), [])
+        self.assertEqual(len(oFilter._get_sub_expressions()), 1)
+        oFilter = aTests[3]
+        self.assertEqual(len(oFilter._get_joins()), 1)
+        self.assertEqual(len(oFilter._get_sub_expressions()), 2)
+
+        # Nested boxes and negated filters
+        oFilter = Filters.FilterAndBox([
+            Filters.FilterOrBox([Filters.ClanFilter('Ventrue'),
+                                 Filters.ClanFilter('Tremere')]),
+            Filters.FilterNot(Filters.DisciplineFilter('dom')),
+            Filters.MultiCardTypeFilter(['Vampire'])])
+        aNames = sorted(x.name for x in oFilter.select(AbstractCard))
+        aExpected = sorted(
+            x.name for x in AbstractCard.select() if
+            set(oClan.name for oClan in x.clan) & set(['Ventrue', 'Tremere'])
+            and 'dom' not in [oPair.discipline.name for oPair in
+                              x.discipline]
+            and 'Vampire' in [oType.name for oType in x.cardtype])
+        self.assertTrue(aNames)
+        self.assertEqual(aNames, aExpected)
+
     def test_card_set_filters(self):
         """Tests for the physical card set filters."""
         # Tests on the physical card set properties
@@ -0,0 +1,58 @@
+# -*- coding: utf-8 -*-
+# vim:fileencoding=utf-8 ai ts=4 sts=4 et sw=4
+# Copyright 2026 Neil Muller <drnlmuller+sutekh@gmail.com>
+# GPL - see COPYING for details
+
+"""Test the query plan report for filters"""
+
+import unittest
+
+from sutekh.base.core.BaseTables import (AbstractCard,
+                                         MapPhysicalCardToPhysicalCardSet)
+from sutekh.base.core.QueryPlan import QueryPlan, get_map_tables
+from sutekh.core import Filters
+from sutekh.tests.TestCore import SutekhTest
+from sutekh.tests.core.test_Filters import make_physical_card_sets
+
+
+class QueryPlanTests(SutekhTest):
+    """Class for the query plan tests"""
+    # pylint: disable=too-many-public-methods
+    # unittest.TestCase, so many public methods
+
+    def test_map_tables(self):
+        """Test that we find the mapping tables"""
+        aTables = get_map_tables()
+        self.assertTrue('abs_type_map' in aTables)
+        self.assertTrue('physical_map' in aTables)
+        self.assertTrue('abs_clan_map' in aTables)
+        self.assertFalse('abstract_card' in aTables)
+
+    def test_filter_plan(self):
+        """Test the plan for a filter on the card list"""
+        oFilter = Filters.ClanFilter('Ahrimane')
+        oResults = oFilter.select(AbstractCard)
+        oPlan = QueryPlan(oResults)
+        self.assertEqual(oPlan.iRows, oResults.count())
+        self.assertTrue(oPlan.iRows > 0)
+        self.assertTrue(oPlan.fTime >= 0)
+        self.assertTrue(oPlan.aPlan)
+        self.assertEqual(oPlan.aFullScans, [])
+        sText = oPlan.format()
+        self.assertTrue(oPlan.sSQL in sText)
+        self.assertTrue('%d rows in' % oPlan.iRows in sText)
+        self.assertFalse('WARNING' in sText)
+
+    def test_full_scan(self):
+        """Test that a full scan of a mapping table is flagged"""
+        make_physical_card_sets()
+        oResults = MapPhysicalCardToPhysicalCardSet.select()
+        oPlan = QueryPlan(oResults)
+        self.assertEqual(oPlan.iRows, oResults.count())
+        self.assertEqual(oPlan.aFullScans, ['physical_map'])
+        self.assertTrue('WARNING: full scan of the physical_map mapping '
+                        'table' in oPlan.format())
+
+
+if __name__ == "__main__":
+    unittest.main()
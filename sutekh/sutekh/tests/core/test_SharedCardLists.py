@@ -0,0 +1,118 @@
+# -*- coding: utf-8 -*-
+# vim:fileencoding=utf-8 ai ts=4 sts=4 et sw=4
+# Copyright 2026 Neil Muller <drnlmuller+sutekh@gmail.com>
+# GPL - see COPYING for details
+
+"""Test the card lists shared between card set panes"""
+
+import unittest
+
+from mock import patch
+
+from sutekh.base.core.BaseTables import (PhysicalCardSet,
+                                         MapPhysicalCardToPhysicalCardSet)
+from sutekh.base.core.BaseFilters import (MultiPhysicalCardSetMapFilter,
+                                          CardNameFilter, NullFilter)
+from sutekh.base.core.SharedCardLists import SHARED_CARD_LISTS
+from sutekh.base.core.DBSignals import send_changed_signal
+from sutekh.base.core.DBUtility import flush_cache
+from sutekh.base.tests.TestUtils import make_card
+
+from sutekh.tests.TestCore import SutekhTest
+
+
+class SharedCardListsTests(SutekhTest):
+    """class for the shared card list tests"""
+    # pylint: disable=too-many-public-methods
+    # unittest.TestCase, so many public methods
+
+    def _get_ids(self, oCS, oFilter):
+        """Helper to get the card ids in the shared list for oCS"""
+        aEntries = SHARED_CARD_LISTS.get_entries(
+            [oCS.id], MultiPhysicalCardSetMapFilter([oCS.name]), oFilter)
+        return sorted(x.physicalCardID for x in aEntries)
+
+    def test_basic(self):
+        """Test that the lists are shared and follow changes"""
+        # pylint: disable=no-member
+        # SQLObject confuses pylint
+        oMagnum = make_card('.44 magnum', 'Jyhad')
+        oAbbot = make_card('abbot', None)
+        oCS1 = PhysicalCardSet(name='Set 1')
+        oCS2 = PhysicalCardSet(name='Set 2')
+        for oCard in (oMagnum, oMagnum, oAbbot):
+            oCS1.addPhysicalCard(oCard.id)
+        flush_cache()
+        oFilter = NullFilter()
+        self.assertEqual(self._get_ids(oCS1, oFilter),
+                         sorted([oMagnum.id, oMagnum.id, oAbbot.id]))
+        self.assertEqual(self._get_ids(oCS1, CardNameFilter('abbot')),
+                         [oAbbot.id])
+        self.assertEqual(self._get_ids(oCS2, oFilter), [])
+
+        # Equal filters share the list, and callers get a copy
+        oSetFilter = MultiPhysicalCardSetMapFilter([oCS1.name])
+        aFirst = SHARED_CARD_LISTS.get_entries([oCS1.id], oSetFilter,
+                                               NullFilter())
+        aFirst.pop()
+        aSecond = SHARED_CARD_LISTS.get_entries(
+            [oCS1.id], MultiPhysicalCardSetMapFilter([oCS1.name]),
+            NullFilter())
+        self.assertEqual(len(aSecond), 3)
+        self.assertEqual(aFirst, aSecond[:2])
+
+        # Changes that send the changed signal are picked up
+        oCS2.addPhysicalCard(oAbbot.id)
+        send_changed_signal(oCS2, oAbbot, 1)
+        self.assertEqual(self._get_ids(oCS2, oFilter), [oAbbot.id])
+        oMap = MapPhysicalCardToPhysicalCardSet.selectBy(
+            physicalCardID=oAbbot.id, physicalCardSetID=oCS1.id)[0]
+        MapPhysicalCardToPhysicalCardSet.delete(oMap.id)
+        send_changed_signal(oCS1, oAbbot, -1)
+        self.assertEqual(self._get_ids(oCS1, oFilter),
+                         [oMagnum.id, oMagnum.id])
+        self.assertEqual(self._get_ids(oCS1, CardNameFilter('abbot')), [])
+
+        # Changes without the signal need invalidate_set
+        oCS2.addPhysicalCard(oMagnum.id)
+        self.assertEqual(self._get_ids(oCS2, oFilter), [oAbbot.id])
+        SHARED_CARD_LISTS.invalidate_set(oCS2)
+        self.assertEqual(self._get_ids(oCS2, oFilter),
+                         sorted([oAbbot.id, oMagnum.id]))
+
+        # flush_cache clears everything
+        oMap = MapPhysicalCardToPhysicalCardSet.selectBy(
+            physicalCardID=oMagnum.id, physicalCardSetID=oCS1.id)[0]
+        MapPhysicalCardToPhysicalCardSet.delete(oMap.id)
+        flush_cache()
+        self.assertEqual(self._get_ids(oCS1, oFilter), [oMagnum.id])
+
+    def test_size_limit(self):
+        """Test that only the most recently used lists are kept"""
+        # pylint: disable=protected-access
+        # we check the stored lists directly
+        oAbbot = make_card('abbot', None)
+        aSets = []
+        for iNum in range(3):
+            oCS = PhysicalCardSet(name='Set %d' % iNum)
+            oCS.addPhysicalCard(oAbbot.id)
+            aSets.append(oCS)
+        flush_cache()
+        oFilter = NullFilter()
+        with patch('sutekh.base.core.SharedCardLists.LIST_CACHE_SIZE', 2):
+            self._get_ids(aSets[0], oFilter)
+            self._get_ids(aSets[1], oFilter)
+            # Use the first list again, so the second is the oldest
+            self._get_ids(aSets[0], oFilter)
+            self.assertEqual(self._get_ids(aSets[2], oFilter), [oAbbot.id])
+            self.assertEqual(len(SHARED_CARD_LISTS._dLists), 2)
+            aIds = [x[0] for x in SHARED_CARD_LISTS._dLists.values()]
+            self.assertEqual(aIds, [frozenset([aSets[0].id]),
+                                    frozenset([aSets[2].id])])
+            # Dropped lists are fetched again when needed
+            self.assertEqual(self._get_ids(aSets[1], oFilter), [oAbbot.id])
+            self.assertEqual(len(SHARED_CARD_LISTS._dLists), 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
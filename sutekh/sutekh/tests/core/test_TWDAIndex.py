@@ -0,0 +1,128 @@
+# -*- coding: utf-8 -*-
+# vim:fileencoding=utf-8 ai ts=4 sts=4 et sw=4
+# Copyright 2026 Neil Muller <drnlmuller+sutekh@gmail.com>
+# GPL - see COPYING for details
+
+"""Test the TWDA card to deck index"""
+
+import unittest
+
+from sutekh.base.core.BaseTables import PhysicalCardSet
+from sutekh.base.core.BaseAdapters import IAbstractCard
+from sutekh.base.tests.TestUtils import make_card
+from sutekh.core.TWDAIndex import TWDAIndex, CO_LIFT
+
+from sutekh.tests.TestCore import SutekhTest
+
+DECKS = {
+    'Deck 1': ('TWDA 2009', [('.44 magnum', 3), ('ak-47', 1)]),
+    'Deck 2': ('TWDA 2010', [('.44 magnum', 2), ('abbot', 1),
+                             ('ak-47', 2)]),
+    'Deck 3': ('TWDA 2010', [('abbot', 4)]),
+}
+
+
+class TWDAIndexTests(SutekhTest):
+    """class for the TWDA index tests"""
+    # pylint: disable=too-many-public-methods
+    # unittest.TestCase, so many public methods
+
+    def _setup_decks(self):
+        """Create the TWDA holders and decks"""
+        dHolders = {}
+        for sHolder in ('TWDA 2009', 'TWDA 2010'):
+            dHolders[sHolder] = PhysicalCardSet(name=sHolder)
+        for sName, (sHolder, aCards) in DECKS.items():
+            oCS = PhysicalCardSet(name=sName, parent=dHolders[sHolder],
+                                  inuse=True)
+            for sCard, iCount in aCards:
+                oCard = make_card(sCard, None)
+                for _iNum in range(iCount):
+                    # pylint: disable=no-member
+                    # SQLObject confuses pylint
+                    oCS.addPhysicalCard(oCard.id)
+        # Not in use, so should be ignored
+        oCS = PhysicalCardSet(name='Not used', parent=dHolders['TWDA 2009'])
+        oCS.addPhysicalCard(make_card('abbot', None).id)
+        # Not a TWDA deck
+        oCS = PhysicalCardSet(name='Other', inuse=True)
+        oCS.addPhysicalCard(make_card('abbot', None).id)
+
+    def test_basic(self):
+        """Test building and querying the index"""
+        oIndex = TWDAIndex()
+        self.assertFalse(oIndex.has_holders())
+        self.assertEqual(oIndex.get_deck_names(), [])
+        self._setup_decks()
+        # Index is stale until invalidated
+        self.assertFalse(oIndex.has_holders())
+        oIndex.invalidate()
+        self.assertTrue(oIndex.has_holders())
+        self.assertEqual(sorted(oIndex.get_deck_names()),
+                         ['Deck 1', 'Deck 2', 'Deck 3'])
+
+        aCards = [IAbstractCard(x) for x in ('.44 magnum', 'ak-47',
+                                             'abbot')]
+        dAny = oIndex.find_decks(aCards, 1)
+        self.assertEqual(sorted(x.name for x in dAny),
+                         ['Deck 1', 'Deck 2', 'Deck 3'])
+        dDeck2 = [y for x, y in dAny.items() if x.name == 'Deck 2'][0]
+        self.assertEqual(dDeck2, {'.44 Magnum': 2, 'Abbot': 1,
+                                  'AK-47': 2})
+
+        dAtLeast2 = oIndex.find_decks(aCards, 2)
+        self.assertEqual(sorted(x.name for x in dAtLeast2),
+                         ['Deck 1', 'Deck 2'])
+        dAll = oIndex.find_decks(aCards, len(aCards))
+        self.assertEqual([x.name for x in dAll], ['Deck 2'])
+
+        # Check that removing a deck from use is picked up
+        oCS = PhysicalCardSet.byName('Deck 2')
+        self.assertTrue(oIndex.involves(oCS))
+        oCS.inuse = False
+        oCS.syncUpdate()
+        oIndex.invalidate()
+        self.assertEqual(oIndex.find_decks(aCards, len(aCards)), {})
+        self.assertFalse(oIndex.involves(oCS))
+
+    def test_co_occurrences(self):
+        """Test the card co-occurrence statistics"""
+        oIndex = TWDAIndex()
+        self._setup_decks()
+        oMagnum = IAbstractCard('.44 magnum')
+        oAK = IAbstractCard('ak-47')
+        oAbbot = IAbstractCard('abbot')
+        aResults = oIndex.get_co_occurrences(oMagnum)
+        self.assertEqual([(x.name, y) for x, y, _z, _w in aResults],
+                         [('AK-47', 2), ('Abbot', 1)])
+        # AK-47 appears in every deck with the .44 Magnum
+        self.assertEqual(aResults[0][2], 1.0)
+        # 3 decks, 2 with magnum, 2 with the Abbot, 1 in common
+        self.assertAlmostEqual(aResults[1][3], 0.75)
+        self.assertEqual(len(oIndex.get_co_occurrences(oMagnum, 1)), 1)
+        self.assertEqual(
+            [x.name for x, _y, _z, _w in
+             oIndex.get_co_occurrences(oMagnum, sOrder=CO_LIFT)],
+            ['AK-47', 'Abbot'])
+        self.assertEqual(oIndex.get_co_occurrences(oMagnum, iMinDecks=3),
+                         [])
+
+        # Adding a new deck only needs the holder to be reloaded
+        oHolder = PhysicalCardSet.byName('TWDA 2009')
+        oCS = PhysicalCardSet(name='Deck 4', parent=oHolder, inuse=True)
+        oCS.addPhysicalCard(make_card('abbot', None).id)
+        oCS.addPhysicalCard(make_card('ak-47', None).id)
+        self.assertEqual(oIndex.get_deck_count(), 3)
+        oIndex.mark_changed(oCS)
+        self.assertFalse(oIndex.is_valid())
+        self.assertEqual(oIndex.get_deck_count(), 4)
+        self.assertTrue(oIndex.is_valid())
+        self.assertEqual(
+            [(x.name, y) for x, y, _z, _w in
+             oIndex.get_co_occurrences(oAK)],
+            [('.44 Magnum', 2), ('Abbot', 2)])
+        self.assertEqual(len(oIndex.get_card_decks(oAbbot)), 3)
+
+
+if __name__ == "__main__":
+    unittest.main()
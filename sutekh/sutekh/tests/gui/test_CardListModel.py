@@ -7,6 +7,8 @@
 
 import unittest
 
+from gi.repository import Gtk
+
 from sutekh.base.tests.GuiTestUtils import (count_second_level,
                                             count_all_cards,
                                             count_top_level,
@@ -17,6 +19,7 @@ from sutekh.base.core.BaseAdapters import (IAbstractCard, IPhysicalCard,
                                            IExpansion)
 from sutekh.base.core import BaseFilters
 from sutekh.base.core.BaseGroupings import NullGrouping, CardTypeGrouping
+from sutekh.base.gui import CardListModel as CardListModelModule
 from sutekh.base.gui.CardListModel import CardListModel
 from sutekh.base.gui.MessageBus import MessageBus
 
@@ -185,6 +188,138 @@ class CardListModelTests(ConfigSutekhTest):
         self.assertEqual('Dramatic Upheaval' in aCards, True)
         self.assertEqual('Motivated by Gehenna' in aCards, True)
 
+    def test_load_in_background(self):
+        """Test the background load API"""
+        # pylint: disable=protected-access
+        # we need to access protected methods
+        oModel = CardListModel(self.oConfig)
+        oModel.groupby = NullGrouping
+        oModel.hideillegal = False
+        oListener = LocalTestListener(oModel, True)
+        aCalls = []
+        # The test database is in memory, so this falls back to a
+        # normal load
+        oModel.load_in_background(lambda: aCalls.append('before'),
+                                  lambda: aCalls.append('after'))
+        self.assertEqual(aCalls, ['before', 'after'])
+        self.assertFalse(oModel.is_loading())
+        self.assertTrue(oListener.bLoadCalled)
+        iCards = count_all_cards(oModel)
+        iExpansions = count_second_level(oModel)
+        self.assertEqual(iCards, AbstractCard.select().count())
+        # Filling the model in steps gives the same result
+        iOldSize = CardListModelModule.LOAD_CHUNK_SIZE
+        CardListModelModule.LOAD_CHUNK_SIZE = 10
+        try:
+            oListener.bLoadCalled = False
+            iSteps = len(list(oModel._fill_model(oModel._get_load_data())))
+        finally:
+            CardListModelModule.LOAD_CHUNK_SIZE = iOldSize
+        self.assertEqual(iSteps, iCards // 10)
+        self.assertTrue(oListener.bLoadCalled)
+        self.assertEqual(count_all_cards(oModel), iCards)
+        self.assertEqual(count_second_level(oModel), iExpansions)
+
+        # A failure while filling the store still finishes the load
+        def _broken_fill():
+            """Fail part way through filling the store"""
+            yield
+            raise RuntimeError('Broken fill')
+
+        del aCalls[:]
+        oModel._tLoadCallbacks = (lambda: aCalls.append('before'),
+                                  lambda: aCalls.append('after'))
+        oModel._oActiveFill = _broken_fill()
+        iGeneration = oModel._iLoadGeneration
+        self.assertTrue(oModel.is_loading())
+        self.assertTrue(oModel._fill_step(iGeneration))
+        with self.assertLogs(level='WARNING'):
+            self.assertFalse(oModel._fill_step(iGeneration))
+        self.assertEqual(aCalls, ['after'])
+        self.assertFalse(oModel.is_loading())
+        self.assertEqual(oModel._oActiveFill, None)
+        self.assertEqual(count_all_cards(oModel), iCards)
+
+        # Loading in the main thread doesn't wait for a background gather
+        with oModel._oLoadLock:
+            oModel.load()
+        self.assertEqual(count_all_cards(oModel), iCards)
+
+    def test_update_in_place(self):
+        """Test that reloads only change the rows that differ"""
+        oModel = CardListModel(self.oConfig)
+        oModel.hideillegal = False
+        self.assertFalse(oModel.can_update_in_place())
+        oModel.load()
+        self.assertTrue(oModel.can_update_in_place())
+        aChanges = []
+        oModel.connect('row-inserted',
+                       lambda _oModel, _oPath, _oIter: aChanges.append(1))
+        oModel.connect('row-deleted',
+                       lambda _oModel, _oPath: aChanges.append(-1))
+        # Reloading with the same filter changes nothing
+        oModel.load()
+        self.assertEqual(aChanges, [])
+        iCards = count_all_cards(oModel)
+        iExpansions = count_second_level(oModel)
+        # Narrowing the filter only removes rows
+        oModel.selectfilter = BaseFilters.CardTypeFilter('Vampire')
+        oModel.applyfilter = True
+        oModel.load()
+        self.assertTrue(aChanges)
+        self.assertEqual(set(aChanges), set([-1]))
+        oFresh = CardListModel(self.oConfig)
+        oFresh.hideillegal = False
+        oFresh.selectfilter = oModel.selectfilter
+        oFresh.applyfilter = True
+        oFresh.load()
+        self.assertEqual(get_card_names(oModel), get_card_names(oFresh))
+        self.assertEqual(count_top_level(oModel), count_top_level(oFresh))
+        self.assertEqual(count_second_level(oModel),
+                         count_second_level(oFresh))
+        # Empty results and removing the filter again
+        oModel.selectfilter = BaseFilters.CardNameFilter('ZZZZZZZ')
+        oModel.load()
+        self.assertEqual(count_top_level(oModel), 1)
+        self.assertEqual(count_all_cards(oModel), 0)
+        del aChanges[:]
+        oModel.applyfilter = False
+        oModel.load()
+        self.assertEqual(set(aChanges), set([-1, 1]))
+        self.assertEqual(count_all_cards(oModel), iCards)
+        self.assertEqual(count_second_level(oModel), iExpansions)
+        # Sorting is disabled during the update, and restored afterwards
+        oModel.set_sort_column_id(0, Gtk.SortType.ASCENDING)
+        oModel.selectfilter = BaseFilters.CardTypeFilter('Vampire')
+        oModel.applyfilter = True
+        iOldSize = CardListModelModule.LOAD_CHUNK_SIZE
+        CardListModelModule.LOAD_CHUNK_SIZE = 1
+        try:
+            oUpdate = oModel._fill_model(oModel._get_load_data())
+            next(oUpdate)
+            self.assertEqual(oModel.get_sort_column_id()[0], -2)
+            oUpdate.close()
+        finally:
+            CardListModelModule.LOAD_CHUNK_SIZE = iOldSize
+        self.assertEqual(oModel.get_sort_column_id(),
+                         (0, Gtk.SortType.ASCENDING))
+        oModel.load()
+        self.assertEqual(oModel.get_sort_column_id(),
+                         (0, Gtk.SortType.ASCENDING))
+        oModel.applyfilter = False
+        oModel.load()
+        # Changing the grouping needs a rebuild
+        oModel.groupby = NullGrouping
+        self.assertFalse(oModel.can_update_in_place())
+        oModel.load()
+        self.assertTrue(oModel.can_update_in_place())
+        self.assertEqual(count_all_cards(oModel),
+                         AbstractCard.select().count())
+        oModel.reset_load_state()
+        self.assertFalse(oModel.can_update_in_place())
+        oModel.cleanup()
+        oFresh.cleanup()
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -499,6 +499,34 @@ class TestCardSetFrame(GuiSutekhTest):
         self.assertEqual(len([x for x in oTest2.cards if x == oAblative]), 5)
         self.assertEqual(len([x for x in oTest2.cards if x == oAlex]), 3)
 
+    def test_change_cards(self):
+        """Test applying a group of changes through the controller"""
+        # pylint: disable=protected-access
+        # we need to get at the controller
+        oTest = PhysicalCardSet(name='Test Set 1')
+        oOther = PhysicalCardSet(name='Test Set 2')
+        self.oWin.setup(self.oConfig)
+        oFrame = self.oWin.add_new_physical_card_set('Test Set 1', True)
+        oController = oFrame._oController
+        oAK = make_card(u'AK-47', None)
+        oAlex = make_card(u'Alexandra', u'CE')
+        # None and the card set's name refer to the same card set, so
+        # both sets of changes are applied
+        dResult = oController.change_cards({
+            None: [(oAK, 2)],
+            'Test Set 1': [(oAlex, 1), (oAK, 1)],
+            'Test Set 2': [(oAlex, 1)]})
+        self.assertEqual(len([x for x in oTest.cards if x == oAK]), 3)
+        self.assertEqual(len([x for x in oTest.cards if x == oAlex]), 1)
+        self.assertEqual(len(oOther.cards), 1)
+        self.assertEqual(sorted(dResult), ['Test Set 1', 'Test Set 2'])
+        self.assertEqual(dict(dResult['Test Set 1']),
+                         {oAK: 3, oAlex: 1})
+        # Undo reverses all the changes
+        oController.undo_edit()
+        self.assertEqual(len(oTest.cards), 0)
+        self.assertEqual(len(oOther.cards), 0)
+
 
 if __name__ == "__main__":
     unittest.main()
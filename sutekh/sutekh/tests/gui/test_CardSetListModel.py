@@ -19,6 +19,8 @@ from sutekh.base.tests.GuiTestUtils import (LocalTestListener,
                                             reset_modes,
                                             cleanup_models)
 from sutekh.base.core.DBSignals import send_changed_signal
+from sutekh.base.core.CardSetUtilities import change_card_counts
+from sutekh.base.core.SharedCardLists import SHARED_CARD_LISTS
 from sutekh.base.core import BaseFilters
 from sutekh.base.core.BaseGroupings import (CardTypeGrouping,
                                             ExpansionGrouping,
@@ -26,6 +28,7 @@ from sutekh.base.core.BaseGroupings import (CardTypeGrouping,
 from sutekh.base.core.BaseTables import (PhysicalCardSet,
                                          MapPhysicalCardToPhysicalCardSet)
 from sutekh.base.gui.BaseConfigFile import CARDSET, FRAME
+from sutekh.base.gui import CardSetListModel
 from sutekh.base.gui.CardSetListModel import (CardSetCardListModel,
                                               EXTRA_LEVEL_OPTION,
                                               EXTRA_LEVEL_LOOKUP,
@@ -250,6 +253,8 @@ class CardSetListModelTests(ConfigSutekhTest):
             dCountInfo[oModel]['added'] = None
             # Ensure we start with a clean cache
             oModel._dCache = {}
+        # The test cases add cards without sending the changed signals
+        SHARED_CARD_LISTS.invalidate()
         for bEditFlag in (False, True):
             for oModel in aModels:
                 oModel.bEditable = bEditFlag
@@ -283,6 +288,7 @@ class CardSetListModelTests(ConfigSutekhTest):
             oController = DummyCardSetController()
             oModel.set_controller(oController)
             oModel._dCache = {}
+        SHARED_CARD_LISTS.invalidate()
         for bEditFlag in (False, True):
             for oModel in aModels:
                 oModel.bEditable = bEditFlag
@@ -625,6 +631,32 @@ class CardSetListModelTests(ConfigSutekhTest):
         self._loop_modes(oPCS, aModels)
         cleanup_models(aModels)
 
+    def test_load_state(self):
+        """Check gathering the data for a load doesn't change the model"""
+        # pylint: disable=protected-access
+        # we need to access protected methods
+        _oCache = SutekhObjectCache()
+        self._setup_simple()
+        oModel = self._get_model(self.aNames[0])
+        oModel.load()
+        dCache = oModel._dCache
+        self.assertFalse(oModel._bPhysicalFilter)
+        self.assertEqual(oModel._dAbs2Phys, {})
+        oModel.selectfilter = BaseFilters.PhysicalExpansionFilter(
+            'Third Edition')
+        oModel.applyfilter = True
+        # This is what runs in the background thread
+        tData = oModel._get_load_data()
+        self.assertTrue(oModel._dCache is dCache)
+        self.assertFalse(oModel._bPhysicalFilter)
+        self.assertEqual(oModel._dAbs2Phys, {})
+        for _oStep in oModel._fill_model(tData):
+            pass
+        self.assertFalse(oModel._dCache is dCache)
+        self.assertTrue(oModel._bPhysicalFilter)
+        self.assertNotEqual(oModel._dAbs2Phys, {})
+        cleanup_models([oModel])
+
     def test_cache_simple(self):
         """Test that the special persistent caches don't affect results"""
         # pylint: disable=protected-access
@@ -817,6 +849,144 @@ class CardSetListModelTests(ConfigSutekhTest):
         oGrandChild2PCS.syncUpdate()
         return oPCS, oSibPCS, oChildPCS, oGrandChildPCS, oGrandChild2PCS
 
+    def _check_batch(self, dChanges, aModels):
+        """Apply a batch of changes and check the models match a reload"""
+        change_card_counts(dChanges)
+        for oModel in aModels:
+            tBatchTotals = (
+                oModel.iter_n_children(None),
+                count_all_cards(oModel),
+                count_second_level(oModel))
+            aBatchList = sorted(get_all_counts(oModel))
+            oModel.load()
+            tLoadTotals = (
+                oModel.iter_n_children(None),
+                count_all_cards(oModel),
+                count_second_level(oModel))
+            aLoadList = sorted(get_all_counts(oModel))
+            self.assertEqual(tBatchTotals, tLoadTotals,
+                             self._format_error(
+                                 "Totals for batch and load differ",
+                                 tBatchTotals, tLoadTotals, oModel))
+            self.assertEqual(aBatchList, aLoadList,
+                             self._format_error(
+                                 "Card lists for batch and load differ",
+                                 aBatchList, aLoadList, oModel))
+
+    def test_batch_changes(self):
+        """Test applying batches of changes to the model"""
+        # pylint: disable=protected-access
+        # we need to access protected methods
+        _oCache = SutekhObjectCache()
+        oPCS, oSibPCS, oChildPCS, _oGC1, _oGC2 = self._setup_relationships()
+        aModels = [self._get_model(self.aNames[0]),
+                   self._get_model(self.aNames[1])]
+        oFiltered = self._get_model(self.aNames[1])
+        oFiltered.selectfilter = BaseFilters.CardSetMultiCardCountFilter(
+            (['2', '3'], self.aNames[1]))
+        oFiltered.applyfilter = True
+        aModels.append(oFiltered)
+        aCards = self.aPhysCards[:8]
+        for bEditFlag in (False, True):
+            for oModel in aModels:
+                oModel.bEditable = bEditFlag
+            for iShowMode in (ALL_CARDS, CHILD_CARDS, THIS_SET_ONLY):
+                for iLevelMode in (SHOW_EXPANSIONS, EXP_AND_CARD_SETS,
+                                   CARD_SETS_AND_EXP):
+                    for iParentMode in (PARENT_COUNT, MINUS_SETS_IN_USE):
+                        for oModel in aModels:
+                            oModel._change_count_mode(iShowMode)
+                            oModel._change_level_mode(iLevelMode)
+                            oModel._change_parent_count_mode(iParentMode)
+                            oModel.load()
+                        for oCS in (oPCS, oChildPCS, oSibPCS):
+                            self._check_batch(
+                                {oCS: [(x, 2) for x in aCards]}, aModels)
+                            self._check_batch(
+                                {oCS: [(x, -2) for x in aCards]}, aModels)
+                        # Several card sets at once
+                        self._check_batch(
+                            {oPCS: [(x, 1) for x in aCards],
+                             oChildPCS: [(x, 3) for x in aCards[::2]]},
+                            aModels)
+                        self._check_batch(
+                            {oPCS: [(x, -1) for x in aCards],
+                             oChildPCS: [(x, -3) for x in aCards[::2]]},
+                            aModels)
+        for oModel in aModels:
+            reset_modes(oModel)
+        # Large batches queue a reload
+        oDummy = DummyCardSetController()
+        aModels[0].set_controller(oDummy)
+        iOldLimit = CardSetListModel.BATCH_RELOAD_LIMIT
+        CardSetListModel.BATCH_RELOAD_LIMIT = 2
+        try:
+            change_card_counts({oPCS: [(x, 1) for x in aCards]})
+        finally:
+            CardSetListModel.BATCH_RELOAD_LIMIT = iOldLimit
+        self.assertTrue(oDummy.bReload)
+        cleanup_models(aModels)
+
+    def _get_card_rows(self, oModel):
+        """Return the counts for the card level rows in the model"""
+        aResults = []
+        oIter = oModel.get_iter_first()
+        while oIter:
+            oChildIter = oModel.iter_children(oIter)
+            while oChildIter:
+                aResults.append((oModel.get_value(oChildIter, 1),
+                                 oModel.get_value(oChildIter, 2),
+                                 oModel.get_name_from_iter(oChildIter)))
+                oChildIter = oModel.iter_next(oChildIter)
+            oIter = oModel.iter_next(oIter)
+        return sorted(aResults)
+
+    def _populate_all(self, oModel):
+        """Add the deferred children for all the cards in the model"""
+        oIter = oModel.get_iter_first()
+        while oIter:
+            oChildIter = oModel.iter_children(oIter)
+            while oChildIter:
+                oModel.populate_children(oChildIter)
+                oChildIter = oModel.iter_next(oChildIter)
+            oIter = oModel.iter_next(oIter)
+
+    def test_lazy_children(self):
+        """Test that lazily added children match the full model"""
+        # pylint: disable=protected-access
+        # we need to access protected methods
+        _oCache = SutekhObjectCache()
+        oPCS, _oSibPCS, oChildPCS, _oGC1, _oGC2 = self._setup_relationships()
+        oEager = self._get_model(self.aNames[0])
+        oLazy = self._get_model(self.aNames[0])
+        oLazy.enable_lazy_children()
+        aModels = [oEager, oLazy]
+        aCards = self.aPhysCards[:8]
+        for iShowMode in (ALL_CARDS, CHILD_CARDS, THIS_SET_ONLY):
+            for iLevelMode in (SHOW_EXPANSIONS, EXP_AND_CARD_SETS,
+                               CARD_SETS_AND_EXP):
+                for oModel in aModels:
+                    oModel._change_count_mode(iShowMode)
+                    oModel._change_level_mode(iLevelMode)
+                    oModel._change_parent_count_mode(PARENT_COUNT)
+                    oModel.load()
+                self.assertEqual(self._get_card_rows(oLazy),
+                                 self._get_card_rows(oEager))
+                # Changes to cards that haven't been expanded
+                change_card_counts({oPCS: [(x, 2) for x in aCards],
+                                    oChildPCS: [(x, 1) for x in aCards]})
+                self.assertEqual(self._get_card_rows(oLazy),
+                                 self._get_card_rows(oEager))
+                self._populate_all(oLazy)
+                self.assertEqual(sorted(get_all_counts(oLazy)),
+                                 sorted(get_all_counts(oEager)))
+                change_card_counts({oPCS: [(x, -2) for x in aCards],
+                                    oChildPCS: [(x, -1) for x in aCards]})
+                self._populate_all(oLazy)
+                self.assertEqual(sorted(get_all_counts(oLazy)),
+                                 sorted(get_all_counts(oEager)))
+        cleanup_models(aModels)
+
     def test_child_parent(self):
         """Tests Model against parent-child relationships"""
         _oCache = SutekhObjectCache()
@@ -1276,6 +1446,7 @@ class CardSetListModelTests(ConfigSutekhTest):
         oController = DummyCardSetController()
         oModel.set_controller(oController)
         oModel._dCache = {}
+        SHARED_CARD_LISTS.invalidate()
 
         oModel._change_count_mode(ALL_CARDS)
         oModel._change_level_mode(SHOW_CARD_SETS)
@@ -1335,6 +1506,7 @@ class CardSetListModelTests(ConfigSutekhTest):
         oController = DummyCardSetController()
         oModel.set_controller(oController)
         oModel._dCache = {}
+        SHARED_CARD_LISTS.invalidate()
 
         oModel._change_count_mode(THIS_SET_ONLY)
         oModel._change_level_mode(NO_SECOND_LEVEL)
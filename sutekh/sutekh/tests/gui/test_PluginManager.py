@@ -0,0 +1,111 @@
+# -*- coding: utf-8 -*-
+# vim:fileencoding=utf-8 ai ts=4 sts=4 et sw=4
+# Copyright 2026 Neil Muller <drnlmuller+sutekh@gmail.com>
+# GPL - see COPYING for details
+
+"""Test the deferred plugin loading"""
+
+import unittest
+
+from mock import patch
+
+from gi.repository import Gtk
+
+from sutekh.base.core.BaseTables import PhysicalCardSet
+from sutekh.base.gui.BasePluginManager import DeferredPluginInfo
+from sutekh.gui.PluginManager import PluginManager
+from sutekh.gui.plugins import DEFERRED_PLUGINS
+from sutekh.tests.TestCore import SutekhTest
+
+
+class PluginManagerTests(SutekhTest):
+    """Class for the plugin manager tests"""
+    # pylint: disable=too-many-public-methods
+    # unittest.TestCase, so many public methods
+
+    def test_metadata(self):
+        """Test the deferred plugin metadata matches the plugins"""
+        oManager = PluginManager()
+        oManager.load_plugins()
+        dPlugins = dict((oManager.get_plugin_name(cPlugin), cPlugin) for
+                        cPlugin in oManager.get_all_plugins())
+        for sName, (aModels, dVersions, aMenus) in \
+                DEFERRED_PLUGINS.items():
+            cPlugin = dPlugins[sName]
+            self.assertEqual(tuple(aModels), tuple(cPlugin.aModelsSupported))
+            self.assertEqual(dVersions, cPlugin.dTableVersions, sName)
+            # Plugins with config need to be loaded at start-up
+            for sConfig in ('dGlobalConfig', 'dPerPaneConfig',
+                            'dCardListConfig', 'dCardSetListConfig'):
+                self.assertFalse(getattr(cPlugin, sConfig), sName)
+            oPlugin = cPlugin(None, None, aModels[0])
+            aItems = oPlugin.get_menu_item()
+            if not isinstance(aItems, list):
+                aItems = [aItems]
+            self.assertEqual([(sMenu, oItem.get_label()) for sMenu, oItem in
+                              aItems], list(aMenus), sName)
+            oPlugin.cleanup()
+
+    def test_deferred(self):
+        """Test loading a deferred plugin"""
+        oManager = PluginManager()
+        oManager.load_plugins(True)
+        aDeferred = [cPlugin for cPlugin in oManager.get_all_plugins() if
+                     isinstance(cPlugin, DeferredPluginInfo)]
+        self.assertEqual(sorted(oManager.get_plugin_name(x) for x in
+                                aDeferred),
+                         sorted(DEFERRED_PLUGINS))
+        dCosts = oManager.get_startup_costs()
+        # We only import the other plugins
+        self.assertEqual(list(dCosts['CardSetExportCSV']), ['version check'])
+        self.assertTrue('import' in dCosts['ExtraCardViewColumns'])
+
+        oInfo = [x for x in aDeferred if x.sName == 'CardSetExportCSV'][0]
+        self.assertTrue(oInfo in oManager.get_plugins_for(PhysicalCardSet))
+        self.assertFalse(oInfo in oManager.get_plugins_for('MainWindow'))
+        oPlugin = oInfo(None, None, PhysicalCardSet)
+        self.assertEqual(oPlugin.plugin, None)
+        oMenu = Gtk.Menu()
+        oCatchAll = Gtk.Menu()
+        oPlugin.add_to_menu({'Export Card Set': oMenu}, oCatchAll)
+        self.assertEqual([x.get_label() for x in oMenu.get_children()],
+                         ['Export to CSV'])
+        self.assertEqual(oCatchAll.get_children(), [])
+        # Adding the menu items doesn't load the plugin
+        self.assertEqual(oPlugin.plugin, None)
+        self.assertFalse('import' in
+                         oManager.get_startup_costs().get('CardSetExportCSV',
+                                                          {}))
+
+        # pylint: disable=protected-access
+        # We want to load the plugin without running the menu action
+        self.assertTrue(oPlugin._load())
+        # pylint: enable=protected-access
+        cPlugin = oInfo.load()
+        self.assertEqual(cPlugin.__name__, 'CardSetExportCSV')
+        self.assertTrue(isinstance(oPlugin.plugin, cPlugin))
+        dCosts = oManager.get_startup_costs()['CardSetExportCSV']
+        self.assertTrue('import' in dCosts)
+        self.assertTrue('init' in dCosts)
+        oPlugin.cleanup()
+        self.assertEqual(oPlugin.plugin, None)
+
+    def test_versions(self):
+        """Test that deferred plugins are skipped if they don't support
+           the database"""
+        aModels, _dVersions, aMenus = DEFERRED_PLUGINS['CardSetExportCSV']
+        with patch.dict(DEFERRED_PLUGINS, {'CardSetExportCSV': (
+                aModels, {PhysicalCardSet: (1,)}, aMenus)}):
+            oManager = PluginManager()
+            oManager.load_plugins(True)
+        aNames = [oManager.get_plugin_name(x) for x in
+                  oManager.get_all_plugins()]
+        self.assertFalse('CardSetExportCSV' in aNames)
+        self.assertTrue('CardSetExport' in aNames)
+        # We checked the versions without importing the plugin
+        dCosts = oManager.get_startup_costs()['CardSetExportCSV']
+        self.assertEqual(list(dCosts), ['version check'])
+
+
+if __name__ == "__main__":
+    unittest.main()
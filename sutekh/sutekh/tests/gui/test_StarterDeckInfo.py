@@ -0,0 +1,112 @@
+# -*- coding: utf-8 -*-
+# vim:fileencoding=utf-8 ai ts=4 sts=4 et sw=4
+# Copyright 2026 Neil Muller <drnlmuller+sutekh@gmail.com>
+# GPL - see COPYING for details
+
+"""Test the card to starter deck index of the starter info plugin"""
+
+import unittest
+
+from sutekh.base.core.BaseTables import PhysicalCardSet
+from sutekh.base.core.BaseAdapters import IAbstractCard
+from sutekh.base.core.CardSetUtilities import (change_card_counts,
+                                               delete_physical_card_set)
+from sutekh.base.core.DBSignals import send_changed_signal
+from sutekh.base.tests.TestUtils import make_card
+from sutekh.gui.plugins.StarterDeckInfo import StarterInfoPlugin
+from sutekh.tests.TestCore import SutekhTest
+
+
+class StarterDeckInfoTests(SutekhTest):
+    """Class for the starter deck index tests"""
+    # pylint: disable=too-many-public-methods
+    # unittest.TestCase, so many public methods
+    # pylint: disable=protected-access
+    # We test the plugin's index directly
+
+    def test_index(self):
+        """Test building and invalidating the starter deck index"""
+        # pylint: disable=too-many-statements
+        # Want a long, sequential test case to minimise
+        # repeated setups, so it has lots of lines
+        oHektor = make_card(u'Hektor', u'Third Edition')
+        oRaven = make_card(u'Raven Spy', u'Third Edition')
+        oStarter = PhysicalCardSet(name='[Third Edition] Tremere Starter')
+        oOther = PhysicalCardSet(name='Not a starter')
+        for oCS in (oStarter, oStarter, oOther):
+            oCS.addPhysicalCard(oHektor.id)
+        oHektorAbs = IAbstractCard(u'Hektor')
+        oRavenAbs = IAbstractCard(u'Raven Spy')
+
+        oPlugin = StarterInfoPlugin(None, None, 'MainWindow')
+        oPlugin._connect_signals()
+        try:
+            dInfo = oPlugin._get_card_set_info(oHektorAbs)
+            self.assertTrue(oPlugin._bIndexValid)
+            self.assertEqual(list(oPlugin._dStarters), [oStarter.id])
+            self.assertEqual(oPlugin._dCardIndex[oHektorAbs.id],
+                             [(oStarter.id, 2)])
+            self.assertEqual(dInfo['Starters'],
+                             ['x 2 Third Edition (Tremere)'])
+            self.assertEqual(dInfo['Demos'], [])
+            self.assertEqual(dInfo['Fixed'], [])
+            self.assertEqual(oPlugin._get_card_set_info(oRavenAbs)['Starters'],
+                             [])
+
+            # Changes to other card sets leave the index alone
+            oOther.addPhysicalCard(oRaven.id)
+            send_changed_signal(oOther, oRaven, 1)
+            change_card_counts({oOther: [(oHektor, 1)]})
+            self.assertTrue(oPlugin._bIndexValid)
+
+            # Changing a starter deck rebuilds the index
+            oStarter.addPhysicalCard(oHektor.id)
+            send_changed_signal(oStarter, oHektor, 1)
+            self.assertFalse(oPlugin._bIndexValid)
+            self.assertEqual(
+                oPlugin._get_card_set_info(oHektorAbs)['Starters'],
+                ['x 3 Third Edition (Tremere)'])
+            self.assertTrue(oPlugin._bIndexValid)
+
+            # As does a batch of changes
+            change_card_counts({oStarter: [(oRaven, 1), (oHektor, -1)]})
+            self.assertFalse(oPlugin._bIndexValid)
+            self.assertEqual(
+                oPlugin._get_card_set_info(oRavenAbs)['Starters'],
+                ['x 1 Third Edition (Tremere)'])
+            self.assertEqual(
+                oPlugin._get_card_set_info(oHektorAbs)['Starters'],
+                ['x 2 Third Edition (Tremere)'])
+
+            # Adding a starter deck
+            oDemo = PhysicalCardSet(name='[Third Edition] Tremere Demo Deck')
+            self.assertFalse(oPlugin._bIndexValid)
+            oDemo.addPhysicalCard(oHektor.id)
+            self.assertEqual(
+                sorted(oPlugin._get_card_set_info(oHektorAbs).items()),
+                [('Demos', ['x 1 Third Edition (Tremere)']),
+                 ('Fixed', []),
+                 ('Starters', ['x 2 Third Edition (Tremere)'])])
+            self.assertEqual(sorted(oPlugin._dStarters),
+                             sorted([oStarter.id, oDemo.id]))
+
+            # Deleting a starter deck
+            delete_physical_card_set(oDemo.name)
+            self.assertFalse(oPlugin._bIndexValid)
+            self.assertEqual(
+                oPlugin._get_card_set_info(oHektorAbs)['Demos'], [])
+            self.assertEqual(list(oPlugin._dStarters), [oStarter.id])
+
+            # Renaming a card set
+            oOther.name = '[Third Edition] Other Starter'
+            oOther.syncUpdate()
+            self.assertFalse(oPlugin._bIndexValid)
+            self.assertEqual(
+                oPlugin._get_card_set_info(oHektorAbs)['Starters'],
+                ['x 2 Third Edition (Other)', 'x 2 Third Edition (Tremere)'])
+        finally:
+            oPlugin._disconnect_signals()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -9,7 +9,9 @@ from io import StringIO
 import unittest
 
 from sutekh.base.core.BaseAdapters import IPhysicalCardSet
+from sutekh.base.core.BaseTables import PhysicalCardSet
 from sutekh.base.core.CardSetHolder import CardSetWrapper
+from sutekh.base.io.IOBase import BaseXMLWriter
 
 from sutekh.io.PhysicalCardSetWriter import PhysicalCardSetWriter
 from sutekh.io.XmlFileHandling import PhysicalCardSetXmlFile
@@ -159,6 +161,25 @@ class PhysicalCardSetWriterTests(SutekhTest):
         oFile.close()
         self._compare_xml_strings(sWriterXML, EXPECTED_4)
 
+    def test_streamed_output(self):
+        """Test the streamed output matches the full tree output"""
+        oWriter = PhysicalCardSetWriter()
+        oPhysCardSet1 = make_set_1()
+        oPhysCardSet2 = make_set_2()
+        oPhysCardSet3 = make_set_3()
+        # pylint: disable=no-member
+        # SQLObject confuses pylint
+        oEmpty = PhysicalCardSet(name='Empty & <Set>', comment='',
+                                 annotations=None, inuse=True,
+                                 parent=oPhysCardSet1)
+        oPhysCardSet2.parent = oPhysCardSet3
+        for oCS in (oPhysCardSet1, oPhysCardSet2, oPhysCardSet3, oEmpty):
+            oFile = StringIO()
+            oWriter.write(oFile, CardSetWrapper(oCS))
+            oTreeFile = StringIO()
+            BaseXMLWriter.write(oWriter, oTreeFile, CardSetWrapper(oCS))
+            self.assertEqual(oFile.getvalue(), oTreeFile.getvalue())
+
 
 if __name__ == "__main__":
     unittest.main()